@@ -8,7 +8,12 @@ import json
 import subprocess
 from pathlib import Path
 
+from binary_strings import extract, print_flags
+import entropy_map
+from log_parser import LogParser
+
 SOFTWARE_DIR = Path("8BitDo_Ultimate_Software_V2_Windows_V1.29/8BitDo_Ultimate_Software_V2_Windows_V1.29")
+LOG_STATE_FILE = Path("8bitdo_log_state.json")   # offsets so re-runs only parse new log lines
 
 def analyze_software():
     """Analyze the 8BitDo software installation"""
@@ -47,21 +52,21 @@ def analyze_software():
     print("Log Files Analysis:")
     print("=" * 60)
     
+    log_parser = LogParser(str(LOG_STATE_FILE))
+    
     log_dir = SOFTWARE_DIR / "Log"
     if log_dir.exists():
-        log_files = list(log_dir.glob("*.txt"))
+        log_files = sorted(log_dir.glob("*.txt"))
         print(f"  Found {len(log_files)} log files:")
-        for log_file in sorted(log_files)[-3:]:  # Show last 3
+        new_records = sum(1 for _ in log_parser.parse(str(f) for f in log_files))
+        print(f"  {new_records} new records since last run")
+        for log_file in log_files[-3:]:  # Show last 3
             print(f"    - {log_file.name}")
-            try:
-                with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    if "PID" in content or "VID" in content:
-                        lines = [l for l in content.split('\n') if 'PID' in l or 'VID' in l]
-                        if lines:
-                            print(f"      Sample: {lines[0][:80]}")
-            except:
-                pass
+            summary = log_parser.summary(log_file)
+            if summary['last_device']:
+                print(f"      Sample: {summary['last_device'][:80]}")
+            for ids, count in summary['devices'].items():
+                print(f"      VID:PID {ids} seen {count} times")
     
     # Check error log
     print("\n" + "=" * 60)
@@ -71,37 +76,30 @@ def analyze_software():
     err_log = SOFTWARE_DIR / "ErrLog" / "ErrLog.txt"
     if err_log.exists():
         try:
-            with open(err_log, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                print(f"  Error log size: {len(content)} bytes")
-                
-                # Look for firmware update information
-                if "firmware" in content.lower() or "version" in content.lower():
-                    print("  >>> Contains firmware/version information! <<<")
-                    
-                    # Try to extract JSON
-                    lines = content.split('\n')
-                    for line in lines:
-                        if line.strip().startswith('{'):
-                            try:
-                                data = json.loads(line)
-                                if 'list' in data and data['list']:
-                                    print(f"\n  Firmware Update Information:")
-                                    for item in data['list']:
-                                        print(f"    Version: {item.get('version', 'N/A')}")
-                                        print(f"    Date: {item.get('date', 'N/A')}")
-                                        print(f"    File: {item.get('fileName', 'N/A')}")
-                                        print(f"    Size: {item.get('fileSize', 0):,} bytes")
-                                        print(f"    MD5: {item.get('md5', 'N/A')}")
-                                        print(f"    Type: {item.get('type', 'N/A')}")
-                                        if 'readme' in item:
-                                            print(f"    Readme: {item['readme']}")
-                                        print()
-                            except:
-                                pass
+            for _ in log_parser.parse_file(str(err_log)):
+                pass
+            summary = log_parser.summary(err_log)
+            print(f"  Error log size: {err_log.stat().st_size} bytes")
+            print(f"  Error lines: {summary['errors']}")
+            
+            if summary['firmware']:
+                print("  >>> Contains firmware/version information! <<<")
+                print(f"\n  Firmware Update Information:")
+                for item in summary['firmware']:
+                    print(f"    Version: {item['version'] or 'N/A'}")
+                    print(f"    Date: {item['date'] or 'N/A'}")
+                    print(f"    File: {item['file_name'] or 'N/A'}")
+                    print(f"    Size: {item['file_size'] or 0:,} bytes")
+                    print(f"    MD5: {item['md5'] or 'N/A'}")
+                    print(f"    Type: {item['type'] or 'N/A'}")
+                    if item['readme']:
+                        print(f"    Readme: {item['readme']}")
+                    print()
         except Exception as e:
             print(f"  Error reading log: {e}")
     
+    log_parser.save()
+    
     # Check for DFU tool
     print("\n" + "=" * 60)
     print("DFU Tool Analysis:")
@@ -116,6 +114,29 @@ def analyze_software():
         print(f"      - Read firmware from device")
         print(f"      - Write firmware to device")
         print(f"      - Potentially extract firmware for analysis")
+        
+        if entropy_map.np is not None:
+            offsets, entropy, size = entropy_map.map_file(str(dfu_tool))
+            print(f"\n    Entropy map (run entropy_map.py for the full profile):")
+            regions = entropy_map.find_regions(offsets, entropy, entropy_map.DEFAULT_WINDOW, size)
+            for start, end, name, mean in regions:
+                if end - start >= 65536:
+                    print(f"      0x{start:08X}-0x{end:08X}  {mean:.2f} bits/byte  {name}")
+    
+    # Scan the key binaries for VID/PID constants and HID descriptors
+    print("\n" + "=" * 60)
+    print("Binary Signature Scan:")
+    print("=" * 60)
+    
+    binaries = [str(SOFTWARE_DIR / f) for f in ("dfu4.exe", "RTKHIDKit.dll", "8BitDoAdvance.dll")
+                if (SOFTWARE_DIR / f).exists()]
+    if binaries:
+        result = extract(binaries)
+        print(f"  {len(result['strings']):,} unique strings in {len(binaries)} binaries")
+        if result['flags']:
+            print_flags(result['flags'])
+        else:
+            print("  No VID/PID constants or HID report descriptors found")
     
     # Check for data directory
     print("\n" + "=" * 60)
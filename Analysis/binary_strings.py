@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Binary Strings / Signature Extractor
+Built-in replacement for the external `strings` pass that produced
+strings_output.txt. Each binary is memory-mapped and scanned with compiled
+byte regexes for ASCII and UTF-16LE strings, so nothing is decoded byte by
+byte in Python. Files are spread across a process pool.
+
+Besides strings it flags things that matter for this controller:
+    - VID/PID constants 2DC8 / 301F / 3208 in text (e.g. "VID_2DC8&PID_301F")
+    - VID/PID pairs stored as little-endian u16s (as in a device descriptor)
+    - HID report descriptors and their report ID items for the IDs the
+      bridge reads (0x01, 0x02) and the sweeper probes (0x43-0x46, 0x85)
+
+Output is deduplicated (one line per unique string) with an offset index
+(file, offset, encoding) for every occurrence.
+"""
+
+import json
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from controller_state import INPUT_REPORT_ID, VENDOR_REPORT_ID
+from report_sweeper import DEFAULT_IDS, parse_ids
+
+MIN_LENGTH = 4
+
+VITURE_VID = 0x2DC8
+KNOWN_PIDS = {0x301F: "normal mode", 0x3208: "update mode"}
+KNOWN_REPORT_IDS = {INPUT_REPORT_ID: "gamepad input", VENDOR_REPORT_ID: "vendor input"}
+KNOWN_REPORT_IDS.update((i, "vendor output/feature") for i in parse_ids(DEFAULT_IDS))
+
+BINARY_EXTENSIONS = (".exe", ".dll", ".bin", ".sys", ".fw", ".dfu", ".img", ".rom")
+
+_TEXT_ID = re.compile(rb"(?i)(?<![0-9A-F])(2DC8|301F|3208)(?![0-9A-F])")
+
+# Generic Desktop Game Pad/Joystick collection, or a vendor-defined page collection
+_DESCRIPTOR_START = re.compile(rb"\x05\x01\x09[\x04\x05]\xa1\x01|\x06\x00\xff\x09.\xa1\x01", re.DOTALL)
+_REPORT_ID_ITEM = re.compile(rb"\x85([" + re.escape(bytes(sorted(KNOWN_REPORT_IDS))) + rb"])")
+DESCRIPTOR_WINDOW = 512
+
+
+def _string_patterns(min_length):
+    ascii_re = re.compile(rb"[\x20-\x7e]{%d,}" % min_length)
+    utf16_re = re.compile(rb"(?:[\x20-\x7e]\x00){%d,}" % min_length)
+    return ascii_re, utf16_re
+
+
+def _id_pair_pattern():
+    pairs = [VITURE_VID.to_bytes(2, "little") + pid.to_bytes(2, "little") for pid in KNOWN_PIDS]
+    return re.compile(b"|".join(re.escape(p) for p in pairs))
+
+
+def scan_file(path, min_length=MIN_LENGTH):
+    """Scan one file. Returns (path, strings, flags).
+
+    strings: [(offset, encoding, text)]
+    flags:   [(offset, kind, detail)]
+    Runs in a worker process, so it only returns plain tuples.
+    """
+    strings = []
+    flags = []
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return path, strings, flags
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        return path, strings, [(0, "error", str(e))]
+
+    try:
+        ascii_re, utf16_re = _string_patterns(min_length)
+        for m in ascii_re.finditer(data):
+            strings.append((m.start(), "ascii", m.group().decode("ascii")))
+        for m in utf16_re.finditer(data):
+            strings.append((m.start(), "utf16le", m.group().decode("utf-16-le")))
+
+        for offset, encoding, text in strings:
+            raw = text.encode("ascii")
+            for m in _TEXT_ID.finditer(raw):
+                value = int(m.group(1), 16)
+                step = 2 if encoding == "utf16le" else 1
+                flags.append((offset + m.start() * step, "id-text", _describe_id(value) + f": {text[:80]}"))
+
+        for m in _id_pair_pattern().finditer(data):
+            pid = int.from_bytes(m.group()[2:], "little")
+            flags.append((m.start(), "id-binary", f"VID 2DC8 / PID {pid:04X} ({KNOWN_PIDS[pid]}) as u16 LE"))
+
+        for m in _DESCRIPTOR_START.finditer(data):
+            start = m.start()
+            flags.append((start, "hid-descriptor", "report descriptor collection start"))
+            window = data[start:start + DESCRIPTOR_WINDOW]
+            for item in _REPORT_ID_ITEM.finditer(window):
+                report_id = item.group(1)[0]
+                flags.append((start + item.start(), "report-id",
+                              f"Report ID 0x{report_id:02X} ({KNOWN_REPORT_IDS[report_id]})"))
+    finally:
+        data.close()
+
+    strings.sort()
+    flags.sort()
+    return path, strings, flags
+
+
+def _describe_id(value):
+    if value == VITURE_VID:
+        return "VID 2DC8"
+    return f"PID {value:04X} ({KNOWN_PIDS[value]})"
+
+
+def collect_files(paths, extensions=BINARY_EXTENSIONS):
+    """Expand directories into the binaries inside them; explicit files are kept as-is"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, names in os.walk(path):
+                for name in sorted(names):
+                    if extensions is None or name.lower().endswith(extensions):
+                        files.append(os.path.join(dirpath, name))
+        else:
+            files.append(path)
+    return files
+
+
+def extract(paths, min_length=MIN_LENGTH, workers=None, extensions=BINARY_EXTENSIONS):
+    """Scan every file under `paths` in a process pool.
+
+    Returns a dict:
+        strings: {text: [(file, offset, encoding), ...]}  in first-seen order
+        flags:   [(file, offset, kind, detail), ...]      sorted by file, offset
+    """
+    files = collect_files(paths, extensions)
+    index = {}
+    flags = []
+    if not files:
+        return {"strings": index, "flags": flags}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() keeps input order, so the output is deterministic
+        for path, strings, file_flags in pool.map(scan_file, files, [min_length] * len(files)):
+            for offset, encoding, text in strings:
+                index.setdefault(text, []).append((path, offset, encoding))
+            flags.extend((path, offset, kind, detail) for offset, kind, detail in file_flags)
+    return {"strings": index, "flags": flags}
+
+
+def print_flags(flags, file=None):
+    for path, offset, kind, detail in flags:
+        print(f"  {os.path.basename(path)}:0x{offset:08X}  [{kind}] {detail}", file=file)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract strings and VID/PID/report ID signatures from binaries")
+    parser.add_argument("paths", nargs="+", help="files or directories to scan")
+    parser.add_argument("-n", "--min-length", type=int, default=MIN_LENGTH, help="minimum string length")
+    parser.add_argument("-o", "--output", help="write unique strings here (default: stdout)")
+    parser.add_argument("--offsets", action="store_true", help="list every occurrence with file and offset")
+    parser.add_argument("--json", metavar="FILE", help="write the full string/offset index and flags as JSON")
+    parser.add_argument("--all-files", action="store_true", help="scan every file, not just known binary types")
+    parser.add_argument("--workers", type=int, help="process pool size")
+    args = parser.parse_args()
+
+    result = extract(args.paths, args.min_length, args.workers,
+                     None if args.all_files else BINARY_EXTENSIONS)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for text, occurrences in result["strings"].items():
+            if args.offsets:
+                for path, offset, encoding in occurrences:
+                    out.write(f"{os.path.basename(path)}:0x{offset:08X} {encoding:7} {text}\n")
+            else:
+                out.write(text + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"strings": result["strings"], "flags": result["flags"]}, f, indent=1)
+
+    print(f"\n{len(result['strings'])} unique strings, {len(result['flags'])} signature hits", file=sys.stderr)
+    if result["flags"]:
+        print_flags(result["flags"], file=sys.stderr)
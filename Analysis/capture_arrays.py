@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Capture Arrays
+Loads a capture file (Bridge/capture_format.py) into NumPy arrays in a
+handful of vectorized passes instead of one Python object per record.
+
+Records are variable length, but captures are long runs of same-sized
+input reports. Starting at a record, the rest of the file is viewed as a
+(records, header + length) array with no copy; the run continues up to
+the first row whose kind or length differs, and the whole run is sliced
+out at once. Only markers and odd-sized reports break a run, so a
+regular capture loads at millions of records per second; irregular
+stretches (interleaved report IDs, fuzzed lengths) are walked record by
+record until a run starts again.
+
+    arrays = load_capture("session.vxcap")
+    frames = arrays.frames(report_id=1, width=8)    # (N, 8) uint8
+
+Usage:
+    python capture_arrays.py session.vxcap
+"""
+
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from capture_format import FILE_HEADER, FORMAT_VERSION, MAGIC, RECORD_HEADER, KIND_INPUT, KIND_MARKER
+
+MIN_WINDOW = 256         # records examined per vectorized run: starts small,
+MAX_WINDOW = 1 << 16     # doubles while runs keep filling it
+MIN_VECTOR_RUN = 16      # shorter runs are walked record by record
+
+
+def _require_numpy():
+    if np is None:
+        print("Error: 'numpy' package not installed")
+        print("Install it with: pip install numpy")
+        sys.exit(1)
+
+
+class CaptureArrays:
+    """One capture as parallel arrays, one entry per record.
+
+    payload is (records, max length) uint8, zero padded; lengths says how
+    much of each row is real. markers is [(record index, timestamp_ns, text)].
+    """
+
+    def __init__(self, path, start_time_ns, timestamps, kinds, report_ids, lengths, payload, markers):
+        self.path = path
+        self.start_time_ns = start_time_ns
+        self.timestamps = timestamps
+        self.kinds = kinds
+        self.report_ids = report_ids
+        self.lengths = lengths
+        self.payload = payload
+        self.markers = markers
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def select(self, report_id=1, min_length=0):
+        """Record indices of input reports with this ID and at least min_length bytes"""
+        mask = (self.kinds == KIND_INPUT) & (self.report_ids == report_id) & (self.lengths >= min_length)
+        return np.flatnonzero(mask)
+
+    def frames(self, report_id=1, width=8):
+        """(N, width) uint8 of the input reports with this ID and at least width bytes"""
+        return self.payload[self.select(report_id, width), :width]
+
+    def marker_before(self, index):
+        """Text of the last marker at or before record `index`, or None"""
+        label = None
+        for position, _, text in self.markers:
+            if position > index:
+                break
+            label = text
+        return label
+
+
+def load_capture(path, max_width=None):
+    """Read a capture into CaptureArrays (payload rows cut to max_width if given)"""
+    _require_numpy()
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < FILE_HEADER.size:
+        raise ValueError(f"{path}: too short to be a capture file")
+    magic, version, start_time_ns = FILE_HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a capture file")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"{path}: capture format v{version} is newer than this tool")
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    header = RECORD_HEADER.size
+    unpack = RECORD_HEADER.unpack_from
+    end = len(data)
+    offset = FILE_HEADER.size
+    runs = []         # (timestamps, kinds, ids, lengths, payload rows) per run
+    markers = []
+    count = 0
+    window = MIN_WINDOW
+    while offset + header <= end:
+        timestamp, kind, report_id, length = unpack(data, offset)
+        stride = header + length
+        available = min(window, (end - offset) // stride)
+        if available == 0:
+            break     # truncated final record
+        rows = buf[offset:offset + available * stride].reshape(available, stride)
+        # A row is a real record only while every earlier row had this length
+        lengths = rows[:, 10].astype(np.uint16) | (rows[:, 11].astype(np.uint16) << 8)
+        broken = np.flatnonzero((lengths != length) | (rows[:, 8] != kind))
+        run = max(1, int(broken[0]) if len(broken) else available)
+        window = min(MAX_WINDOW, max(MIN_WINDOW, run * 2))
+
+        if run >= MIN_VECTOR_RUN or kind == KIND_MARKER:
+            rows = rows[:run]
+            if kind == KIND_MARKER:
+                for i in range(run):
+                    text = bytes(rows[i, header:]).decode("utf-8", errors="replace")
+                    markers.append((count + i, int(rows[i, :8].view("<i8")[0]), text))
+            width = length if max_width is None else min(length, max_width)
+            runs.append((rows[:, :8].copy().view("<i8").ravel(), rows[:, 8], rows[:, 9],
+                         np.full(run, length, dtype=np.uint16), rows[:, header:header + width]))
+            count += run
+            offset += run * stride
+            continue
+
+        # Irregular stretch (interleaved report IDs, fuzzed lengths): walk
+        # record by record until input reports settle into a run again
+        stamps, kinds, ids, sizes, starts = [], [], [], [], []
+        same = 0
+        previous = None
+        while offset + header <= end and same < MIN_VECTOR_RUN and len(stamps) < MAX_WINDOW:
+            timestamp, kind, report_id, length = unpack(data, offset)
+            if kind == KIND_MARKER or offset + header + length > end:
+                break
+            same = same + 1 if (kind, length) == previous else 0
+            previous = (kind, length)
+            stamps.append(timestamp)
+            kinds.append(kind)
+            ids.append(report_id)
+            sizes.append(length)
+            starts.append(offset + header)
+            offset += header + length
+        if not stamps:
+            if offset + header <= end and unpack(data, offset)[1] == KIND_MARKER:
+                window = MIN_WINDOW
+                continue
+            break     # truncated final record
+        width = max(sizes) if max_width is None else min(max(sizes), max_width)
+        sizes = np.array(sizes, dtype=np.uint16)
+        # Gather every payload at once; bytes past a record's length are zeroed
+        columns = np.arange(width)
+        gather = np.minimum(np.array(starts)[:, None] + columns, end - 1)
+        payload = np.where(columns < sizes[:, None], buf[gather], 0).astype(np.uint8)
+        runs.append((np.array(stamps, dtype=np.int64), np.array(kinds, dtype=np.uint8),
+                     np.array(ids, dtype=np.uint8), sizes, payload))
+        count += len(stamps)
+        window = MIN_WINDOW
+
+    width = max((r[4].shape[1] for r in runs), default=0)
+    payload = np.zeros((count, width), dtype=np.uint8)
+    position = 0
+    for rows in (r[4] for r in runs):
+        payload[position:position + len(rows), :rows.shape[1]] = rows
+        position += len(rows)
+
+    def joined(i, dtype):
+        return np.concatenate([r[i] for r in runs]) if runs else np.zeros(0, dtype)
+    timestamps, kinds, report_ids, lengths = (joined(0, np.int64), joined(1, np.uint8),
+                                              joined(2, np.uint8), joined(3, np.uint16))
+    return CaptureArrays(path, start_time_ns, timestamps, kinds, report_ids, lengths, payload, markers)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a capture file via the vectorized loader")
+    parser.add_argument("capture")
+    args = parser.parse_args()
+
+    _require_numpy()
+    start = time.perf_counter()
+    arrays = load_capture(args.capture)
+    elapsed = time.perf_counter() - start
+    print(f"{args.capture}: {len(arrays)} records in {elapsed * 1000:.1f} ms "
+          f"({len(arrays) / max(elapsed, 1e-9) / 1e6:.1f} M records/s)")
+    inputs = arrays.kinds == KIND_INPUT
+    for report_id in np.unique(arrays.report_ids[inputs]):
+        sizes = np.unique(arrays.lengths[inputs & (arrays.report_ids == report_id)])
+        print(f"  report ID {report_id}: {int((arrays.report_ids[inputs] == report_id).sum())} reports, "
+              f"lengths {', '.join(str(s) for s in sizes)}")
+    print(f"  markers: {len(arrays.markers)}")
@@ -8,6 +8,8 @@ import platform
 import subprocess
 from pathlib import Path
 
+from firmware_scanner import scan_for_firmware
+
 def check_windows_drives():
     """Check all Windows drives for potential controller storage"""
     print("Checking Windows drives for controller storage...")
@@ -72,31 +74,27 @@ def check_linux_mounts():
     except Exception as e:
         print(f"Error: {e}")
 
-def search_for_firmware_files(root_path):
-    """Search for common firmware file patterns"""
-    firmware_patterns = [
-        "*.bin", "*.hex", "*.fw", "*.firmware",
-        "*.dfu", "*.uf2", "*.img", "*.rom",
-        "config*", "firmware*", "*.cfg", "*.ini"
-    ]
+def search_for_firmware_files(root_paths, index_path=None):
+    """Search for common firmware file patterns in one pass over each root.
+
+    `root_paths` may be a single path or a list; all roots are walked
+    concurrently and matches are printed as they are found.
+    """
+    if isinstance(root_paths, (str, Path)):
+        root_paths = [root_paths]
     
     found_files = []
     
-    for pattern in firmware_patterns:
-        for path in Path(root_path).rglob(pattern):
-            try:
-                size = path.stat().st_size
-                found_files.append({
-                    'path': str(path),
-                    'size': size
-                })
-                print(f"  Found: {path} ({size} bytes)")
-            except:
-                pass
+    for found in scan_for_firmware([str(p) for p in root_paths], index_path=index_path):
+        found_files.append({
+            'path': found['path'],
+            'size': found['size']
+        })
+        print(f"  Found: {found['path']} ({found['size']} bytes)")
     
     return found_files
 
-def main():
+def main(index_path=None):
     system = platform.system()
     
     print("Controller Storage Detection Tool")
@@ -111,11 +109,10 @@ def main():
         print("Searching for firmware files...")
         print("=" * 60)
         
-        for drive in drives:
-            print(f"\nSearching {drive['path']}...")
-            firmware_files = search_for_firmware_files(drive['path'])
-            if firmware_files:
-                print(f"\nFound {len(firmware_files)} potential firmware files!")
+        print(f"\nSearching {', '.join(drive['path'] for drive in drives)}...")
+        firmware_files = search_for_firmware_files([drive['path'] for drive in drives], index_path)
+        if firmware_files:
+            print(f"\nFound {len(firmware_files)} potential firmware files!")
     
     elif system == "Linux":
         check_linux_mounts()
@@ -124,11 +121,10 @@ def main():
         print("Searching common mount points for firmware files...")
         print("=" * 60)
         
-        for mount_dir in ["/media", "/mnt"]:
-            if os.path.exists(mount_dir):
-                firmware_files = search_for_firmware_files(mount_dir)
-                if firmware_files:
-                    print(f"\nFound {len(firmware_files)} potential firmware files!")
+        mount_dirs = [d for d in ["/media", "/mnt"] if os.path.exists(d)]
+        firmware_files = search_for_firmware_files(mount_dirs, index_path)
+        if firmware_files:
+            print(f"\nFound {len(firmware_files)} potential firmware files!")
     
     else:
         print(f"Unsupported OS: {system}")
@@ -141,6 +137,12 @@ def main():
     print("3. Check the device manufacturer's documentation for firmware update tools")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Check for controller storage and firmware files")
+    parser.add_argument("--index", metavar="FILE",
+                        help="keep an mtime index so re-scans only list changed directories")
+    args = parser.parse_args()
+    main(args.index)
 
 
@@ -35,20 +35,24 @@ def detect_usb_devices_windows():
         print(f"Error running PowerShell command: {e}")
 
 def detect_usb_devices_linux():
-    """Detect USB devices on Linux using lsusb"""
-    import subprocess
+    """Detect USB devices on Linux straight from sysfs (no lsusb / ls subprocesses)"""
+    from sysfs_inventory import scan_sysfs, print_inventory
     
     print("Detecting USB devices on Linux...")
     print("=" * 60)
     
     try:
-        result = subprocess.run(["lsusb"], capture_output=True, text=True)
-        print(result.stdout)
+        inventory = scan_sysfs()
+        print_inventory(inventory)
         
-        # Also check /dev/input for gamepad devices
-        print("\nChecking for gamepad devices in /dev/input...")
-        result = subprocess.run(["ls", "-la", "/dev/input/"], capture_output=True, text=True)
-        print(result.stdout)
+        # hidraw / event / js nodes are joined to their interfaces above
+        print("\nGamepad-related device nodes:")
+        for device in inventory:
+            for intf in device["interfaces"]:
+                for node in intf["hidraw"] + intf["input"]:
+                    print(f"  {node['node']:22s} {node.get('name') or ''} "
+                          f"({device['vendor_id']:04x}:{device['product_id']:04x} interface {intf['number']})")
+        return inventory
     except Exception as e:
         print(f"Error: {e}")
 
@@ -125,19 +129,39 @@ def check_storage_devices():
         except Exception as e:
             print(f"Error: {e}")
     elif system == "Linux":
-        import subprocess
+        from sysfs_inventory import scan_sysfs
         try:
-            result = subprocess.run(["lsblk"], capture_output=True, text=True)
-            print(result.stdout)
+            found = False
+            for device in scan_sysfs():
+                for intf in device["interfaces"]:
+                    for block in intf["block"]:
+                        found = True
+                        size = block["size_bytes"]
+                        print(f"  {block['node']:12s} {size if size is not None else '?':>14} bytes  "
+                              f"{'removable ' if block['removable'] else ''}"
+                              f"({device['vendor_id']:04x}:{device['product_id']:04x} {device['product'] or ''})")
+            if not found:
+                print("  No USB storage devices found.")
         except Exception as e:
             print(f"Error: {e}")
 
 if __name__ == "__main__":
+    system = platform.system()
+    
+    if "--json" in sys.argv:
+        # Machine-readable inventory (Linux only: read from sysfs)
+        if system != "Linux":
+            print("--json is only supported on Linux")
+            sys.exit(1)
+        import json
+        from sysfs_inventory import scan_sysfs
+        json.dump(scan_sysfs(), sys.stdout, indent=2)
+        print()
+        sys.exit(0)
+    
     print("USB Device Detection Tool")
     print("=" * 60)
     
-    system = platform.system()
-    
     if system == "Windows":
         detect_usb_devices_windows()
     elif system == "Linux":
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Device Inventory Database
+Loads device snapshots into an embedded SQLite database so questions like
+"which interfaces appear only in X mode" or "when did PID 3208 first show
+up" are one indexed query instead of grepping text files by hand.
+
+Understands:
+    - JSON device lists (device_info.json from hid_device_inspector.py)
+    - JSON inventories from `detect_usb_devices.py --json` / sysfs_inventory.py
+    - detection_log_*.txt (detect_usb_devices.py output)
+    - hid_log*.txt (hid_device_inspector.py output, incl. report descriptors)
+
+Git merge-conflict blocks in the snapshots are resolved to their HEAD side.
+Each file becomes one session; re-ingesting identical content is a no-op.
+
+Every interface gets an identity string (VID:PID:usage page:usage:
+interface:path) that session diffs compare on; it is indexed together with
+the session, as are VID/PID and usage page/usage.
+
+Usage:
+    python device_db.py ingest detection_log_*.txt device_info.json
+    python device_db.py sessions
+    python device_db.py diff detection_log_x_mode detection_log_y_mode
+    python device_db.py only-in detection_log_x_mode
+    python device_db.py first-seen --pid 3208
+    python device_db.py find --vid 2dc8
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "device_inventory.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id           INTEGER PRIMARY KEY,
+    name         TEXT NOT NULL UNIQUE,
+    source       TEXT,
+    kind         TEXT,
+    captured_at  TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS devices (
+    id                INTEGER PRIMARY KEY,
+    session_id        INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    ident             TEXT NOT NULL,
+    vendor_id         INTEGER,
+    product_id        INTEGER,
+    usage_page        INTEGER,
+    usage             INTEGER,
+    interface_number  INTEGER,
+    manufacturer      TEXT,
+    product           TEXT,
+    serial            TEXT,
+    path              TEXT,
+    report_descriptor TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_time ON sessions(captured_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_hash ON sessions(content_hash);
+CREATE INDEX IF NOT EXISTS idx_devices_session_ident ON devices(session_id, ident);
+CREATE INDEX IF NOT EXISTS idx_devices_ident ON devices(ident, session_id);
+CREATE INDEX IF NOT EXISTS idx_devices_vid_pid ON devices(vendor_id, product_id);
+CREATE INDEX IF NOT EXISTS idx_devices_usage ON devices(usage_page, usage);
+"""
+
+DEVICE_COLUMNS = ("vendor_id", "product_id", "usage_page", "usage", "interface_number",
+                  "manufacturer", "product", "serial", "path", "report_descriptor")
+
+
+def connect(path=DEFAULT_DB):
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.execute("PRAGMA journal_mode = WAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+# ---------------------------------------------------------------------------
+# Snapshot parsing
+
+def resolve_conflicts(text):
+    """Keep the HEAD side of any <<<<<<< / ======= / >>>>>>> blocks"""
+    if "<<<<<<< " not in text:
+        return text
+    out = []
+    side = None   # None outside a conflict, "head" or "theirs" inside
+    for line in text.splitlines(keepends=True):
+        bare = line.rstrip("\r\n")
+        if bare.startswith("<<<<<<< "):
+            side = "head"
+        elif bare == "=======" and side == "head":
+            side = "theirs"
+        elif bare.startswith(">>>>>>> ") and side is not None:
+            side = None
+        elif side != "theirs":
+            out.append(line)
+    return "".join(out)
+
+
+def normalize_path(path):
+    """Paths are often logged as repr(bytes); store the decoded string"""
+    if path is None:
+        return None
+    path = str(path).strip()
+    if path.startswith(("b'", 'b"')):
+        try:
+            path = ast.literal_eval(path).decode("utf-8", errors="replace")
+        except (ValueError, SyntaxError):
+            pass
+    return path
+
+
+def _int(value, base=10):
+    if value is None or value == "" or value == "N/A":
+        return None
+    if isinstance(value, int):
+        return value
+    value = str(value).strip()
+    try:
+        if value.lower().startswith("0x"):
+            return int(value, 16)
+        return int(value, base)
+    except ValueError:
+        return None
+
+
+def _record(**fields):
+    record = {column: fields.get(column) for column in DEVICE_COLUMNS}
+    record["path"] = normalize_path(record["path"])
+    return record
+
+
+def parse_json_snapshot(data):
+    """Flat hid.enumerate()-style lists, or sysfs inventories with nested interfaces"""
+    records = []
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict):
+            continue
+        if "interfaces" in item:
+            for intf in item["interfaces"] or [{}]:
+                nodes = [n["node"] for n in intf.get("hidraw", []) + intf.get("input", [])]
+                records.append(_record(
+                    vendor_id=item.get("vendor_id"), product_id=item.get("product_id"),
+                    interface_number=intf.get("number"), manufacturer=item.get("manufacturer"),
+                    product=item.get("product"), serial=item.get("serial"),
+                    path=f"{item.get('name')}:{intf.get('number', '-')} {' '.join(nodes)}".strip()))
+        else:
+            records.append(_record(
+                vendor_id=item.get("vendor_id"), product_id=item.get("product_id"),
+                usage_page=item.get("usage_page"), usage=item.get("usage"),
+                interface_number=item.get("interface_number"),
+                manufacturer=item.get("manufacturer", item.get("manufacturer_string")),
+                product=item.get("product", item.get("product_string")),
+                serial=item.get("serial", item.get("serial_number")),
+                path=item.get("path"), report_descriptor=item.get("report_descriptor")))
+    return records
+
+
+_DEVICE_START = re.compile(r"^\s*Device(?: (\d+))?:\s*(.*)$")
+_FIELD = re.compile(r"^\s*([A-Za-z][A-Za-z ()]*?):\s*(.*)$")
+_TEXT_FIELDS = {
+    "Vendor ID": ("vendor_id", 16),
+    "Product ID": ("product_id", 16),
+    "Usage Page": ("usage_page", 10),
+    "Usage": ("usage", 10),
+    "Interface Number": ("interface_number", 10),
+    "Manufacturer": ("manufacturer", None),
+    "Product": ("product", None),
+    "Serial": ("serial", None),
+    "Serial Number": ("serial", None),
+    "Path": ("path", None),
+    "Report Descriptor (hex)": ("report_descriptor", None),
+}
+
+
+def parse_text_snapshot(text):
+    """Device blocks from detect_usb_devices.py / hid_device_inspector.py output"""
+    records = []
+    current = None
+    for line in text.splitlines():
+        m = _DEVICE_START.match(line)
+        if m:
+            if current is not None:
+                records.append(current)
+            current = {}
+            if m.group(1) is None and m.group(2).strip():
+                current["product"] = m.group(2).strip()   # "Device: <name>"
+            continue
+        if current is None:
+            continue
+        m = _FIELD.match(line)
+        if not m or m.group(1) not in _TEXT_FIELDS:
+            continue
+        column, base = _TEXT_FIELDS[m.group(1)]
+        value = m.group(2).strip()
+        if column in current and column != "report_descriptor":
+            continue   # first value wins (the inspector repeats strings after opening)
+        if base is not None:
+            value = _int(value if base == 10 or value.lower().startswith("0x") else "0x" + value)
+        current[column] = value
+    if current is not None:
+        records.append(current)
+    return [_record(**r) for r in records if r.get("vendor_id") is not None]
+
+
+def parse_snapshot(path):
+    """Return (kind, text, records) for a snapshot file"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = resolve_conflicts(f.read())
+    stripped = text.lstrip()
+    if stripped.startswith(("[", "{")):
+        try:
+            return "json", text, parse_json_snapshot(json.loads(text))
+        except ValueError:
+            pass
+    name = os.path.basename(path).lower()
+    kind = "inspector_log" if name.startswith("hid_log") else "detection_log"
+    return kind, text, parse_text_snapshot(text)
+
+
+# ---------------------------------------------------------------------------
+# Ingest
+
+def ident(record):
+    def part(value, fmt="{}"):
+        return "-" if value is None else fmt.format(value)
+    return ":".join((part(record["vendor_id"], "{:04x}"), part(record["product_id"], "{:04x}"),
+                     part(record["usage_page"]), part(record["usage"]),
+                     part(record["interface_number"]), part(record["path"])))
+
+
+def add_session(db, name, records, kind=None, source=None, captured_at=None, content_hash=None):
+    """Store one snapshot. Returns the session id, or None if identical content exists."""
+    if content_hash is None:
+        content_hash = hashlib.sha1(json.dumps(records, sort_keys=True).encode()).hexdigest()
+    if db.execute("SELECT 1 FROM sessions WHERE content_hash = ? AND name = ?",
+                  (content_hash, name)).fetchone():
+        return None
+    captured_at = captured_at or time.strftime("%Y-%m-%dT%H:%M:%S")
+    with db:
+        db.execute("DELETE FROM sessions WHERE name = ?", (name,))
+        cursor = db.execute(
+            "INSERT INTO sessions (name, source, kind, captured_at, content_hash) VALUES (?, ?, ?, ?, ?)",
+            (name, source, kind, captured_at, content_hash))
+        session_id = cursor.lastrowid
+        db.executemany(
+            f"INSERT INTO devices (session_id, ident, {', '.join(DEVICE_COLUMNS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(DEVICE_COLUMNS))})",
+            [(session_id, ident(r)) + tuple(r[c] for c in DEVICE_COLUMNS) for r in records])
+    return session_id
+
+
+def ingest_file(db, path, name=None, captured_at=None):
+    kind, text, records = parse_snapshot(path)
+    if captured_at is None:
+        captured_at = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(os.path.getmtime(path)))
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    content_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    session_id = add_session(db, name, records, kind, os.path.abspath(path), captured_at, content_hash)
+    return name, len(records), session_id is not None
+
+
+# ---------------------------------------------------------------------------
+# Queries
+
+def _session_id(db, name):
+    row = db.execute("SELECT id FROM sessions WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        raise SystemExit(f"Unknown session: {name}")
+    return row[0]
+
+
+def list_sessions(db):
+    return db.execute(
+        "SELECT s.name, s.kind, s.captured_at, COUNT(d.id) FROM sessions s "
+        "LEFT JOIN devices d ON d.session_id = s.id GROUP BY s.id ORDER BY s.captured_at, s.name"
+    ).fetchall()
+
+
+_ROW = "vendor_id, product_id, usage_page, usage, interface_number, product, path"
+
+
+def diff_sessions(db, a, b):
+    """(only in a, only in b) as device rows"""
+    ida, idb = _session_id(db, a), _session_id(db, b)
+    query = (f"SELECT {_ROW} FROM devices d WHERE d.session_id = ? AND NOT EXISTS "
+             f"(SELECT 1 FROM devices o WHERE o.session_id = ? AND o.ident = d.ident) ORDER BY ident")
+    return db.execute(query, (ida, idb)).fetchall(), db.execute(query, (idb, ida)).fetchall()
+
+
+def only_in(db, name, others=None):
+    """Interfaces in session `name` that appear in none of `others` (default: all other sessions)"""
+    sid = _session_id(db, name)
+    if others:
+        ids = [_session_id(db, other) for other in others]
+        placeholders = ", ".join("?" * len(ids))
+        query = (f"SELECT {_ROW} FROM devices d WHERE d.session_id = ? AND NOT EXISTS "
+                 f"(SELECT 1 FROM devices o WHERE o.ident = d.ident AND o.session_id IN ({placeholders})) "
+                 f"ORDER BY ident")
+        return db.execute(query, [sid] + ids).fetchall()
+    query = (f"SELECT {_ROW} FROM devices d WHERE d.session_id = ? AND NOT EXISTS "
+             f"(SELECT 1 FROM devices o WHERE o.ident = d.ident AND o.session_id != d.session_id) "
+             f"ORDER BY ident")
+    return db.execute(query, (sid,)).fetchall()
+
+
+def _filters(vid=None, pid=None, usage_page=None, usage=None):
+    clauses, params = [], []
+    for column, value in (("vendor_id", vid), ("product_id", pid),
+                          ("usage_page", usage_page), ("usage", usage)):
+        if value is not None:
+            clauses.append(f"d.{column} = ?")
+            params.append(value)
+    return " AND ".join(clauses) or "1", params
+
+
+def find_sessions(db, vid=None, pid=None, usage_page=None, usage=None):
+    """Sessions containing a matching interface, oldest first"""
+    where, params = _filters(vid, pid, usage_page, usage)
+    return db.execute(
+        f"SELECT s.name, s.captured_at, COUNT(*) FROM devices d JOIN sessions s ON s.id = d.session_id "
+        f"WHERE {where} GROUP BY s.id ORDER BY s.captured_at, s.name", params).fetchall()
+
+
+def first_seen(db, vid=None, pid=None, usage_page=None, usage=None):
+    rows = find_sessions(db, vid, pid, usage_page, usage)
+    return rows[0] if rows else None
+
+
+def print_rows(rows, prefix="  "):
+    for vid, pid, usage_page, usage, interface, product, path in rows:
+        usage_text = f"{usage_page}/{usage}" if usage_page is not None else "-"
+        print(f"{prefix}{vid:04x}:{pid:04x} usage {usage_text:<9} if {'-' if interface is None else interface:<3} "
+              f"{product or '':<30} {path or ''}")
+
+
+def _hex(value):
+    return int(value, 16)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Device inventory database")
+    parser.add_argument("--db", default=DEFAULT_DB, help="database file (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="load snapshot files")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--session", help="session name (single file only; default: file name)")
+    p.add_argument("--time", help="capture time, ISO format (default: file mtime)")
+
+    sub.add_parser("sessions", help="list sessions")
+
+    p = sub.add_parser("diff", help="interfaces that differ between two sessions")
+    p.add_argument("a")
+    p.add_argument("b")
+
+    p = sub.add_parser("only-in", help="interfaces seen only in one session")
+    p.add_argument("session")
+    p.add_argument("--not", dest="others", nargs="+", metavar="SESSION",
+                   help="compare against these sessions instead of all others")
+
+    for command, text in (("first-seen", "earliest session with a matching interface"),
+                          ("find", "all sessions with a matching interface")):
+        p = sub.add_parser(command, help=text)
+        p.add_argument("--vid", type=_hex, help="vendor ID (hex)")
+        p.add_argument("--pid", type=_hex, help="product ID (hex)")
+        p.add_argument("--usage-page", type=int)
+        p.add_argument("--usage", type=int)
+
+    args = parser.parse_args()
+    db = connect(args.db)
+    start = time.perf_counter()
+
+    if args.command == "ingest":
+        for path in args.files:
+            name, count, added = ingest_file(db, path, args.session if len(args.files) == 1 else None, args.time)
+            print(f"  {name}: {count} interfaces {'ingested' if added else '(unchanged, skipped)'}")
+    elif args.command == "sessions":
+        for name, kind, captured_at, count in list_sessions(db):
+            print(f"  {captured_at}  {name:<32} {kind or '':<14} {count} interfaces")
+    elif args.command == "diff":
+        only_a, only_b = diff_sessions(db, args.a, args.b)
+        print(f"Only in {args.a} ({len(only_a)}):")
+        print_rows(only_a)
+        print(f"Only in {args.b} ({len(only_b)}):")
+        print_rows(only_b)
+    elif args.command == "only-in":
+        rows = only_in(db, args.session, args.others)
+        print(f"Only in {args.session} ({len(rows)}):")
+        print_rows(rows)
+    else:
+        rows = find_sessions(db, args.vid, args.pid, args.usage_page, args.usage)
+        if args.command == "first-seen":
+            rows = rows[:1]
+        if not rows:
+            print("No matching interfaces")
+        for name, captured_at, count in rows:
+            print(f"  {captured_at}  {name} ({count} matching interfaces)")
+
+    print(f"\n({(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+    db.close()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Entropy Map
+Locates encrypted/compressed regions in firmware blobs and in the 8BitDo
+tools (dfu4.exe is "encrypted/silent"). The file is memory-mapped and the
+Shannon entropy of every sliding window is computed with NumPy:
+
+    1. The bytes are viewed as a (blocks, stride) array - no copy - and one
+       bincount gives a 256-bin histogram per stride-sized block.
+    2. A cumulative sum over blocks turns those into per-window histograms
+       (window = several consecutive blocks) with one subtraction.
+    3. Entropy comes from a lookup table of c*log2(c) per count, so there is
+       no per-byte or per-window Python loop.
+
+The file is processed in chunks so memory stays flat on files of hundreds
+of MB. Consecutive windows of the same class (padding / code-data /
+compressed-encrypted) are merged into regions.
+
+Usage:
+    python entropy_map.py dfu4.exe
+    python entropy_map.py firmware.bin --window 4096 --stride 512 --csv profile.csv
+"""
+
+import mmap
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_WINDOW = 4096
+DEFAULT_STRIDE = 1024
+CHUNK_BLOCKS = 4096          # blocks per chunk (4 MB at the default stride)
+
+LOW_ENTROPY = 1.0            # below: padding, erased flash, zero fill
+HIGH_ENTROPY = 7.2           # above: compressed or encrypted
+
+
+def _require_numpy():
+    if np is None:
+        print("Error: 'numpy' package not installed")
+        print("Install it with: pip install numpy")
+        sys.exit(1)
+
+
+def _entropy_of_counts(counts, total, table):
+    """Entropy in bits/byte of each row of a (n, 256) count array"""
+    return np.log2(total) - table[counts].sum(axis=1) / total
+
+
+def entropy_profile(data, window=DEFAULT_WINDOW, stride=DEFAULT_STRIDE):
+    """Sliding-window entropy of a bytes-like object (or mmap).
+
+    Returns (offsets, entropy) arrays; window i covers
+    data[offsets[i]:offsets[i] + window]. `window` must be a multiple of
+    `stride`. Trailing bytes that don't fill a stride are ignored unless the
+    whole input is shorter than one window.
+    """
+    _require_numpy()
+    if window % stride:
+        raise ValueError("window must be a multiple of stride")
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    size = len(buf)
+    if size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    if size < window:
+        counts = np.bincount(buf, minlength=256)[None, :]
+        table = _plogp_table(size)
+        return np.zeros(1, dtype=np.int64), _entropy_of_counts(counts, size, table)
+
+    per_window = window // stride
+    n_blocks = size // stride
+    n_windows = n_blocks - per_window + 1
+    table = _plogp_table(window)
+    entropy = np.empty(n_windows)
+
+    for first in range(0, n_windows, CHUNK_BLOCKS):
+        last = min(first + CHUNK_BLOCKS, n_windows)
+        # Windows [first, last) need blocks [first, last + per_window - 1)
+        block_end = last + per_window - 1
+        blocks = buf[first * stride:block_end * stride].reshape(-1, stride)
+        n = len(blocks)
+
+        index = blocks.astype(np.int32)
+        index += (np.arange(n, dtype=np.int32) * 256)[:, None]
+        hist = np.bincount(index.ravel(), minlength=n * 256).reshape(n, 256)
+
+        cumulative = np.zeros((n + 1, 256), dtype=np.int32)
+        np.cumsum(hist, axis=0, out=cumulative[1:])
+        windows = cumulative[per_window:] - cumulative[:-per_window]
+        entropy[first:last] = _entropy_of_counts(windows, window, table)
+
+    offsets = np.arange(n_windows, dtype=np.int64) * stride
+    return offsets, entropy
+
+
+def _plogp_table(total):
+    counts = np.arange(total + 1, dtype=np.float64)
+    table = np.zeros(total + 1)
+    table[1:] = counts[1:] * np.log2(counts[1:])
+    return table
+
+
+def classify(entropy, low=LOW_ENTROPY, high=HIGH_ENTROPY):
+    """0 = padding, 1 = code/data, 2 = compressed/encrypted"""
+    return np.where(entropy < low, 0, np.where(entropy > high, 2, 1))
+
+
+REGION_NAMES = ("padding", "code/data", "compressed/encrypted")
+
+
+def find_regions(offsets, entropy, window, file_size, low=LOW_ENTROPY, high=HIGH_ENTROPY):
+    """Merge runs of same-class windows into (start, end, class, mean entropy) regions"""
+    if len(entropy) == 0:
+        return []
+    classes = classify(entropy, low, high)
+    # Indices where the class changes start a new run
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(classes)) + 1))
+    ends = np.concatenate((starts[1:], [len(classes)]))
+    sums = np.add.reduceat(entropy, starts)
+
+    regions = []
+    for s, e, total in zip(starts.tolist(), ends.tolist(), sums.tolist()):
+        start = int(offsets[s])
+        end = min(int(offsets[e]) if e < len(offsets) else int(offsets[-1]) + window, file_size)
+        regions.append((start, end, REGION_NAMES[classes[s]], total / (e - s)))
+    return regions
+
+
+def map_file(path, window=DEFAULT_WINDOW, stride=DEFAULT_STRIDE):
+    """Memory-map `path` and return (offsets, entropy, file_size)"""
+    _require_numpy()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            offsets, entropy = entropy_profile(b"", window, stride)
+            return offsets, entropy, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offsets, entropy = entropy_profile(data, window, stride)
+    return offsets, entropy, size
+
+
+def export_csv(path, offsets, entropy):
+    np.savetxt(path, np.column_stack((offsets, entropy)), fmt=("%d", "%.4f"),
+               delimiter=",", header="offset,entropy", comments="")
+
+
+def export_npy(path, offsets, entropy):
+    """Two-column float64 array: offset, entropy"""
+    np.save(path, np.column_stack((offsets.astype(np.float64), entropy)))
+
+
+def print_regions(regions, min_size=0):
+    print(f"{'Start':>12} {'End':>12} {'Size':>12}  {'Entropy':>7}  Class")
+    for start, end, name, mean in regions:
+        if end - start < min_size:
+            continue
+        print(f"  0x{start:08X}   0x{end:08X} {end - start:>12,}  {mean:7.3f}  {name}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Sliding-window entropy map of a binary")
+    parser.add_argument("file", help="firmware blob or executable")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="window size in bytes")
+    parser.add_argument("--stride", type=int, default=DEFAULT_STRIDE, help="step between windows")
+    parser.add_argument("--low", type=float, default=LOW_ENTROPY, help="padding threshold (bits/byte)")
+    parser.add_argument("--high", type=float, default=HIGH_ENTROPY, help="encrypted/compressed threshold")
+    parser.add_argument("--min-region", type=int, default=0, help="hide regions smaller than this")
+    parser.add_argument("--csv", metavar="FILE", help="export offset,entropy as CSV")
+    parser.add_argument("--npy", metavar="FILE", help="export offset,entropy as a NumPy array")
+    args = parser.parse_args()
+
+    _require_numpy()
+    start_time = time.perf_counter()
+    offsets, entropy, size = map_file(args.file, args.window, args.stride)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{args.file}: {size:,} bytes, {len(entropy):,} windows "
+          f"({args.window}/{args.stride}) in {elapsed:.2f}s")
+    if len(entropy):
+        print(f"Entropy min {entropy.min():.3f}  mean {entropy.mean():.3f}  max {entropy.max():.3f} bits/byte\n")
+    print_regions(find_regions(offsets, entropy, args.window, size, args.low, args.high), args.min_region)
+
+    if args.csv:
+        export_csv(args.csv, offsets, entropy)
+        print(f"\nProfile written to {args.csv}")
+    if args.npy:
+        export_npy(args.npy, offsets, entropy)
+        print(f"\nProfile written to {args.npy}")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Firmware File Scanner
+Walks each root exactly once with os.scandir and checks every name against
+all firmware patterns at the same time (one precompiled regex), instead of
+one full Path.rglob walk per pattern. Roots and their top-level
+subdirectories are walked in parallel on a thread pool, and matches are
+yielded as soon as they are found.
+
+With an index file, each directory's mtime, matches and subdirectories are
+remembered; on the next scan unchanged directories are not listed again
+(their subdirectories are still checked, since a directory's mtime only
+changes when its own entries do).
+"""
+
+import fnmatch
+import json
+import os
+import queue
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+FIRMWARE_PATTERNS = [
+    "*.bin", "*.hex", "*.fw", "*.firmware",
+    "*.dfu", "*.uf2", "*.img", "*.rom",
+    "config*", "firmware*", "*.cfg", "*.ini"
+]
+
+INDEX_VERSION = 1
+
+
+def compile_patterns(patterns=FIRMWARE_PATTERNS):
+    """One regex matching any of the glob patterns (case-insensitive on Windows)"""
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns), flags)
+
+
+def load_index(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data["dirs"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_index(path, dirs):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "dirs": dirs}, f)
+    os.replace(tmp, path)
+
+
+class _Walker:
+    def __init__(self, matcher, old_index, new_index, results):
+        self.matcher = matcher
+        self.old_index = old_index
+        self.new_index = new_index
+        self.results = results
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+
+    def list_dir(self, path):
+        """Return (matches, subdirs) for one directory, from the index if unchanged"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return [], []
+
+        cached = self.old_index.get(path)
+        if cached is not None and cached["mtime_ns"] == mtime:
+            self.dirs_reused += 1
+            self.new_index[path] = cached
+            return cached["matches"], cached["subdirs"]
+
+        matches = []
+        subdirs = []
+        match = self.matcher.match
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if match(entry.name):
+                            size = entry.stat(follow_symlinks=False).st_size
+                            matches.append([entry.path, size, is_dir])
+                        if is_dir:
+                            subdirs.append(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            # Access denied etc. - remember nothing so we retry next time
+            return [], []
+
+        self.dirs_listed += 1
+        self.new_index[path] = {"mtime_ns": mtime, "matches": matches, "subdirs": subdirs}
+        return matches, subdirs
+
+    def walk(self, top):
+        """Depth-first walk of one subtree, streaming matches into the queue"""
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            matches, subdirs = self.list_dir(path)
+            for item in matches:
+                self.results.put({"path": item[0], "size": item[1], "is_dir": item[2]})
+            stack.extend(subdirs)
+
+
+def scan_for_firmware(roots, patterns=FIRMWARE_PATTERNS, index_path=None, workers=None, stats=None):
+    """Yield {'path', 'size', 'is_dir'} for every match under `roots`, as found.
+
+    Pass a dict as `stats` to get dirs_listed / dirs_reused counts back.
+    """
+    matcher = compile_patterns(patterns)
+    old_index = load_index(index_path) if index_path else {}
+    new_index = {}
+    results = queue.Queue()
+    walker = _Walker(matcher, old_index, new_index, results)
+    done = object()
+
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) * 4)   # I/O bound
+
+    def run_subtree(path):
+        try:
+            walker.walk(path)
+        finally:
+            results.put(done)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = 0
+        # The roots themselves are listed here; each top-level subdirectory
+        # becomes its own task so big drives spread across the pool
+        for root in roots:
+            matches, subdirs = walker.list_dir(os.path.abspath(root))
+            for item in matches:
+                yield {"path": item[0], "size": item[1], "is_dir": item[2]}
+            for subdir in subdirs:
+                pool.submit(run_subtree, subdir)
+                pending += 1
+
+        while pending:
+            item = results.get()
+            if item is done:
+                pending -= 1
+            else:
+                yield item
+
+    if index_path:
+        save_index(index_path, new_index)
+    if stats is not None:
+        stats["dirs_listed"] = walker.dirs_listed
+        stats["dirs_reused"] = walker.dirs_reused
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Find firmware-like files in a single pass")
+    parser.add_argument("roots", nargs="+", help="directories to scan")
+    parser.add_argument("--index", metavar="FILE", help="mtime index for fast re-scans")
+    parser.add_argument("--workers", type=int, help="thread pool size")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = {}
+    count = 0
+    for found in scan_for_firmware(args.roots, index_path=args.index, workers=args.workers, stats=stats):
+        count += 1
+        print(f"  Found: {found['path']} ({found['size']} bytes)")
+    elapsed = time.perf_counter() - start
+    print(f"\n{count} matches in {elapsed:.2f}s "
+          f"({stats['dirs_listed']} directories listed, {stats['dirs_reused']} reused from index)",
+          file=sys.stderr)
@@ -4,9 +4,12 @@ HID Device Inspector
 Examines HID device capabilities and reports to help understand controller functionality
 """
 
+import os
 import sys
 
-def inspect_hid_device():
+from hid_probe import probe_devices, DEFAULT_TIMEOUT
+
+def inspect_hid_device(timeout=DEFAULT_TIMEOUT, refresh=False):
     """Inspect HID device capabilities"""
     try:
         import hid
@@ -55,12 +58,15 @@ def inspect_hid_device():
     
     print(f"Found {len(controller_devices)} controller/gamepad device(s):\n")
     
-    for i, device in enumerate(controller_devices, 1):
+    numbers = {id(device): i for i, device in enumerate(controller_devices, 1)}
+    
+    # Probe concurrently; each device is printed as soon as its probe finishes
+    for device, result in probe_devices(controller_devices, timeout=timeout, refresh=refresh):
         vid = device.get('vendor_id', 0)
         pid = device.get('product_id', 0)
         is_target = (vid == TARGET_VID and pid == TARGET_PID)
         
-        print(f"Device {i}:")
+        print(f"Device {numbers[id(device)]}:")
         print("=" * 60)
         if is_target:
             print(">>> VITURE x 8BitDo Ultimate Mobile Gaming Controller <<<")
@@ -77,32 +83,24 @@ def inspect_hid_device():
         print(f"Interface Number: {device.get('interface_number', 'N/A')}")
         print(f"Path: {device.get('path', 'N/A')}")
         
-        # Try to open the device and get report descriptor
-        try:
-            h = hid.device()
-            h.open_path(device['path'])
-            
-            print(f"\nDevice opened successfully!")
-            print(f"Manufacturer String: {h.get_manufacturer_string()}")
-            print(f"Product String: {h.get_product_string()}")
-            print(f"Serial Number: {h.get_serial_number_string()}")
-            
-            # Get report descriptor
-            try:
-                report_desc = h.get_report_descriptor()
-                print(f"\nReport Descriptor Length: {len(report_desc)} bytes")
-                print(f"Report Descriptor (hex): {bytes(report_desc).hex()}")
-                
-                # Try to parse basic info
-                if len(report_desc) > 0:
-                    print("\nRaw descriptor analysis:")
-                    print(f"  First bytes: {bytes(report_desc)[:20].hex()}")
-            except Exception as e:
-                print(f"\nCould not read report descriptor: {e}")
+        if result['opened']:
+            print(f"\nDevice opened successfully!{' (cached)' if result['cached'] else ''}")
+            print(f"Manufacturer String: {result['manufacturer']}")
+            print(f"Product String: {result['product']}")
+            print(f"Serial Number: {result['serial']}")
+        
+        report_desc = result['report_descriptor']
+        if report_desc is not None:
+            report_desc = bytes.fromhex(report_desc)
+            print(f"\nReport Descriptor Length: {len(report_desc)} bytes")
+            print(f"Report Descriptor (hex): {report_desc.hex()}")
             
-            h.close()
-        except Exception as e:
-            print(f"\nCould not open device: {e}")
+            # Try to parse basic info
+            if len(report_desc) > 0:
+                print("\nRaw descriptor analysis:")
+                print(f"  First bytes: {report_desc[:20].hex()}")
+        if result['error']:
+            print(f"\n{result['error']}")
         
         print()
 
@@ -136,9 +134,29 @@ def save_device_info():
         print(f"Error saving device info: {e}")
 
 if __name__ == "__main__":
-    inspect_hid_device()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Inspect HID controller devices")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds to wait for each device (default: %(default)s)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="probe every device again instead of using cached descriptors")
+    parser.add_argument("--db", metavar="FILE", nargs="?", const="",
+                        help="also record this run as a session in the device inventory database")
+    args = parser.parse_args()
+    
+    inspect_hid_device(args.timeout, args.refresh)
     save_device_info()
     
+    if args.db is not None and os.path.exists('device_info.json'):
+        import time
+        import device_db
+        db = device_db.connect(args.db or device_db.DEFAULT_DB)
+        name, count, _ = device_db.ingest_file(db, 'device_info.json',
+                                               name=time.strftime("inspector_%Y%m%d_%H%M%S"))
+        db.close()
+        print(f"Recorded {count} interfaces as session {name}")
+    
     print("\n" + "=" * 60)
     print("Next steps:")
     print("1. Note the Vendor ID and Product ID of your controller")
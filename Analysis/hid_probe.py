@@ -0,0 +1,179 @@
+"""
+HID Probe
+Opens HID collections and reads their strings and report descriptor on a
+small pool of worker threads, with a hard timeout per device, so a wedged
+or access-denied collection (the Dell and HIDI2C entries in
+device_info.json) can't stall the whole inspection.
+
+Results come back as each probe finishes. A device that misses its
+deadline is reported as timed out and its worker is replaced; the worker
+threads are daemons, so a probe stuck inside hidapi never blocks exit.
+
+Successful probes are cached on disk keyed by path + VID/PID, so repeated
+runs of hid_device_inspector.py and inspect_new_mode.py skip devices whose
+descriptors were already captured.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+DEFAULT_TIMEOUT = 2.0     # seconds per device
+DEFAULT_WORKERS = 4
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hid_probe_cache.json")
+
+
+def _path_str(path):
+    if isinstance(path, bytes):
+        return path.decode("utf-8", errors="replace")
+    return str(path)
+
+
+def cache_key(device):
+    return (f"{_path_str(device.get('path', b''))}|"
+            f"{device.get('vendor_id', 0):04x}:{device.get('product_id', 0):04x}")
+
+
+def load_cache(path=CACHE_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, path)
+
+
+def probe_device(device):
+    """Open one device and read its strings and report descriptor"""
+    import hid
+
+    result = {
+        "path": _path_str(device.get("path", b"")),
+        "vendor_id": device.get("vendor_id", 0),
+        "product_id": device.get("product_id", 0),
+        "opened": False,
+        "manufacturer": None,
+        "product": None,
+        "serial": None,
+        "report_descriptor": None,
+        "error": None,
+    }
+    try:
+        h = hid.device()
+        h.open_path(device["path"])
+    except Exception as e:
+        result["error"] = f"Could not open device: {e}"
+        return result
+
+    try:
+        result["opened"] = True
+        result["manufacturer"] = h.get_manufacturer_string()
+        result["product"] = h.get_product_string()
+        result["serial"] = h.get_serial_number_string()
+        try:
+            result["report_descriptor"] = bytes(h.get_report_descriptor()).hex()
+        except Exception as e:
+            result["error"] = f"Could not read report descriptor: {e}"
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        h.close()
+    return result
+
+
+def probe_devices(devices, timeout=DEFAULT_TIMEOUT, max_workers=DEFAULT_WORKERS,
+                  cache_path=CACHE_FILE, refresh=False):
+    """Probe `devices` concurrently; yield (device, result) as each finishes.
+
+    result has "cached": True if it came from the cache and "timed_out":
+    True if the device didn't answer within `timeout` seconds.
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    cache_dirty = False
+
+    pending = []
+    for device in devices:
+        cached = None if refresh else cache.get(cache_key(device))
+        if cached is not None:
+            yield device, dict(cached, cached=True, timed_out=False)
+        else:
+            pending.append(device)
+
+    tasks = queue.Queue()
+    results = queue.Queue()
+    started = {}   # index -> monotonic start time
+    for index, device in enumerate(pending):
+        tasks.put((index, device))
+
+    def worker():
+        while True:
+            try:
+                index, device = tasks.get_nowait()
+            except queue.Empty:
+                return
+            started[index] = time.monotonic()
+            try:
+                result = probe_device(device)
+            except Exception as e:
+                result = {"path": _path_str(device.get("path", b"")), "opened": False,
+                          "report_descriptor": None, "error": str(e)}
+            results.put((index, result))
+
+    def start_worker():
+        threading.Thread(target=worker, name="hid-probe", daemon=True).start()
+
+    for _ in range(min(max_workers, len(pending))):
+        start_worker()
+
+    done = set()
+    try:
+        while len(done) < len(pending):
+            # Wait until the next result or the earliest running deadline
+            now = time.monotonic()
+            running = [started[i] + timeout for i in list(started) if i not in done]
+            wait = max(0.0, min(running) - now) if running else timeout
+            try:
+                index, result = results.get(timeout=wait)
+            except queue.Empty:
+                index = None
+            if index is not None:
+                if index in done:
+                    continue   # late answer from a probe we already gave up on
+                done.add(index)
+                result.update(cached=False, timed_out=False)
+                if result.get("report_descriptor") is not None:
+                    cache[cache_key(pending[index])] = {k: v for k, v in result.items()
+                                                        if k not in ("cached", "timed_out")}
+                    cache_dirty = True
+                yield pending[index], result
+                continue
+
+            now = time.monotonic()
+            for i in list(started):
+                if i not in done and now - started[i] >= timeout:
+                    done.add(i)
+                    start_worker()   # the stuck one no longer counts against the pool
+                    device = pending[i]
+                    yield device, {"path": _path_str(device.get("path", b"")),
+                                   "vendor_id": device.get("vendor_id", 0),
+                                   "product_id": device.get("product_id", 0),
+                                   "opened": False, "report_descriptor": None,
+                                   "error": f"No response within {timeout:.1f}s",
+                                   "cached": False, "timed_out": True}
+    finally:
+        # Anything not yet started is dropped if the caller stops early
+        while not tasks.empty():
+            try:
+                tasks.get_nowait()
+            except queue.Empty:
+                break
+        if cache_path and cache_dirty:
+            save_cache(cache, cache_path)
@@ -4,15 +4,35 @@ Direct USB device inspection using pyusb
 This bypasses the HID library issues on Windows
 """
 
+import os
+import sys
+
 import usb.core
 import usb.util
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from descriptor_store import DescriptorStore
+
 # VITURE x 8BitDo controller identifiers
 TARGET_VID = 0x2DC8
 TARGET_PID = 0x301F
 
-def inspect_device():
-    """Inspect the controller using pyusb"""
+def print_report_descriptor(report_desc):
+    print(f"Report Descriptor Length: {len(report_desc)} bytes")
+    print(f"Report Descriptor (hex): {report_desc.hex()}")
+    print(f"Report Descriptor (first 64 bytes):")
+    for i in range(0, min(64, len(report_desc)), 16):
+        hex_str = ' '.join(f'{b:02X}' for b in report_desc[i:i+16])
+        ascii_str = ''.join(chr(b) if 32 <= b < 127 else '.' for b in report_desc[i:i+16])
+        print(f"  {i:04X}: {hex_str:<48} {ascii_str}")
+
+def inspect_device(refresh=False):
+    """Inspect the controller using pyusb.
+
+    Descriptors are saved to the bridge's descriptor store; on later runs
+    the HID report descriptors come from the store instead of new
+    GET_DESCRIPTOR transfers unless refresh is set.
+    """
     print("VITURE x 8BitDo Controller Inspector")
     print("=" * 60)
     
@@ -28,6 +48,11 @@ def inspect_device():
     print(f"\n>>> Controller Found! <<<")
     print("=" * 60)
     
+    store = DescriptorStore()
+    bcd = device.bcdDevice
+    cached = None if refresh else store.get_device(TARGET_VID, TARGET_PID, bcd)
+    high_speed = device.speed == usb.util.SPEED_HIGH
+    
     try:
         # Get device information
         print(f"\nDevice Information:")
@@ -93,41 +118,64 @@ def inspect_device():
         print("Attempting to read HID report descriptor...")
         print("=" * 60)
         
+        # Endpoint layout comes from the descriptors libusb already cached
+        for cfg in device:
+            for intf in cfg:
+                store.put_interface(TARGET_VID, TARGET_PID, bcd, intf.bInterfaceNumber,
+                                    interface_class=intf.bInterfaceClass,
+                                    endpoints=[(ep.bEndpointAddress, ep.bmAttributes,
+                                                ep.wMaxPacketSize, ep.bInterval) for ep in intf])
+        
+        hid_interfaces = [intf for cfg in device for intf in cfg if intf.bInterfaceClass == 3]
+        if cached is not None and all(
+                cached["interfaces"].get(str(intf.bInterfaceNumber), {}).get("report_descriptor")
+                for intf in hid_interfaces):
+            print(f"(from descriptor store {store.path}, bcdDevice 0x{bcd:04X}; use --refresh to re-read)")
+            for intf in hid_interfaces:
+                print(f"\nFound HID interface {intf.bInterfaceNumber}")
+                record = cached["interfaces"][str(intf.bInterfaceNumber)]
+                print_report_descriptor(bytes.fromhex(record["report_descriptor"]))
+            store.save()
+            return
+        
         try:
             # Set configuration
             device.set_configuration()
             
+            # Raw device and configuration descriptors for the store
+            device_desc = device.ctrl_transfer(0x80, 0x06, 0x0100, 0, 18)
+            cfg = device.get_active_configuration()
+            config_desc = device.ctrl_transfer(0x80, 0x06, 0x0200, 0, cfg.wTotalLength)
+            store.put_device(TARGET_VID, TARGET_PID, bcd, device_desc, config_desc, high_speed)
+            
             # Find HID interface
-            for cfg in device:
-                for intf in cfg:
-                    if intf.bInterfaceClass == 3:  # HID class
-                        print(f"\nFound HID interface {intf.bInterfaceNumber}")
-                        
-                        # Try to get report descriptor
-                        try:
-                            # HID report descriptor request
-                            # bmRequestType: 0x81 (Device to host, standard, device)
-                            # bRequest: 0x06 (GET_DESCRIPTOR)
-                            # wValue: 0x2200 (Report descriptor, index 0)
-                            # wIndex: interface number
-                            report_desc = device.ctrl_transfer(
-                                0x81,  # bmRequestType
-                                0x06,  # bRequest (GET_DESCRIPTOR)
-                                0x2200,  # wValue (Report descriptor)
-                                intf.bInterfaceNumber,  # wIndex
-                                256  # wLength
-                            )
-                            
-                            print(f"Report Descriptor Length: {len(report_desc)} bytes")
-                            print(f"Report Descriptor (hex): {report_desc.hex()}")
-                            print(f"Report Descriptor (first 64 bytes):")
-                            for i in range(0, min(64, len(report_desc)), 16):
-                                hex_str = ' '.join(f'{b:02X}' for b in report_desc[i:i+16])
-                                ascii_str = ''.join(chr(b) if 32 <= b < 127 else '.' for b in report_desc[i:i+16])
-                                print(f"  {i:04X}: {hex_str:<48} {ascii_str}")
-                            
-                        except Exception as e:
-                            print(f"Could not read report descriptor: {e}")
+            for intf in hid_interfaces:
+                print(f"\nFound HID interface {intf.bInterfaceNumber}")
+                
+                # Try to get report descriptor
+                try:
+                    # HID report descriptor request
+                    # bmRequestType: 0x81 (Device to host, standard, device)
+                    # bRequest: 0x06 (GET_DESCRIPTOR)
+                    # wValue: 0x2200 (Report descriptor, index 0)
+                    # wIndex: interface number
+                    report_desc = device.ctrl_transfer(
+                        0x81,  # bmRequestType
+                        0x06,  # bRequest (GET_DESCRIPTOR)
+                        0x2200,  # wValue (Report descriptor)
+                        intf.bInterfaceNumber,  # wIndex
+                        256  # wLength
+                    )
+                    
+                    print_report_descriptor(bytes(report_desc))
+                    store.put_interface(TARGET_VID, TARGET_PID, bcd, intf.bInterfaceNumber,
+                                        report_descriptor=report_desc)
+                    
+                except Exception as e:
+                    print(f"Could not read report descriptor: {e}")
+            
+            store.save()
+            print(f"\nDescriptors saved to {store.path}")
         
         except Exception as e:
             print(f"Error setting configuration: {e}")
@@ -145,8 +193,15 @@ def inspect_device():
             pass
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Inspect the controller with pyusb")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-read report descriptors even if the descriptor store has them")
+    args = parser.parse_args()
+    
     try:
-        inspect_device()
+        inspect_device(args.refresh)
     except Exception as e:
         print(f"Error: {e}")
         import traceback
@@ -1,38 +1,34 @@
-import hid
+import os
+import sys
 
-TARGET_VID = 0x2DC8
-TARGET_PID = 0x3208
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from device_discovery import find_all, VITURE_VID as TARGET_VID, UPDATE_PID as TARGET_PID
+from hid_probe import probe_devices
 
 print(f"Looking for device 0x{TARGET_VID:04x}:0x{TARGET_PID:04x}...")
 
-devices = hid.enumerate()
+devices = find_all(mode="update")
 found = False
 
-for device in devices:
-    if device['vendor_id'] == TARGET_VID and device['product_id'] == TARGET_PID:
-        found = True
-        print("\nFOUND DEVICE!")
-        print(f"Manufacturer: {device.get('manufacturer_string')}")
-        print(f"Product: {device.get('product_string')}")
-        print(f"Usage Page: {device.get('usage_page')} (0x{device.get('usage_page'):04x})")
-        print(f"Usage: {device.get('usage')} (0x{device.get('usage'):04x})")
-        print(f"Path: {device.get('path')}")
-        
-        try:
-            h = hid.device()
-            h.open_path(device['path'])
-            print("Opened successfully.")
-            
-            try:
-                desc = h.get_report_descriptor()
-                print(f"Report Descriptor ({len(desc)} bytes):")
-                print(bytes(desc).hex())
-            except Exception as e:
-                print(f"Failed to get descriptor: {e}")
-                
-            h.close()
-        except Exception as e:
-            print(f"Failed to open: {e}")
+for device, result in probe_devices(devices):
+    found = True
+    print("\nFOUND DEVICE!")
+    print(f"Manufacturer: {device.get('manufacturer_string')}")
+    print(f"Product: {device.get('product_string')}")
+    print(f"Usage Page: {device.get('usage_page')} (0x{device.get('usage_page'):04x})")
+    print(f"Usage: {device.get('usage')} (0x{device.get('usage'):04x})")
+    print(f"Path: {device.get('path')}")
+    
+    if result['opened']:
+        print("Opened successfully." + (" (cached)" if result['cached'] else ""))
+    if result['report_descriptor'] is not None:
+        desc = bytes.fromhex(result['report_descriptor'])
+        print(f"Report Descriptor ({len(desc)} bytes):")
+        print(desc.hex())
+    elif result['opened']:
+        print(f"Failed to get descriptor: {result['error']}")
+    else:
+        print(f"Failed to open: {result['error']}")
 
 if not found:
     print("Device not found in HID enumeration.")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+8BitDo Software Log Parser
+Streams the 8BitDo Ultimate Software logs (Log/*.txt, ErrLog/ErrLog.txt)
+line by line and yields structured records:
+
+    firmware  one entry from a firmware-update JSON line ({"list": [...]})
+    device    a PID/VID sighting, e.g. "设备初始化列表：0----PID:0---VID:0"
+    error     a line mentioning an error/exception/failure
+
+With a state file, the byte offset, inode and mtime of every log are
+remembered, so the next run only parses bytes appended since the last one
+(a truncated or replaced file is parsed again from the start). A small
+per-file summary (latest firmware list, device sightings, error count) is
+kept in the same state so reports don't need the old records.
+
+Usage:
+    python log_parser.py path/to/Log path/to/ErrLog --state log_state.json
+    python log_parser.py path/to/Log --follow
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+LogRecord = namedtuple("LogRecord", "kind path offset timestamp data")
+
+STATE_VERSION = 1
+
+_TIMESTAMP = re.compile(r"^\[?(\d{4}[-/]\d{1,2}[-/]\d{1,2}[ T]\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?)")
+_PID_VID = re.compile(r"PID\s*[:=]\s*(0x[0-9A-Fa-f]+|[0-9A-Fa-f]+)\W{0,8}?-*\s*VID\s*[:=]\s*(0x[0-9A-Fa-f]+|[0-9A-Fa-f]+)")
+_ERROR = re.compile(r"(?i)error|exception|fail|错误|异常|失败")
+
+
+def _parse_id(text):
+    """Log IDs are usually decimal ("PID:12319"), sometimes hex ("2DC8", "0x301F")"""
+    if text.lower().startswith("0x"):
+        return int(text, 16)
+    if text.isdigit():
+        return int(text)
+    return int(text, 16)
+
+
+def parse_line(line):
+    """Yield (kind, data) for one decoded log line"""
+    stripped = line.strip()
+    if not stripped:
+        return
+
+    if stripped.startswith("{"):
+        try:
+            data = json.loads(stripped)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and data.get("list"):
+            for item in data["list"]:
+                yield "firmware", {
+                    "version": item.get("version"),
+                    "date": item.get("date"),
+                    "file_name": item.get("fileName"),
+                    "file_size": item.get("fileSize"),
+                    "md5": item.get("md5"),
+                    "type": item.get("type"),
+                    "readme": item.get("readme"),
+                }
+            return
+
+    m = _PID_VID.search(stripped)
+    if m:
+        yield "device", {"pid": _parse_id(m.group(1)), "vid": _parse_id(m.group(2)), "line": stripped[:200]}
+    elif _ERROR.search(stripped):
+        yield "error", {"message": stripped[:500]}
+
+
+class LogParser:
+    """Incremental parser; offsets and summaries persist in `state_path`"""
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path
+        self.files = {}
+        if state_path:
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == STATE_VERSION:
+                    self.files = data["files"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def save(self):
+        if not self.state_path:
+            return
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "files": self.files}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.state_path)
+
+    def summary(self, path):
+        entry = self.files.get(os.path.abspath(path))
+        return entry["summary"] if entry else _empty_summary()
+
+    def parse_file(self, path):
+        """Yield LogRecords for the lines appended to `path` since the last call"""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+
+        entry = self.files.get(path)
+        if entry is None or entry["inode"] != st.st_ino or st.st_size < entry["offset"]:
+            # New, replaced or truncated - start over
+            entry = {"offset": 0, "inode": st.st_ino, "mtime_ns": 0, "summary": _empty_summary()}
+            self.files[path] = entry
+        if st.st_size == entry["offset"] and st.st_mtime_ns == entry["mtime_ns"]:
+            return
+
+        summary = entry["summary"]
+        firmware_batch = None
+        with open(path, "rb") as f:
+            f.seek(entry["offset"])
+            offset = entry["offset"]
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break   # partial last line, finish it next time
+                line = raw.decode("utf-8", errors="replace")
+                timestamp = None
+                for kind, data in parse_line(line):
+                    if timestamp is None:
+                        m = _TIMESTAMP.match(line)
+                        timestamp = m.group(1) if m else ""
+                    if kind == "firmware":
+                        if firmware_batch != offset:
+                            firmware_batch = offset
+                            summary["firmware"] = []
+                        summary["firmware"].append(data)
+                    elif kind == "device":
+                        key = f"{data['vid']:04X}:{data['pid']:04X}"
+                        summary["devices"][key] = summary["devices"].get(key, 0) + 1
+                        summary["last_device"] = data["line"]
+                    else:
+                        summary["errors"] += 1
+                    yield LogRecord(kind, path, offset, timestamp or None, data)
+                offset += len(raw)
+                entry["offset"] = offset
+        entry["mtime_ns"] = st.st_mtime_ns
+
+    def parse(self, paths):
+        for path in expand_paths(paths):
+            yield from self.parse_file(path)
+
+    def follow(self, paths, interval=0.5):
+        """Tail `paths` forever, yielding records as lines are appended"""
+        while True:
+            found = False
+            for record in self.parse(paths):
+                found = True
+                yield record
+            if found:
+                self.save()
+            time.sleep(interval)
+
+
+def _empty_summary():
+    return {"firmware": [], "devices": {}, "last_device": None, "errors": 0}
+
+
+def expand_paths(paths):
+    """Directories expand to the *.txt logs inside them"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(".txt"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def format_record(record):
+    name = os.path.basename(record.path)
+    stamp = f"{record.timestamp} " if record.timestamp else ""
+    data = record.data
+    if record.kind == "firmware":
+        return (f"[firmware] {name} {stamp}version {data['version']} ({data['date']}) "
+                f"{data['file_name']} {data['file_size'] or 0:,} bytes md5 {data['md5']}")
+    if record.kind == "device":
+        return f"[device]   {name} {stamp}VID {data['vid']:04X} PID {data['pid']:04X}"
+    return f"[error]    {name} {stamp}{data['message'][:120]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental parser for 8BitDo software logs")
+    parser.add_argument("paths", nargs="+", help="log files or directories of *.txt logs")
+    parser.add_argument("--state", metavar="FILE", help="remember offsets here and only parse new bytes")
+    parser.add_argument("--follow", action="store_true", help="keep tailing the logs")
+    parser.add_argument("--kind", choices=("firmware", "device", "error"), action="append",
+                        help="only show these record kinds")
+    parser.add_argument("--json", action="store_true", help="print records as JSON lines")
+    args = parser.parse_args()
+
+    log_parser = LogParser(args.state)
+    records = log_parser.follow(args.paths) if args.follow else log_parser.parse(args.paths)
+    try:
+        for record in records:
+            if args.kind and record.kind not in args.kind:
+                continue
+            if args.json:
+                print(json.dumps(record._asdict(), ensure_ascii=False))
+            else:
+                print(format_record(record))
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log_parser.save()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Mapping Learner
+Infers where every control lives in report ID 1 from a labelled capture
+(test_button_diagnostic.py --guided) and writes a mapping profile the
+bridge can load with --profile. Replaces reading hex off the screen and
+guessing ("Assumed", "Swapped per User Report").
+
+All of the analysis is vectorized over the whole session with NumPy:
+
+    axes     per axis step, the byte with the largest mean |value - rest
+             value| while the stick is held; the sign says if it's inverted
+    hat      the byte that changes in all four D-pad steps, with one value
+             per direction
+    buttons  frames are XORed with the rest state and unpacked to bits; one
+             matrix product gives, per step, how often each bit is set while
+             anything is pressed. A bit's score is that rate times how rarely
+             it is set in every other step.
+
+Bytes that sweep through many values within one step (analog triggers)
+are reported but not used as buttons. Every entry gets a 0-1 confidence.
+
+Usage:
+    python mapping_learner.py session.vxcap -o profile.json
+"""
+
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from capture_format import CaptureReader, KIND_INPUT, KIND_MARKER
+from controller_state import BUTTON_MAP
+from mapping_profile import (
+    BUTTON_TARGETS, HAT_DIRECTIONS, MARKER_PREFIX, save_profile, decoder_kwargs,
+)
+
+MAX_REPORT_BYTES = 16      # only the start of report 1 carries controls
+AXIS_ACTIVE = 32           # |deviation| that counts as "stick held"
+ANALOG_MIN_VALUES = 16     # distinct values that mark a byte as analog
+
+
+def _require_numpy():
+    if np is None:
+        print("Error: 'numpy' package not installed")
+        print("Install it with: pip install numpy")
+        sys.exit(1)
+
+
+def load_session(path):
+    """Return (frames (N, L) uint8, labels (N,) int, label names)"""
+    _require_numpy()
+    names = []
+    index = {}
+    reports = []
+    labels = []
+    current = None
+    for record in CaptureReader(path):
+        if record.kind == KIND_MARKER:
+            text = record.data.decode("utf-8", errors="replace")
+            if text.startswith(MARKER_PREFIX):
+                label = text[len(MARKER_PREFIX):]
+                if label not in index:
+                    index[label] = len(names)
+                    names.append(label)
+                current = index[label]
+        elif record.kind == KIND_INPUT and current is not None:
+            if record.report_id == 1 and len(record.data) >= 8:
+                reports.append(record.data)
+                labels.append(current)
+
+    if not reports:
+        raise ValueError(f"{path}: no labelled report-1 frames (was it recorded with --guided?)")
+    width = min(MAX_REPORT_BYTES, min(len(r) for r in reports))
+    frames = np.frombuffer(b"".join(r[:width] for r in reports), dtype=np.uint8).reshape(-1, width)
+    return frames, np.asarray(labels), names
+
+
+def _mode(column):
+    return int(np.bincount(column, minlength=256).argmax())
+
+
+def learn(frames, labels, names):
+    """Infer a mapping profile (dict) from labelled frames"""
+    _require_numpy()
+    width = frames.shape[1]
+    label_of = {name: i for i, name in enumerate(names)}
+
+    idle = labels == label_of["idle"] if "idle" in label_of else np.ones(len(frames), bool)
+    rest = np.array([_mode(frames[idle, c]) for c in range(width)], dtype=np.uint8)
+    deviation = frames.astype(np.int16) - rest.astype(np.int16)
+    changed = frames != rest
+
+    profile = {"buttons": {}, "axes": {}}
+
+    # --- Axes -------------------------------------------------------------
+    axis_bytes = set()
+    for axis in ("LX", "LY", "RX", "RY"):
+        votes = []
+        for sign in "+-":
+            step = label_of.get(f"axis:{axis}{sign}")
+            if step is None:
+                continue
+            seg = deviation[labels == step]
+            seg = seg[np.abs(seg).max(axis=1) > AXIS_ACTIVE]
+            if not len(seg):
+                continue
+            strength = np.abs(seg).mean(axis=0)
+            strength[0] = 0                      # report ID
+            order = np.argsort(strength)[::-1]
+            best, second = strength[order[0]], strength[order[1]]
+            column = int(order[0])
+            moved_up = seg[:, column].mean() > 0
+            inverted = moved_up != (sign == "+")
+            votes.append((column, inverted, float((best - second) / best) if best else 0.0))
+        if not votes:
+            continue
+        column = max(set(v[0] for v in votes), key=lambda c: sum(v[2] for v in votes if v[0] == c))
+        agreeing = [v for v in votes if v[0] == column]
+        inverted = agreeing[0][1]
+        confidence = sum(v[2] for v in agreeing) / len(votes)
+        if any(v[1] != inverted for v in agreeing):
+            confidence *= 0.5
+        profile["axes"][axis] = {"byte": column, "inverted": bool(inverted),
+                                 "confidence": round(confidence, 3)}
+        axis_bytes.add(column)
+
+    # Outside the stick steps, a byte that sweeps through many values within
+    # one step is analog (a button byte only toggles a few bits per step)
+    non_axis_steps = ~np.isin(labels, [label_of[n] for n in names if n.startswith("axis:")])
+    step_values = labels[non_axis_steps].astype(np.int64) * 256
+    analog = {}
+    for c in range(1, width):
+        if c in axis_bytes:
+            continue
+        pairs = np.unique(step_values + frames[non_axis_steps, c])
+        distinct = int(np.bincount(pairs // 256).max())
+        if distinct >= ANALOG_MIN_VALUES:
+            analog[c] = distinct
+
+    # --- Hat --------------------------------------------------------------
+    candidates = [c for c in range(1, width) if c not in axis_bytes and c not in analog]
+    hat_steps = [(d, label_of[f"hat:{d}"]) for d in HAT_DIRECTIONS if f"hat:{d}" in label_of]
+    hat_byte = None
+    if hat_steps and candidates:
+        cand = np.array(candidates)
+        rates = []
+        for _, step in hat_steps:
+            seg = changed[labels == step][:, cand]
+            active = seg.any(axis=1)
+            rates.append(seg[active].mean(axis=0) if active.any() else np.zeros(len(cand)))
+        # The hat byte changes in every direction: rank by the weakest direction
+        score = np.min(rates, axis=0)
+        if score.max() > 0:
+            hat_byte = int(cand[score.argmax()])
+            values = {}
+            agreement = []
+            for direction, step in hat_steps:
+                seg = frames[labels == step][:, hat_byte]
+                pressed = seg[seg != rest[hat_byte]]
+                if not len(pressed):
+                    continue
+                value = _mode(pressed)
+                values[direction] = value
+                agreement.append(np.mean(pressed == value))
+            distinct = len(set(values.values())) == len(values)
+            if values == {"up": 0, "right": 2, "down": 4, "left": 6}:
+                encoding = "hat8"
+            elif all(v and not v & (v - 1) for v in values.values()) and distinct:
+                encoding = "bits"
+            else:
+                encoding = "values"
+            confidence = float(np.mean(agreement)) * float(score.max()) * (1.0 if distinct else 0.5)
+            profile["hat"] = {"byte": hat_byte, "neutral": int(rest[hat_byte]), "encoding": encoding,
+                              "values": values, "confidence": round(confidence, 3)}
+
+    # --- Buttons ----------------------------------------------------------
+    button_cols = np.array([c for c in candidates if c != hat_byte], dtype=int)
+    button_steps = [(name, label_of[f"button:{name}"]) for name in BUTTON_TARGETS
+                    if f"button:{name}" in label_of]
+    if button_steps and len(button_cols):
+        xor = (frames[:, button_cols] ^ rest[button_cols])
+        bits = np.unpackbits(xor[:, :, None], axis=2, bitorder="little").reshape(len(frames), -1)
+        active = bits.any(axis=1)
+        onehot = np.stack([labels == step for _, step in button_steps]).astype(np.float64)
+        counts = onehot @ bits                          # (steps, bits) frames with bit set
+        active_counts = onehot @ active                 # (steps,) frames with anything set
+        rate = counts / np.maximum(active_counts, 1)[:, None]
+        # Highest rate of each bit in any *other* step
+        top2 = np.sort(rate, axis=0)[-2:] if len(rate) > 1 else np.vstack([np.zeros(rate.shape[1]), rate[0]])
+        other = np.where(rate == top2[1], top2[0], top2[1])
+        score = rate * (1.0 - other)
+
+        # Greedy unique assignment, best scores first
+        taken_steps, taken_bits = set(), set()
+        for flat in np.argsort(score, axis=None)[::-1]:
+            k, b = divmod(int(flat), score.shape[1])
+            if score[k, b] <= 0:
+                break
+            if k in taken_steps or b in taken_bits:
+                continue
+            taken_steps.add(k)
+            taken_bits.add(b)
+            name = button_steps[k][0]
+            profile["buttons"][name] = {"byte": int(button_cols[b // 8]), "mask": 1 << (b % 8),
+                                        "confidence": round(float(score[k, b]), 3)}
+        profile["buttons"] = {name: profile["buttons"][name] for name, _ in button_steps
+                              if name in profile["buttons"]}
+
+    if analog:
+        profile["analog_bytes"] = sorted(analog)
+    profile["frames"] = int(len(frames))
+    return profile
+
+
+def print_profile(profile):
+    print(f"Learned from {profile['frames']} frames\n")
+    print("Buttons:")
+    for name, entry in profile["buttons"].items():
+        print(f"  {name:<7} byte {entry['byte']} mask 0x{entry['mask']:02X}   confidence {entry['confidence']:.2f}")
+    if "hat" in profile:
+        hat = profile["hat"]
+        values = ", ".join(f"{d}=0x{v:02X}" for d, v in hat["values"].items())
+        print(f"\nD-pad: byte {hat['byte']} ({hat['encoding']}, rest 0x{hat['neutral']:02X}) {values}"
+              f"   confidence {hat['confidence']:.2f}")
+    print("\nAxes:")
+    for axis, entry in profile["axes"].items():
+        print(f"  {axis}  byte {entry['byte']}{' inverted' if entry['inverted'] else ''}"
+              f"   confidence {entry['confidence']:.2f}")
+    if profile.get("analog_bytes"):
+        print(f"\nOther analog bytes (not mapped): {profile['analog_bytes']}")
+
+
+def compare_with_default(profile):
+    """Print where the learned buttons disagree with BUTTON_MAP"""
+    default = {target: (byte, mask) for byte, mask, target in BUTTON_MAP}
+    differences = []
+    for name, entry in profile["buttons"].items():
+        expected = default.get(BUTTON_TARGETS[name])
+        if expected and expected != (entry["byte"], entry["mask"]):
+            differences.append(f"  {name}: bridge uses byte {expected[0]} mask 0x{expected[1]:02X}, "
+                               f"learned byte {entry['byte']} mask 0x{entry['mask']:02X}")
+    print("\nDifferences from the built-in mapping:")
+    print("\n".join(differences) if differences else "  none")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Learn a mapping profile from a guided capture")
+    parser.add_argument("capture", help="capture recorded with test_button_diagnostic.py --guided")
+    parser.add_argument("-o", "--output", help="write the mapping profile here")
+    parser.add_argument("--min-confidence", type=float, default=0.5,
+                        help="warn about entries below this confidence")
+    args = parser.parse_args()
+
+    _require_numpy()
+    start = time.perf_counter()
+    frames, labels, names = load_session(args.capture)
+    loaded = time.perf_counter()
+    profile = learn(frames, labels, names)
+    done = time.perf_counter()
+
+    print_profile(profile)
+    compare_with_default(profile)
+    weak = [name for name, e in list(profile["buttons"].items()) + list(profile["axes"].items())
+            if e["confidence"] < args.min_confidence]
+    if weak:
+        print(f"\nLow confidence: {', '.join(weak)} - consider recording that step again")
+    print(f"\nLoaded in {(loaded - start) * 1000:.0f} ms, analysed in {(done - loaded) * 1000:.0f} ms")
+
+    if args.output:
+        try:
+            decoder_kwargs(profile)
+        except ValueError as e:
+            print(f"Warning: the bridge can't use this profile as-is: {e}")
+        save_profile(profile, args.output)
+        print(f"Profile written to {args.output} (use: controller_bridge.py --profile {args.output})")
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Report Sweeper
+Tries report IDs and payload patterns against the controller's HID
+collections through get_feature_report / send_feature_report / write, to
+find out what the output reports (0x43-0x46, 0x85: rumble? LEDs? mode
+switching?) do and whether the 3208 update-mode interface takes feature
+reports - without hours of poking by hand.
+
+    get     get_feature_report(id)            read-only, the default
+    set     send_feature_report([id] + pattern)
+    write   write([id] + pattern)             output report
+
+Every hidapi call runs on a worker thread with a strict deadline: a call
+that hangs is recorded as a timeout, its handle is abandoned and a fresh
+one opened, and the sweep carries on. Meanwhile a second handle watches
+the gamepad collection's input reports; after each attempt the settle
+window is compared with what came before it, so an attempt that changes
+a report byte, adds a report ID, changes the report rate or drops the
+device gets the side effect pinned on it. Rumble and LEDs can't be seen
+in the input reports - pace the sweep (--settle, --interval) slowly
+enough to watch the controller and match it against the printed lines.
+
+Everything goes into one capture file: input reports, a marker per
+attempt ("sweep:set 0x43 ones"), what was sent (KIND_FEATURE_SET /
+KIND_OUTPUT), what came back (KIND_FEATURE_GET) and the outcome.
+
+Sets and writes can change the controller's configuration, so they are
+opt-in (--ops); in update mode they also need --allow-update-writes.
+
+Usage:
+    python report_sweeper.py --dry-run --ops get set write
+    python report_sweeper.py -o sweep.vxcap                      # get 0x43-0x46, 0x85 and declared IDs
+    python report_sweeper.py --ids 0x43-0x46,0x85 --ops get set write --settle 300 --interval 700
+    python report_sweeper.py --mode update --ids all
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from capture_format import CaptureWriter, KIND_FEATURE_GET, KIND_FEATURE_SET, KIND_INPUT, KIND_OUTPUT
+from descriptor_store import DescriptorStore, parse_report_sizes
+
+DEFAULT_IDS = "0x43-0x46,0x85"
+DEFAULT_TIMEOUT_MS = 250
+DEFAULT_SETTLE_MS = 100       # input watched after each attempt
+DEFAULT_INTERVAL_MS = 0       # extra pause between attempts
+DEFAULT_SIZE = 64             # report length incl. ID when the descriptor doesn't say
+MAX_ABANDONED = 8             # hung handles before giving up on a collection
+AXIS_BYTES = range(4, 8)      # stick bytes jitter at rest...
+AXIS_NOISE = 3                # ...by this much without meaning anything
+BASELINE_S = 1.0              # input before an attempt used as its baseline
+MIN_BASELINE_RATE = 50        # reports/s needed to call a silent window "stopped"
+
+OPERATIONS = ("get", "set", "write")
+PATTERNS = {
+    "zeros": lambda n: bytes(n),
+    "ones": lambda n: b"\xff" * n,
+    "first": lambda n: b"\x01" + bytes(n - 1),
+    "ramp": lambda n: bytes(i & 0xFF for i in range(n)),
+}
+
+Attempt = namedtuple("Attempt", "op report_id pattern payload length")
+Outcome = namedtuple("Outcome", "attempt status response elapsed_ms effects")
+
+
+def parse_ids(text):
+    """'0x43-0x46,0x85' / 'all' -> sorted report IDs"""
+    if text == "all":
+        return list(range(256))
+    ids = set()
+    for part in text.split(","):
+        first, _, last = part.strip().partition("-")
+        first = int(first, 0)
+        ids.update(range(first, int(last, 0) + 1) if last else (first,))
+    if not all(0 <= i <= 255 for i in ids):
+        raise ValueError("report IDs must be 0-255")
+    return sorted(ids)
+
+
+def build_attempts(ops, ids, patterns, sizes=None, size=None):
+    """Every (operation, report ID, pattern) to try, in order.
+
+    Lengths (including the ID byte) come from `size`, else the report's
+    declared size in `sizes` (parse_report_sizes output), else DEFAULT_SIZE.
+    """
+    sizes = sizes or {"output": {}, "feature": {}}
+    attempts = []
+    for report_id in ids:
+        for op in ops:
+            declared = sizes["output" if op == "write" else "feature"].get(report_id)
+            length = size or (declared + 1 if declared else DEFAULT_SIZE)
+            if op == "get":
+                attempts.append(Attempt(op, report_id, None, None, length))
+                continue
+            for name, payload in patterns:
+                body = payload(length - 1) if callable(payload) else payload[:length - 1].ljust(length - 1, b"\0")
+                attempts.append(Attempt(op, report_id, name, bytes([report_id]) + body, length))
+    return attempts
+
+
+def describe(attempt):
+    return f"{attempt.op} 0x{attempt.report_id:02X}" + (f" {attempt.pattern}" if attempt.pattern else "")
+
+
+class SweepLog:
+    """CaptureWriter shared by the watch and sweep threads"""
+
+    def __init__(self, path):
+        self.writer = CaptureWriter(path) if path else None
+        self._lock = threading.Lock()
+
+    def write(self, timestamp_ns, kind, data, report_id=None):
+        if self.writer:
+            with self._lock:
+                self.writer.write(timestamp_ns, kind, data, report_id)
+
+    def marker(self, text):
+        if self.writer:
+            with self._lock:
+                self.writer.write_marker(time.perf_counter_ns(), text)
+
+    def close(self):
+        if self.writer:
+            with self._lock:
+                self.writer.close()
+
+
+class TimedDevice:
+    """A HID handle whose every call has a deadline.
+
+    Calls run on a fresh daemon thread; if one misses `timeout` seconds the
+    handle is abandoned to it (closing a handle another thread is inside
+    would crash hidapi) and a new one is opened for the next attempt.
+    """
+
+    def __init__(self, factory, path, timeout):
+        self.factory = factory
+        self.path = path
+        self.timeout = timeout
+        self.abandoned = 0
+        self._h = None
+        self.reopen()
+
+    @property
+    def is_open(self):
+        return self._h is not None
+
+    @property
+    def handle(self):
+        return self._h
+
+    def reopen(self):
+        h = self.factory()
+        h.open_path(self.path)
+        self._h = h
+
+    def call(self, method, *args):
+        """(status, result): ("ok", value), ("error", message) or ("timeout", None)"""
+        box = {}
+
+        def run():
+            try:
+                box["value"] = getattr(self._h, method)(*args)
+            except Exception as e:
+                box["error"] = f"{type(e).__name__}: {e}"
+        worker = threading.Thread(target=run, name=f"sweep-{method}", daemon=True)
+        worker.start()
+        worker.join(self.timeout)
+        if worker.is_alive():
+            self.abandoned += 1
+            self._h = None
+            return "timeout", None
+        if "error" in box:
+            return "error", box["error"]
+        return "ok", box["value"]
+
+    def close(self):
+        if self._h is not None:
+            try:
+                self._h.close()
+            except Exception:
+                pass
+            self._h = None
+
+
+class InputWatch(threading.Thread):
+    """Reads input reports on its own handle, keeps the recent ones and logs them all"""
+
+    def __init__(self, factory, path, log, history=16384):
+        super().__init__(name="sweep-watch", daemon=True)
+        self.log = log
+        self.recent = deque(maxlen=history)      # (timestamp_ns, bytes)
+        self.disconnected = None                 # timestamp_ns when reads started failing
+        self.total = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._h = factory()
+        self._h.open_path(path)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                report = self._h.read(64, 50)
+            except Exception:
+                self.disconnected = time.perf_counter_ns()
+                break
+            if report:
+                timestamp = time.perf_counter_ns()
+                report = bytes(report)
+                with self._lock:
+                    self.recent.append((timestamp, report))
+                    self.total += 1
+                self.log.write(timestamp, KIND_INPUT, report)
+
+    def between(self, start_ns, end_ns):
+        with self._lock:
+            return [(t, r) for t, r in self.recent if start_ns <= t < end_ns]
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(1.0)
+        try:
+            self._h.close()
+        except Exception:
+            pass
+
+
+def side_effects(before, window, settle_s, disconnected=False):
+    """What changed in the input reports after an attempt.
+
+    `before` and `window` are [(timestamp_ns, report)] from the baseline
+    and the settle window.
+    """
+    effects = []
+    if disconnected:
+        effects.append("device disconnected")
+    baseline_rate = len(before) / BASELINE_S
+    window_rate = len(window) / settle_s if settle_s else 0.0
+    if not window and baseline_rate >= MIN_BASELINE_RATE:
+        effects.append("input stopped")
+    elif window and baseline_rate >= MIN_BASELINE_RATE and window_rate > 2 * baseline_rate + 50:
+        effects.append(f"input rate {baseline_rate:.0f} -> {window_rate:.0f}/s")
+
+    seen_ids = {r[0] for _, r in before if r}
+    new_ids = sorted({r[0] for _, r in window if r} - seen_ids)
+    if new_ids and before:
+        effects.append("new report ID " + ", ".join(f"0x{i:02X}" for i in new_ids))
+
+    # Bytes of each report ID that leave the range they had before
+    ranges = {}
+    for _, report in before:
+        if not report:
+            continue
+        lo_hi = ranges.get(report[0])
+        if lo_hi is None or len(lo_hi[0]) != len(report):
+            ranges[report[0]] = (bytearray(report), bytearray(report))
+            continue
+        lo, hi = lo_hi
+        for i, value in enumerate(report):
+            if value < lo[i]:
+                lo[i] = value
+            elif value > hi[i]:
+                hi[i] = value
+    changed = {}
+    for _, report in window:
+        lo_hi = ranges.get(report[0]) if report else None
+        if lo_hi is None:
+            continue
+        lo, hi = lo_hi
+        for i in range(1, min(len(report), len(lo))):
+            slack = AXIS_NOISE if report[0] == 1 and i in AXIS_BYTES else 0
+            if lo[i] - slack <= report[i] <= hi[i] + slack:
+                continue
+            changed.setdefault((report[0], i), (lo[i] if report[i] < lo[i] else hi[i], report[i]))
+    if changed:
+        effects.append("bytes changed: " + ", ".join(
+            f"id{rid}[{i}] 0x{a:02X}->0x{b:02X}" for (rid, i), (a, b) in sorted(changed.items())[:6])
+            + (" ..." if len(changed) > 6 else ""))
+    return effects
+
+
+def run_attempt(device, attempt, log):
+    """One hidapi call under the device's deadline; returns (status, response)"""
+    log.marker("sweep:" + describe(attempt))
+    now = time.perf_counter_ns
+    if attempt.op == "get":
+        status, value = device.call("get_feature_report", attempt.report_id, attempt.length)
+        if status == "ok" and value:
+            log.write(now(), KIND_FEATURE_GET, bytes(value), attempt.report_id)
+            return status, bytes(value)
+        return (status, value) if status != "ok" else ("empty", None)
+    kind, method = (KIND_FEATURE_SET, "send_feature_report") if attempt.op == "set" else (KIND_OUTPUT, "write")
+    log.write(now(), kind, attempt.payload, attempt.report_id)
+    status, value = device.call(method, list(attempt.payload))
+    if status == "ok" and isinstance(value, int) and value < 0:
+        return "rejected", value
+    return status, value
+
+
+def sweep(attempts, device, log, watch=None, settle=DEFAULT_SETTLE_MS / 1000,
+          interval=DEFAULT_INTERVAL_MS / 1000, on_outcome=None):
+    """Run the attempts in order; returns [Outcome]. Stops if the device goes away."""
+    outcomes = []
+    for attempt in attempts:
+        if not device.is_open:
+            if device.abandoned >= MAX_ABANDONED:
+                log.marker(f"sweep:stopped after {device.abandoned} hung calls")
+                break
+            try:
+                device.reopen()
+            except Exception as e:
+                log.marker(f"sweep:stopped, could not reopen: {e}")
+                break
+        start_ns = time.perf_counter_ns()
+        status, response = run_attempt(device, attempt, log)
+        elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        effects = []
+        if watch is not None:
+            time.sleep(settle)
+            end_ns = time.perf_counter_ns()
+            before = watch.between(start_ns - int(BASELINE_S * 1e9), start_ns)
+            window = watch.between(start_ns, end_ns)
+            gone = watch.disconnected is not None and watch.disconnected >= start_ns
+            effects = side_effects(before, window, (end_ns - start_ns) / 1e9, disconnected=gone)
+        log.marker(f"sweep:result {describe(attempt)}: {status}" + (f" [{'; '.join(effects)}]" if effects else ""))
+        outcome = Outcome(attempt, status, response, elapsed_ms, effects)
+        outcomes.append(outcome)
+        if on_outcome:
+            on_outcome(outcome)
+        if watch is not None and watch.disconnected is not None:
+            break
+        if interval:
+            time.sleep(interval)
+    return outcomes
+
+
+def print_outcome(outcome):
+    response = outcome.response
+    if isinstance(response, bytes):
+        shown = response[:16].hex(" ") + (" ..." if len(response) > 16 else "")
+    else:
+        shown = "" if response is None else str(response)
+    effects = f"  <-- {'; '.join(outcome.effects)}" if outcome.effects else ""
+    print(f"  {describe(outcome.attempt):<22} {outcome.status:<8} {outcome.elapsed_ms:7.1f} ms  {shown}{effects}")
+
+
+def print_summary(outcomes):
+    def ids(pred):
+        found = sorted({o.attempt.report_id for o in outcomes if pred(o)})
+        return ", ".join(f"0x{i:02X}" for i in found) or "none"
+    print("\nSummary:")
+    print(f"  feature reports answered:  {ids(lambda o: o.attempt.op == 'get' and o.status == 'ok')}")
+    print(f"  feature sets accepted:     {ids(lambda o: o.attempt.op == 'set' and o.status == 'ok')}")
+    print(f"  output writes accepted:    {ids(lambda o: o.attempt.op == 'write' and o.status == 'ok')}")
+    print(f"  timed out:                 {ids(lambda o: o.status == 'timeout')}")
+    for outcome in outcomes:
+        if outcome.effects:
+            print(f"  side effect: {describe(outcome.attempt)}: {'; '.join(outcome.effects)}")
+
+
+def declared_sizes(target, h=None):
+    """Output/feature sizes from the live report descriptor, else the descriptor store"""
+    descriptor = None
+    if h is not None:
+        try:
+            descriptor = bytes(h.get_report_descriptor())
+        except Exception:
+            descriptor = None
+    if descriptor is None:
+        interface = DescriptorStore().get_interface(target.get("vendor_id", 0), target.get("product_id", 0),
+                                                    target.get("release_number", 0),
+                                                    max(0, target.get("interface_number", 0)))
+        if interface and interface.get("report_descriptor"):
+            descriptor = bytes.fromhex(interface["report_descriptor"])
+    return parse_report_sizes(descriptor) if descriptor else None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sweep feature/output report IDs and watch for side effects")
+    parser.add_argument("--mode", choices=("normal", "update"), default="normal")
+    parser.add_argument("--ids", default=DEFAULT_IDS, help="report IDs, e.g. 0x43-0x46,0x85 or all "
+                                                            "(default: %(default)s plus every declared one)")
+    parser.add_argument("--ops", nargs="+", choices=OPERATIONS, default=["get"])
+    parser.add_argument("--patterns", nargs="+", choices=list(PATTERNS), default=["zeros", "first"])
+    parser.add_argument("--pattern", action="append", default=[], metavar="HEX",
+                        help="extra payload after the ID byte, zero padded (repeatable)")
+    parser.add_argument("--size", type=int, help="report length incl. ID (default: from the descriptor)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_MS, help="ms per call")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_MS, help="ms of input watched after each attempt")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_MS, help="extra ms between attempts")
+    parser.add_argument("-o", "--output", metavar="FILE", help="capture file (default: sweep_<mode>.vxcap)")
+    parser.add_argument("--allow-update-writes", action="store_true",
+                        help="allow set/write on the update-mode (bootloader) interface")
+    parser.add_argument("--dry-run", action="store_true", help="list the attempts and the estimated time")
+    args = parser.parse_args()
+
+    try:
+        ids = parse_ids(args.ids)
+    except ValueError as e:
+        print(f"Bad --ids: {e}")
+        sys.exit(1)
+    patterns = [(name, PATTERNS[name]) for name in args.patterns]
+    patterns += [(f"hex:{text}", bytes.fromhex(text)) for text in args.pattern]
+    writes = [op for op in args.ops if op != "get"]
+    if args.mode == "update" and writes and not args.allow_update_writes:
+        print("Refusing to set/write reports on the firmware update interface without --allow-update-writes")
+        sys.exit(1)
+
+    if args.dry_run:
+        attempts = build_attempts(args.ops, ids, patterns, size=args.size)
+        per = (args.settle + args.interval) / 1000
+        print(f"{len(attempts)} attempts per collection, about {len(attempts) * per:.0f} s "
+              f"(at most {len(attempts) * (per + args.timeout / 1000):.0f} s if every call times out)")
+        for attempt in attempts[:40]:
+            print(f"  {describe(attempt):<22} {attempt.length} bytes"
+                  + (f"  {attempt.payload[:12].hex(' ')}" if attempt.payload else ""))
+        if len(attempts) > 40:
+            print(f"  ... {len(attempts) - 40} more")
+        return
+
+    try:
+        import hid
+    except ImportError:
+        print("Error: 'hid' package not installed")
+        sys.exit(1)
+    from device_discovery import find_all, find_controller
+
+    targets = find_all(args.mode)
+    if not targets:
+        print(f"[X] Controller not found in {args.mode} mode")
+        sys.exit(1)
+    output = args.output or f"sweep_{args.mode}.vxcap"
+    log = SweepLog(output)
+    watch_target = find_controller(args.mode)
+    watch = None
+    if watch_target is not None:
+        try:
+            watch = InputWatch(hid.device, watch_target["path"], log)
+            watch.start()
+        except Exception as e:
+            print(f"Input watch disabled: {e}")
+
+    print("=" * 70)
+    print(f"REPORT SWEEP - {args.mode} mode, {len(targets)} collection(s), ops {', '.join(args.ops)}")
+    print("=" * 70)
+    all_outcomes = []
+    try:
+        for target in targets:
+            print(f"\nCollection usage {target.get('usage_page', 0):04X}:{target.get('usage', 0):04X} "
+                  f"interface {target.get('interface_number')}")
+            try:
+                device = TimedDevice(hid.device, target["path"], args.timeout / 1000)
+            except Exception as e:
+                print(f"  [X] could not open: {e}")
+                continue
+            sizes = declared_sizes(target, device.handle)
+            target_ids = ids
+            if sizes:
+                declared = set(sizes["output"]) | set(sizes["feature"])
+                target_ids = sorted(set(ids) | declared)
+                print("  declared output reports: " + (", ".join(f"0x{i:02X} ({n} bytes)"
+                      for i, n in sorted(sizes["output"].items())) or "none"))
+                print("  declared feature reports: " + (", ".join(f"0x{i:02X} ({n} bytes)"
+                      for i, n in sorted(sizes["feature"].items())) or "none"))
+            attempts = build_attempts(args.ops, target_ids, patterns, sizes, args.size)
+            print(f"  {len(attempts)} attempts")
+            log.marker(f"sweep:collection {target.get('usage_page', 0):04X}:{target.get('usage', 0):04X}")
+            all_outcomes += sweep(attempts, device, log, watch, args.settle / 1000,
+                                  args.interval / 1000, on_outcome=print_outcome)
+            device.close()
+            if watch is not None and watch.disconnected is not None:
+                print("\n[X] The controller went away - stopping (see the last attempt above)")
+                break
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        if watch is not None:
+            watch.stop()
+        log.close()
+    print_summary(all_outcomes)
+    print(f"\nCapture saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+sysfs USB/HID Inventory
+Builds a structured inventory of USB devices on Linux straight from sysfs,
+without spawning lsusb / ls / lsblk. Each USB device is joined to its
+interfaces, and each interface to the hidraw, input (event/js) and block
+nodes the kernel created for it.
+
+Every path is relative to `root`, so the scanner can be pointed at a copy
+or a hand-made fake of /sys for testing:
+    python sysfs_inventory.py --root /tmp/fake_sys --json
+"""
+
+import json
+import os
+import sys
+
+# VITURE x 8BitDo controller identifiers
+TARGET_VID = 0x2DC8
+TARGET_PIDS = (0x301F, 0x3208)
+
+
+def _read(path, default=None):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def _read_attrs(path, names):
+    """Read several sysfs attributes with one directory listing"""
+    try:
+        present = set(os.listdir(path))
+    except OSError:
+        return {}
+    return {name: _read(os.path.join(path, name)) for name in names if name in present}
+
+
+def _scan_usb(root):
+    """Return (devices by sysfs name, interfaces by resolved path)"""
+    usb_dir = os.path.join(root, "bus", "usb", "devices")
+    devices = {}
+    interfaces = {}
+    try:
+        entries = sorted(os.listdir(usb_dir))
+    except OSError:
+        return devices, interfaces
+
+    for name in entries:
+        path = os.path.join(usb_dir, name)
+        real = os.path.realpath(path)
+        if ":" in name:
+            attrs = _read_attrs(real, ("bInterfaceNumber", "bInterfaceClass",
+                                       "bInterfaceSubClass", "bInterfaceProtocol",
+                                       "bNumEndpoints"))
+            driver = os.path.join(real, "driver")
+            interfaces[real] = {
+                "name": name,
+                "device": name.split(":")[0],
+                "number": int(attrs.get("bInterfaceNumber") or "0", 16),
+                "class": int(attrs.get("bInterfaceClass") or "0", 16),
+                "subclass": int(attrs.get("bInterfaceSubClass") or "0", 16),
+                "protocol": int(attrs.get("bInterfaceProtocol") or "0", 16),
+                "endpoints": int(attrs.get("bNumEndpoints") or "0", 16),
+                "driver": os.path.basename(os.path.realpath(driver)) if os.path.exists(driver) else None,
+                "hidraw": [],
+                "input": [],
+                "block": [],
+            }
+        else:
+            attrs = _read_attrs(real, ("idVendor", "idProduct", "bcdDevice", "manufacturer",
+                                       "product", "serial", "busnum", "devnum", "speed",
+                                       "bDeviceClass", "bNumInterfaces"))
+            if "idVendor" not in attrs:
+                continue
+            vid = int(attrs["idVendor"], 16)
+            pid = int(attrs.get("idProduct") or "0", 16)
+            devices[name] = {
+                "name": name,
+                "vendor_id": vid,
+                "product_id": pid,
+                "bcd_device": attrs.get("bcdDevice"),
+                "manufacturer": attrs.get("manufacturer"),
+                "product": attrs.get("product"),
+                "serial": attrs.get("serial"),
+                "bus": int(attrs.get("busnum") or 0),
+                "address": int(attrs.get("devnum") or 0),
+                "speed_mbps": attrs.get("speed"),
+                "device_class": int(attrs.get("bDeviceClass") or "0", 16),
+                "is_target": vid == TARGET_VID and pid in TARGET_PIDS,
+                "interfaces": [],
+            }
+    return devices, interfaces
+
+
+def _owning_interface(node_device_path, interfaces, stop):
+    """Walk up from a class node's device until we reach a USB interface"""
+    path = os.path.realpath(node_device_path)
+    while path and path != stop and path != os.path.dirname(path):
+        if path in interfaces:
+            return interfaces[path]
+        path = os.path.dirname(path)
+    return None
+
+
+def _scan_class(root, interfaces):
+    devices_root = os.path.realpath(os.path.join(root, "devices"))
+
+    hidraw_dir = os.path.join(root, "class", "hidraw")
+    for name in _listdir(hidraw_dir):
+        node = os.path.join(hidraw_dir, name)
+        intf = _owning_interface(os.path.join(node, "device"), interfaces, devices_root)
+        if intf is None:
+            continue
+        hid_dir = os.path.realpath(os.path.join(node, "device"))
+        uevent = _read(os.path.join(hid_dir, "uevent"), "")
+        hid_name = None
+        for line in uevent.splitlines():
+            if line.startswith("HID_NAME="):
+                hid_name = line.split("=", 1)[1]
+        intf["hidraw"].append({"node": "/dev/" + name, "hid_id": os.path.basename(hid_dir),
+                               "name": hid_name})
+
+    input_dir = os.path.join(root, "class", "input")
+    for name in _listdir(input_dir):
+        if not (name.startswith("event") or name.startswith("js")):
+            continue
+        node = os.path.join(input_dir, name)
+        intf = _owning_interface(os.path.join(node, "device"), interfaces, devices_root)
+        if intf is None:
+            continue
+        input_dev = os.path.realpath(os.path.join(node, "device"))
+        intf["input"].append({"node": "/dev/input/" + name,
+                              "name": _read(os.path.join(input_dev, "name"))})
+
+    block_dir = os.path.join(root, "block")
+    for name in _listdir(block_dir):
+        node = os.path.join(block_dir, name)
+        intf = _owning_interface(os.path.join(node, "device"), interfaces, devices_root)
+        if intf is None:
+            continue
+        sectors = _read(os.path.join(node, "size"))
+        intf["block"].append({"node": "/dev/" + name,
+                              "size_bytes": int(sectors) * 512 if sectors and sectors.isdigit() else None,
+                              "removable": _read(os.path.join(node, "removable")) == "1"})
+
+
+def _listdir(path):
+    try:
+        return sorted(os.listdir(path))
+    except OSError:
+        return []
+
+
+def scan_sysfs(root="/sys"):
+    """Return a list of USB device dicts, each with its interfaces and nodes"""
+    devices, interfaces = _scan_usb(root)
+    _scan_class(root, interfaces)
+    for intf in sorted(interfaces.values(), key=lambda i: i["name"]):
+        device = devices.get(intf.pop("device"))
+        if device is not None:
+            device["interfaces"].append(intf)
+    return sorted(devices.values(), key=lambda d: (d["bus"], d["address"], d["name"]))
+
+
+def print_inventory(devices):
+    for device in devices:
+        marker = "  >>> VITURE x 8BitDo controller <<<" if device["is_target"] else ""
+        print(f"Bus {device['bus']:03d} Device {device['address']:03d}: "
+              f"ID {device['vendor_id']:04x}:{device['product_id']:04x} "
+              f"{device['manufacturer'] or ''} {device['product'] or ''}{marker}")
+        for intf in device["interfaces"]:
+            nodes = [n["node"] for n in intf["hidraw"] + intf["input"] + intf["block"]]
+            print(f"    Interface {intf['number']}: class 0x{intf['class']:02x} "
+                  f"driver={intf['driver'] or '-'} {' '.join(nodes)}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="USB/HID inventory from sysfs")
+    parser.add_argument("--root", default="/sys", help="sysfs root (default: /sys)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of text")
+    args = parser.parse_args()
+
+    inventory = scan_sysfs(args.root)
+    if args.json:
+        json.dump(inventory, sys.stdout, indent=2)
+        print()
+    else:
+        print_inventory(inventory)
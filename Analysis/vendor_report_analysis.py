@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Vendor Report Analysis
+Works out what the 63-byte vendor report (ID 2) carries from a capture:
+the bridge's --record (all reports), --record-vendor (ID 2 only) or a
+guided session from test_button_diagnostic.py --guided.
+
+Everything is vectorized over the whole session with NumPy:
+
+    bytes    range, distinct values, how often each byte changes, its
+             lag-1 autocorrelation (smooth signal vs noise) and whether it
+             steps by a constant (counters / sequence numbers)
+    words    adjacent byte pairs that form a much smoother 16-bit value
+             than their low byte alone (int16 motion data wraps the low
+             byte constantly), little- or big-endian, signed or not
+    actions  each vendor frame is paired with the gamepad report (ID 1)
+             read just before it; one matrix product correlates every byte
+             and word with every stick, trigger and button. With guided
+             markers, each field's mean per step shows which step moves it
+
+Fields worth naming are printed as a mapping profile "vendor" section;
+-o merges them into a profile so the bridge (--profile) decodes them.
+
+Usage:
+    python vendor_report_analysis.py session.vxcap
+    python vendor_report_analysis.py session.vxcap -o profile.json
+"""
+
+import json
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from capture_arrays import load_capture
+from controller_state import BUTTON_MAP, INPUT_REPORT_ID, MIN_REPORT_LENGTH, VENDOR_REPORT_ID
+from mapping_profile import BUTTON_TARGETS, MARKER_PREFIX, load_profile, save_profile
+
+COUNTER_SHARE = 0.9        # share of steps with the same nonzero increment
+FLAG_MAX_VALUES = 4        # a byte with this few values is a flag/state byte
+SMOOTH = 0.5               # lag-1 autocorrelation of a slowly moving signal
+WORD_SMOOTH = 0.8          # ... of a 16-bit value worth suggesting
+WORD_GAIN = 0.1            # and how much smoother than its low byte alone
+MIN_CORRELATION = 0.5      # |r| reported as a match with a gamepad control
+MIN_STEP_SHARE = 0.3       # eta^2: share of a field's variance explained by steps
+
+WORD_TYPES = {("le", True): "i16", ("le", False): "u16", ("be", True): "i16be", ("be", False): "u16be"}
+
+
+def _require_numpy():
+    if np is None:
+        print("Error: 'numpy' package not installed")
+        print("Install it with: pip install numpy")
+        sys.exit(1)
+
+
+def load_vendor_frames(path):
+    """(CaptureArrays, record indices of vendor frames, (N, length) uint8 frames)"""
+    _require_numpy()
+    arrays = load_capture(path)
+    index = arrays.select(VENDOR_REPORT_ID)
+    if not len(index):
+        raise ValueError(f"{path}: no vendor (report ID {VENDOR_REPORT_ID}) frames")
+    width = int(arrays.lengths[index].max())
+    return arrays, index, arrays.payload[index, :width]
+
+
+def _autocorrelation(values):
+    """Lag-1 autocorrelation of each column (0 for constant columns)"""
+    x = values - values.mean(axis=0)
+    power = (x * x).sum(axis=0)
+    lagged = (x[1:] * x[:-1]).sum(axis=0)
+    return np.divide(lagged, power, out=np.zeros_like(power), where=power > 0)
+
+
+def byte_profile(frames):
+    """Per-byte statistics, each an array over byte offsets"""
+    n, width = frames.shape
+    offsets = np.arange(width) * 256
+    counts = np.bincount((frames.astype(np.int64) + offsets).ravel(), minlength=256 * width).reshape(width, 256)
+    steps = (np.diff(frames.astype(np.int16), axis=0) % 256).astype(np.int64)
+    step_counts = np.bincount((steps + offsets).ravel(), minlength=256 * width).reshape(width, 256)
+    common_step = step_counts[:, 1:].argmax(axis=1) + 1
+    step_share = step_counts[np.arange(width), common_step] / max(n - 1, 1)
+    return {
+        "min": frames.min(axis=0),
+        "max": frames.max(axis=0),
+        "distinct": (counts > 0).sum(axis=1),
+        "change": (steps != 0).mean(axis=0) if n > 1 else np.zeros(width),
+        "smooth": _autocorrelation(frames.astype(np.float64)),
+        "step": common_step,
+        "step_share": step_share,
+    }
+
+
+def classify(stats, offset):
+    if stats["distinct"][offset] == 1:
+        return "constant"
+    if stats["step_share"][offset] >= COUNTER_SHARE:
+        step = int(stats["step"][offset])
+        return f"counter {'+' + str(step) if step < 128 else '-' + str(256 - step)}"
+    if stats["distinct"][offset] <= FLAG_MAX_VALUES:
+        return "flags"
+    return "signal" if stats["smooth"][offset] >= SMOOTH else "noisy"
+
+
+def find_words(frames, stats):
+    """[(offset, type, values, smoothness)] for 16-bit fields; overlaps go to the smoother pair"""
+    width = frames.shape[1]
+    wide = frames.astype(np.int32)
+    candidates = []
+    for offset in range(1, width - 1):
+        for order, low, high in (("le", offset, offset + 1), ("be", offset + 1, offset)):
+            if stats["distinct"][low] < 16 or stats["distinct"][high] < 2:
+                continue
+            unsigned = wide[:, low] | (wide[:, high] << 8)
+            signed = np.where(unsigned >= 0x8000, unsigned - 0x10000, unsigned)
+            smooth_u, smooth_s = _autocorrelation(np.stack([unsigned, signed], axis=1).astype(np.float64))
+            is_signed = smooth_s > smooth_u
+            smooth = max(smooth_s, smooth_u)
+            if smooth >= WORD_SMOOTH and smooth >= stats["smooth"][low] + WORD_GAIN:
+                candidates.append((smooth, offset, WORD_TYPES[(order, bool(is_signed))],
+                                   signed if is_signed else unsigned))
+    words, used = [], set()
+    for smooth, offset, kind, values in sorted(candidates, key=lambda c: -c[0]):
+        if offset in used or offset + 1 in used:
+            continue
+        used.update((offset, offset + 1))
+        words.append((offset, kind, values, float(smooth)))
+    return sorted(words, key=lambda w: w[0])
+
+
+def gamepad_signals(arrays, vendor_index):
+    """{name: values} for the gamepad report read just before each vendor frame"""
+    pad_index = arrays.select(INPUT_REPORT_ID, MIN_REPORT_LENGTH)
+    if not len(pad_index):
+        return {}, np.zeros(len(vendor_index), bool)
+    before = np.searchsorted(pad_index, vendor_index) - 1
+    valid = before >= 0
+    pad = arrays.payload[pad_index[np.maximum(before, 0)]]
+    signals = {axis: pad[:, byte] for axis, byte in (("LX", 4), ("LY", 5), ("RX", 6), ("RY", 7))}
+    if pad.shape[1] >= 10 and (arrays.lengths[pad_index] >= 10).all():
+        signals["L2"], signals["R2"] = pad[:, 8], pad[:, 9]
+    names = {target: name for name, target in BUTTON_TARGETS.items()}
+    for byte, mask, target in BUTTON_MAP:
+        signals[names.get(target, f"b{byte}&0x{mask:02X}")] = (pad[:, byte] & mask) > 0
+    signals["D-pad"] = pad[:, 3] < 8
+    return signals, valid
+
+
+def correlate(features, signals, valid):
+    """{feature: (signal, r)} for the best-matching gamepad control of each feature"""
+    if not signals or not features or valid.sum() < 3:
+        return {}
+    f = np.stack([v[valid] for v in features.values()], axis=1).astype(np.float64)
+    s = np.stack([v[valid] for v in signals.values()], axis=1).astype(np.float64)
+
+    def zscore(m):
+        std = m.std(axis=0)
+        return np.divide(m - m.mean(axis=0), std, out=np.zeros_like(m), where=std > 0)
+    r = zscore(f).T @ zscore(s) / len(f)                 # (features, signals)
+    names = list(signals)
+    best = np.abs(r).argmax(axis=1)
+    return {name: (names[best[i]], float(r[i, best[i]])) for i, name in enumerate(features)}
+
+
+def step_contrast(arrays, vendor_index, features):
+    """{feature: (step label, eta^2)} from guided markers: the step that moves it most"""
+    steps = [(position, text[len(MARKER_PREFIX):]) for position, _, text in arrays.markers
+             if text.startswith(MARKER_PREFIX)]
+    if not steps or not features:
+        return {}
+    positions = np.array([p for p, _ in steps])
+    names = sorted(set(label for _, label in steps))
+    code = {label: i for i, label in enumerate(names)}
+    step_codes = np.array([code[label] for _, label in steps])
+    at = np.searchsorted(positions, vendor_index, side="right") - 1
+    keep = at >= 0
+    labels = step_codes[at[keep]]
+    if "prepare" in code:
+        keep[keep] = labels != code["prepare"]
+        labels = labels[labels != code["prepare"]]
+    if len(labels) < 3:
+        return {}
+    f = np.stack([v[keep] for v in features.values()], axis=1).astype(np.float64)
+    onehot = np.stack([labels == i for i in range(len(names))]).astype(np.float64)
+    sizes = onehot.sum(axis=1)
+    means = (onehot @ f) / np.maximum(sizes, 1)[:, None]          # (steps, features)
+    overall = f.mean(axis=0)
+    between = (sizes[:, None] * (means - overall) ** 2).sum(axis=0)
+    total = ((f - overall) ** 2).sum(axis=0)
+    eta = np.divide(between, total, out=np.zeros_like(total), where=total > 0)
+    strongest = np.abs(means - overall).argmax(axis=0)
+    return {name: (names[strongest[i]], float(eta[i])) for i, name in enumerate(features)}
+
+
+def analyse(path):
+    """Full analysis of one capture, as a dict (see print_analysis)"""
+    arrays, index, frames = load_vendor_frames(path)
+    stats = byte_profile(frames)
+    words = find_words(frames, stats)
+    in_words = {o for offset, _, _, _ in words for o in (offset, offset + 1)}
+
+    kinds = {offset: classify(stats, offset) for offset in range(1, frames.shape[1])}
+    features = {f"byte{o}": frames[:, o] for o, kind in kinds.items()
+                if kind not in ("constant", "noisy") and o not in in_words}
+    features.update({f"word{offset}": values for offset, _, values, _ in words})
+
+    signals, valid = gamepad_signals(arrays, index)
+    stamps = arrays.timestamps[index]
+    span = (stamps[-1] - stamps[0]) / 1e9 if len(stamps) > 1 else 0.0
+    return {
+        "frames": len(frames), "width": frames.shape[1], "rate": (len(stamps) - 1) / span if span else 0.0,
+        "lengths": sorted(set(arrays.lengths[index].tolist())),
+        "gamepad_frames": len(arrays.select(INPUT_REPORT_ID, MIN_REPORT_LENGTH)),
+        "stats": stats, "kinds": kinds, "words": words,
+        "matches": correlate(features, signals, valid),
+        "steps": step_contrast(arrays, index, features),
+    }
+
+
+def suggest_fields(result):
+    """Profile "vendor" section for the fields that look meaningful"""
+    fields = {}
+    counters = 0
+    for offset, kind in result["kinds"].items():
+        if any(offset in (w[0], w[0] + 1) for w in result["words"]):
+            continue
+        if kind.startswith("counter"):
+            fields["counter" if not counters else f"counter{offset}"] = {"byte": offset, "type": "u8"}
+            counters += 1
+        elif kind in ("flags", "signal"):
+            fields[f"byte{offset}"] = {"byte": offset, "type": "u8"}
+    for offset, kind, _, _ in result["words"]:
+        fields[f"word{offset}"] = {"byte": offset, "type": kind}
+    return dict(sorted(fields.items(), key=lambda item: item[1]["byte"]))
+
+
+def _evidence(result, name):
+    parts = []
+    match = result["matches"].get(name)
+    if match and abs(match[1]) >= MIN_CORRELATION:
+        parts.append(f"{match[0]} r={match[1]:+.2f}")
+    step = result["steps"].get(name)
+    if step and step[1] >= MIN_STEP_SHARE:
+        parts.append(f"step '{step[0]}' ({step[1]:.0%} of variance)")
+    return ", ".join(parts)
+
+
+def print_analysis(result):
+    stats = result["stats"]
+    print(f"Vendor report {VENDOR_REPORT_ID}: {result['frames']} frames, "
+          f"length {'/'.join(str(n) for n in result['lengths'])}, {result['rate']:.1f} frames/s"
+          f"   ({result['gamepad_frames']} gamepad reports alongside)")
+    print(f"\n{'byte':>5} {'min':>4} {'max':>4} {'values':>6} {'change':>7} {'smooth':>6}  {'kind':<12} evidence")
+    constant = []
+    word_of = {o: f"{kind} {offset}-{offset + 1}" for offset, kind, _, _ in result["words"]
+               for o in (offset, offset + 1)}
+    for offset, kind in result["kinds"].items():
+        if kind == "constant":
+            value = int(stats["min"][offset])
+            if constant and constant[-1][1] == offset - 1 and constant[-1][2] == value:
+                constant[-1][1] = offset
+            else:
+                constant.append([offset, offset, value])
+            continue
+        kind = word_of.get(offset, kind)
+        print(f"{offset:>5} {int(stats['min'][offset]):>4} {int(stats['max'][offset]):>4} "
+              f"{int(stats['distinct'][offset]):>6} {stats['change'][offset]:>7.1%} "
+              f"{stats['smooth'][offset]:>6.2f}  {kind:<12} {_evidence(result, f'byte{offset}')}")
+    if constant:
+        runs = (f"{first}" if first == last else f"{first}-{last}" for first, last, _ in constant)
+        print("\nConstant bytes: " + ", ".join(f"{run}=0x{value:02X}" for run, (_, _, value) in zip(runs, constant)))
+    if result["words"]:
+        print("\n16-bit fields:")
+        for offset, kind, values, smooth in result["words"]:
+            print(f"  bytes {offset}-{offset + 1} {kind:<6} {int(values.min()):>6} .. {int(values.max()):<6} "
+                  f"smooth {smooth:.2f}   {_evidence(result, f'word{offset}')}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find the fields of the vendor report (ID 2) in a capture")
+    parser.add_argument("capture", help="capture from controller_bridge.py --record/--record-vendor or --guided")
+    parser.add_argument("-o", "--output", metavar="PROFILE",
+                        help="add the suggested fields to this mapping profile (created if missing)")
+    args = parser.parse_args()
+
+    _require_numpy()
+    start = time.perf_counter()
+    try:
+        result = analyse(args.capture)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    print_analysis(result)
+
+    fields = suggest_fields(result)
+    print("\nSuggested profile \"vendor\" section (rename fields once you know what they are):")
+    print(json.dumps(fields, indent=2))
+    print(f"\nAnalysed in {elapsed * 1000:.0f} ms")
+
+    if args.output:
+        profile = load_profile(args.output) if os.path.exists(args.output) else {}
+        profile["vendor"] = fields
+        save_profile(profile, args.output)
+        print(f"Vendor fields written to {args.output} (use: controller_bridge.py --profile {args.output})")
@@ -0,0 +1,172 @@
+"""
+Button Events
+Turns the stream of full-state reports into timestamped press/release
+events, so consumers (macros, test scripts, overlays) don't each have to
+diff snapshots themselves.
+
+Per report the decoder packs the button bytes and the hat into one 32-bit
+mask and XORs it against the previous one; only when that is non-zero is
+any per-button work done. Subscribers choose which buttons they hear about.
+
+The bridge runs one stream inline, right after each report is decoded, and
+takes subscribers through controller_bridge.subscribe_buttons(). Callbacks
+then run on the read thread; a consumer with slow work can run its own
+stream on a pipeline thread with ButtonEventSink instead.
+
+Mask layout:
+    bits 0-7   report byte 1 (face buttons, bumpers, P2)
+    bits 8-15  report byte 2 (triggers, system buttons, stick clicks)
+    bits 16-19 D-pad up / down / left / right (decoded from the hat)
+"""
+
+import time
+from collections import namedtuple
+
+from controller_state import (
+    HID_BTN_A, HID_BTN_B, HID_BTN_X, HID_BTN_Y, HID_BTN_LB, HID_BTN_RB,
+    HID_BTN_LT, HID_BTN_RT, HID_BTN_SELECT, HID_BTN_START, HID_BTN_HOME,
+    HID_BTN_L3, HID_BTN_R3, INPUT_REPORT_ID, MIN_REPORT_LENGTH, parse_hat_switch,
+)
+from report_pipeline import Sink
+
+BUTTON_A      = HID_BTN_A
+BUTTON_B      = HID_BTN_B
+BUTTON_X      = HID_BTN_X
+BUTTON_Y      = HID_BTN_Y
+BUTTON_P2     = 0x20          # Rear button, see test_buttons_simple.py
+BUTTON_LB     = HID_BTN_LB
+BUTTON_RB     = HID_BTN_RB
+BUTTON_LT     = HID_BTN_LT << 8
+BUTTON_RT     = HID_BTN_RT << 8
+BUTTON_SELECT = HID_BTN_SELECT << 8
+BUTTON_START  = HID_BTN_START << 8
+BUTTON_HOME   = HID_BTN_HOME << 8
+BUTTON_L3     = HID_BTN_L3 << 8
+BUTTON_R3     = HID_BTN_R3 << 8
+DPAD_UP       = 1 << 16
+DPAD_DOWN     = 1 << 17
+DPAD_LEFT     = 1 << 18
+DPAD_RIGHT    = 1 << 19
+
+ALL_BUTTONS = 0xFFFFF
+
+BUTTON_NAMES = {
+    BUTTON_A: "A", BUTTON_B: "B", BUTTON_X: "X", BUTTON_Y: "Y",
+    BUTTON_P2: "P2", BUTTON_LB: "LB", BUTTON_RB: "RB",
+    BUTTON_LT: "LT", BUTTON_RT: "RT", BUTTON_SELECT: "Select",
+    BUTTON_START: "Start", BUTTON_HOME: "Home", BUTTON_L3: "L3", BUTTON_R3: "R3",
+    DPAD_UP: "D-Up", DPAD_DOWN: "D-Down", DPAD_LEFT: "D-Left", DPAD_RIGHT: "D-Right",
+}
+
+ButtonEvent = namedtuple("ButtonEvent", "button name pressed timestamp_ns held_ns")
+
+
+def _build_hat_table():
+    table = []
+    for value in range(256):
+        d_up, d_down, d_left, d_right = parse_hat_switch(value)
+        table.append((DPAD_UP if d_up else 0) | (DPAD_DOWN if d_down else 0) |
+                     (DPAD_LEFT if d_left else 0) | (DPAD_RIGHT if d_right else 0))
+    return tuple(table)
+
+_HAT_BITS = _build_hat_table()
+
+
+def button_mask(report):
+    """Pack a raw report's buttons and hat into the 32-bit event mask"""
+    return report[1] | (report[2] << 8) | _HAT_BITS[report[3]]
+
+
+def button_name(bit):
+    return BUTTON_NAMES.get(bit, f"bit{bit.bit_length() - 1}")
+
+
+class ButtonEventStream:
+    """Computes changed-button masks once per report and fans events out"""
+
+    def __init__(self):
+        self.mask = 0
+        self._press_time = {}
+        self._subscribers = []
+        self._interest = 0   # union of all subscriber masks
+        self.errors = {}     # subscription token -> callbacks that raised
+
+    def subscribe(self, callback, buttons=ALL_BUTTONS):
+        """callback(ButtonEvent) for presses/releases of `buttons` (a bit mask).
+        Returns a token for unsubscribe(). A callback that raises is counted
+        in `errors` (the first error printed) and never stops the caller."""
+        token = (callback, buttons)
+        self._subscribers.append(token)
+        self._interest |= buttons
+        return token
+
+    def unsubscribe(self, token):
+        self._subscribers.remove(token)
+        self._interest = 0
+        for _, buttons in self._subscribers:
+            self._interest |= buttons
+
+    def pressed(self):
+        """Names of the buttons currently held"""
+        return [button_name(bit) for bit in BUTTON_NAMES if self.mask & bit]
+
+    def feed(self, timestamp_ns, report):
+        """Pipeline entry point: feed one raw report"""
+        if len(report) < MIN_REPORT_LENGTH or report[0] != INPUT_REPORT_ID:
+            return
+        self.update(button_mask(report), timestamp_ns)
+
+    def update(self, mask, timestamp_ns=None):
+        """Diff `mask` against the previous one, emit events, return the changed bits"""
+        changed = mask ^ self.mask
+        if not changed:
+            return 0
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        self.mask = mask
+
+        interesting = changed & self._interest
+        bits = changed
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            if mask & bit:
+                self._press_time[bit] = timestamp_ns
+                held = 0
+            else:
+                held = timestamp_ns - self._press_time.pop(bit, timestamp_ns)
+            if not interesting & bit:
+                continue
+            event = ButtonEvent(bit, button_name(bit), bool(mask & bit), timestamp_ns, held)
+            for token in self._subscribers:
+                if token[1] & bit:
+                    try:
+                        token[0](event)
+                    except Exception as e:
+                        count = self.errors[token] = self.errors.get(token, 0) + 1
+                        if count == 1:
+                            print(f"[events] subscriber error: {e}")
+        return changed
+
+
+class ButtonEventSink(Sink):
+    """Runs a ButtonEventStream on its own pipeline thread.
+
+    Events keep the timestamps of the reports that caused them, so hold
+    durations stay accurate even if this thread lags the reader.
+    """
+
+    name = "events"
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else ButtonEventStream()
+
+    def handle(self, timestamp_ns, report):
+        self.stream.feed(timestamp_ns, report)
+
+
+def print_event(event):
+    if event.pressed:
+        print(f"[events] {event.name} pressed")
+    else:
+        print(f"[events] {event.name} released (held {event.held_ns / 1e6:.0f} ms)")
@@ -0,0 +1,105 @@
+"""
+Capture Format
+Compact binary recording of controller traffic, shared by the bridge's
+recorder and the testing/analysis tools.
+
+File layout (little-endian):
+    header  <6sHQ   magic b"VXCAP\\0", format version, wall-clock start (time.time_ns)
+    records <qBBH   timestamp (time.perf_counter_ns), kind, report ID, payload length
+            followed by `length` payload bytes
+
+Input reports are stored whole, including the report ID in byte 0, so a
+capture can be replayed through the same decoder the bridge uses.
+"""
+
+import struct
+import time
+from collections import namedtuple
+
+MAGIC = b"VXCAP\x00"
+FORMAT_VERSION = 1
+
+FILE_HEADER = struct.Struct("<6sHQ")
+RECORD_HEADER = struct.Struct("<qBBH")
+
+# Record kinds
+KIND_INPUT       = 1   # input report read from the device
+KIND_MARKER      = 2   # UTF-8 label / annotation (e.g. "press A now")
+KIND_OUTPUT      = 3   # output report written to the device (hid write)
+KIND_FEATURE_SET = 4   # feature report sent to the device
+KIND_FEATURE_GET = 5   # feature report returned by the device
+
+KIND_NAMES = {KIND_INPUT: "input", KIND_MARKER: "marker", KIND_OUTPUT: "output",
+              KIND_FEATURE_SET: "feature-set", KIND_FEATURE_GET: "feature-get"}
+
+CaptureRecord = namedtuple("CaptureRecord", "timestamp_ns kind report_id data")
+
+
+class CaptureWriter:
+    """Appends records to a capture file. Not thread-safe: one writer per file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self._f = open(path, "wb", buffering=1 << 16)
+        self._f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, time.time_ns()))
+
+    def write(self, timestamp_ns, kind, data, report_id=None):
+        """Write one record; `data` is bytes or a list of ints"""
+        if report_id is None:
+            report_id = data[0] if data else 0
+        self._f.write(RECORD_HEADER.pack(timestamp_ns, kind, report_id, len(data)))
+        self._f.write(bytes(data))
+        self.records += 1
+
+    def write_report(self, timestamp_ns, report):
+        self.write(timestamp_ns, KIND_INPUT, report)
+
+    def write_marker(self, timestamp_ns, text):
+        self.write(timestamp_ns, KIND_MARKER, text.encode("utf-8"), report_id=0)
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """Iterates the records of a capture file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = f.read()
+        if len(self._data) < FILE_HEADER.size:
+            raise ValueError(f"{path}: too short to be a capture file")
+        magic, self.version, self.start_time_ns = FILE_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a capture file")
+        if self.version > FORMAT_VERSION:
+            raise ValueError(f"{path}: capture format v{self.version} is newer than this tool")
+
+    def __iter__(self):
+        data = self._data
+        offset = FILE_HEADER.size
+        header_size = RECORD_HEADER.size
+        unpack = RECORD_HEADER.unpack_from
+        end = len(data)
+        while offset + header_size <= end:
+            timestamp, kind, report_id, length = unpack(data, offset)
+            offset += header_size
+            if offset + length > end:
+                break  # truncated final record (recorder was killed mid-write)
+            yield CaptureRecord(timestamp, kind, report_id, data[offset:offset + length])
+            offset += length
+
+    def reports(self):
+        """Only the input reports, as CaptureRecords"""
+        return (r for r in self if r.kind == KIND_INPUT)
@@ -1,89 +1,306 @@
-import vgamepad as vg
-import hid
 import time
 import sys
+import argparse
 
-# Constants for controller mapping - CORRECTED based on User Diagnostics
-# Byte 1 (b1)
-HID_BTN_A       = 0x01  # Assumed
-HID_BTN_B       = 0x02  # Assumed
-HID_BTN_X       = 0x08  # Confirmed
-HID_BTN_Y       = 0x10  # Confirmed
-HID_BTN_LB      = 0x40  # Swapped per User Report
-HID_BTN_RB      = 0x80  # Confirmed
-
-# Byte 2 (b2)
-HID_BTN_LT      = 0x01  # Swapped per User Report
-HID_BTN_RT      = 0x02  # Confirmed (Digital flag)
-HID_BTN_SELECT  = 0x04  # Confirmed (In standard Xbox map, this is "Back")
-HID_BTN_START   = 0x08  # Confirmed
-HID_BTN_HOME    = 0x10  # Confirmed
-HID_BTN_L3      = 0x20  # Confirmed
-HID_BTN_R3      = 0x40  # Confirmed
-
-HID_VID = 0x2DC8
-HID_PID = 0x301F
-
-DEADZONE_THRESHOLD = 0.08  # 8% deadzone (Standard for controllers)
-
-def scale_axis(val):
-    """Scale 0-255 (unsigned) to -32768 to 32767 (signed 16-bit) with Deadzone"""
-    # 1. Center the value (0-255 -> -1.0 to 1.0)
-    # Center is technically 127.5, but 128 is common midpoint
-    normalized = (val - 128) / 127.5
-    
-    # 2. Apply Deadzone
-    if abs(normalized) < DEADZONE_THRESHOLD:
-        return 0
-        
-    # 3. Rescale remaining range to 0.0 to 1.0 so we don't jump
-    # (optional, but feels smoother)
-    if normalized > 0:
-        normalized = (normalized - DEADZONE_THRESHOLD) / (1 - DEADZONE_THRESHOLD)
-    else:
-        normalized = (normalized + DEADZONE_THRESHOLD) / (1 - DEADZONE_THRESHOLD)
-        
-    # 4. Convert to 16-bit integer
-    return int(normalized * 32767)
-
-def scale_inv_axis(val):
-    """Invert axis with deadzone support"""
-    return -scale_axis(val)
-
-def parse_hat_switch(hat_value):
-    """Parse HID hat switch value to D-pad directions"""
-    # 0x0F is center, 0x1F seems to be special (Turbo?), 0-7 are directions
-    if hat_value >= 8:
-        return (False, False, False, False)
-    
-    directions = [
-        (True, False, False, False),   # 0: Up
-        (True, False, False, True),    # 1: Up-Right
-        (False, False, False, True),   # 2: Right
-        (False, True, False, True),    # 3: Down-Right
-        (False, True, False, False),   # 4: Down
-        (False, True, True, False),    # 5: Down-Left
-        (False, False, True, False),   # 6: Left
-        (True, False, True, False),    # 7: Up-Left
-    ]
-    
-    return directions[hat_value] if hat_value < 8 else (False, False, False, False)
-
-def find_device():
-    """Find the VITURE controller path"""
-    # Try finding exact usage mode first
-    for device in hid.enumerate():
-        if device['vendor_id'] == HID_VID and device['product_id'] == HID_PID:
-                if device['usage_page'] == 1 and device['usage'] == 5:
-                    return device['path']
-    
-    # Fallback to any interface
-    for device in hid.enumerate():
-        if device['vendor_id'] == HID_VID and device['product_id'] == HID_PID:
-            return device['path']
-    return None
+from controller_state import (
+    DEADZONE_THRESHOLD, VENDOR_REPORT_ID, ControllerState, ReportDecoder, make_report_writer,
+)
+from shared_state import SharedStatePublisher
+from device_discovery import VITURE_VID as HID_VID, NORMAL_PID as HID_PID, invalidate as invalidate_devices
+from report_pipeline import SLOT_SIZE, ReportPipeline, RecorderSink, StatsSink
+from button_events import ALL_BUTTONS, ButtonEventStream, button_mask, print_event
+from udp_stream import StreamSender, StreamReceiver, DEFAULT_PORT, parse_address
+from descriptor_store import DescriptorStore
+from mapping_profile import decoder_from_profile
+from device_backend import HidBackend, SyntheticBackend
+from synthetic_reports import STREAMS
+from stall_watchdog import StallWatchdog
+from power_mode import IDLE_AFTER_S, PowerMode
+from metrics_endpoint import (
+    DEFAULT_METRICS_PORT, BridgeMetrics, MetricsServer,
+    decoder_collector, pipeline_collector, power_collector, watchdog_collector,
+)
+
+SYNTHETIC_TIMEOUT_MS = 100
+
+# Press/release edges, detected inline as each report is decoded. Macros and
+# overlays hook in with subscribe_buttons() before calling main().
+button_events = ButtonEventStream()
+
+def subscribe_buttons(callback, buttons=ALL_BUTTONS):
+    """callback(ButtonEvent) for presses/releases of `buttons`; runs on the read thread, keep it cheap"""
+    return button_events.subscribe(callback, buttons)
+
+def describe_read_plan(plan):
+    """Print what the descriptor store told us and check it fits ReportDecoder"""
+    if plan is None:
+        print("No stored descriptors for this controller (run inspect_controller_pyusb.py); "
+              "polling every 5 ms.")
+        return
+    if plan.timeout_ms:
+        print(f"Endpoint interval {plan.interval_ms:g} ms from descriptor store: "
+              f"blocking reads of {plan.read_size} bytes, {plan.timeout_ms} ms timeout")
+    if plan.input_sizes and plan.input_sizes.get(1, 0) < 7:
+        print("Warning: stored report descriptor has no 7+ byte input report 1; "
+              "the gamepad decoder may not match this firmware.")
+
+def make_backend(synthetic=None):
+    """HidBackend, or a SyntheticBackend for --synthetic STREAM[@HZ]"""
+    if not synthetic:
+        return HidBackend()
+    stream, _, rate = synthetic.partition("@")
+    if stream not in STREAMS:
+        raise ValueError(f"unknown stream {stream!r} (choose from {', '.join(STREAMS)})")
+    return SyntheticBackend(stream, rate_hz=float(rate) if rate else 0)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VITURE x 8BitDo -> Virtual Xbox 360 Bridge")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record every raw report to a capture file")
+    parser.add_argument("--record-vendor", metavar="FILE",
+                        help="record only vendor reports (ID 2) to their own capture file")
+    parser.add_argument("--stats", action="store_true",
+                        help="print report-rate statistics every few seconds")
+    parser.add_argument("--events", action="store_true",
+                        help="print button press/release events with hold durations")
+    parser.add_argument("--stream", metavar="HOST[:PORT]",
+                        help="also send controller state to a remote bridge running --receive")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="button/axis mapping profile from Analysis/mapping_learner.py")
+    parser.add_argument("--receive", metavar="PORT", type=int, nargs="?", const=DEFAULT_PORT,
+                        help="drive the virtual pad from a remote --stream instead of a local controller. "
+                             "Packets are not authenticated: anyone who can reach the port can drive "
+                             "the pad, so use --receive-bind on untrusted networks")
+    parser.add_argument("--receive-bind", metavar="ADDRESS", default="0.0.0.0",
+                        help="with --receive, listen only on this address (default: all interfaces; "
+                             "127.0.0.1 for a sender on the same machine)")
+    parser.add_argument("--synthetic", metavar="STREAM[@HZ]",
+                        help="stress test: read a generated stream instead of the controller "
+                             f"({', '.join(STREAMS)}), e.g. mixed@20000")
+    parser.add_argument("--stall-timeout", metavar="MS", type=float,
+                        help="reopen the controller after this much silence "
+                             "(default: learned from its report rate; 0 turns the watchdog off)")
+    parser.add_argument("--watchdog-metrics", metavar="FILE",
+                        help="keep stall/recovery metrics in a JSON file, updated on every stall and recovery")
+    parser.add_argument("--power-save", action="store_true",
+                        help="battery hosts: slow down while sticks and buttons are idle and "
+                             "back off the search while the controller is away")
+    parser.add_argument("--idle-after", metavar="SECONDS", type=float, default=IDLE_AFTER_S,
+                        help=f"with --power-save, unchanged input for this long counts as idle "
+                             f"(default {IDLE_AFTER_S:g})")
+    parser.add_argument("--metrics", metavar="PORT", type=int, nargs="?", const=DEFAULT_METRICS_PORT,
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics "
+                             f"(default port {DEFAULT_METRICS_PORT})")
+    return parser.parse_args()
+
+def run_receiver(gamepad, port, bind="0.0.0.0"):
+    """Receiver mode: feed the local virtual pad from UDP packets"""
+    receiver = StreamReceiver(port, bind=bind)
+    write_report = make_report_writer(gamepad, receiver.state)
+    print(f"\nRECEIVER ACTIVE on UDP {bind}:{receiver.port}! Press Ctrl+C to stop.")
+    if bind == "0.0.0.0":
+        print("Listening on every interface with no authentication: any host that can "
+              "reach this port can drive the pad (--receive-bind to restrict it).")
+
+    last_status = time.perf_counter()
+    try:
+        while True:
+            if receiver.receive(timeout=0.1):
+                write_report()
+                gamepad.update()
+            if time.perf_counter() - last_status >= 5.0:
+                last_status = time.perf_counter()
+                print(f"[receiver] {receiver.received} packets, {receiver.lost} lost, "
+                      f"{receiver.keyframes} keyframes, {receiver.malformed} malformed, "
+                      f"{'synced' if receiver.synced else 'waiting for keyframe'}")
+    except KeyboardInterrupt:
+        print("\nStopping receiver based on user input...")
+    finally:
+        receiver.close()
+
+class Bridge:
+    """One controller driving the virtual pad, connection after connection.
+
+    feed() runs inline on the pipeline for every report: decoder, button
+    events, pad, shared state and stream. release() lets go of the pad
+    when the controller goes away. run_connection() opens a found
+    controller, reads until it disconnects or stalls and returns how long
+    to wait before searching again; main() loops over it. `gamepad` needs
+    update() and either a 12-byte XUSB `report` or vgamepad's setters (see
+    make_report_writer), so the loop runs without ViGEmBus too.
+    """
+
+    def __init__(self, gamepad, backend, decoder, pipeline, power, watchdog, publisher=None,
+                 streamer=None, metrics=None, store=None, watchdog_metrics=None, events=button_events):
+        self.gamepad = gamepad
+        self.backend = backend
+        self.decoder = decoder
+        self.pipeline = pipeline
+        self.power = power
+        self.watchdog = watchdog
+        self.publisher = publisher
+        self.streamer = streamer
+        self.metrics = metrics
+        self.store = store
+        self.watchdog_metrics = watchdog_metrics
+        self.events = events
+        # Decoder tables and the XUSB-layout state are built once and reused
+        self.state = ControllerState()
+        self.write_report = make_report_writer(gamepad, self.state)
+        # Per-device histograms, set on every connect when --metrics is on
+        self.device_metrics = None
+        # One read feeds everything: the virtual pad runs inline on this thread,
+        # recorder/stats sinks run on their own threads and can never stall it
+        pipeline.add_inline(self.feed)
+
+    def feed(self, timestamp_ns, report):
+        # Decode straight into the preallocated XUSB-layout state and
+        # copy it into vgamepad's report in one 12-byte copy
+        state = self.state
+        if self.decoder.decode_into(report, state):
+            self.events.update(button_mask(report), timestamp_ns)
+            device_metrics = self.device_metrics
+            if device_metrics:
+                device_metrics.report(timestamp_ns)
+            power = self.power
+            if power.enabled and not power.active(timestamp_ns, state):
+                return   # idle duplicate: the pad already holds this state
+            self.write_report()
+            self.gamepad.update()
+            if device_metrics:
+                device_metrics.updated(timestamp_ns)
+            if self.publisher:
+                self.publisher.publish(self.pipeline.ring.newest_slot(), state, timestamp_ns,
+                                       min(len(report), SLOT_SIZE))
+            if self.streamer:
+                # Non-blocking sendto, so it runs inline for the lowest latency
+                self.streamer.send_state(state, timestamp_ns)
+
+    def release(self):
+        # Nothing is coming from the controller: let go of every button and
+        # center the sticks rather than leave the last report held
+        self.state.clear()
+        self.write_report()
+        self.gamepad.update()
+        now_ns = time.perf_counter_ns()
+        self.events.update(0, now_ns)
+        if self.streamer:
+            self.streamer.send_state(self.state, now_ns)
+
+    def save_watchdog_metrics(self):
+        if self.watchdog_metrics:
+            try:
+                self.watchdog.save(self.watchdog_metrics)
+            except OSError as e:
+                print(f"[watchdog] could not write {self.watchdog_metrics}: {e}")
+
+    def run_connection(self, target):
+        """Open `target` and read until it disconnects or stalls.
+
+        Returns the seconds to wait before searching again.
+        """
+        backend, power, watchdog = self.backend, self.power, self.watchdog
+        print(f"Found controller! Connecting...")
+        if backend.name == "synthetic":
+            # Generated reports come as fast as they are paced: never sleep
+            timeout_ms, read_size = SYNTHETIC_TIMEOUT_MS, 64
+        else:
+            plan = self.store.read_plan(target) if self.store else None
+            describe_read_plan(plan)
+            timeout_ms = plan.timeout_ms if plan else None
+            read_size = plan.read_size if plan else 64
+            watchdog.interval_ms = plan.interval_ms if plan else None
+        # With a known polling interval, block in read() until the next
+        # report instead of sleeping a fixed 5 ms between polls
+        backend.open(target, nonblocking=not timeout_ms)
+        print(f"Connected to {target.get('product_string') or 'controller'} at {HID_VID:04x}:{HID_PID:04x}")
+        if self.publisher:
+            self.publisher.set_connected(True)
+        watchdog.opened()
+        power.connected()
+        if self.metrics:
+            self.device_metrics = self.metrics.device_connected(
+                f"{target.get('vendor_id', HID_VID):04x}:{target.get('product_id', HID_PID):04x}")
+
+        stalled = self.read_reports(timeout_ms, read_size)
+
+        # Disconnected or stalled: close the device and go back to searching
+        self.release()
+        if self.publisher:
+            self.publisher.set_connected(False)
+        if self.metrics:
+            self.metrics.device_disconnected(not stalled)
+        backend.close()
+        if stalled:
+            self.save_watchdog_metrics()
+            invalidate_devices()
+            return watchdog.backoff()
+        return 1.0
+
+    def read_reports(self, timeout_ms, read_size):
+        """The connected read loop. Returns True on a stall, False on a read error.
+
+        Every wakeup (a blocking read returning, or a sleep ending) takes
+        all the reports that queued up meanwhile before waiting again, so
+        a slow poll never leaves the pad behind the controller.
+        """
+        backend, pipeline, power, watchdog = self.backend, self.pipeline, self.power, self.watchdog
+        draining = False
+        while True:
+            try:
+                if draining or power.idle:
+                    # Take what queued up since the last wakeup, never wait
+                    report = backend.read(read_size, 0)
+                elif timeout_ms:
+                    report = backend.read(read_size, timeout_ms)
+                    power.woke()
+                else:
+                    report = backend.read(64)
+            except OSError:
+                print("Device disconnected (read error).")
+                return False
+            # Stamped here so the latency metric starts at the read
+            read_ns = time.perf_counter_ns()
+
+            if not report:
+                if draining and not power.idle:
+                    # Queue empty: wait for the next report (the blocking
+                    # read does the waiting)
+                    draining = False
+                    if not timeout_ms:
+                        # Polling rate ~200Hz
+                        power.sleep(0.005)
+                    continue
+                draining = False
+                # No data: timed out (blocking) or nothing queued (non-blocking)
+                if self.streamer:
+                    # Keyframe heartbeat even while idle: a receiver that
+                    # hears nothing for a second releases the remote pad
+                    self.streamer.tick()
+                if watchdog.check():
+                    print(f"No reports for {watchdog.silence_ms:.0f} ms with the device open "
+                          f"(stall {watchdog.stalls}); releasing the pad and reopening.")
+                    return True
+                if power.idle:
+                    power.sleep(power.idle_poll)
+                else:
+                    power.quiet()
+                    if not timeout_ms:
+                        power.sleep(0.005)
+                continue
+
+            draining = True
+            pipeline.push(report, read_ns)
+            power.report_read()
+            if watchdog.recovering:
+                watchdog.recovered()
+                print(f"Reports flowing again after {watchdog.last_recovery_ms:.0f} ms "
+                      f"({watchdog.reopens} reopens so far).")
+                self.save_watchdog_metrics()
 
 def main():
+    args = parse_args()
+
     print("VITURE x 8BitDo -> Virtual Xbox 360 Bridge")
     print("Version: User-Mapped Fix + Auto-Reconnect")
     print(f"Deadzone: {int(DEADZONE_THRESHOLD*100)}% active")
@@ -91,6 +308,7 @@ def main():
 
     # 1. Initialize Virtual Controller
     try:
+        import vgamepad as vg
         gamepad = vg.VX360Gamepad()
         print("Virtual Xbox 360 Controller created successfully.")
     except Exception as e:
@@ -98,6 +316,80 @@ def main():
         print("Make sure ViGEmBus drivers are installed!")
         sys.exit(1)
 
+    if args.receive is not None:
+        run_receiver(gamepad, args.receive, args.receive_bind)
+        return
+
+    try:
+        backend = make_backend(args.synthetic)
+    except ImportError:
+        print("Error: 'hid' package not installed")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Bad --synthetic value: {e}")
+        sys.exit(1)
+
+    if args.profile:
+        try:
+            decoder = decoder_from_profile(args.profile)
+            print(f"Using mapping profile {args.profile}")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not use mapping profile {args.profile}: {e}")
+            sys.exit(1)
+    else:
+        decoder = ReportDecoder()
+
+    # Local tools (overlays, telemetry) read state from shared memory instead
+    # of opening the controller themselves
+    try:
+        publisher = SharedStatePublisher()
+    except Exception as e:
+        print(f"Shared state disabled: {e}")
+        publisher = None
+
+    power = PowerMode(enabled=args.power_save, idle_after=args.idle_after)
+    if args.power_save:
+        print(f"Power saving on: idle after {args.idle_after:g} s without input")
+
+    streamer = None
+    if args.stream:
+        streamer = StreamSender(parse_address(args.stream))
+        print(f"Streaming controller state to {args.stream}")
+
+    pipeline = ReportPipeline()
+    # Reports stopping with the handle still open never raises; the watchdog
+    # catches that from the silence instead
+    watchdog = StallWatchdog(pipeline.ring, timeout_ms=args.stall_timeout)
+
+    metrics = metrics_server = None
+    if args.metrics is not None:
+        metrics = BridgeMetrics()
+        for collector in (pipeline_collector(pipeline), decoder_collector(decoder),
+                          watchdog_collector(watchdog), power_collector(power)):
+            metrics.add_collector(collector)
+        try:
+            metrics_server = MetricsServer(metrics, args.metrics)
+            print(f"Serving metrics on {metrics_server.url}")
+        except OSError as e:
+            print(f"Metrics endpoint disabled: {e}")
+            metrics = None
+
+    # Descriptors captured by inspect_controller_pyusb.py, read once
+    bridge = Bridge(gamepad, backend, decoder, pipeline, power, watchdog, publisher=publisher,
+                    streamer=streamer, metrics=metrics, store=DescriptorStore(),
+                    watchdog_metrics=args.watchdog_metrics)
+    if args.record:
+        pipeline.add_sink(RecorderSink(args.record))
+        print(f"Recording raw reports to {args.record}")
+    if args.record_vendor:
+        pipeline.add_sink(RecorderSink(args.record_vendor, report_ids=(VENDOR_REPORT_ID,),
+                                       name="vendor-recorder"))
+        print(f"Recording vendor reports (ID {VENDOR_REPORT_ID}) to {args.record_vendor}")
+    if args.stats:
+        pipeline.add_sink(StatsSink(vendor=decoder.vendor, power=power))
+    if args.events:
+        subscribe_buttons(print_event)
+
     print("\nBRIDGE ACTIVE! Press Ctrl+C to stop.")
     print("Your PC should now see an Xbox 360 Controller.")
 
@@ -105,88 +397,14 @@ def main():
         try:
             # 2. Connect to Physical Controller
             print("\nSearching for controller...")
-            target_path = None
-            while target_path is None:
-                target_path = find_device()
-                if target_path is None:
-                    time.sleep(1) # Wait before retry
-            
-            print(f"Found controller! Connecting...")
-            h = hid.device()
-            h.open_path(target_path)
-            h.set_nonblocking(1)
-            print(f"Connected to physical controller at {HID_VID:04x}:{HID_PID:04x}")
-
-            # 3. Main Input Loop
-            while True:
-                # Read 64 bytes
-                try:
-                    report = h.read(64)
-                except OSError:
-                    print("Device disconnected (read error).")
-                    break
-                
-                if not report:
-                    # No data, just sleep and check again (non-blocking)
-                    time.sleep(0.005)
-                    continue
+            target = None
+            while target is None:
+                target = backend.find()
+                if target is None:
+                    power.sleep(power.search_delay()) # Wait before retry
 
-                if len(report) >= 8:
-                    b1 = report[1]
-                    b2 = report[2]
-                    hat = report[3]
-                    
-                    gamepad.reset()
-                    
-                    # --- Button Mappings (Based on User Diagnostics) ---
-                    
-                    # Face Buttons
-                    if b1 & HID_BTN_A: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_A)
-                    if b1 & HID_BTN_B: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_B)
-                    if b1 & HID_BTN_X: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_X)
-                    if b1 & HID_BTN_Y: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_Y)
-                    
-                    # Bumpers (Shoulders)
-                    if b1 & HID_BTN_LB: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_SHOULDER)
-                    if b1 & HID_BTN_RB: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_SHOULDER)
-                    
-                    # Triggers (Digital input converted to full Analog press)
-                    if b2 & HID_BTN_LT: gamepad.left_trigger(255)
-                    if b2 & HID_BTN_RT: gamepad.right_trigger(255)
-                    
-                    # System Buttons
-                    if b2 & HID_BTN_SELECT: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_BACK)
-                    if b2 & HID_BTN_START:  gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_START)
-                    if b2 & HID_BTN_HOME:   gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_GUIDE)
-                    
-                    # Thumbstick Clicks
-                    if b2 & HID_BTN_L3:     gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_THUMB)
-                    if b2 & HID_BTN_R3:     gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_THUMB)
-                    
-                    # D-Pad
-                    d_up, d_down, d_left, d_right = parse_hat_switch(hat)
-                    if d_up:    gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP)
-                    if d_down:  gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN)
-                    if d_left:  gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT)
-                    if d_right: gamepad.press_button(button=vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT)
-                    
-                    # Analog Sticks (Standard HID locations)
-                    lx = scale_axis(report[4])
-                    ly = scale_inv_axis(report[5])
-                    rx = scale_axis(report[6])
-                    ry = scale_inv_axis(report[7])
-                    
-                    gamepad.left_joystick(x_value=lx, y_value=ly)
-                    gamepad.right_joystick(x_value=rx, y_value=ry)
-                    
-                    gamepad.update()
-                
-                # Polling rate ~200Hz
-                time.sleep(0.005)
-                
-            # Loop broke (disconnected), close device and go back to searching
-            h.close()
-            time.sleep(1)
+            # 3. Main Input Loop, until it disconnects or stalls
+            time.sleep(bridge.run_connection(target))
 
         except KeyboardInterrupt:
             print("\nStopping bridge based on user input...")
@@ -196,9 +414,29 @@ def main():
             time.sleep(2) # Wait a bit before retrying main loop
             
     try:
-        h.close()
+        backend.close()
     except:
         pass
+    if metrics_server:
+        metrics_server.close()
+    pipeline.stop()
+    if streamer:
+        rtt = f"{streamer.rtt_avg_ms:.2f} ms" if streamer.rtt_avg_ms is not None else "n/a"
+        print(f"[stream] {streamer.sent} packets sent, avg round trip {rtt}")
+        streamer.close()
+    if decoder.rejected:
+        print(f"[decoder] {decoder.rejected} reports ignored (short reads or not report ID 1)")
+    if decoder.vendor is not None:
+        print(f"[decoder] {decoder.vendor.decoded} vendor reports decoded: "
+              + ", ".join(f"{name}={value}" for name, value in decoder.vendor.values.items()))
+    if watchdog.stalls:
+        print(f"[watchdog] {watchdog.summary()}")
+    print(f"[power] {power.summary()}")
+    bridge.save_watchdog_metrics()
+    for name, consumed, dropped, lag, errors in pipeline.sink_stats():
+        print(f"[{name}] {consumed} reports handled, {dropped} dropped, {errors} errors")
+    if publisher:
+        publisher.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,346 @@
+"""
+Controller State
+Compact, preallocated controller state laid out like ViGEm's XUSB_REPORT,
+plus the lookup-table decoder that fills it in place from raw HID reports.
+
+Nothing in here imports vgamepad or hid, so the testing and analysis tools
+can share the exact decode the bridge uses.
+"""
+
+import ctypes
+import struct
+
+# Constants for controller mapping - CORRECTED based on User Diagnostics
+# Byte 1 (b1)
+HID_BTN_A       = 0x01  # Assumed
+HID_BTN_B       = 0x02  # Assumed
+HID_BTN_X       = 0x08  # Confirmed
+HID_BTN_Y       = 0x10  # Confirmed
+HID_BTN_LB      = 0x40  # Swapped per User Report
+HID_BTN_RB      = 0x80  # Confirmed
+
+# Byte 2 (b2)
+HID_BTN_LT      = 0x01  # Swapped per User Report
+HID_BTN_RT      = 0x02  # Confirmed (Digital flag)
+HID_BTN_SELECT  = 0x04  # Confirmed (In standard Xbox map, this is "Back")
+HID_BTN_START   = 0x08  # Confirmed
+HID_BTN_HOME    = 0x10  # Confirmed
+HID_BTN_L3      = 0x20  # Confirmed
+HID_BTN_R3      = 0x40  # Confirmed
+
+DEADZONE_THRESHOLD = 0.08  # 8% deadzone (Standard for controllers)
+
+# Gamepad input report: ID in byte 0, controls in bytes 1-7. Report ID 2
+# (63-byte vendor data) arrives on the same interface and must be skipped.
+INPUT_REPORT_ID = 1
+MIN_REPORT_LENGTH = 8
+VENDOR_REPORT_ID = 2
+
+# Vendor field types: struct format per type name (little-endian unless "be")
+VENDOR_FIELD_TYPES = {"u8": "B", "i8": "b", "u16": "<H", "i16": "<h", "u32": "<I", "i32": "<i",
+                      "u16be": ">H", "i16be": ">h"}
+
+# XUSB_REPORT.wButtons flags (same values as vgamepad.XUSB_BUTTON)
+XUSB_GAMEPAD_DPAD_UP        = 0x0001
+XUSB_GAMEPAD_DPAD_DOWN      = 0x0002
+XUSB_GAMEPAD_DPAD_LEFT      = 0x0004
+XUSB_GAMEPAD_DPAD_RIGHT     = 0x0008
+XUSB_GAMEPAD_START          = 0x0010
+XUSB_GAMEPAD_BACK           = 0x0020
+XUSB_GAMEPAD_LEFT_THUMB     = 0x0040
+XUSB_GAMEPAD_RIGHT_THUMB    = 0x0080
+XUSB_GAMEPAD_LEFT_SHOULDER  = 0x0100
+XUSB_GAMEPAD_RIGHT_SHOULDER = 0x0200
+XUSB_GAMEPAD_GUIDE          = 0x0400
+XUSB_GAMEPAD_A              = 0x1000
+XUSB_GAMEPAD_B              = 0x2000
+XUSB_GAMEPAD_X              = 0x4000
+XUSB_GAMEPAD_Y              = 0x8000
+
+XUSB_BUTTON_FLAGS = (
+    XUSB_GAMEPAD_DPAD_UP, XUSB_GAMEPAD_DPAD_DOWN, XUSB_GAMEPAD_DPAD_LEFT,
+    XUSB_GAMEPAD_DPAD_RIGHT, XUSB_GAMEPAD_START, XUSB_GAMEPAD_BACK,
+    XUSB_GAMEPAD_LEFT_THUMB, XUSB_GAMEPAD_RIGHT_THUMB,
+    XUSB_GAMEPAD_LEFT_SHOULDER, XUSB_GAMEPAD_RIGHT_SHOULDER,
+    XUSB_GAMEPAD_GUIDE, XUSB_GAMEPAD_A, XUSB_GAMEPAD_B, XUSB_GAMEPAD_X,
+    XUSB_GAMEPAD_Y,
+)
+
+# Pseudo-targets for buttons that drive a trigger instead of a wButtons flag
+TRIGGER_LEFT  = "LT"
+TRIGGER_RIGHT = "RT"
+
+# Default mapping: (report byte, HID mask, XUSB flag or trigger)
+BUTTON_MAP = [
+    # Face Buttons
+    (1, HID_BTN_A,      XUSB_GAMEPAD_A),
+    (1, HID_BTN_B,      XUSB_GAMEPAD_B),
+    (1, HID_BTN_X,      XUSB_GAMEPAD_X),
+    (1, HID_BTN_Y,      XUSB_GAMEPAD_Y),
+    # Bumpers (Shoulders)
+    (1, HID_BTN_LB,     XUSB_GAMEPAD_LEFT_SHOULDER),
+    (1, HID_BTN_RB,     XUSB_GAMEPAD_RIGHT_SHOULDER),
+    # Triggers (Digital input converted to full Analog press)
+    (2, HID_BTN_LT,     TRIGGER_LEFT),
+    (2, HID_BTN_RT,     TRIGGER_RIGHT),
+    # System Buttons
+    (2, HID_BTN_SELECT, XUSB_GAMEPAD_BACK),
+    (2, HID_BTN_START,  XUSB_GAMEPAD_START),
+    (2, HID_BTN_HOME,   XUSB_GAMEPAD_GUIDE),
+    # Thumbstick Clicks
+    (2, HID_BTN_L3,     XUSB_GAMEPAD_LEFT_THUMB),
+    (2, HID_BTN_R3,     XUSB_GAMEPAD_RIGHT_THUMB),
+]
+
+
+def scale_axis(val, deadzone=None):
+    """Scale 0-255 (unsigned) to -32768 to 32767 (signed 16-bit) with Deadzone"""
+    if deadzone is None:
+        deadzone = DEADZONE_THRESHOLD
+
+    # 1. Center the value (0-255 -> -1.0 to 1.0)
+    # Center is technically 127.5, but 128 is common midpoint
+    normalized = (val - 128) / 127.5
+
+    # 2. Apply Deadzone
+    if abs(normalized) < deadzone:
+        return 0
+
+    # 3. Rescale remaining range to 0.0 to 1.0 so we don't jump
+    # (optional, but feels smoother)
+    if normalized > 0:
+        normalized = (normalized - deadzone) / (1 - deadzone)
+    else:
+        normalized = (normalized + deadzone) / (1 - deadzone)
+
+    # 4. Convert to 16-bit integer. 0 maps just past -1.0, so clamp: an
+    # out-of-range value wraps around in the XUSB report's signed short
+    return max(-32768, min(32767, int(normalized * 32767)))
+
+def scale_inv_axis(val, deadzone=None):
+    """Invert axis with deadzone support"""
+    return min(32767, -scale_axis(val, deadzone))
+
+def parse_hat_switch(hat_value):
+    """Parse HID hat switch value to D-pad directions"""
+    # 0x0F is center, 0x1F seems to be special (Turbo?), 0-7 are directions
+    if hat_value >= 8:
+        return (False, False, False, False)
+
+    directions = [
+        (True, False, False, False),   # 0: Up
+        (True, False, False, True),    # 1: Up-Right
+        (False, False, False, True),   # 2: Right
+        (False, True, False, True),    # 3: Down-Right
+        (False, True, False, False),   # 4: Down
+        (False, True, True, False),    # 5: Down-Left
+        (False, False, True, False),   # 6: Left
+        (True, False, True, False),    # 7: Up-Left
+    ]
+
+    return directions[hat_value] if hat_value < 8 else (False, False, False, False)
+
+
+class ControllerState(ctypes.Structure):
+    """Decoded controller state, byte-for-byte compatible with XUSB_REPORT.
+
+    wButtons is split into its low and high byte so the decoder only ever
+    stores values below 256 (CPython's cached small ints).
+    """
+    _fields_ = [
+        ("bButtonsLo", ctypes.c_ubyte),
+        ("bButtonsHi", ctypes.c_ubyte),
+        ("bLeftTrigger", ctypes.c_ubyte),
+        ("bRightTrigger", ctypes.c_ubyte),
+        ("sThumbLX", ctypes.c_short),
+        ("sThumbLY", ctypes.c_short),
+        ("sThumbRX", ctypes.c_short),
+        ("sThumbRY", ctypes.c_short),
+    ]
+
+    @property
+    def wButtons(self):
+        return self.bButtonsLo | (self.bButtonsHi << 8)
+
+    def clear(self):
+        """Reset to the neutral (nothing pressed, sticks centered) state"""
+        ctypes.memset(ctypes.addressof(self), 0, ctypes.sizeof(self))
+
+    def as_tuple(self):
+        """(wButtons, LT, RT, LX, LY, RX, RY) - handy for diffs and printing"""
+        return (self.wButtons, self.bLeftTrigger, self.bRightTrigger,
+                self.sThumbLX, self.sThumbLY, self.sThumbRX, self.sThumbRY)
+
+
+XUSB_REPORT_SIZE = ctypes.sizeof(ControllerState)  # 12 bytes
+
+
+class ReportDecoder:
+    """Decodes raw report-ID-1 frames into a ControllerState in place.
+
+    All of the per-report work is table lookups: the mapping, hat and
+    deadzone math is done once when the decoder is built.
+
+    The report layout is fixed (buttons in bytes 1-2, hat in byte 3, sticks
+    in bytes 4-7); what can change is which bit means which button
+    (`button_map`), the hat value for each direction (`hat_values`,
+    {"up": 0, "right": 2, ...}) and which sticks are inverted
+    (`inverted_axes`, e.g. ("LY", "RY")). mapping_profile.py builds these
+    from a learned profile. `vendor`, a VendorDecoder, picks up the fields
+    of report ID 2 frames.
+    """
+
+    def __init__(self, button_map=None, deadzone=None, hat_values=None, inverted_axes=("LY", "RY"),
+                 vendor=None):
+        if button_map is None:
+            button_map = BUTTON_MAP
+        for byte_idx, _, _ in button_map:
+            if byte_idx not in (1, 2):
+                raise ValueError(f"buttons must be in report byte 1 or 2, not {byte_idx}")
+
+        # Per-byte tables: value -> wButtons low byte, high byte, LT, RT
+        lo = {1: bytearray(256), 2: bytearray(256)}
+        hi = {1: bytearray(256), 2: bytearray(256)}
+        lt = {1: bytearray(256), 2: bytearray(256)}
+        rt = {1: bytearray(256), 2: bytearray(256)}
+        for byte_idx, mask, target in button_map:
+            for value in range(256):
+                if not value & mask:
+                    continue
+                if target == TRIGGER_LEFT:
+                    lt[byte_idx][value] = 255
+                elif target == TRIGGER_RIGHT:
+                    rt[byte_idx][value] = 255
+                else:
+                    lo[byte_idx][value] |= target & 0xFF
+                    hi[byte_idx][value] |= target >> 8
+
+        # bytes objects: indexing returns cached small ints, no allocation
+        self.b1_lo, self.b2_lo = bytes(lo[1]), bytes(lo[2])
+        self.b1_hi, self.b2_hi = bytes(hi[1]), bytes(hi[2])
+        self.b1_lt, self.b2_lt = bytes(lt[1]), bytes(lt[2])
+        self.b1_rt, self.b2_rt = bytes(rt[1]), bytes(rt[2])
+
+        hat = bytearray(256)
+        if hat_values is None:
+            for value in range(256):
+                d_up, d_down, d_left, d_right = parse_hat_switch(value)
+                if d_up:    hat[value] |= XUSB_GAMEPAD_DPAD_UP
+                if d_down:  hat[value] |= XUSB_GAMEPAD_DPAD_DOWN
+                if d_left:  hat[value] |= XUSB_GAMEPAD_DPAD_LEFT
+                if d_right: hat[value] |= XUSB_GAMEPAD_DPAD_RIGHT
+        else:
+            flags = {"up": XUSB_GAMEPAD_DPAD_UP, "down": XUSB_GAMEPAD_DPAD_DOWN,
+                     "left": XUSB_GAMEPAD_DPAD_LEFT, "right": XUSB_GAMEPAD_DPAD_RIGHT}
+            # One bit per direction can combine into diagonals; otherwise
+            # each direction is a single hat value
+            bitwise = all(v and not v & (v - 1) for v in hat_values.values())
+            for value in range(256):
+                for direction, code in hat_values.items():
+                    if (value & code) if bitwise else (value == code):
+                        hat[value] |= flags[direction]
+        self.hat_lo = bytes(hat)
+
+        # Axis tables hold prebuilt int objects, so lookups never allocate
+        self.axis = tuple(scale_axis(v, deadzone) for v in range(256))
+        self.inv_axis = tuple(scale_inv_axis(v, deadzone) for v in range(256))
+        inverted = set(inverted_axes or ())
+        self.lx = self.inv_axis if "LX" in inverted else self.axis
+        self.ly = self.inv_axis if "LY" in inverted else self.axis
+        self.rx = self.inv_axis if "RX" in inverted else self.axis
+        self.ry = self.inv_axis if "RY" in inverted else self.axis
+        self.rejected = 0
+        # Vendor report fields, decoded only on the rejection branch so the
+        # gamepad report's path is exactly what it was without them
+        self.vendor = vendor
+
+    def decode_into(self, report, state):
+        """Fill `state` from `report`.
+
+        Returns False, leaving `state` untouched, for short reads and for
+        reports other than the gamepad report (counted in `rejected`). A
+        vendor report is handed to the VendorDecoder, if there is one.
+        """
+        if len(report) < MIN_REPORT_LENGTH or report[0] != INPUT_REPORT_ID:
+            if self.vendor is None or not self.vendor.decode(report):
+                self.rejected += 1
+            return False
+        b1 = report[1]
+        b2 = report[2]
+        state.bButtonsLo = self.b1_lo[b1] | self.b2_lo[b2] | self.hat_lo[report[3]]
+        state.bButtonsHi = self.b1_hi[b1] | self.b2_hi[b2]
+        state.bLeftTrigger = self.b1_lt[b1] | self.b2_lt[b2]
+        state.bRightTrigger = self.b1_rt[b1] | self.b2_rt[b2]
+        state.sThumbLX = self.lx[report[4]]
+        state.sThumbLY = self.ly[report[5]]
+        state.sThumbRX = self.rx[report[6]]
+        state.sThumbRY = self.ry[report[7]]
+        return True
+
+
+class VendorDecoder:
+    """Named fields of the vendor report (ID 2), once they are known.
+
+    `fields` maps a name to {"byte": offset, "type": one of
+    VENDOR_FIELD_TYPES, "scale": optional multiplier}, as found with
+    Analysis/vendor_report_analysis.py. Latest values are in `values`.
+    """
+
+    def __init__(self, fields):
+        self._fields = []
+        self.min_length = 1
+        for name, entry in fields.items():
+            kind = entry.get("type", "u8")
+            if kind not in VENDOR_FIELD_TYPES:
+                raise ValueError(f"vendor field {name}: unknown type {kind!r}")
+            offset = int(entry["byte"])
+            if offset < 1:
+                raise ValueError(f"vendor field {name}: byte 0 is the report ID")
+            layout = struct.Struct(VENDOR_FIELD_TYPES[kind])
+            self._fields.append((name, layout.unpack_from, offset, entry.get("scale", 1)))
+            self.min_length = max(self.min_length, offset + layout.size)
+        self.values = dict.fromkeys(fields)
+        self.decoded = 0
+
+    def decode(self, report):
+        """Update `values` from a vendor report; False for anything else"""
+        if len(report) < self.min_length or report[0] != VENDOR_REPORT_ID:
+            return False
+        if not isinstance(report, (bytes, bytearray)):
+            report = bytes(report)
+        values = self.values
+        for name, unpack, offset, scale in self._fields:
+            value = unpack(report, offset)[0]
+            values[name] = value if scale == 1 else value * scale
+        self.decoded += 1
+        return True
+
+
+def make_report_writer(gamepad, state):
+    """Return a zero-argument callable that copies `state` into the gamepad.
+
+    When the gamepad exposes a 12-byte XUSB_REPORT (vgamepad's VX360Gamepad
+    on Windows) this is a single 12-byte copy between preallocated byte
+    views - unlike ctypes.memmove, which boxes its return value, it
+    allocates nothing. Otherwise it falls back to vgamepad's wrapper calls.
+    """
+    report = getattr(gamepad, "report", None)
+    if isinstance(report, ctypes.Structure) and ctypes.sizeof(report) == XUSB_REPORT_SIZE:
+        dst = memoryview(report).cast("B")
+        src = memoryview(state).cast("B")
+
+        def write():
+            dst[:] = src
+        return write
+
+    def write_via_wrapper():
+        gamepad.reset()
+        buttons = state.wButtons
+        for flag in XUSB_BUTTON_FLAGS:
+            if buttons & flag:
+                gamepad.press_button(button=flag)
+        gamepad.left_trigger(state.bLeftTrigger)
+        gamepad.right_trigger(state.bRightTrigger)
+        gamepad.left_joystick(x_value=state.sThumbLX, y_value=state.sThumbLY)
+        gamepad.right_joystick(x_value=state.sThumbRX, y_value=state.sThumbRY)
+    return write_via_wrapper
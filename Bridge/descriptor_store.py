@@ -0,0 +1,214 @@
+"""
+Descriptor Store
+On-disk cache of what the controller told us about itself, so the bridge
+can size its reads and pick a read timeout for the endpoint's real polling
+interval without probing the device on every launch.
+
+Entries are keyed by VID/PID/bcdDevice (a firmware update changes
+bcdDevice and so gets a fresh entry) and then by interface number:
+
+    {
+      "version": 1,
+      "devices": {
+        "2dc8:301f:0114": {
+          "device_descriptor": "<hex>",
+          "configuration_descriptor": "<hex>",
+          "high_speed": false,
+          "updated": "2026-01-03T12:00:00",
+          "interfaces": {
+            "0": {
+              "class": 3,
+              "report_descriptor": "<hex>",
+              "endpoints": [{"address": 129, "attributes": 3,
+                             "max_packet_size": 64, "interval": 1}]
+            }
+          }
+        }
+      }
+    }
+
+inspect_controller_pyusb.py fills the store; the bridge only reads it.
+The file lives in the per-user cache directory unless
+VITURE_DESCRIPTOR_STORE points somewhere else.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+STORE_VERSION = 1
+
+# Default HID read used when nothing is known about the device
+DEFAULT_READ_SIZE = 64
+
+ReadPlan = namedtuple("ReadPlan", "read_size timeout_ms interval_ms input_sizes")
+
+
+def default_path():
+    override = os.environ.get("VITURE_DESCRIPTOR_STORE")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "VitureX8BitDo", "descriptors.json")
+
+
+def device_key(vid, pid, bcd_device):
+    return f"{vid:04x}:{pid:04x}:{bcd_device or 0:04x}"
+
+
+def parse_report_sizes(descriptor):
+    """Walk a HID report descriptor and return the size of every report.
+
+    Returns {"input": {report_id: bytes}, "output": {...}, "feature": {...}},
+    sizes excluding the report ID byte. Report ID 0 means the device does
+    not use report IDs.
+    """
+    sizes = {"input": {}, "output": {}, "feature": {}}
+    bits = {"input": {}, "output": {}, "feature": {}}
+    main_kinds = {0x8: "input", 0x9: "output", 0xB: "feature"}
+    report_size = 0
+    report_count = 0
+    report_id = 0
+    stack = []
+
+    i = 0
+    n = len(descriptor)
+    while i < n:
+        prefix = descriptor[i]
+        if prefix == 0xFE:                     # long item: size, tag, data
+            if i + 1 >= n:
+                break
+            i += 3 + descriptor[i + 1]
+            continue
+        size = (0, 1, 2, 4)[prefix & 0x03]
+        kind = (prefix >> 2) & 0x03
+        tag = prefix >> 4
+        value = int.from_bytes(bytes(descriptor[i + 1:i + 1 + size]), "little")
+        i += 1 + size
+
+        if kind == 0 and tag in main_kinds:    # Input / Output / Feature
+            table = bits[main_kinds[tag]]
+            table[report_id] = table.get(report_id, 0) + report_size * report_count
+        elif kind == 1:                        # Global
+            if tag == 0x7:
+                report_size = value
+            elif tag == 0x8:
+                report_id = value
+            elif tag == 0x9:
+                report_count = value
+            elif tag == 0xA:
+                stack.append((report_size, report_count, report_id))
+            elif tag == 0xB and stack:
+                report_size, report_count, report_id = stack.pop()
+
+    for kind, table in bits.items():
+        for rid, total in table.items():
+            sizes[kind][rid] = (total + 7) // 8
+    return sizes
+
+
+def interval_ms(endpoint, high_speed=False):
+    """Polling period of an interrupt endpoint in milliseconds"""
+    b_interval = max(1, endpoint["interval"])
+    if high_speed:
+        # High speed: 2^(bInterval-1) microframes of 125 us
+        return (1 << (min(b_interval, 16) - 1)) * 0.125
+    return float(b_interval)
+
+
+class DescriptorStore:
+    """JSON-backed descriptor cache. Cheap to create; loads once."""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self.devices = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == STORE_VERSION:
+                self.devices = data["devices"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": STORE_VERSION, "devices": self.devices}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def get_device(self, vid, pid, bcd_device):
+        return self.devices.get(device_key(vid, pid, bcd_device))
+
+    def get_interface(self, vid, pid, bcd_device, interface):
+        device = self.get_device(vid, pid, bcd_device)
+        if device is None:
+            return None
+        return device["interfaces"].get(str(interface))
+
+    def put_device(self, vid, pid, bcd_device, device_descriptor=None,
+                   configuration_descriptor=None, high_speed=False):
+        entry = self.devices.setdefault(device_key(vid, pid, bcd_device), {"interfaces": {}})
+        if device_descriptor is not None:
+            entry["device_descriptor"] = bytes(device_descriptor).hex()
+        if configuration_descriptor is not None:
+            entry["configuration_descriptor"] = bytes(configuration_descriptor).hex()
+        entry["high_speed"] = bool(high_speed)
+        entry["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return entry
+
+    def put_interface(self, vid, pid, bcd_device, interface, interface_class=None,
+                      report_descriptor=None, endpoints=()):
+        """endpoints: iterable of (address, attributes, max_packet_size, interval)"""
+        entry = self.devices.setdefault(device_key(vid, pid, bcd_device), {"interfaces": {}})
+        record = entry["interfaces"].setdefault(str(interface), {})
+        if interface_class is not None:
+            record["class"] = interface_class
+        if report_descriptor is not None:
+            record["report_descriptor"] = bytes(report_descriptor).hex()
+        if endpoints:
+            record["endpoints"] = [{"address": a, "attributes": attr, "max_packet_size": mps,
+                                    "interval": interval}
+                                   for a, attr, mps, interval in endpoints]
+        return record
+
+    def read_plan(self, hid_device):
+        """How the bridge should read `hid_device` (an hid.enumerate() dict).
+
+        Returns a ReadPlan, or None if the device has never been inspected.
+        read_size covers the largest input report plus its ID byte;
+        timeout_ms is a few polling intervals of the IN endpoint, so a
+        blocking read returns promptly on every report but still wakes up
+        regularly when the controller is idle.
+        """
+        vid = hid_device.get("vendor_id", 0)
+        pid = hid_device.get("product_id", 0)
+        bcd = hid_device.get("release_number", 0)
+        device = self.get_device(vid, pid, bcd)
+        if device is None:
+            return None
+        interface = device["interfaces"].get(str(max(0, hid_device.get("interface_number", 0))))
+        if interface is None:
+            return None
+
+        input_sizes = {}
+        read_size = DEFAULT_READ_SIZE
+        if interface.get("report_descriptor"):
+            input_sizes = parse_report_sizes(bytes.fromhex(interface["report_descriptor"]))["input"]
+            if input_sizes:
+                read_size = max(size + (1 if rid else 0) for rid, size in input_sizes.items())
+
+        period = None
+        for endpoint in interface.get("endpoints", ()):
+            if endpoint["address"] & 0x80 and endpoint["attributes"] & 0x03 == 3:
+                period = interval_ms(endpoint, device.get("high_speed", False))
+                break
+        timeout = max(2, int(round(period * 4))) if period else None
+        return ReadPlan(read_size, timeout, period, input_sizes)
@@ -0,0 +1,145 @@
+"""
+Device Backend
+Where the bridge gets its reports from. Both backends offer the same
+small interface, so the bridge's read loop and the stress tests run the
+same code against the real controller or a generated stream:
+
+    find()                        device dict, or None
+    open(device, nonblocking)     open it
+    read(size, timeout_ms=None)   one report (list of ints), [] if none
+                                  yet (timeout_ms=0: don't wait, even on a
+                                  blocking handle); raises OSError when the
+                                  device goes
+    close()
+
+HidBackend is the controller through hidapi. SyntheticBackend serves a
+synthetic_reports stream, paced to a target rate (tens of kHz are fine)
+or as fast as the reader can take it.
+"""
+
+import time
+
+from device_discovery import find_controller, VITURE_VID, NORMAL_PID, GAMEPAD_USAGE_PAGE, GAMEPAD_USAGE
+from synthetic_reports import make_stream
+
+SPIN_THRESHOLD = 0.001   # sleep above this, spin below: time.sleep is too coarse
+
+
+class HidBackend:
+    """The physical controller via the `hid` package"""
+
+    name = "hid"
+
+    def __init__(self):
+        import hid
+        self._hid = hid
+        self._h = None
+        self._nonblocking = True
+
+    def find(self):
+        return find_controller()
+
+    def open(self, device, nonblocking=True):
+        h = self._hid.device()
+        h.open_path(device['path'])
+        h.set_nonblocking(1 if nonblocking else 0)
+        self._h = h
+        self._nonblocking = nonblocking
+
+    def read(self, size, timeout_ms=None):
+        if timeout_ms:
+            return self._h.read(size, timeout_ms)
+        if timeout_ms == 0 and not self._nonblocking:
+            # hid's read() treats a 0 timeout as "block"; flipping the
+            # handle's mode is only a flag in hidapi, no I/O
+            self._h.set_nonblocking(1)
+            try:
+                return self._h.read(size)
+            finally:
+                self._h.set_nonblocking(0)
+        return self._h.read(size)
+
+    def close(self):
+        if self._h is not None:
+            self._h.close()
+            self._h = None
+
+
+class SyntheticBackend:
+    """Serves a generated report stream, optionally paced to `rate_hz`.
+
+    After `count` reports read() raises OSError, like an unplugged device.
+    After `stall_after` reports it goes quiet instead, with the handle
+    still open, the way the controller has been seen to wedge: reads time
+    out until it is reopened, and the first `silent_reopens` reopens stay
+    quiet too.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, stream="walk", rate_hz=0, count=None, seed=None, stall_after=None, silent_reopens=0):
+        self.stream_name = stream
+        self.rate_hz = rate_hz
+        self.count = count
+        self.seed = seed
+        self.stall_after = stall_after
+        self.silent_reopens = silent_reopens
+        self.served = 0
+        self.opens = 0
+        self.stalled = False
+        self._stream = None
+        self._period = 1.0 / rate_hz if rate_hz else 0.0
+        self._next = 0.0
+        self._nonblocking = True
+
+    def find(self):
+        return {
+            "path": b"synthetic:" + self.stream_name.encode(),
+            "vendor_id": VITURE_VID,
+            "product_id": NORMAL_PID,
+            "usage_page": GAMEPAD_USAGE_PAGE,
+            "usage": GAMEPAD_USAGE,
+            "interface_number": 0,
+            "product_string": f"Synthetic ({self.stream_name})",
+        }
+
+    def open(self, device=None, nonblocking=True):
+        self.opens += 1
+        if self.stalled and self.silent_reopens:
+            self.silent_reopens -= 1
+        else:
+            self.stalled = False
+        self._stream = make_stream(self.stream_name, self.seed)
+        self._nonblocking = nonblocking
+        self._next = time.perf_counter()
+
+    def read(self, size, timeout_ms=None):
+        if self._stream is None:
+            raise OSError("synthetic device not open")
+        if self.count is not None and self.served >= self.count:
+            raise OSError("synthetic stream finished")
+        if self.stall_after is not None and self.served >= self.stall_after:
+            self.stall_after = None
+            self.stalled = True
+        if self.stalled:
+            if timeout_ms:
+                time.sleep(timeout_ms / 1000)
+            return []
+        if self._period:
+            wait = self._next - time.perf_counter()
+            if wait > 0:
+                if timeout_ms == 0 or (timeout_ms is None and self._nonblocking):
+                    return []
+                if timeout_ms and wait > timeout_ms / 1000:
+                    time.sleep(timeout_ms / 1000)
+                    return []
+                if wait > SPIN_THRESHOLD:
+                    time.sleep(wait - SPIN_THRESHOLD)
+                while time.perf_counter() < self._next:
+                    pass
+            self._next += self._period
+        self.served += 1
+        return next(self._stream)[:size]
+
+    def close(self):
+        self._stream = None
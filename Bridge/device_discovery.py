@@ -0,0 +1,114 @@
+"""
+Device Discovery
+One place to find the controller. hid.enumerate() is called once per
+lookup burst and the result is indexed by (vid, pid) and by (vid, pid,
+usage_page, usage), the key find_controller() looks the Game Pad
+collection up by; repeated lookups within CACHE_TTL seconds reuse that index
+instead of walking the HID bus again.
+
+Knows both modes the controller shows up in:
+    normal  2DC8:301F  (Android D-Input, the bridge's input source)
+    update  2DC8:3208  (firmware update mode, hold L1+R1 while plugging in)
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+VITURE_VID = 0x2DC8
+NORMAL_PID = 0x301F
+UPDATE_PID = 0x3208
+
+MODES = {
+    "normal": NORMAL_PID,
+    "update": UPDATE_PID,
+}
+
+# Generic Desktop / Game Pad - the collection that carries report ID 1
+GAMEPAD_USAGE_PAGE = 1
+GAMEPAD_USAGE = 5
+
+CACHE_TTL = 0.5  # seconds
+
+_lock = threading.Lock()
+_cache = None
+
+
+class DeviceIndex:
+    """A single hid.enumerate() result, indexed for lookups"""
+
+    def __init__(self, devices, timestamp):
+        self.devices = devices
+        self.timestamp = timestamp
+        self.by_usage = defaultdict(list)
+        self.by_vid_pid = defaultdict(list)
+        for device in devices:
+            vid = device.get('vendor_id')
+            pid = device.get('product_id')
+            self.by_usage[(vid, pid, device.get('usage_page'), device.get('usage'))].append(device)
+            self.by_vid_pid[(vid, pid)].append(device)
+
+    def age(self):
+        return time.monotonic() - self.timestamp
+
+    def find(self, vid, pid, usage_page=None, usage=None, interface=None):
+        """All matching devices; None acts as a wildcard"""
+        if usage_page is not None and usage is not None:
+            candidates = self.by_usage.get((vid, pid, usage_page, usage), ())
+            if interface is None:
+                return list(candidates)
+            return [d for d in candidates if d.get('interface_number') == interface]
+        return [d for d in self.by_vid_pid.get((vid, pid), ())
+                if (usage_page is None or d.get('usage_page') == usage_page)
+                and (usage is None or d.get('usage') == usage)
+                and (interface is None or d.get('interface_number') == interface)]
+
+
+def enumerate_devices(max_age=CACHE_TTL, refresh=False):
+    """Return a DeviceIndex, re-enumerating only if the cached one is too old"""
+    global _cache
+    with _lock:
+        if not refresh and _cache is not None and _cache.age() <= max_age:
+            return _cache
+        import hid
+        _cache = DeviceIndex(hid.enumerate(), time.monotonic())
+        return _cache
+
+
+def invalidate():
+    """Forget the cached enumeration (e.g. after a device was unplugged)"""
+    global _cache
+    with _lock:
+        _cache = None
+
+
+def find_controller(mode="normal", any_interface=True, max_age=CACHE_TTL):
+    """Find the controller's HID device dict.
+
+    Prefers the Game Pad collection (usage page 1, usage 5); with
+    any_interface=True falls back to any interface of the right VID/PID.
+    """
+    index = enumerate_devices(max_age)
+    pid = MODES[mode]
+    matches = index.find(VITURE_VID, pid, GAMEPAD_USAGE_PAGE, GAMEPAD_USAGE)
+    if matches:
+        return matches[0]
+    if any_interface:
+        matches = index.find(VITURE_VID, pid)
+        if matches:
+            return matches[0]
+    return None
+
+
+def find_all(mode="normal", max_age=CACHE_TTL):
+    """Every HID interface the controller exposes in `mode`"""
+    return enumerate_devices(max_age).find(VITURE_VID, MODES[mode])
+
+
+def detect_mode(max_age=CACHE_TTL):
+    """'normal', 'update' or None, depending on which PID is plugged in"""
+    index = enumerate_devices(max_age)
+    for mode, pid in MODES.items():
+        if index.find(VITURE_VID, pid):
+            return mode
+    return None
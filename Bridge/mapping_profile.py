@@ -0,0 +1,145 @@
+"""
+Mapping Profile
+JSON description of where each control lives in report ID 1, learned from
+a guided capture (Analysis/mapping_learner.py) instead of read off the
+screen by hand. The bridge loads one with --profile.
+
+    {
+      "version": 1,
+      "buttons": {"A": {"byte": 1, "mask": 1, "confidence": 0.99}, ...},
+      "hat":     {"byte": 3, "neutral": 15, "encoding": "hat8",
+                  "values": {"up": 0, "right": 2, "down": 4, "left": 6},
+                  "confidence": 0.97},
+      "axes":    {"LX": {"byte": 4, "inverted": false, "confidence": 0.95}, ...},
+      "vendor":  {"counter": {"byte": 1, "type": "u8"},
+                  "gyro_x": {"byte": 10, "type": "i16", "scale": 0.061}, ...}
+    }
+
+"vendor" names fields of the vendor report (ID 2) found with
+Analysis/vendor_report_analysis.py; the decoder keeps their latest values.
+
+Also defines the guided capture script, so the capture tool and the
+learner agree on the segment labels. Each step is announced with a capture
+marker "step:<label>"; reports up to the next marker belong to that step.
+"""
+
+import json
+
+from controller_state import (
+    ReportDecoder, VendorDecoder, TRIGGER_LEFT, TRIGGER_RIGHT,
+    XUSB_GAMEPAD_A, XUSB_GAMEPAD_B, XUSB_GAMEPAD_X, XUSB_GAMEPAD_Y,
+    XUSB_GAMEPAD_LEFT_SHOULDER, XUSB_GAMEPAD_RIGHT_SHOULDER,
+    XUSB_GAMEPAD_BACK, XUSB_GAMEPAD_START, XUSB_GAMEPAD_GUIDE,
+    XUSB_GAMEPAD_LEFT_THUMB, XUSB_GAMEPAD_RIGHT_THUMB,
+)
+
+PROFILE_VERSION = 1
+
+MARKER_PREFIX = "step:"
+
+# Button name -> XUSB flag or trigger, in guided capture order
+BUTTON_TARGETS = {
+    "A": XUSB_GAMEPAD_A,
+    "B": XUSB_GAMEPAD_B,
+    "X": XUSB_GAMEPAD_X,
+    "Y": XUSB_GAMEPAD_Y,
+    "LB": XUSB_GAMEPAD_LEFT_SHOULDER,
+    "RB": XUSB_GAMEPAD_RIGHT_SHOULDER,
+    "LT": TRIGGER_LEFT,
+    "RT": TRIGGER_RIGHT,
+    "Select": XUSB_GAMEPAD_BACK,
+    "Start": XUSB_GAMEPAD_START,
+    "Home": XUSB_GAMEPAD_GUIDE,
+    "L3": XUSB_GAMEPAD_LEFT_THUMB,
+    "R3": XUSB_GAMEPAD_RIGHT_THUMB,
+}
+
+HAT_DIRECTIONS = ("up", "right", "down", "left")
+
+# Axis steps: (axis, XUSB sign, prompt). XUSB Y is positive when pushed up.
+AXIS_STEPS = (
+    ("LX", "-", "Push the LEFT stick fully LEFT"),
+    ("LX", "+", "Push the LEFT stick fully RIGHT"),
+    ("LY", "+", "Push the LEFT stick fully UP"),
+    ("LY", "-", "Push the LEFT stick fully DOWN"),
+    ("RX", "-", "Push the RIGHT stick fully LEFT"),
+    ("RX", "+", "Push the RIGHT stick fully RIGHT"),
+    ("RY", "+", "Push the RIGHT stick fully UP"),
+    ("RY", "-", "Push the RIGHT stick fully DOWN"),
+)
+
+# The decoder's fixed byte positions
+BUTTON_BYTES = (1, 2)
+AXIS_BYTES = {"LX": 4, "LY": 5, "RX": 6, "RY": 7}
+HAT_BYTE = 3
+
+
+def capture_steps():
+    """[(label, prompt)] for a guided capture, idle first and between groups"""
+    steps = [("idle", "Release everything and leave the controller still")]
+    for name in BUTTON_TARGETS:
+        steps.append((f"button:{name}", f"Press and HOLD {name}"))
+    steps.append(("idle", "Release everything"))
+    for direction in HAT_DIRECTIONS:
+        steps.append((f"hat:{direction}", f"Press and HOLD D-pad {direction.upper()}"))
+    steps.append(("idle", "Release everything"))
+    for axis, sign, prompt in AXIS_STEPS:
+        steps.append((f"axis:{axis}{sign}", prompt + " and hold it there"))
+    steps.append(("idle", "Release everything"))
+    return steps
+
+
+def load_profile(path):
+    with open(path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"{path}: unsupported mapping profile version {profile.get('version')}")
+    return profile
+
+
+def save_profile(profile, path):
+    profile = dict(profile, version=PROFILE_VERSION)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+        f.write("\n")
+
+
+def decoder_kwargs(profile):
+    """ReportDecoder arguments for a profile.
+
+    Raises ValueError if the profile puts a control somewhere the decoder's
+    fixed layout can't read it.
+    """
+    button_map = []
+    for name, entry in profile.get("buttons", {}).items():
+        if name not in BUTTON_TARGETS:
+            continue
+        if entry["byte"] not in BUTTON_BYTES:
+            raise ValueError(f"{name} found in byte {entry['byte']}, decoder reads buttons from bytes 1-2")
+        button_map.append((entry["byte"], entry["mask"], BUTTON_TARGETS[name]))
+
+    hat_values = None
+    hat = profile.get("hat")
+    if hat:
+        if hat["byte"] != HAT_BYTE:
+            raise ValueError(f"D-pad found in byte {hat['byte']}, decoder reads byte {HAT_BYTE}")
+        if hat.get("encoding") != "hat8":
+            hat_values = hat["values"]
+
+    inverted = []
+    for axis, entry in profile.get("axes", {}).items():
+        if entry["byte"] != AXIS_BYTES[axis]:
+            raise ValueError(f"{axis} found in byte {entry['byte']}, decoder reads byte {AXIS_BYTES[axis]}")
+        if entry["inverted"]:
+            inverted.append(axis)
+
+    kwargs = {"button_map": button_map or None, "hat_values": hat_values}
+    if profile.get("axes"):
+        kwargs["inverted_axes"] = tuple(inverted)
+    if profile.get("vendor"):
+        kwargs["vendor"] = VendorDecoder(profile["vendor"])
+    return kwargs
+
+
+def decoder_from_profile(path, deadzone=None):
+    return ReportDecoder(deadzone=deadzone, **decoder_kwargs(load_profile(path)))
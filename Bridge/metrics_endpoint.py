@@ -0,0 +1,283 @@
+"""
+Metrics Endpoint
+Serves the running bridge's counters and latency histograms over HTTP on
+the loopback interface, in the Prometheus text format, so "it feels
+laggy" can be checked against numbers: point Prometheus (or just curl)
+at http://127.0.0.1:47111/metrics.
+
+Only two things happen per report, both into storage allocated when the
+device connects: DeviceMetrics.report() files the gap since the previous
+report in the interval histogram, and DeviceMetrics.updated() files the
+latency from the HID read returning to the pad update. Histogram buckets live in an array("q") and
+are found with bisect, so no lists, tuples or strings are built on the
+hot path. Everything else - reports read, ignored and coalesced, stalls,
+wakeups - is already counted by the pipeline, decoder, watchdog and power
+mode, and is read from them when the endpoint is scraped.
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+
+DEFAULT_METRICS_PORT = 47111
+PREFIX = "vxbridge_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds, seconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+INTERVAL_BUCKETS = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.032, 0.064, 0.125, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of nanosecond values, exported in seconds"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._bounds = [int(b * 1e9) for b in self.buckets]
+        self._counts = array("q", bytes(8 * (len(self.buckets) + 1)))
+        self._sum = array("q", bytes(8))
+
+    def observe(self, value_ns):
+        self._counts[bisect_left(self._bounds, value_ns)] += 1
+        self._sum[0] += value_ns
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    def snapshot(self):
+        """(cumulative counts per bucket and +Inf, sum in seconds)"""
+        counts = self._counts.tolist()
+        total = 0
+        cumulative = []
+        for count in counts:
+            total += count
+            cumulative.append(total)
+        return cumulative, self._sum[0] / 1e9
+
+
+class DeviceMetrics:
+    """Per-device histograms; report() and updated() run on the producer thread"""
+
+    def __init__(self, label):
+        self.label = label
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.interval = Histogram(INTERVAL_BUCKETS)
+        self.connects = 0
+        self._last_ns = 0
+        # Histogram.observe() inlined below: a method call less per report
+        self._interval = (self.interval._bounds, self.interval._counts, self.interval._sum)
+        self._latency = (self.latency._bounds, self.latency._counts, self.latency._sum)
+
+    def report(self, timestamp_ns):
+        """A gamepad report arrived at `timestamp_ns`"""
+        last = self._last_ns
+        self._last_ns = timestamp_ns
+        if last:
+            gap = timestamp_ns - last
+            bounds, counts, total = self._interval
+            counts[bisect_left(bounds, gap)] += 1
+            total[0] += gap
+
+    def updated(self, timestamp_ns):
+        """The virtual pad now holds the report read at `timestamp_ns`"""
+        latency = perf_counter_ns() - timestamp_ns
+        bounds, counts, total = self._latency
+        counts[bisect_left(bounds, latency)] += 1
+        total[0] += latency
+
+    def reconnected(self):
+        # The silence while it was away is not a report interval
+        self._last_ns = 0
+
+
+class BridgeMetrics:
+    """Everything the endpoint serves.
+
+    Connection events are counted here; other components register a
+    collector with add_collector(), called at scrape time and returning
+    [(name, type, help, value)] where value is a number or a list of
+    (labels dict, number).
+    """
+
+    def __init__(self):
+        self.devices = {}
+        self.connects = 0
+        self.read_errors = 0
+        self.connected = False
+        self._collectors = []
+
+    def device_connected(self, label):
+        """The controller `label` (e.g. "2dc8:301f") was opened; returns its DeviceMetrics"""
+        device = self.devices.get(label)
+        if device is None:
+            device = self.devices[label] = DeviceMetrics(label)
+        device.reconnected()
+        device.connects += 1
+        self.connects += 1
+        self.connected = True
+        return device
+
+    def device_disconnected(self, read_error=False):
+        self.connected = False
+        if read_error:
+            self.read_errors += 1
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def families(self):
+        families = [
+            ("connected", "gauge", "1 while the controller is open", int(self.connected)),
+            ("connects_total", "counter", "Times the controller was opened",
+             [({"device": d.label}, d.connects) for d in self.devices.values()]),
+            ("reconnects_total", "counter", "Times the controller was reopened after the first connect",
+             max(self.connects - 1, 0)),
+            ("read_errors_total", "counter", "Reads that failed and dropped the connection", self.read_errors),
+            ("updates_emitted_total", "counter", "Virtual pad updates sent",
+             [({"device": d.label}, d.latency.count) for d in self.devices.values()]),
+        ]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def render(self):
+        """The Prometheus text exposition of every metric"""
+        lines = []
+        for name, kind, text, value in self.families():
+            lines.append(f"# HELP {PREFIX}{name} {text}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+            samples = value if isinstance(value, list) else [({}, value)]
+            for labels, number in samples:
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {_number(number)}")
+        for name, attribute, text in (("update_latency_seconds", "latency",
+                                       "HID read returned to virtual pad updated"),
+                                      ("report_interval_seconds", "interval",
+                                       "Gap between consecutive gamepad reports")):
+            lines.append(f"# HELP {PREFIX}{name} {text}")
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for device in list(self.devices.values()):
+                histogram = getattr(device, attribute)
+                cumulative, total = histogram.snapshot()
+                for bound, count in zip(histogram.buckets + ("+Inf",), cumulative):
+                    labels = {"device": device.label, "le": bound if bound == "+Inf" else _number(bound)}
+                    lines.append(f"{PREFIX}{name}_bucket{_labels(labels)} {count}")
+                lines.append(f"{PREFIX}{name}_sum{_labels({'device': device.label})} {_number(total)}")
+                lines.append(f"{PREFIX}{name}_count{_labels({'device': device.label})} {cumulative[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, float):
+        return repr(value)
+    return str(int(value))
+
+
+class MetricsServer:
+    """HTTP server for /metrics on its own daemon thread, loopback only by default"""
+
+    def __init__(self, metrics, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", CONTENT_TYPE)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-endpoint", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# Collectors for the bridge's components, read at scrape time
+
+def pipeline_collector(pipeline):
+    ring = pipeline.ring
+
+    def collect():
+        last = ring.last_stamp
+        since = (time.perf_counter_ns() - last) / 1e9 if last else None
+        return [
+            ("reports_read_total", "counter", "Reports read from the controller (all report IDs)", ring.head),
+            ("seconds_since_last_report", "gauge", "Time since the last report was read", since),
+            ("sink_dropped_total", "counter", "Reports a threaded sink fell too far behind to see",
+             [({"sink": name}, dropped) for name, consumed, dropped, lag, errors in pipeline.sink_stats()]),
+        ]
+    return collect
+
+
+def decoder_collector(decoder):
+    def collect():
+        families = [("reports_ignored_total", "counter",
+                     "Short reads and report IDs the decoder does not handle", decoder.rejected)]
+        if decoder.vendor is not None:
+            families.append(("vendor_reports_total", "counter", "Vendor reports (ID 2) decoded",
+                             decoder.vendor.decoded))
+        return families
+    return collect
+
+
+def watchdog_collector(watchdog):
+    def collect():
+        m = watchdog.metrics()
+        return [
+            ("stalls_total", "counter", "Times the controller went silent with its handle open", m["stalls"]),
+            ("stall_recoveries_total", "counter", "Stalls that ended with reports flowing again", m["recoveries"]),
+            ("stall_reopens_total", "counter", "Reopens while recovering from a stall", m["reopens"]),
+            ("stall_threshold_seconds", "gauge", "Silence that counts as a stall",
+             m["threshold_ms"] / 1000 if m["threshold_ms"] else None),
+            ("stalled_seconds_total", "counter", "Time spent recovering from stalls", m["stalled_seconds"]),
+            ("last_stall_recovery_seconds", "gauge", "Stall detection to first report, last recovery",
+             m["last_recovery_ms"] / 1000 if m["last_recovery_ms"] is not None else None),
+        ]
+    return collect
+
+
+def power_collector(power):
+    def collect():
+        m = power.metrics()
+        return [
+            ("coalesced_reports_total", "counter",
+             "Reports that queued up behind the first one a read-loop wakeup took", m["coalesced_reports"]),
+            ("idle_updates_skipped_total", "counter",
+             "Idle duplicate reports not sent to the pad (power saving)", m["suppressed_updates"]),
+            ("idle", "gauge", "1 while power saving has the bridge idle", int(m["idle"])),
+            ("wakeups_total", "counter", "Read-loop sleeps and blocking reads returning", m["wakeups"]),
+            ("cpu_seconds_total", "counter", "Process CPU time", m["cpu_seconds"]),
+        ]
+    return collect
@@ -0,0 +1,174 @@
+"""
+Power Mode
+Keeps the bridge from burning battery while nothing happens. On a laptop
+or handheld driving the glasses the read loop otherwise wakes for every
+report (or 200 times a second when polling), pushes every idle duplicate
+into the virtual pad, and the reconnect loop enumerates HID devices once
+a second for as long as the controller is away.
+
+With power saving on, PowerMode watches the decoded state: once sticks
+(after the deadzone) and buttons have not changed for `idle_after`
+seconds the bridge goes idle - it stops updating the pad, shared state
+and stream with duplicates, and instead of waiting on every report it
+wakes every `idle_poll` seconds to drain what queued up. The stream's
+keyframe heartbeat keeps going, so a remote bridge goes on holding a
+steady input instead of timing out and releasing it. The first report
+that changes the state ends idle and goes straight to the pad, so the
+cost is up to one idle poll of latency on the first input: the
+controller keeps sending duplicates while nothing moves, so a read that
+blocks would wake for every one of them. While disconnected, the wait
+between searches doubles up to SEARCH_MAX_S.
+
+Wakeups (sleeps and blocking reads returning), process CPU time and the
+reports each wakeup drains are counted with power saving on or off, so
+the two can be compared.
+"""
+
+import time
+
+IDLE_AFTER_S = 5.0       # unchanged state for this long means idle
+IDLE_POLL_S = 0.025      # how often an idle bridge drains the report queue
+SEARCH_START_S = 1.0     # wait between searches while disconnected...
+SEARCH_MAX_S = 8.0       # ...doubling up to this with power saving on
+
+
+class PowerMode:
+    """Idle detection and wakeup/CPU accounting for the bridge's read loop.
+
+    The bridge calls active() for every decoded report (only when
+    `enabled`), quiet() on empty reads, sleep() instead of time.sleep(),
+    woke() after a blocking read, search_delay() between searches and
+    connected() once the controller is open, and report_read() for every
+    report the loop takes.
+    """
+
+    def __init__(self, enabled=False, idle_after=IDLE_AFTER_S, idle_poll=IDLE_POLL_S):
+        self.enabled = enabled
+        self.idle_after_ns = int(idle_after * 1e9)
+        self.idle_poll = idle_poll
+        self.idle = False
+        self.wakeups = 0
+        self.idle_periods = 0
+        self.suppressed = 0
+        self.coalesced = 0
+        self._drained = 0
+        self._idle_ns = 0
+        self._idle_since = None
+        self._last = None
+        self._last_change_ns = time.perf_counter_ns()
+        self._search_delay = SEARCH_START_S
+        self._start = self._mark()
+        self._sampled = self._start
+
+    def active(self, timestamp_ns, state):
+        """Whether this decoded report should reach the pad"""
+        snapshot = bytes(state)
+        if snapshot != self._last:
+            self._last = snapshot
+            self._last_change_ns = timestamp_ns
+            if self.idle:
+                self._wake(timestamp_ns)
+            return True
+        if self.idle:
+            self.suppressed += 1
+            return False
+        self.quiet(timestamp_ns)
+        return True
+
+    def quiet(self, now_ns=None):
+        """Nothing changed at `now_ns`: go idle once that has lasted idle_after"""
+        if not self.enabled or self.idle:
+            return
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        if now_ns - self._last_change_ns >= self.idle_after_ns:
+            self.idle = True
+            self.idle_periods += 1
+            self._idle_since = now_ns
+
+    def _wake(self, now_ns):
+        self.idle = False
+        self._idle_ns += now_ns - self._idle_since
+        self._idle_since = None
+
+    def reset(self):
+        """Back to full rate, e.g. after a disconnect; the next report counts as a change"""
+        if self.idle:
+            self._wake(time.perf_counter_ns())
+        self._last = None
+        self._last_change_ns = time.perf_counter_ns()
+
+    def report_read(self):
+        """The read loop took a report"""
+        self._drained += 1
+
+    def _cycle_done(self):
+        # Every report after the first of a wakeup had queued up meanwhile
+        if self._drained > 1:
+            self.coalesced += self._drained - 1
+        self._drained = 0
+
+    def sleep(self, seconds):
+        self._cycle_done()
+        time.sleep(seconds)
+        self.wakeups += 1
+
+    def woke(self):
+        """A blocking read returned"""
+        self._cycle_done()
+        self.wakeups += 1
+
+    def search_delay(self):
+        """Seconds to wait before the next search for the controller"""
+        delay = self._search_delay
+        if self.enabled:
+            self._search_delay = min(self._search_delay * 2, SEARCH_MAX_S)
+        return delay
+
+    def connected(self):
+        self._search_delay = SEARCH_START_S
+        self._drained = 0
+        self.reset()
+
+    def _mark(self):
+        return time.perf_counter(), time.process_time(), self.wakeups
+
+    @staticmethod
+    def _rates(since, now):
+        elapsed = max(now[0] - since[0], 1e-9)
+        return (now[2] - since[2]) / elapsed, 100.0 * (now[1] - since[1]) / elapsed
+
+    def sample(self):
+        """(wakeups/s, CPU %) since the previous sample"""
+        now = self._mark()
+        rates = self._rates(self._sampled, now)
+        self._sampled = now
+        return rates
+
+    def metrics(self):
+        """Totals since the bridge started"""
+        now = self._mark()
+        wakeups_per_s, cpu_percent = self._rates(self._start, now)
+        idle_ns = self._idle_ns
+        if self.idle:
+            idle_ns += time.perf_counter_ns() - self._idle_since
+        return {
+            "power_save": self.enabled,
+            "idle": self.idle,
+            "wakeups": self.wakeups,
+            "wakeups_per_s": wakeups_per_s,
+            "cpu_seconds": now[1] - self._start[1],
+            "cpu_percent": cpu_percent,
+            "idle_periods": self.idle_periods,
+            "idle_seconds": idle_ns / 1e9,
+            "suppressed_updates": self.suppressed,
+            "coalesced_reports": self.coalesced,
+        }
+
+    def summary(self):
+        m = self.metrics()
+        line = (f"{m['wakeups_per_s']:.0f} wakeups/s, CPU {m['cpu_seconds']:.2f} s "
+                f"({m['cpu_percent']:.1f}%)")
+        if self.enabled:
+            line += (f", idle {m['idle_seconds']:.0f} s over {m['idle_periods']} periods, "
+                     f"{m['suppressed_updates']} duplicate updates skipped")
+        return line
@@ -0,0 +1,281 @@
+"""
+Report Pipeline
+Fans one HID read out to several consumers without slowing the bridge.
+
+The producer (the bridge's read loop) copies each raw report into a
+preallocated ring buffer and runs the inline sinks - the virtual pad -
+straight away. Slower sinks (recorder, stats, network streamer) each run
+on their own thread with their own cursor into the ring. A sink that falls
+more than a ring's worth of reports behind skips ahead and counts the
+overflow; the producer never waits for anyone.
+"""
+
+import threading
+import time
+from array import array
+
+from capture_format import CaptureWriter
+
+DEFAULT_CAPACITY = 1024   # reports; must be a power of two
+SLOT_SIZE = 64            # bytes per report, matches h.read(64)
+
+
+class ReportRing:
+    """Single-producer, multi-consumer ring of raw reports"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, slot_size=SLOT_SIZE):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self._mask = capacity - 1
+        self._data = bytearray(capacity * slot_size)
+        self._lengths = array("H", bytes(2 * capacity))
+        self._stamps = array("q", bytes(8 * capacity))
+        data = memoryview(self._data)
+        self._slots = [data[i * slot_size:(i + 1) * slot_size] for i in range(capacity)]
+        # Total number of reports ever pushed. Only the producer writes it,
+        # and only after the slot is fully written.
+        self.head = 0
+        # Timestamp of the newest report: one attribute, safe to read from
+        # any thread (recent_stamps() is not)
+        self.last_stamp = 0
+
+    def push(self, report, timestamp_ns):
+        """Copy a report into the next slot (producer thread only)"""
+        slot = self.head & self._mask
+        offset = slot * self.slot_size
+        length = len(report)
+        if length > self.slot_size:
+            report = report[:self.slot_size]
+            length = self.slot_size
+        self._data[offset:offset + length] = report
+        self._lengths[slot] = length
+        self._stamps[slot] = timestamp_ns
+        self.last_stamp = timestamp_ns
+        self.head += 1
+
+    def newest_slot(self):
+        """The whole slot holding the newest report, as a memoryview (producer thread only)"""
+        return self._slots[(self.head - 1) & self._mask]
+
+    def recent_stamps(self, count):
+        """Timestamps of the last `count` reports, oldest first (producer thread only)"""
+        count = min(count, self.head, self.capacity)
+        return [self._stamps[i & self._mask] for i in range(self.head - count, self.head)]
+
+    def cursor(self):
+        """A new consumer cursor starting at the current head"""
+        return RingCursor(self)
+
+
+class RingCursor:
+    """One consumer's position in a ReportRing"""
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.position = ring.head
+        self.consumed = 0
+        self.dropped = 0
+
+    def lag(self):
+        return self.ring.head - self.position
+
+    def next(self):
+        """Return (timestamp_ns, report bytes) for the next report, or None.
+
+        If the producer lapped this cursor, the overwritten reports are
+        counted in `dropped` and the cursor jumps to the oldest safe slot.
+        """
+        ring = self.ring
+        while True:
+            head = ring.head
+            if self.position >= head:
+                return None
+            # Slot `head - capacity` is the one the producer writes next
+            if head - self.position >= ring.capacity:
+                skipped = head - ring.capacity + 1 - self.position
+                self.dropped += skipped
+                self.position += skipped
+
+            slot = self.position & ring._mask
+            offset = slot * ring.slot_size
+            timestamp = ring._stamps[slot]
+            report = bytes(ring._data[offset:offset + ring._lengths[slot]])
+
+            # The producer may have lapped us while we copied; discard if so
+            if ring.head - self.position >= ring.capacity:
+                self.dropped += 1
+                self.position += 1
+                continue
+
+            self.position += 1
+            self.consumed += 1
+            return timestamp, report
+
+
+class Sink:
+    """Base class for threaded sinks; override handle()"""
+
+    name = "sink"
+
+    def handle(self, timestamp_ns, report):
+        raise NotImplementedError
+
+    def idle(self):
+        """Called when the sink has caught up with the producer"""
+
+    def close(self):
+        """Called once from the sink's thread when the pipeline stops"""
+
+
+class _SinkThread(threading.Thread):
+    def __init__(self, sink, cursor, poll_interval):
+        super().__init__(name=f"sink-{sink.name}", daemon=True)
+        self.sink = sink
+        self.cursor = cursor
+        self.poll_interval = poll_interval
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        cursor = self.cursor
+        sink = self.sink
+        while True:
+            item = cursor.next()
+            if item is None:
+                if self._stop_event.is_set():
+                    break
+                sink.idle()
+                self._stop_event.wait(self.poll_interval)
+                continue
+            try:
+                sink.handle(*item)
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"[{sink.name}] sink error: {e}")
+        try:
+            sink.close()
+        except Exception as e:
+            print(f"[{sink.name}] close error: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class ReportPipeline:
+    """Ring buffer plus the inline and threaded sinks hanging off it"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.ring = ReportRing(capacity)
+        self._inline = []
+        self._threads = []
+
+    def add_inline(self, callback):
+        """callback(timestamp_ns, report) runs on the producer thread - keep it cheap"""
+        self._inline.append(callback)
+
+    def add_sink(self, sink, poll_interval=0.005):
+        """Run `sink` on its own thread; it may lag or drop but never blocks push()"""
+        thread = _SinkThread(sink, self.ring.cursor(), poll_interval)
+        self._threads.append(thread)
+        thread.start()
+        return thread
+
+    def push(self, report, timestamp_ns=None):
+        """Producer entry point: one call per HID report"""
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        self.ring.push(report, timestamp_ns)
+        for callback in self._inline:
+            callback(timestamp_ns, report)
+
+    def stop(self, timeout=2.0):
+        """Let threaded sinks drain what they can, then close them"""
+        for thread in self._threads:
+            thread.stop()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def sink_stats(self):
+        """[(name, consumed, dropped, lag, errors)] for every threaded sink"""
+        return [(t.sink.name, t.cursor.consumed, t.cursor.dropped, t.cursor.lag(), t.errors)
+                for t in self._threads]
+
+
+class RecorderSink(Sink):
+    """Writes every report it sees to a capture file.
+
+    With `report_ids`, only reports with those IDs are kept - e.g. (2,) for
+    a capture of just the vendor report. Filtering happens on the sink's
+    thread, so the producer does the same work either way.
+    """
+
+    name = "recorder"
+
+    def __init__(self, path, report_ids=None, name=None):
+        self.writer = CaptureWriter(path)
+        self.report_ids = frozenset(report_ids) if report_ids else None
+        if name:
+            self.name = name
+
+    def handle(self, timestamp_ns, report):
+        if self.report_ids is None or (report and report[0] in self.report_ids):
+            self.writer.write_report(timestamp_ns, report)
+
+    def idle(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+
+class StatsSink(Sink):
+    """Report-rate and activity counters, printed every `interval` seconds.
+
+    Rates are broken down by report ID once more than one shows up; with a
+    VendorDecoder (`vendor`) its latest field values are printed too, and
+    with a PowerMode (`power`) the read loop's wakeups/s and CPU use.
+    """
+
+    name = "stats"
+
+    def __init__(self, interval=5.0, vendor=None, power=None):
+        self.interval = interval
+        self.vendor = vendor
+        self.power = power
+        self.total = 0
+        self.changed = 0
+        self._window = 0
+        self._window_ids = {}
+        self._window_start = None
+        self._last_report = None
+
+    def handle(self, timestamp_ns, report):
+        self.total += 1
+        self._window += 1
+        report_id = report[0] if report else None
+        self._window_ids[report_id] = self._window_ids.get(report_id, 0) + 1
+        if report != self._last_report:
+            self.changed += 1
+            self._last_report = report
+        if self._window_start is None:
+            self._window_start = timestamp_ns
+        elapsed = (timestamp_ns - self._window_start) / 1e9
+        if elapsed >= self.interval:
+            by_id = ""
+            if len(self._window_ids) > 1:
+                by_id = "   " + "  ".join(f"id{'?' if i is None else i} {n / elapsed:.1f}/s"
+                                          for i, n in sorted(self._window_ids.items(), key=str))
+            print(f"[stats] {self._window / elapsed:6.1f} reports/s   "
+                  f"total {self.total}   changed {self.changed}{by_id}")
+            if self.vendor is not None and self.vendor.decoded:
+                print("[vendor] " + "  ".join(f"{name}={value}" for name, value in self.vendor.values.items()))
+            if self.power is not None:
+                wakeups_per_s, cpu_percent = self.power.sample()
+                print(f"[power] {wakeups_per_s:6.1f} wakeups/s   CPU {cpu_percent:.1f}%"
+                      + ("   idle" if self.power.idle else ""))
+            self._window = 0
+            self._window_ids = {}
+            self._window_start = timestamp_ns
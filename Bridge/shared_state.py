@@ -0,0 +1,247 @@
+"""
+Shared State
+Publishes the latest raw report and decoded ControllerState into a small
+fixed-layout shared memory segment, so overlays and telemetry tools can
+follow the controller without opening the HID device themselves.
+
+The segment is guarded by a sequence counter (seqlock): the bridge makes
+it odd before writing and even again afterwards, and readers retry if the
+counter was odd or changed while they copied. Readers never block the
+bridge and never take a lock; a reader that keeps finding the counter odd
+(the bridge died mid-write) gives up after READ_RETRY_S.
+
+Only one publisher can own the segment: the first takes an exclusive lock
+(flock on POSIX, a named mutex on Windows) that is released when it
+closes or dies, and a second bridge on the same machine gets
+FileExistsError instead of silently overwriting the first one's state.
+
+Layout (little-endian, 128 bytes):
+    0   4s   magic b"VXSS"
+    4   u16  layout version
+    6   u16  flags (bit 0 = physical controller connected)
+    8   u64  sequence counter (odd while a write is in progress)
+    16  u64  report timestamp, time.perf_counter_ns() when it was read
+    24  u16  raw report length
+    26  u16  reserved
+    28  u32  reserved
+    32  64s  raw report bytes
+    96  12s  ControllerState (XUSB_REPORT layout)
+"""
+
+import ctypes
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from controller_state import ControllerState, XUSB_REPORT_SIZE
+
+SEGMENT_NAME = "VITURE_Controller_State"
+SEGMENT_SIZE = 128
+LAYOUT_VERSION = 1
+MAGIC = b"VXSS"
+
+FLAG_CONNECTED = 0x0001
+
+# A publish takes microseconds; odd for longer than this means the
+# publisher died halfway through one
+READ_RETRY_S = 0.01
+
+_HEADER = struct.Struct("<4sHH")
+_BODY = struct.Struct("<QH")        # timestamp, report length
+SEQ_OFFSET = 8
+TIMESTAMP_OFFSET = 16
+REPORT_OFFSET = 32
+REPORT_SIZE = 64
+STATE_OFFSET = 96
+
+StateSnapshot = namedtuple("StateSnapshot", "seq timestamp_ns connected report state")
+
+
+def segment_path():
+    """Backing file for the segment on POSIX systems (Windows uses a named mapping)"""
+    shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(shm_dir, SEGMENT_NAME.lower())
+
+
+def _in_use():
+    return FileExistsError(f"shared state segment {SEGMENT_NAME} is already published "
+                           "by another bridge on this machine")
+
+
+def _claim_windows():
+    """Named mutex marking the publisher; returns its handle"""
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    handle = kernel32.CreateMutexW(None, False, SEGMENT_NAME + "_Publisher")
+    if not handle:
+        raise ctypes.WinError(ctypes.get_last_error())
+    if ctypes.get_last_error() == 183:          # ERROR_ALREADY_EXISTS
+        kernel32.CloseHandle(handle)
+        raise _in_use()
+    return handle
+
+
+def _open_mapping(create):
+    """Open (or create) the shared mapping, returns (mmap, file descriptor or None)"""
+    if sys.platform == "win32":
+        # Named mappings live as long as any process has them open
+        return mmap.mmap(-1, SEGMENT_SIZE, tagname=SEGMENT_NAME), None
+
+    path = segment_path()
+    if create:
+        import fcntl
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Held until the publisher closes or its process exits
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise _in_use() from None
+        os.ftruncate(fd, SEGMENT_SIZE)
+        return mmap.mmap(fd, SEGMENT_SIZE), fd
+
+    fd = os.open(path, os.O_RDONLY)
+    return mmap.mmap(fd, SEGMENT_SIZE, access=mmap.ACCESS_READ), fd
+
+
+class SharedStatePublisher:
+    """Writer side, owned by the bridge. One publisher per machine; a second raises FileExistsError."""
+
+    def __init__(self):
+        self._mutex = _claim_windows() if sys.platform == "win32" else None
+        self._mm, self._fd = _open_mapping(create=True)
+        self._mm[:] = bytes(SEGMENT_SIZE)
+        _HEADER.pack_into(self._mm, 0, MAGIC, LAYOUT_VERSION, 0)
+
+        # Aligned 8-byte views so the counter is updated with a single store
+        self._seq = ctypes.c_uint64.from_buffer(self._mm, SEQ_OFFSET)
+        self._flags = ctypes.c_uint16.from_buffer(self._mm, 6)
+        # Preallocated views: publish() copies between them without allocating
+        view = memoryview(self._mm)
+        self._report = view[REPORT_OFFSET:REPORT_OFFSET + REPORT_SIZE]
+        self._state = view[STATE_OFFSET:STATE_OFFSET + XUSB_REPORT_SIZE]
+        self._source = None
+        self._source_bytes = None
+
+    def publish(self, report, state, timestamp_ns=None, length=None):
+        """Publish a raw report and its decoded ControllerState.
+
+        The bridge passes the report's whole ring slot
+        (ReportRing.newest_slot()) with its `length` and read stamp; the
+        slot is copied straight into the segment and nothing is allocated.
+        A list or bytes `report` on its own works too.
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        if state is not self._source:
+            self._source = state
+            self._source_bytes = memoryview(state).cast("B")
+        seq = self._seq.value
+        self._seq.value = seq + 1   # odd: write in progress
+        if length is None:
+            length = min(len(report), REPORT_SIZE)
+            self._mm[REPORT_OFFSET:REPORT_OFFSET + length] = bytes(report[:length])
+        else:
+            self._report[:] = report
+        _BODY.pack_into(self._mm, TIMESTAMP_OFFSET, timestamp_ns, length)
+        self._state[:] = self._source_bytes
+        self._seq.value = seq + 2   # even: consistent again
+
+    def set_connected(self, connected):
+        """Flag whether the physical controller is currently attached"""
+        seq = self._seq.value
+        self._seq.value = seq + 1
+        self._flags.value = FLAG_CONNECTED if connected else 0
+        self._seq.value = seq + 2
+
+    def close(self):
+        # ctypes views and memoryviews pin the buffer, drop them before closing the mapping
+        self._seq = self._flags = None
+        self._report.release()
+        self._state.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+        if self._fd is not None:
+            os.close(self._fd)          # releases the flock
+        if self._mutex is not None:
+            ctypes.WinDLL("kernel32").CloseHandle(self._mutex)
+
+
+class SharedStateReader:
+    """Lock-free reader. Any number of these can poll the segment at once."""
+
+    def __init__(self):
+        try:
+            self._mm, self._fd = _open_mapping(create=False)
+        except FileNotFoundError:
+            raise FileNotFoundError("No shared state segment - is the bridge running?")
+        if self._mm[0:4] != MAGIC:
+            self.close()
+            raise FileNotFoundError("No shared state segment - is the bridge running?")
+        self._seq = struct.Struct("<Q")
+
+    def sequence(self):
+        """Current sequence counter; cheap enough to spin on"""
+        return self._seq.unpack_from(self._mm, SEQ_OFFSET)[0]
+
+    def read(self, timeout=READ_RETRY_S):
+        """Return a consistent StateSnapshot.
+
+        None if nothing was published yet, or if no consistent copy could
+        be taken within `timeout` seconds (a publisher stuck mid-write).
+        """
+        mm = self._mm
+        unpack_seq = self._seq.unpack_from
+        deadline = None
+        while True:
+            seq = unpack_seq(mm, SEQ_OFFSET)[0]
+            if not seq & 1:
+                data = mm[0:SEGMENT_SIZE]
+                if unpack_seq(mm, SEQ_OFFSET)[0] == seq:
+                    break
+            # Only look at the clock once the first attempt has failed
+            if deadline is None:
+                deadline = time.perf_counter() + timeout
+            elif time.perf_counter() >= deadline:
+                return None
+
+        if seq == 0:
+            return None
+        _, _, flags = _HEADER.unpack_from(data, 0)
+        timestamp, length = _BODY.unpack_from(data, TIMESTAMP_OFFSET)
+        return StateSnapshot(
+            seq=seq,
+            timestamp_ns=timestamp,
+            connected=bool(flags & FLAG_CONNECTED),
+            report=data[REPORT_OFFSET:REPORT_OFFSET + length],
+            state=ControllerState.from_buffer_copy(data, STATE_OFFSET),
+        )
+
+    def wait_for_update(self, last_seq, timeout=None, poll_interval=0.0):
+        """Poll until the sequence moves past `last_seq`, return the new snapshot.
+
+        poll_interval=0 busy-spins for the lowest latency; overlays that only
+        redraw at 60 Hz should pass something like 0.001. Returns None on timeout.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            seq = self.sequence()
+            if seq != last_seq and not seq & 1:
+                snapshot = self.read()
+                if snapshot is not None and snapshot.seq != last_seq:
+                    return snapshot
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            if poll_interval:
+                time.sleep(poll_interval)
+
+    def close(self):
+        self._mm.close()
+        if self._fd is not None:
+            os.close(self._fd)
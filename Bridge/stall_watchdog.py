@@ -0,0 +1,158 @@
+"""
+Stall Watchdog
+Notices the controller going quiet while its handle stays open. A read
+error already sends the bridge back to searching, but the controller has
+also been seen to simply stop sending: reads time out, nothing raises,
+and the virtual pad stays frozen with whatever the last report held.
+
+The controller keeps reporting at its polling rate while nothing is
+touched (the duplicates profile_report_rate.py counts), so a silence of
+many polling intervals is a stall, not a player at rest. The interval is
+learned from the timestamps already in the pipeline's ring, and the
+watchdog is only consulted when a read comes back empty - the per-report
+path costs nothing while reports flow.
+
+When it fires the bridge releases the virtual pad, closes the device and
+reopens it, backing off exponentially while reopens stay silent.
+"""
+
+import json
+import os
+import time
+from collections import deque
+
+STALL_FLOOR_MS = 500       # never call a silence shorter than this a stall
+STALL_INTERVALS = 100      # ...or shorter than this many report intervals
+LEARN_REPORTS = 64         # recent reports the interval is learned from
+BACKOFF_START_S = 0.05
+BACKOFF_MAX_S = 5.0
+RECENT_RECOVERIES = 100    # recovery times kept for the metrics
+
+
+class StallWatchdog:
+    """Time since the last report in a ReportRing, and what happened after.
+
+    `timeout_ms` fixes the stall threshold instead of learning it (0 turns
+    detection off); `interval_ms`, the endpoint's polling interval from the
+    descriptor store, stands in until reports have arrived.
+
+    The bridge calls opened() after every open, check() on every empty
+    read, backoff() before reopening a stalled device and recovered() for
+    the first report while `recovering`. Those run on the read thread and
+    leave the threshold they used in `threshold`; metrics() only reads
+    attributes, so the metrics endpoint can call it from its own thread
+    without touching the ring.
+    """
+
+    def __init__(self, ring, timeout_ms=None, interval_ms=None):
+        self.ring = ring
+        self.timeout_ms = timeout_ms
+        self.interval_ms = interval_ms
+        self.stalls = 0
+        self.recoveries = 0
+        self.reopens = 0
+        self.recovering = False
+        self.silence_ms = 0.0
+        self.longest_silence_ms = 0.0
+        self.last_recovery_ms = None
+        self.recovery_ms = deque(maxlen=RECENT_RECOVERIES)
+        self.threshold = self.threshold_ms()
+        self._stalled_ns = 0
+        self._stall_ns = None
+        self._open_ns = None
+        self._open_head = 0
+        self._backoff = BACKOFF_START_S
+
+    def threshold_ms(self):
+        """Silence that counts as a stall, or None when detection is off"""
+        if self.timeout_ms is not None:
+            return self.timeout_ms or None
+        stamps = self.ring.recent_stamps(LEARN_REPORTS + 1)
+        gaps = sorted(b - a for a, b in zip(stamps, stamps[1:]))
+        interval_ms = gaps[len(gaps) // 2] / 1e6 if gaps else self.interval_ms or 0
+        return max(STALL_FLOOR_MS, STALL_INTERVALS * interval_ms)
+
+    def opened(self, now_ns=None):
+        """The device was (re)opened: silence counts from here"""
+        self._open_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        self._open_head = self.ring.head
+        self.threshold = self.threshold_ms()
+        if self.recovering:
+            self.reopens += 1
+
+    def check(self, now_ns=None):
+        """True once the device has been silent for longer than the threshold"""
+        threshold = self.threshold = self.threshold_ms()
+        if threshold is None or self._open_ns is None:
+            return False
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        if self.ring.head > self._open_head:
+            last_ns = self.ring.recent_stamps(1)[0]
+        else:
+            last_ns = self._open_ns
+        silence_ms = (now_ns - last_ns) / 1e6
+        if silence_ms < threshold:
+            return False
+        self.silence_ms = silence_ms
+        self.longest_silence_ms = max(self.longest_silence_ms, silence_ms)
+        if not self.recovering:
+            self.stalls += 1
+            self.recovering = True
+            self._stall_ns = now_ns
+        return True
+
+    def backoff(self):
+        """Seconds to wait before the next reopen; doubles until a recovery"""
+        delay = self._backoff
+        self._backoff = min(self._backoff * 2, BACKOFF_MAX_S)
+        return delay
+
+    def recovered(self, now_ns=None):
+        """Reports are flowing again after a stall"""
+        if not self.recovering:
+            return
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        elapsed_ns = now_ns - self._stall_ns
+        self._stalled_ns += elapsed_ns
+        self.last_recovery_ms = elapsed_ns / 1e6
+        self.recovery_ms.append(self.last_recovery_ms)
+        self.recoveries += 1
+        self.recovering = False
+        self._backoff = BACKOFF_START_S
+
+    def metrics(self, now_ns=None):
+        """Counters and recovery times as a flat dict (times in ms, seconds)"""
+        stalled_ns = self._stalled_ns
+        if self.recovering:
+            now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+            stalled_ns += now_ns - self._stall_ns
+        recent = self.recovery_ms
+        return {
+            "stalls": self.stalls,
+            "recoveries": self.recoveries,
+            "reopens": self.reopens,
+            "recovering": self.recovering,
+            "threshold_ms": self.threshold,
+            "longest_silence_ms": self.longest_silence_ms,
+            "last_recovery_ms": self.last_recovery_ms,
+            "avg_recovery_ms": sum(recent) / len(recent) if recent else None,
+            "max_recovery_ms": max(recent) if recent else None,
+            "stalled_seconds": stalled_ns / 1e9,
+        }
+
+    def summary(self):
+        m = self.metrics()
+        threshold = f"{m['threshold_ms']:.0f} ms" if m["threshold_ms"] else "off"
+        line = (f"{m['stalls']} stalls, {m['recoveries']} recovered, {m['reopens']} reopens, "
+                f"threshold {threshold}")
+        if m["last_recovery_ms"] is not None:
+            line += (f", recovery last {m['last_recovery_ms']:.0f} ms / avg {m['avg_recovery_ms']:.0f} ms"
+                     f" / max {m['max_recovery_ms']:.0f} ms")
+        return line
+
+    def save(self, path):
+        """Write metrics() to a JSON file, atomically, for other tools to pick up"""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.metrics(), f, indent=2)
+        os.replace(tmp, path)
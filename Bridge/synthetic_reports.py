@@ -0,0 +1,107 @@
+"""
+Synthetic Reports
+Generators of fake controller traffic for stress tests: endless streams
+of raw reports shaped like h.read(64) output (lists of ints, report ID in
+byte 0). SyntheticBackend in device_backend.py serves them to the bridge
+in place of the controller; Testing/stress_decoder.py pushes them through
+the decoder as fast as it can.
+
+    walk    sticks random-walking, occasional buttons and D-pad
+    storm   every button and hat value flipping every report
+    hat     the hat byte cycling through all values, including 0x0F / 0x1F
+    fuzz    random lengths (short reads included), report IDs and bytes
+    vendor  report ID 2 vendor frames (63 bytes)
+    mixed   mostly walk, with storm, vendor and fuzz frames mixed in
+"""
+
+import random
+
+REPORT_SIZE = 64
+VENDOR_REPORT_SIZE = 63
+HAT_CENTER = 0x0F
+HAT_SPECIAL = 0x1F   # seen on the real controller, meaning unknown (Turbo?)
+
+
+def _report(b1=0, b2=0, hat=HAT_CENTER, axes=(128, 128, 128, 128), analog=(0, 0)):
+    report = [0] * REPORT_SIZE
+    report[0] = 0x01
+    report[1] = b1
+    report[2] = b2
+    report[3] = hat
+    report[4:8] = axes
+    report[8:10] = analog
+    return report
+
+
+def stick_walk(rng, step=6):
+    """Sticks random-walking; buttons and D-pad change now and then"""
+    axes = [128, 128, 128, 128]
+    b1 = b2 = 0
+    hat = HAT_CENTER
+    while True:
+        for i in range(4):
+            axes[i] = max(0, min(255, axes[i] + rng.randint(-step, step)))
+        if rng.random() < 0.02:
+            b1 = rng.getrandbits(8) & rng.getrandbits(8)
+            b2 = rng.getrandbits(8) & rng.getrandbits(8) & 0x7F
+        if rng.random() < 0.01:
+            hat = rng.choice((0, 1, 2, 3, 4, 5, 6, 7, HAT_CENTER))
+        yield _report(b1, b2, hat, axes)
+
+
+def button_storm(rng):
+    """All button bits and hat values changing on every report"""
+    while True:
+        yield _report(rng.getrandbits(8), rng.getrandbits(8),
+                      rng.choice((0, 1, 2, 3, 4, 5, 6, 7, HAT_CENTER, HAT_SPECIAL)),
+                      [rng.getrandbits(8) for _ in range(4)])
+
+
+def hat_sweep(rng):
+    """Every possible hat byte in turn, sticks centered"""
+    while True:
+        for hat in range(256):
+            yield _report(hat=hat)
+
+
+def fuzz(rng):
+    """Random report IDs, random bytes and random lengths from 0 to 64"""
+    while True:
+        length = rng.choice((0, 1, 2, 3, 4, 7, 8, 9, rng.randrange(REPORT_SIZE + 1), REPORT_SIZE))
+        report = [rng.getrandbits(8) for _ in range(length)]
+        if report and rng.random() < 0.5:
+            report[0] = rng.choice((0x00, 0x01, 0x02, 0x81, 0xFF))
+        yield report
+
+
+def vendor_frames(rng):
+    """Report ID 2 vendor data: must never move the virtual pad"""
+    while True:
+        frame = [rng.getrandbits(8) for _ in range(VENDOR_REPORT_SIZE)]
+        frame[0] = 0x02
+        yield frame
+
+
+def mixed(rng):
+    """Mostly normal play with storms, vendor frames and garbage mixed in"""
+    sources = (stick_walk(rng), button_storm(rng), vendor_frames(rng), fuzz(rng))
+    weights = (85, 5, 5, 5)
+    while True:
+        yield next(rng.choices(sources, weights)[0])
+
+
+STREAMS = {
+    "walk": stick_walk,
+    "storm": button_storm,
+    "hat": hat_sweep,
+    "fuzz": fuzz,
+    "vendor": vendor_frames,
+    "mixed": mixed,
+}
+
+
+def make_stream(name, seed=None):
+    """Endless iterator of reports for one of STREAMS"""
+    if name not in STREAMS:
+        raise ValueError(f"unknown stream {name!r} (choose from {', '.join(STREAMS)})")
+    return STREAMS[name](random.Random(seed))
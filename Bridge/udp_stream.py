@@ -0,0 +1,274 @@
+"""
+UDP Stream
+Sends controller state to another machine over UDP, for setups where the
+game runs on a different PC from the one the controller is plugged into.
+
+Packets are small and delta-encoded: a 16-byte header followed by a field
+mask and only the ControllerState fields that changed since the previous
+packet. Every `keyframe_interval` seconds a keyframe carries the full
+state, so a receiver recovers from lost packets within one interval.
+The sender also pings the receiver to measure round-trip latency.
+
+There is no authentication: whoever can reach the receiver's port can
+drive its virtual pad. Bind it to the interface facing the sender (or
+firewall the port) on networks you don't control.
+
+Packet header <2sBBIQ:
+    magic b"VX", packet type, flags, sequence number, sender perf_counter_ns
+"""
+
+import socket
+import struct
+import time
+
+from controller_state import ControllerState
+
+MAGIC = b"VX"
+DEFAULT_PORT = 47110
+
+PKT_STATE = 1
+PKT_PING  = 2
+PKT_PONG  = 3
+
+FLAG_KEYFRAME = 0x01
+
+HEADER = struct.Struct("<2sBBIQ")
+
+# (mask bit, ControllerState field, struct format) in wire order
+FIELDS = (
+    (0x01, "bButtonsLo",    "B"),
+    (0x02, "bButtonsHi",    "B"),
+    (0x04, "bLeftTrigger",  "B"),
+    (0x08, "bRightTrigger", "B"),
+    (0x10, "sThumbLX",      "h"),
+    (0x20, "sThumbLY",      "h"),
+    (0x40, "sThumbRX",      "h"),
+    (0x80, "sThumbRY",      "h"),
+)
+ALL_FIELDS = 0xFF
+
+# Precompiled payload struct for every possible mask
+_PAYLOADS = [struct.Struct("<B" + "".join(fmt for bit, _, fmt in FIELDS if mask & bit))
+             for mask in range(256)]
+
+SEQ_MOD = 1 << 32
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """'host:port' or 'host' -> (host, port)"""
+    host, _, port = text.rpartition(":")
+    if not host:
+        return text, default_port
+    return host, int(port)
+
+
+def state_values(state):
+    """ControllerState -> tuple of field values in wire order"""
+    return tuple(getattr(state, name) for _, name, _ in FIELDS)
+
+
+def encode_state(seq, timestamp_ns, values, previous, keyframe):
+    """Build a state packet, return (packet, mask). mask 0 means nothing to send.
+
+    `previous` is the last sent values tuple, or None to force a keyframe.
+    """
+    if keyframe or previous is None:
+        mask = ALL_FIELDS
+    else:
+        mask = 0
+        for (bit, _, _), new, old in zip(FIELDS, values, previous):
+            if new != old:
+                mask |= bit
+        if not mask:
+            return None, 0
+    changed = [v for (bit, _, _), v in zip(FIELDS, values) if mask & bit]
+    flags = FLAG_KEYFRAME if mask == ALL_FIELDS else 0
+    packet = HEADER.pack(MAGIC, PKT_STATE, flags, seq % SEQ_MOD, timestamp_ns)
+    packet += _PAYLOADS[mask].pack(mask, *changed)
+    return packet, mask
+
+
+def apply_state(packet, state):
+    """Apply a state packet's fields onto `state`, return (seq, flags, timestamp_ns)"""
+    magic, kind, flags, seq, timestamp = HEADER.unpack_from(packet, 0)
+    mask = packet[HEADER.size]
+    values = _PAYLOADS[mask].unpack_from(packet, HEADER.size)
+    i = 1
+    for bit, name, _ in FIELDS:
+        if mask & bit:
+            setattr(state, name, values[i])
+            i += 1
+    return seq, flags, timestamp
+
+
+class StreamSender:
+    """Bridge side: encodes state changes and sends them to one receiver"""
+
+    def __init__(self, address, keyframe_interval=0.25, ping_interval=1.0):
+        self.address = address
+        self.keyframe_interval = keyframe_interval
+        self.ping_interval = ping_interval
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)   # never let the network stall the read loop
+        self.seq = 0
+        self.sent = 0
+        self.send_errors = 0
+        self.rtt_last_ms = None
+        self.rtt_min_ms = None
+        self.rtt_avg_ms = None
+        self._previous = None
+        self._last_keyframe = 0
+        self._last_ping = 0
+        self._ping_seq = 0
+
+    def _send(self, packet):
+        try:
+            self.sock.sendto(packet, self.address)
+            self.sent += 1
+        except (BlockingIOError, OSError):
+            self.send_errors += 1
+
+    def send_state(self, state, timestamp_ns=None):
+        """Send the fields of `state` that changed; keyframes go out periodically"""
+        now = time.perf_counter_ns() if timestamp_ns is None else timestamp_ns
+        self._send_values(state_values(state), now)
+        self.tick(now)
+
+    def _send_values(self, values, now, force_keyframe=False):
+        keyframe = force_keyframe or (now - self._last_keyframe) >= self.keyframe_interval * 1e9
+        packet, mask = encode_state(self.seq + 1, now, values, self._previous, keyframe)
+        if not mask:
+            return
+        self.seq += 1
+        self._previous = values
+        if mask == ALL_FIELDS:
+            self._last_keyframe = now
+        self._send(packet)
+
+    def tick(self, now=None):
+        """Housekeeping without new input: keyframe heartbeat, pings, pongs"""
+        if now is None:
+            now = time.perf_counter_ns()
+        if self._previous is not None and (now - self._last_keyframe) >= self.keyframe_interval * 1e9:
+            self._send_values(self._previous, now, force_keyframe=True)
+        if (now - self._last_ping) >= self.ping_interval * 1e9:
+            self._last_ping = now
+            self._ping_seq += 1
+            self._send(HEADER.pack(MAGIC, PKT_PING, 0, self._ping_seq % SEQ_MOD, now))
+        self._drain_pongs()
+
+    def _drain_pongs(self):
+        while True:
+            try:
+                packet, _ = self.sock.recvfrom(64)
+            except (BlockingIOError, OSError):
+                return
+            if len(packet) < HEADER.size:
+                continue
+            magic, kind, _, _, timestamp = HEADER.unpack_from(packet, 0)
+            if magic != MAGIC or kind != PKT_PONG:
+                continue
+            rtt = (time.perf_counter_ns() - timestamp) / 1e6
+            self.rtt_last_ms = rtt
+            self.rtt_min_ms = rtt if self.rtt_min_ms is None else min(self.rtt_min_ms, rtt)
+            self.rtt_avg_ms = rtt if self.rtt_avg_ms is None else self.rtt_avg_ms * 0.9 + rtt * 0.1
+
+    def close(self):
+        self.sock.close()
+
+
+class StreamReceiver:
+    """Remote side: applies incoming packets to a local ControllerState"""
+
+    def __init__(self, port=DEFAULT_PORT, bind="0.0.0.0", stale_timeout=1.0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((bind, port))
+        self.port = self.sock.getsockname()[1]
+        self.state = ControllerState()
+        self.stale_timeout = stale_timeout
+        self.received = 0
+        self.lost = 0
+        self.out_of_order = 0
+        self.keyframes = 0
+        self.malformed = 0
+        self.resyncs = 0
+        self.synced = False
+        self.last_seq = None
+        self.last_packet_time = None
+
+    def receive(self, timeout=0.1):
+        """Wait for one packet and apply it. Returns True if the state changed.
+
+        If no packet is accepted for `stale_timeout` seconds the state is
+        zeroed so a dropped link can't leave buttons held down on the remote
+        pad; this is checked on every call, not only when the socket is
+        quiet. A keyframe is always applied and resets the sequence, so a
+        restarted sender is followed at its first keyframe. Packets that are
+        not ours or are cut short are dropped and counted in `malformed`.
+        """
+        stale = self._check_stale()
+        self.sock.settimeout(timeout)
+        try:
+            packet, sender = self.sock.recvfrom(256)
+        except socket.timeout:
+            return stale or self._check_stale()
+        except OSError:
+            return stale
+
+        if len(packet) < HEADER.size or packet[:2] != MAGIC:
+            self.malformed += 1
+            return stale
+        kind = packet[2]
+        if kind == PKT_PING:
+            # Echo the sender's timestamp back so it can compute the round trip
+            try:
+                self.sock.sendto(HEADER.pack(MAGIC, PKT_PONG, 0, *HEADER.unpack_from(packet, 0)[3:]), sender)
+            except OSError:
+                pass
+            return stale
+        if kind != PKT_STATE:
+            return stale
+        if len(packet) <= HEADER.size or len(packet) < HEADER.size + _PAYLOADS[packet[HEADER.size]].size:
+            self.malformed += 1
+            return stale
+
+        seq = HEADER.unpack_from(packet, 0)[3]
+        keyframe = packet[3] & FLAG_KEYFRAME
+        if self.last_seq is not None:
+            delta = (seq - self.last_seq) % SEQ_MOD
+            if keyframe and (delta == 0 or delta > SEQ_MOD // 2):
+                # A full state from a sender that restarted (its sequence
+                # began again): resync on it rather than reject it forever
+                self.resyncs += 1
+                delta = 1
+            if delta == 0 or delta > SEQ_MOD // 2:
+                # Duplicate or late delta: applying it would roll state back
+                self.out_of_order += 1
+                return stale
+            if delta > 1:
+                # Missed packets: fields they changed are stale until the next keyframe
+                self.lost += delta - 1
+                self.synced = False
+
+        apply_state(packet, self.state)
+        self.received += 1
+        self.last_seq = seq
+        self.last_packet_time = time.perf_counter()
+        if keyframe:
+            self.keyframes += 1
+            self.synced = True
+        return True
+
+    def _check_stale(self):
+        if self.last_packet_time is None:
+            return False
+        if time.perf_counter() - self.last_packet_time < self.stale_timeout:
+            return False
+        self.last_packet_time = None
+        self.last_seq = None
+        self.synced = False
+        self.state.clear()
+        return True
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Hot Loop Benchmark
+Compares the baseline bridge's per-report decode with the preallocated
+ControllerState decoder. The baseline has no decode function to call - it
+was inline in controller_bridge.py's main() - so baseline_decode() below
+is that loop body copied verbatim, with its own scale_axis and
+parse_hat_switch, and vg.XUSB_BUTTON.* spelled as the XUSB_GAMEPAD_*
+constants with the same values. No controller or ViGEmBus needed.
+
+The shared-state publish the bridge adds per report is measured on its
+own; what it still allocates is the two ints of the sequence counter. Allocations are measured per report with tracemalloc: the extra memory
+each report needs while it is decoded (transient) and what is still
+allocated afterwards (retained), each averaged over the sample.
+"""
+
+import ctypes
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+
+from controller_state import (
+    HID_BTN_A, HID_BTN_B, HID_BTN_X, HID_BTN_Y, HID_BTN_LB, HID_BTN_RB,
+    HID_BTN_LT, HID_BTN_RT, HID_BTN_SELECT, HID_BTN_START, HID_BTN_HOME, HID_BTN_L3, HID_BTN_R3,
+    XUSB_GAMEPAD_A, XUSB_GAMEPAD_B, XUSB_GAMEPAD_X, XUSB_GAMEPAD_Y,
+    XUSB_GAMEPAD_LEFT_SHOULDER, XUSB_GAMEPAD_RIGHT_SHOULDER,
+    XUSB_GAMEPAD_BACK, XUSB_GAMEPAD_START, XUSB_GAMEPAD_GUIDE,
+    XUSB_GAMEPAD_LEFT_THUMB, XUSB_GAMEPAD_RIGHT_THUMB,
+    XUSB_GAMEPAD_DPAD_UP, XUSB_GAMEPAD_DPAD_DOWN,
+    XUSB_GAMEPAD_DPAD_LEFT, XUSB_GAMEPAD_DPAD_RIGHT,
+    ControllerState, ReportDecoder, make_report_writer,
+)
+
+REPORTS = 200000
+ALLOC_SAMPLE = 20000
+BASELINE_DEADZONE = 0.08
+
+
+class XUSB_REPORT(ctypes.Structure):
+    """Same layout vgamepad uses on Windows"""
+    _fields_ = [
+        ("wButtons", ctypes.c_ushort),
+        ("bLeftTrigger", ctypes.c_ubyte),
+        ("bRightTrigger", ctypes.c_ubyte),
+        ("sThumbLX", ctypes.c_short),
+        ("sThumbLY", ctypes.c_short),
+        ("sThumbRX", ctypes.c_short),
+        ("sThumbRY", ctypes.c_short),
+    ]
+
+
+class BenchGamepad:
+    """Minimal stand-in for VX360Gamepad: same report struct, same wrapper calls"""
+
+    def __init__(self):
+        self.report = XUSB_REPORT()
+
+    def reset(self):
+        self.report = XUSB_REPORT()
+
+    def press_button(self, button):
+        self.report.wButtons = self.report.wButtons | button
+
+    def left_trigger(self, value):
+        self.report.bLeftTrigger = value
+
+    def right_trigger(self, value):
+        self.report.bRightTrigger = value
+
+    def left_joystick(self, x_value, y_value):
+        self.report.sThumbLX = x_value
+        self.report.sThumbLY = y_value
+
+    def right_joystick(self, x_value, y_value):
+        self.report.sThumbRX = x_value
+        self.report.sThumbRY = y_value
+
+
+# --- Baseline controller_bridge.py, verbatim apart from the button constants ---
+
+def baseline_scale_axis(val):
+    """Scale 0-255 (unsigned) to -32768 to 32767 (signed 16-bit) with Deadzone"""
+    normalized = (val - 128) / 127.5
+    if abs(normalized) < BASELINE_DEADZONE:
+        return 0
+    if normalized > 0:
+        normalized = (normalized - BASELINE_DEADZONE) / (1 - BASELINE_DEADZONE)
+    else:
+        normalized = (normalized + BASELINE_DEADZONE) / (1 - BASELINE_DEADZONE)
+    return int(normalized * 32767)
+
+
+def baseline_scale_inv_axis(val):
+    return -baseline_scale_axis(val)
+
+
+def baseline_parse_hat_switch(hat_value):
+    if hat_value >= 8:
+        return (False, False, False, False)
+    directions = [
+        (True, False, False, False),   # 0: Up
+        (True, False, False, True),    # 1: Up-Right
+        (False, False, False, True),   # 2: Right
+        (False, True, False, True),    # 3: Down-Right
+        (False, True, False, False),   # 4: Down
+        (False, True, True, False),    # 5: Down-Left
+        (False, False, True, False),   # 6: Left
+        (True, False, True, False),    # 7: Up-Left
+    ]
+    return directions[hat_value] if hat_value < 8 else (False, False, False, False)
+
+
+def baseline_decode(report, gamepad):
+    """The baseline main() loop body, from `if len(report) >= 8` to the joystick calls"""
+    if len(report) >= 8:
+        b1 = report[1]
+        b2 = report[2]
+        hat = report[3]
+
+        gamepad.reset()
+
+        if b1 & HID_BTN_A: gamepad.press_button(button=XUSB_GAMEPAD_A)
+        if b1 & HID_BTN_B: gamepad.press_button(button=XUSB_GAMEPAD_B)
+        if b1 & HID_BTN_X: gamepad.press_button(button=XUSB_GAMEPAD_X)
+        if b1 & HID_BTN_Y: gamepad.press_button(button=XUSB_GAMEPAD_Y)
+
+        if b1 & HID_BTN_LB: gamepad.press_button(button=XUSB_GAMEPAD_LEFT_SHOULDER)
+        if b1 & HID_BTN_RB: gamepad.press_button(button=XUSB_GAMEPAD_RIGHT_SHOULDER)
+
+        if b2 & HID_BTN_LT: gamepad.left_trigger(255)
+        if b2 & HID_BTN_RT: gamepad.right_trigger(255)
+
+        if b2 & HID_BTN_SELECT: gamepad.press_button(button=XUSB_GAMEPAD_BACK)
+        if b2 & HID_BTN_START:  gamepad.press_button(button=XUSB_GAMEPAD_START)
+        if b2 & HID_BTN_HOME:   gamepad.press_button(button=XUSB_GAMEPAD_GUIDE)
+
+        if b2 & HID_BTN_L3:     gamepad.press_button(button=XUSB_GAMEPAD_LEFT_THUMB)
+        if b2 & HID_BTN_R3:     gamepad.press_button(button=XUSB_GAMEPAD_RIGHT_THUMB)
+
+        d_up, d_down, d_left, d_right = baseline_parse_hat_switch(hat)
+        if d_up:    gamepad.press_button(button=XUSB_GAMEPAD_DPAD_UP)
+        if d_down:  gamepad.press_button(button=XUSB_GAMEPAD_DPAD_DOWN)
+        if d_left:  gamepad.press_button(button=XUSB_GAMEPAD_DPAD_LEFT)
+        if d_right: gamepad.press_button(button=XUSB_GAMEPAD_DPAD_RIGHT)
+
+        lx = baseline_scale_axis(report[4])
+        ly = baseline_scale_inv_axis(report[5])
+        rx = baseline_scale_axis(report[6])
+        ry = baseline_scale_inv_axis(report[7])
+
+        gamepad.left_joystick(x_value=lx, y_value=ly)
+        gamepad.right_joystick(x_value=rx, y_value=ry)
+
+
+def make_reports(count):
+    """Random-walk sticks with random buttons, shaped like h.read(64) output"""
+    rng = random.Random(1234)
+    axes = [128, 128, 128, 128]
+    reports = []
+    for _ in range(count):
+        for i in range(4):
+            axes[i] = max(0, min(255, axes[i] + rng.randint(-6, 6)))
+        report = [0] * 64
+        report[0] = 0x01
+        report[1] = rng.getrandbits(8)
+        report[2] = rng.getrandbits(8)
+        report[3] = rng.choice((0, 1, 2, 3, 4, 5, 6, 7, 0x0F, 0x1F))
+        report[4:8] = axes
+        reports.append(report)
+    return reports
+
+
+def allocations_per_report(reports, step):
+    """(transient, retained) bytes per report, less tracemalloc's own bookkeeping"""
+    def run(step):
+        transient = 0
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        for report in reports:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            step(report)
+            _, peak = tracemalloc.get_traced_memory()
+            transient += peak - before
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return transient / len(reports), (current - base) / len(reports)
+
+    overhead, _ = run(lambda report: None)     # the get_traced_memory() tuples
+    transient, retained = run(step)
+    return max(transient - overhead, 0.0), retained
+
+
+def measure(name, reports, step):
+    """Run `step` over every report, print timing and allocations per report, return ns/report"""
+    for report in reports[:1000]:  # warm up
+        step(report)
+
+    start = time.perf_counter_ns()
+    for report in reports:
+        step(report)
+    elapsed = time.perf_counter_ns() - start
+
+    transient, retained = allocations_per_report(reports[:ALLOC_SAMPLE], step)
+    per_report = elapsed / len(reports)
+    print(f"  {name:18s} {per_report:8.0f} ns/report   "
+          f"allocated per report: {transient:6.1f} bytes transient, {retained:5.2f} bytes retained")
+    return per_report
+
+
+def main():
+    print("Hot Loop Benchmark")
+    print("=" * 70)
+    print(f"Generating {REPORTS} synthetic reports...")
+    reports = make_reports(REPORTS)
+
+    # Sanity check: both paths must produce identical XUSB reports. The
+    # baseline scales raw 0 to -32906, which wraps in the int16 field;
+    # ControllerState clamps, so reports with an axis at 0 are left out
+    baseline_pad = BenchGamepad()
+    new_pad = BenchGamepad()
+    decoder = ReportDecoder()
+    state = ControllerState()
+    write_report = make_report_writer(new_pad, state)
+    compared = wrapped = 0
+    for report in reports[:50000]:
+        if 0 in report[4:8]:
+            wrapped += 1
+            continue
+        baseline_decode(report, baseline_pad)
+        decoder.decode_into(report, state)
+        write_report()
+        compared += 1
+        if bytes(baseline_pad.report) != bytes(new_pad.report):
+            print(f"[X] Mismatch on report {report[:8]}")
+            sys.exit(1)
+    print(f"[OK] Decoders agree on {compared} reports ({wrapped} with an axis at 0 skipped: "
+          f"the baseline wraps those)\n")
+
+    baseline_pad = BenchGamepad()
+    baseline = measure("baseline bridge", reports, lambda r: baseline_decode(r, baseline_pad))
+
+    def state_step(report):
+        if decoder.decode_into(report, state):
+            write_report()
+    fast = measure("ControllerState", reports, state_step)
+
+    # What the bridge adds per report for local tools. The report is already
+    # in the pipeline's ring; publish copies its slot, the same 64 bytes
+    # whatever the report holds
+    try:
+        from report_pipeline import ReportRing
+        from shared_state import SharedStatePublisher
+        publisher = SharedStatePublisher()
+    except OSError as e:
+        print(f"  shared state skipped: {e}")
+    else:
+        ring = ReportRing()
+        stamp = time.perf_counter_ns()
+        ring.push(reports[0], stamp)
+        measure("shared state", reports,
+                lambda report: publisher.publish(ring.newest_slot(), state, stamp, len(report)))
+        publisher.close()
+
+    print("-" * 70)
+    print(f"Speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
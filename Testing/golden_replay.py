@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Golden Replay
+Regression harness for the bridge's decode and mapping. Every recorded
+session (*.vxcap) in the corpus directory is run through the decoder in
+batch and the XUSB state sequence the bridge would have sent the virtual
+pad is compared with the stored golden output next to it
+(session.golden.npz). The first divergence is reported with the records
+around it: raw bytes, golden and new state, which fields differ and the
+nearest marker, so a mapping change shows up as the exact report it
+broke.
+
+Loading (Analysis/capture_arrays.py) and decoding (Analysis/batch_decoder.py,
+built from the ReportDecoder's own lookup tables) are vectorized, so the
+corpus replays at millions of reports per second.
+
+    python golden_replay.py --synthetic          # seed golden/ with generated sessions
+    python golden_replay.py --update             # (re)write goldens for the corpus
+    python golden_replay.py                      # check every session against its golden
+    python golden_replay.py --profile profile.json sessions/
+
+A golden holds two arrays: `index`, the record number of each report the
+decoder accepted, and `states`, the (N, 12) XUSB_REPORT bytes it produced.
+"""
+
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Bridge"))
+sys.path.insert(0, os.path.join(HERE, "..", "Analysis"))
+from batch_decoder import BatchDecoder, FIELDS, as_tuple, np, state_dtype, _require_numpy
+from capture_arrays import load_capture
+from capture_format import CaptureWriter, KIND_INPUT
+from controller_state import MIN_REPORT_LENGTH, XUSB_REPORT_SIZE, ReportDecoder
+
+DEFAULT_CORPUS = os.path.join(HERE, "golden")
+GOLDEN_SUFFIX = ".golden.npz"
+CONTEXT = 3              # records shown either side of a divergence
+SYNTHETIC_SESSIONS = {   # name: (stream, reports)
+    "walk": ("walk", 200000),
+    "storm": ("storm", 20000),
+    "hat": ("hat", 2000),
+    "mixed": ("mixed", 100000),
+}
+
+
+class Replay:
+    """The decoder's output for one capture, aligned with its records"""
+
+    def __init__(self, arrays, index, states):
+        self.arrays = arrays
+        self.index = index          # record number of each accepted report
+        self.states = states        # (N, 12) uint8, XUSB_REPORT bytes
+
+    def __len__(self):
+        return len(self.index)
+
+
+def replay(path, batch):
+    """Decode every input report of a capture as the bridge would"""
+    arrays = load_capture(path, max_width=MIN_REPORT_LENGTH)
+    inputs = np.flatnonzero(arrays.kinds == KIND_INPUT)
+    frames = arrays.payload[inputs]
+    if frames.shape[1] < MIN_REPORT_LENGTH:
+        frames = np.pad(frames, ((0, 0), (0, MIN_REPORT_LENGTH - frames.shape[1])))
+    accepted, states = batch.decode(frames, arrays.lengths[inputs])
+    states = states.view(np.uint8).reshape(-1, XUSB_REPORT_SIZE)
+    return Replay(arrays, inputs[accepted], states)
+
+
+def golden_path(capture_path):
+    root, _ = os.path.splitext(capture_path)
+    return root + GOLDEN_SUFFIX
+
+
+def save_golden(path, result):
+    np.savez(path, index=result.index.astype(np.int64), states=result.states)
+
+
+def load_golden(path):
+    with np.load(path) as golden:
+        return golden["index"], golden["states"]
+
+
+def first_divergence(golden_index, golden_states, result):
+    """Position in the state sequence where replay and golden first differ, or None"""
+    n = min(len(golden_index), len(result))
+    differs = (golden_index[:n] != result.index[:n]) | (golden_states[:n] != result.states[:n]).any(axis=1)
+    hits = np.flatnonzero(differs)
+    if len(hits):
+        return int(hits[0])
+    return None if len(golden_index) == len(result) else n
+
+
+def _state_tuple(row):
+    return as_tuple(row.view(state_dtype())[0])
+
+
+def describe_divergence(position, golden_index, golden_states, result):
+    """Lines describing the first divergence and the records around it"""
+    arrays = result.arrays
+    lines = []
+    golden_record = int(golden_index[position]) if position < len(golden_index) else None
+    new_record = int(result.index[position]) if position < len(result) else None
+    records = [r for r in (golden_record, new_record) if r is not None]
+    record = min(records)
+    lines.append(f"first divergence at output #{position} (record {record}"
+                 f"{', ' + repr(arrays.marker_before(record)) if arrays.marker_before(record) else ''})")
+    if golden_record is None:
+        lines.append(f"  replay emits {len(result) - position} more states than the golden")
+    elif new_record is None:
+        lines.append(f"  replay stops {len(golden_index) - position} states short of the golden")
+    elif golden_record != new_record:
+        lines.append(f"  golden state came from record {golden_record}, replay's from record {new_record} "
+                     "(a report was accepted or rejected differently)")
+    else:
+        golden_state = _state_tuple(golden_states[position])
+        new_state = _state_tuple(result.states[position])
+        names = ("wButtons",) + tuple(FIELDS[2:])
+        changed = [f"{name} {g:#06x} -> {n:#06x}" if name == "wButtons" else f"{name} {g} -> {n}"
+                   for name, g, n in zip(names, golden_state, new_state) if g != n]
+        lines.append("  " + ", ".join(changed))
+
+    golden_at = dict(zip(golden_index.tolist(), range(len(golden_index))))
+    new_at = dict(zip(result.index.tolist(), range(len(result))))
+    first = max(0, record - CONTEXT)
+    last = min(len(arrays) - 1, record + CONTEXT)
+    lines.append(f"  {'record':>8} {'t (ms)':>10}  {'report':<24} {'golden':<38} replay")
+    t0 = int(arrays.timestamps[0]) if len(arrays) else 0
+    for i in range(first, last + 1):
+        if arrays.kinds[i] != KIND_INPUT:
+            lines.append(f"  {i:>8} {(int(arrays.timestamps[i]) - t0) / 1e6:>10.3f}  marker")
+            continue
+        raw = bytes(arrays.payload[i, :min(int(arrays.lengths[i]), MIN_REPORT_LENGTH)]).hex(" ")
+        g = _state_tuple(golden_states[golden_at[i]]) if i in golden_at else "ignored"
+        n = _state_tuple(result.states[new_at[i]]) if i in new_at else "ignored"
+        flag = ">" if i == record else " "
+        lines.append(f"{flag} {i:>8} {(int(arrays.timestamps[i]) - t0) / 1e6:>10.3f}  {raw:<24} "
+                     f"{str(g):<38} {n}{'' if g == n else '   <--'}")
+    return lines
+
+
+def find_sessions(paths):
+    sessions = []
+    for path in paths:
+        if os.path.isdir(path):
+            sessions += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".vxcap"))
+        else:
+            sessions.append(path)
+    return sessions
+
+
+def write_synthetic(directory, seed=1):
+    """Seed a corpus with generated sessions (see SYNTHETIC_SESSIONS)"""
+    from synthetic_reports import make_stream
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, (stream, count) in SYNTHETIC_SESSIONS.items():
+        path = os.path.join(directory, f"synthetic_{name}.vxcap")
+        reports = make_stream(stream, seed)
+        with CaptureWriter(path) as writer:
+            writer.write_marker(0, f"synthetic:{stream}")
+            for i in range(count):
+                writer.write_report((i + 1) * 1_000_000, next(reports))
+        paths.append(path)
+    return paths
+
+
+def make_decoder(profile=None):
+    if profile:
+        from mapping_profile import decoder_from_profile
+        return decoder_from_profile(profile)
+    return ReportDecoder()
+
+
+def run(sessions, batch, update=False):
+    """Check (or with update, rewrite) each session's golden; True if all match"""
+    ok = True
+    total = 0
+    start = time.perf_counter()
+    for path in sessions:
+        result = replay(path, batch)
+        total += len(result.arrays)
+        golden = golden_path(path)
+        name = os.path.basename(path)
+        if update:
+            save_golden(golden, result)
+            print(f"[OK] {name}: wrote {len(result)} states")
+            continue
+        if not os.path.exists(golden):
+            ok = False
+            print(f"[X] {name}: no golden ({os.path.basename(golden)}), run with --update")
+            continue
+        golden_index, golden_states = load_golden(golden)
+        position = first_divergence(golden_index, golden_states, result)
+        if position is None:
+            print(f"[OK] {name}: {len(result)} states match")
+        else:
+            ok = False
+            print(f"[X] {name}")
+            for line in describe_divergence(position, golden_index, golden_states, result):
+                print("    " + line)
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(sessions)} sessions, {total:,} records in {elapsed:.2f} s "
+          f"({total / max(elapsed, 1e-9) / 1e6:.1f} M records/s)")
+    return ok
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay recorded sessions and compare with golden outputs")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_CORPUS],
+                        help="captures or directories of captures (default: %(default)s)")
+    parser.add_argument("--update", action="store_true", help="write the goldens instead of checking them")
+    parser.add_argument("--profile", help="decode with a mapping profile (Bridge/mapping_profile.py)")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="write generated sessions into the first directory and their goldens")
+    args = parser.parse_args()
+
+    _require_numpy()
+    batch = BatchDecoder(make_decoder(args.profile))
+    if args.synthetic:
+        write_synthetic(args.paths[0])
+        args.update = True
+    sessions = find_sessions(args.paths)
+    if not sessions:
+        print(f"No captures found in {', '.join(args.paths)} (record some, or use --synthetic)")
+        sys.exit(1)
+    if not run(sessions, batch, args.update):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Live Screen
+Flicker-free terminal display shared by the live testing tools.
+
+The tools used to clear the screen and reprint every line on each report.
+LiveScreen keeps the last frame it drew and only rewrites the cells that
+changed, as one buffered write per frame. Frames are drawn on a separate
+thread at most `fps` times a second, so the read loop only hands over
+the latest state and never waits on the terminal:
+
+    screen = LiveScreen(render, fps=30)   # render(state) -> list of lines
+    with screen:
+        while True:
+            data = h.read(64, 100)
+            if data:
+                screen.update(bytes(data))
+
+Updates that arrive faster than the frame rate are coalesced; only the
+newest state is drawn.
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+
+DEFAULT_FPS = 30
+MERGE_GAP = 6   # unchanged cells cheaper to rewrite than a cursor move
+
+CSI = "\033["
+HIDE_CURSOR = CSI + "?25l"
+SHOW_CURSOR = CSI + "?25h"
+CLEAR_SCREEN = CSI + "H" + CSI + "J"
+
+
+def _changed_runs(old, new):
+    """[(start, end)] column ranges where two equal-length rows differ"""
+    runs = []
+    start = end = None
+    for i, (a, b) in enumerate(zip(old, new)):
+        if a == b:
+            continue
+        if start is not None and i - end <= MERGE_GAP:
+            end = i
+        else:
+            if start is not None:
+                runs.append((start, end + 1))
+            start = end = i
+    if start is not None:
+        runs.append((start, end + 1))
+    return runs
+
+
+class LiveScreen:
+    """Diff-based full-screen renderer running on its own thread"""
+
+    def __init__(self, render=None, fps=DEFAULT_FPS, stream=None):
+        self.render = render or (lambda lines: lines)
+        self.interval = 1.0 / fps
+        self.stream = stream or sys.stdout
+        self.frames = 0
+        self.bytes_written = 0
+        self.updates = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._state = None
+        self._version = 0
+        self._drawn_version = 0
+        self._rows = []          # what is on the terminal now
+        self._size = None
+        self._thread = None
+        self._running = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        if os.name == "nt":
+            os.system("")    # turns on ANSI escape handling in the Windows console
+        self._write(HIDE_CURSOR + CLEAR_SCREEN)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="live-screen", daemon=True)
+        self._thread.start()
+
+    def update(self, state):
+        """Hand over the newest state; never blocks on the terminal"""
+        with self._lock:
+            self._state = state
+            self._version += 1
+        self.updates += 1
+        self._wake.set()
+
+    def stop(self):
+        """Draw the final state and leave the cursor below it"""
+        if self._thread is None:
+            return
+        self._running = False
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self._draw()
+        self._write(f"{CSI}{len(self._rows) + 1};1H" + SHOW_CURSOR)
+
+    def stats(self):
+        return {"updates": self.updates, "frames": self.frames, "bytes": self.bytes_written}
+
+    def _run(self):
+        next_frame = 0.0
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)    # updates arriving meanwhile are coalesced
+            if not self._running:
+                break
+            next_frame = time.perf_counter() + self.interval
+            self._draw()
+
+    def _draw(self):
+        with self._lock:
+            state, version = self._state, self._version
+        if version == self._drawn_version:
+            return
+        self._drawn_version = version
+        try:
+            lines = list(self.render(state))
+        except Exception as e:
+            lines = [f"[X] Render error: {e}"]
+
+        size = shutil.get_terminal_size()
+        out = []
+        if size != self._size:
+            # A resize reflows what was on screen: start from a blank one
+            if self._size is not None:
+                out.append(CLEAR_SCREEN)
+            self._rows = []
+            self._size = size
+        # Clip so nothing wraps and row/column positions stay exact
+        width = max(1, size.columns - 1)
+        rows = [line[:width] for line in lines[:max(1, size.lines - 1)]]
+
+        for r in range(max(len(rows), len(self._rows))):
+            old = self._rows[r] if r < len(self._rows) else ""
+            new = rows[r] if r < len(rows) else ""
+            if old == new:
+                continue
+            length = max(len(old), len(new))
+            old, padded = old.ljust(length), new.ljust(length)
+            for start, end in _changed_runs(old, padded):
+                out.append(f"{CSI}{r + 1};{start + 1}H{padded[start:end]}")
+        self._rows = rows
+
+        if out:
+            self._write("".join(out))
+        self.frames += 1
+
+    def _write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+        self.bytes_written += len(text)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Report Rate Profiler
+Measures how often the controller really sends reports and how regular
+they are. Reads in a tight blocking loop (no sleeps), timestamps every
+report with time.perf_counter_ns() and saves them to a capture file, then
+reports:
+
+    achieved rate      reports/s over the whole run
+    inter-arrival      percentiles, jitter around the median and a histogram
+    duplicates         reports identical to the previous one
+    bursts / gaps      arrivals far closer / further apart than the median
+    poll simulation    for each bridge poll interval, how many reports would
+                       be superseded before being read and how long the
+                       newest one waits
+
+Saved captures can be profiled again or compared later without the
+controller:
+
+    python profile_report_rate.py -o rate.vxcap --seconds 10
+    python profile_report_rate.py --from-capture rate.vxcap --poll 1 5 8
+    python profile_report_rate.py --compare before.vxcap after.vxcap
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from capture_format import CaptureReader, CaptureWriter
+from device_discovery import find_controller, VITURE_VID, NORMAL_PID
+
+READ_TIMEOUT_MS = 100
+DEFAULT_SECONDS = 10.0
+DEFAULT_POLLS_MS = (1.0, 5.0, 8.0, 16.0)   # 5 ms is the bridge's fallback loop
+HISTOGRAM_BIN_US = 250
+HISTOGRAM_BINS = 40
+BURST_FRACTION = 0.25    # closer than this x median: delivered back to back
+GAP_FACTOR = 1.5         # further than this x median: late or lost
+
+
+def record(path, seconds=DEFAULT_SECONDS):
+    """Read reports as fast as they arrive for `seconds`; returns the count"""
+    import hid
+
+    device = find_controller()
+    if not device:
+        raise RuntimeError("controller not found")
+    h = hid.device()
+    h.open_path(device['path'])
+    count = 0
+    try:
+        with CaptureWriter(path) as writer:
+            writer.write_marker(time.perf_counter_ns(), f"profile:start {seconds:g}s "
+                                f"{device['vendor_id']:04X}:{device['product_id']:04X} "
+                                f"interface {device.get('interface_number', -1)}")
+            deadline = time.perf_counter_ns() + int(seconds * 1e9)
+            while True:
+                data = h.read(64, READ_TIMEOUT_MS)
+                now = time.perf_counter_ns()
+                if data:
+                    writer.write_report(now, data)
+                    count += 1
+                if now >= deadline:
+                    break
+            writer.write_marker(time.perf_counter_ns(), "profile:end")
+    finally:
+        h.close()
+    return count
+
+
+def load_reports(path):
+    """{report_id: ([timestamp_ns], [payload])} for the input reports in a capture"""
+    streams = {}
+    for record in CaptureReader(path).reports():
+        stamps, payloads = streams.setdefault(record.report_id, ([], []))
+        stamps.append(record.timestamp_ns)
+        payloads.append(record.data)
+    return streams
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def simulate_poll(stamps, interval_ns):
+    """What a reader polling every `interval_ns` would see.
+
+    The poller keeps only the newest report queued at each poll, like a
+    bridge that cares about current state. Returns superseded reports,
+    polls with nothing new, and how long each report (that is, the input
+    change it carries) waited for the next poll.
+    """
+    if len(stamps) < 2:
+        return {"polls": 0, "superseded": 0, "empty": 0, "delay_ms": (0.0, 0.0, 0.0)}
+    start = stamps[0]
+    polls = (stamps[-1] - start) // interval_ns + 1
+    superseded = 0
+    waits = []
+    i = 0
+    n = len(stamps)
+    busy_polls = 0
+    for k in range(1, polls + 1):
+        poll_time = start + k * interval_ns
+        first = i
+        while i < n and stamps[i] <= poll_time:
+            waits.append(poll_time - stamps[i])
+            i += 1
+        if i > first:
+            busy_polls += 1
+            superseded += i - first - 1
+    waits.sort()
+    return {
+        "polls": polls,
+        "superseded": superseded,
+        "empty": polls - busy_polls,
+        "delay_ms": (sum(waits) / len(waits) / 1e6 if waits else 0.0,
+                     percentile(waits, 99) / 1e6, (waits[-1] if waits else 0) / 1e6),
+    }
+
+
+def profile(stamps, payloads, polls_ms=DEFAULT_POLLS_MS):
+    """Rate, jitter, duplicate/gap and poll statistics for one report stream"""
+    n = len(stamps)
+    result = {"reports": n}
+    if n < 2:
+        return result
+    deltas = [b - a for a, b in zip(stamps, stamps[1:])]
+    ordered = sorted(deltas)
+    median = percentile(ordered, 50)
+    duration = (stamps[-1] - stamps[0]) / 1e9
+    deviation = sorted(abs(d - median) for d in deltas)
+
+    gaps = [d for d in deltas if d > GAP_FACTOR * median]
+    # A long interval followed by a burst is a late report, not a lost one,
+    # so count missing reports against the expected total instead
+    expected = round((stamps[-1] - stamps[0]) / median) + 1 if median else n
+    histogram = [0] * (HISTOGRAM_BINS + 1)
+    for d in deltas:
+        histogram[max(0, min(HISTOGRAM_BINS, d // (HISTOGRAM_BIN_US * 1000)))] += 1
+
+    result.update({
+        "duration_s": duration,
+        "rate_hz": (n - 1) / duration if duration else 0.0,
+        "interval_ms": {p: percentile(ordered, p) / 1e6 for p in (0, 1, 50, 90, 99, 99.9, 100)},
+        "mean_ms": sum(deltas) / len(deltas) / 1e6,
+        "jitter_ms": {p: percentile(deviation, p) / 1e6 for p in (50, 99, 100)},
+        "duplicates": sum(1 for a, b in zip(payloads, payloads[1:]) if a == b),
+        "bursts": sum(1 for d in deltas if d < BURST_FRACTION * median),
+        "gaps": len(gaps),
+        "longest_gap_ms": max(gaps) / 1e6 if gaps else 0.0,
+        "missing_estimate": max(0, expected - n),
+        "histogram": histogram,
+        "polls": {ms: simulate_poll(stamps, int(ms * 1e6)) for ms in polls_ms},
+    })
+    return result
+
+
+def print_histogram(histogram, width=50):
+    top = max(histogram) or 1
+    for i, count in enumerate(histogram):
+        if not count:
+            continue
+        low = i * HISTOGRAM_BIN_US / 1000
+        label = f">={low:5.2f} ms" if i == HISTOGRAM_BINS else f"{low:5.2f}-{low + HISTOGRAM_BIN_US / 1000:5.2f} ms"
+        print(f"  {label:<16} {'#' * max(1, round(count / top * width)):<{width}} {count}")
+
+
+def print_profile(report_id, result):
+    print(f"\nReport ID {report_id}: {result['reports']} reports")
+    if result["reports"] < 2:
+        print("  not enough reports to profile")
+        return
+    iv = result["interval_ms"]
+    jit = result["jitter_ms"]
+    print(f"  Achieved rate:   {result['rate_hz']:.1f} Hz over {result['duration_s']:.2f} s")
+    print(f"  Inter-arrival:   min {iv[0]:.3f}  p1 {iv[1]:.3f}  median {iv[50]:.3f}  p90 {iv[90]:.3f}  "
+          f"p99 {iv[99]:.3f}  p99.9 {iv[99.9]:.3f}  max {iv[100]:.3f} ms (mean {result['mean_ms']:.3f})")
+    print(f"  Jitter:          |interval - median| p50 {jit[50]:.3f}  p99 {jit[99]:.3f}  max {jit[100]:.3f} ms")
+    print(f"  Duplicates:      {result['duplicates']} reports identical to the previous one")
+    print(f"  Bursts:          {result['bursts']} arrivals under {BURST_FRACTION:g}x the median interval")
+    print(f"  Gaps:            {result['gaps']} over {GAP_FACTOR:g}x the median (late or lost), longest "
+          f"{result['longest_gap_ms']:.2f} ms; ~{result['missing_estimate']} reports missing overall")
+    print("\n  Inter-arrival histogram:")
+    print_histogram(result["histogram"])
+    print("\n  Poll simulation (reader keeps the newest report per poll):")
+    print(f"  {'poll':>8} {'polls':>7} {'superseded':>11} {'empty polls':>12} {'wait mean':>10} {'p99':>8} {'max':>8}")
+    for ms, sim in result["polls"].items():
+        mean, p99, worst = sim["delay_ms"]
+        share = sim["superseded"] / result["reports"] * 100
+        print(f"  {ms:6g} ms {sim['polls']:7d} {sim['superseded']:6d} ({share:3.0f}%) {sim['empty']:12d} "
+              f"{mean:8.2f}ms {p99:6.2f}ms {worst:6.2f}ms")
+
+
+def profile_capture(path, polls_ms=DEFAULT_POLLS_MS):
+    """{report_id: profile} for every report ID in a capture"""
+    return {rid: profile(stamps, payloads, polls_ms)
+            for rid, (stamps, payloads) in sorted(load_reports(path).items())}
+
+
+def compare(path_a, path_b, polls_ms=DEFAULT_POLLS_MS):
+    a, b = profile_capture(path_a, polls_ms), profile_capture(path_b, polls_ms)
+    print(f"{'':<24} {os.path.basename(path_a):>20} {os.path.basename(path_b):>20}")
+    for rid in sorted(set(a) | set(b)):
+        ra, rb = a.get(rid, {"reports": 0}), b.get(rid, {"reports": 0})
+        print(f"Report ID {rid}")
+        rows = [("reports", lambda r: r["reports"], "{:d}")]
+        if ra["reports"] > 1 and rb["reports"] > 1:
+            rows += [
+                ("rate Hz", lambda r: r["rate_hz"], "{:.1f}"),
+                ("median interval ms", lambda r: r["interval_ms"][50], "{:.3f}"),
+                ("p99 interval ms", lambda r: r["interval_ms"][99], "{:.3f}"),
+                ("p99 jitter ms", lambda r: r["jitter_ms"][99], "{:.3f}"),
+                ("duplicates", lambda r: r["duplicates"], "{:d}"),
+                ("gaps", lambda r: r["gaps"], "{:d}"),
+            ]
+        for name, get, fmt in rows:
+            print(f"  {name:<22} {fmt.format(get(ra)):>20} {fmt.format(get(rb)):>20}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile the controller's report rate and jitter")
+    parser.add_argument("-o", "--output", default="report_rate.vxcap",
+                        help="capture file to record to (default: %(default)s)")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS,
+                        help="how long to record (default: %(default)s)")
+    parser.add_argument("--poll", type=float, nargs="+", default=list(DEFAULT_POLLS_MS), metavar="MS",
+                        help="bridge poll intervals to simulate (default: %(default)s)")
+    parser.add_argument("--from-capture", metavar="FILE", help="profile an existing capture instead")
+    parser.add_argument("--compare", nargs=2, metavar=("A", "B"), help="compare two captures")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Report Rate Profiler")
+    print("=" * 70)
+    if args.compare:
+        compare(*args.compare, polls_ms=args.poll)
+        sys.exit(0)
+
+    path = args.from_capture
+    if not path:
+        try:
+            import hid
+        except ImportError:
+            print("Error: 'hid' package not installed")
+            sys.exit(1)
+        print(f"Recording from controller (VID: 0x{VITURE_VID:04x}, PID: 0x{NORMAL_PID:04x}) "
+              f"for {args.seconds:g} s - move the sticks so reports keep coming...")
+        try:
+            count = record(args.output, args.seconds)
+            print(f"[OK] {count} reports")
+        except (RuntimeError, OSError) as e:
+            print(f"[X] {e}")
+            sys.exit(1)
+        except KeyboardInterrupt:
+            print("\nStopped early.")
+        path = args.output
+        print(f"[OK] Saved to {path}")
+
+    for report_id, result in profile_capture(path, args.poll).items():
+        print_profile(report_id, result)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Decoder Stress Harness
+Drives the bridge's read path - device backend, report pipeline, decoder
+and button events - with synthetic streams (stick walks, button storms,
+every hat value including 0x1F, fuzzed lengths and report IDs, report ID
+2 vendor frames) instead of the controller. For each stream it reports:
+
+    exceptions   anything the read path raised, grouped by type
+    mismatches   decoder output that differs from a straightforward
+                 reference decode, reports decoded that should have been
+                 ignored (or the other way round), and ignored reports
+                 that still changed the state
+    ceiling      reports/s through pipeline + decoder + button events,
+                 unpaced (and how fast the backend generates them)
+
+With --rate it also paces the backend (tens of kHz are fine) and checks
+the read loop keeps up. No controller or ViGEmBus needed.
+
+    python stress_decoder.py
+    python stress_decoder.py --streams fuzz vendor --count 200000
+    python stress_decoder.py --streams mixed --rate 20000 --seconds 3
+"""
+
+import os
+import sys
+import time
+import traceback
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from button_events import ButtonEventStream
+from controller_state import (
+    BUTTON_MAP, INPUT_REPORT_ID, MIN_REPORT_LENGTH, TRIGGER_LEFT, TRIGGER_RIGHT,
+    XUSB_GAMEPAD_DPAD_UP, XUSB_GAMEPAD_DPAD_DOWN, XUSB_GAMEPAD_DPAD_LEFT, XUSB_GAMEPAD_DPAD_RIGHT,
+    ControllerState, ReportDecoder, parse_hat_switch, scale_axis, scale_inv_axis,
+)
+from device_backend import SyntheticBackend
+from report_pipeline import ReportPipeline
+from synthetic_reports import STREAMS
+
+DEFAULT_COUNT = 50000
+CHECK_COUNT = 20000      # reports per stream compared against the reference
+MAX_EXAMPLES = 3
+
+
+def reference_decode(report):
+    """Plain, table-free decode: (wButtons, LT, RT, LX, LY, RX, RY) or None to ignore"""
+    if len(report) < MIN_REPORT_LENGTH or report[0] != INPUT_REPORT_ID:
+        return None
+    buttons = lt = rt = 0
+    for byte_idx, mask, target in BUTTON_MAP:
+        if report[byte_idx] & mask:
+            if target == TRIGGER_LEFT:
+                lt = 255
+            elif target == TRIGGER_RIGHT:
+                rt = 255
+            else:
+                buttons |= target
+    d_up, d_down, d_left, d_right = parse_hat_switch(report[3])
+    if d_up:    buttons |= XUSB_GAMEPAD_DPAD_UP
+    if d_down:  buttons |= XUSB_GAMEPAD_DPAD_DOWN
+    if d_left:  buttons |= XUSB_GAMEPAD_DPAD_LEFT
+    if d_right: buttons |= XUSB_GAMEPAD_DPAD_RIGHT
+    return (buttons, lt, rt, scale_axis(report[4]), scale_inv_axis(report[5]),
+            scale_axis(report[6]), scale_inv_axis(report[7]))
+
+
+class ReadPath:
+    """The bridge's per-report work, minus the virtual pad"""
+
+    def __init__(self):
+        self.decoder = ReportDecoder()
+        self.state = ControllerState()
+        self.events = ButtonEventStream()
+        self.pipeline = ReportPipeline()
+        self.pipeline.add_inline(self._inline)
+        self.accepted = None
+
+    def _inline(self, timestamp_ns, report):
+        self.accepted = self.decoder.decode_into(report, self.state)
+        self.events.feed(timestamp_ns, report)
+
+    def push(self, report):
+        self.pipeline.push(report)
+
+
+def check_stream(name, count):
+    """Compare the read path with reference_decode; returns (stats, problems)"""
+    backend = SyntheticBackend(name, count=count, seed=1)
+    backend.open()
+    path = ReadPath()
+    stats = Counter()
+    problems = {}
+
+    def problem(kind, report, detail):
+        entry = problems.setdefault(kind, [0, []])
+        entry[0] += 1
+        if len(entry[1]) < MAX_EXAMPLES:
+            entry[1].append((bytes(report[:12]).hex(" "), len(report), detail))
+
+    for _ in range(count):
+        report = backend.read(64)
+        before = path.state.as_tuple()
+        try:
+            path.push(report)
+        except Exception as e:
+            frame = traceback.extract_tb(e.__traceback__)[-1]
+            problem(f"exception {type(e).__name__}", report,
+                    f"{e} at {os.path.basename(frame.filename)}:{frame.lineno}")
+            continue
+        expected = reference_decode(report)
+        got = path.state.as_tuple()
+        if expected is None:
+            stats["ignored"] += 1
+            if path.accepted:
+                problem("decoded a report that should be ignored", report, got)
+            elif got != before:
+                problem("ignored report changed the state", report, f"{before} -> {got}")
+        else:
+            stats["decoded"] += 1
+            if not path.accepted:
+                problem("ignored a valid report", report, expected)
+            elif got != expected:
+                problem("state differs from reference", report, f"got {got}, expected {expected}")
+    stats["rejected by decoder"] = path.decoder.rejected
+    return stats, problems
+
+
+def measure_ceiling(name, count):
+    """Unpaced reports/s: (pipeline + decoder + events, backend generating them, errors)"""
+    backend = SyntheticBackend(name, count=count, seed=2)
+    backend.open()
+    read = backend.read
+    start = time.perf_counter()
+    reports = [read(64) for _ in range(count)]
+    generated = time.perf_counter() - start
+
+    path = ReadPath()
+    push = path.push
+    errors = 0
+    start = time.perf_counter()
+    for report in reports:
+        try:
+            push(report)
+        except Exception:
+            errors += 1
+    elapsed = time.perf_counter() - start
+    return count / elapsed, count / generated, errors
+
+
+def paced_run(name, rate_hz, seconds):
+    """Paced backend: achieved rate, and how far the reader fell behind"""
+    count = int(rate_hz * seconds)
+    backend = SyntheticBackend(name, rate_hz=rate_hz, count=count, seed=3)
+    backend.open(nonblocking=False)
+    path = ReadPath()
+    period = 1.0 / rate_hz
+    worst_lag = 0.0
+    start = time.perf_counter()
+    for i in range(count):
+        report = backend.read(64, 100)
+        if report:
+            path.push(report)
+        lag = time.perf_counter() - (start + i * period)
+        worst_lag = max(worst_lag, lag)
+    elapsed = time.perf_counter() - start
+    return count / elapsed, worst_lag
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stress the bridge's read path with synthetic reports")
+    parser.add_argument("--streams", nargs="+", choices=list(STREAMS), default=list(STREAMS))
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT,
+                        help="reports per stream for the throughput ceiling (default: %(default)s)")
+    parser.add_argument("--rate", type=float, help="also run each stream paced at this many reports/s")
+    parser.add_argument("--seconds", type=float, default=2.0, help="length of the paced run")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Decoder Stress Harness")
+    print("=" * 70)
+    failed = False
+    for name in args.streams:
+        stats, problems = check_stream(name, min(CHECK_COUNT, args.count))
+        ceiling, generated, errors = measure_ceiling(name, args.count)
+        print(f"\n[{name}] {stats['decoded']} decoded, {stats['ignored']} ignored "
+              f"({stats['rejected by decoder']} rejected by the decoder)")
+        print(f"  ceiling: {ceiling:,.0f} reports/s ({1e6 / ceiling:.1f} us/report) through the read path, "
+              f"generator {generated:,.0f}/s" + (f", {errors} errors" if errors else ""))
+        if args.rate:
+            achieved, worst_lag = paced_run(name, args.rate, args.seconds)
+            kept_up = achieved >= args.rate * 0.98
+            print(f"  paced {args.rate:,.0f}/s: achieved {achieved:,.0f}/s, worst lag "
+                  f"{worst_lag * 1000:.2f} ms {'[OK]' if kept_up else '[X] read loop fell behind'}")
+            failed |= not kept_up
+        if not problems:
+            print("  [OK] no exceptions or mismatches")
+        for kind, (n, examples) in problems.items():
+            failed = True
+            print(f"  [X] {kind}: {n}")
+            for report_hex, length, detail in examples:
+                print(f"      len {length:2d}  {report_hex:<36} {detail}")
+    print("\n" + "=" * 70)
+    print("FAILED" if failed else "All streams passed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,50 @@
 #!/usr/bin/env python3
 """
 Button Diagnostic Tool
-Shows raw byte values to help map buttons correctly
+Shows raw byte values to help map buttons correctly.
+
+With --guided FILE it instead walks you through every button, the D-pad
+and both sticks ("Press and HOLD A"), recording a labelled capture that
+Analysis/mapping_learner.py turns into a mapping profile.
 """
 
+import os
 import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from device_discovery import find_controller
+from capture_format import CaptureWriter
+from mapping_profile import MARKER_PREFIX, capture_steps
+from live_screen import LiveScreen
+
+GUIDED_PREP = 1.5   # seconds to read the prompt, not used for learning
+GUIDED_HOLD = 3.0   # seconds each step is recorded
+READ_TIMEOUT_MS = 100
+SCREEN_FPS = 30
+
+def render_diagnostic(data):
+    b1 = data[1]
+    b2 = data[2]
+    hat = data[3]
+    hex_str = " ".join([f"{b:02x}" for b in data[:10]])
+    return [
+        "=" * 70,
+        "BUTTON DIAGNOSTIC",
+        "=" * 70,
+        "",
+        f"Byte 1: {b1:02x} ({b1:08b})",
+        f"Byte 2: {b2:02x} ({b2:08b})",
+        f"Byte 3 (Hat): {hat:02x} ({hat:08b})",
+        "",
+        "Full first 10 bytes:",
+        f"  {hex_str}",
+        "",
+        "=" * 70,
+        "Press ONE button and HOLD it to see its values",
+        "=" * 70,
+    ]
+
 def test_button_diagnostic():
     try:
         import hid
@@ -14,9 +52,6 @@ def test_button_diagnostic():
         print("Error: 'hid' package not installed")
         return
 
-    TARGET_VID = 0x2DC8
-    TARGET_PID = 0x301F
-
     print("=" * 70)
     print("BUTTON DIAGNOSTIC - Press ONE button at a time")
     print("=" * 70)
@@ -24,18 +59,7 @@ def test_button_diagnostic():
     print("Press Ctrl+C to stop\n")
     
     # Find the device
-    target_device = None
-    for device in hid.enumerate():
-        if device['vendor_id'] == TARGET_VID and device['product_id'] == TARGET_PID:
-            if device['usage_page'] == 1 and device['usage'] == 5:
-                target_device = device
-                break
-    
-    if not target_device:
-        for device in hid.enumerate():
-            if device['vendor_id'] == TARGET_VID and device['product_id'] == TARGET_PID:
-                target_device = device
-                break
+    target_device = find_controller()
     
     if not target_device:
         print("[X] Controller not found!")
@@ -46,47 +70,28 @@ def test_button_diagnostic():
     print("Release and press the next button\n")
     print("-" * 70)
 
+    screen = LiveScreen(render_diagnostic, fps=SCREEN_FPS)
     try:
         h = hid.device()
         h.open_path(target_device['path'])
-        h.set_nonblocking(1)
         
         last_data = None
+        screen.start()
         
         while True:
-            data = h.read(64)
+            # Blocking read: the screen redraws on its own thread
+            data = h.read(64, READ_TIMEOUT_MS)
             if data and len(data) >= 8:
                 # Only show when data changes
                 if data != last_data:
                     last_data = data
-                    
-                    b1 = data[1]
-                    b2 = data[2]
-                    hat = data[3]
-                    
-                    # Clear and show
-                    sys.stdout.write("\033[H\033[J")
-                    print("=" * 70)
-                    print("BUTTON DIAGNOSTIC")
-                    print("=" * 70)
-                    print()
-                    print(f"Byte 1: {b1:02x} ({b1:08b})")
-                    print(f"Byte 2: {b2:02x} ({b2:08b})")
-                    print(f"Byte 3 (Hat): {hat:02x} ({hat:08b})")
-                    print()
-                    print("Full first 10 bytes:")
-                    hex_str = " ".join([f"{b:02x}" for b in data[:10]])
-                    print(f"  {hex_str}")
-                    print()
-                    print("=" * 70)
-                    print("Press ONE button and HOLD it to see its values")
-                    print("=" * 70)
-            
-            time.sleep(0.001)  # Very small delay to prevent excessive CPU
+                    screen.update(bytes(data[:10]))
 
     except KeyboardInterrupt:
+        screen.stop()
         print("\n\nStopped.")
     except Exception as e:
+        screen.stop()
         print(f"\n\nError: {e}")
     finally:
         try:
@@ -94,6 +99,68 @@ def test_button_diagnostic():
         except:
             pass
 
+def record_guided_session(path, hold=GUIDED_HOLD, prep=GUIDED_PREP):
+    """Prompt for each control in turn and record a labelled capture"""
+    try:
+        import hid
+    except ImportError:
+        print("Error: 'hid' package not installed")
+        return
+
+    target_device = find_controller()
+    if not target_device:
+        print("[X] Controller not found!")
+        return
+
+    steps = capture_steps()
+    print("=" * 70)
+    print(f"GUIDED CAPTURE - {len(steps)} steps, about {len(steps) * (hold + prep):.0f} seconds")
+    print("=" * 70)
+    print("Follow each prompt and keep holding until the next one appears.\n")
+
+    h = hid.device()
+    h.open_path(target_device['path'])
+    h.set_nonblocking(1)
+    writer = CaptureWriter(path)
+
+    def record_for(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            data = h.read(64)
+            if data:
+                writer.write_report(time.perf_counter_ns(), data)
+            else:
+                time.sleep(0.001)
+
+    try:
+        for number, (label, prompt) in enumerate(steps, 1):
+            print(f"[{number:2d}/{len(steps)}] {prompt}...")
+            # Reports while the prompt is being read belong to no step
+            writer.write_marker(time.perf_counter_ns(), MARKER_PREFIX + "prepare")
+            record_for(prep)
+            writer.write_marker(time.perf_counter_ns(), MARKER_PREFIX + label)
+            record_for(hold)
+        writer.write_marker(time.perf_counter_ns(), MARKER_PREFIX + "end")
+        print(f"\n[OK] {writer.records} records saved to {path}")
+        print(f"Next: python ../Analysis/mapping_learner.py {path} -o profile.json")
+    except KeyboardInterrupt:
+        print("\n\nStopped - capture is incomplete.")
+    finally:
+        writer.close()
+        h.close()
+
 if __name__ == "__main__":
-    test_button_diagnostic()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show raw button bytes, or record a guided mapping session")
+    parser.add_argument("--guided", metavar="FILE",
+                        help="record a labelled capture for mapping_learner.py")
+    parser.add_argument("--hold", type=float, default=GUIDED_HOLD,
+                        help="seconds to record each guided step (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.guided:
+        record_guided_session(args.guided, args.hold)
+    else:
+        test_button_diagnostic()
 
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Button Events Test
+Runs a ButtonEventStream inline on the pipeline through the bridge's own
+feed (controller_bridge.Bridge), right after decode_into, and checks
+subscribers hear each press and release before push() returns, only for
+the buttons they asked for, with hold durations taken from the report
+timestamps, that the pad's release on disconnect releases held buttons,
+and that a subscriber that raises is counted without stopping the read
+loop. No controller needed.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+
+NEUTRAL = [0x01, 0, 0, 0x0F, 128, 128, 128, 128, 0, 0]
+
+
+class FakePad:
+    """Stands in for vgamepad"""
+
+    def __init__(self):
+        from controller_state import ControllerState
+
+        self.report = ControllerState()
+
+    def update(self):
+        pass
+
+
+def make_bridge():
+    """The bridge's pipeline and feed, with its own event stream"""
+    from button_events import ButtonEventStream
+    from controller_bridge import Bridge
+    from controller_state import ReportDecoder
+    from power_mode import PowerMode
+    from report_pipeline import ReportPipeline
+    from stall_watchdog import StallWatchdog
+
+    pipeline = ReportPipeline()
+    events = ButtonEventStream()
+    bridge = Bridge(FakePad(), None, ReportDecoder(), pipeline, PowerMode(), StallWatchdog(pipeline.ring),
+                    events=events)
+    return bridge, pipeline, events
+
+
+def report(byte1=0, byte2=0, hat=0x0F):
+    r = list(NEUTRAL)
+    r[1], r[2], r[3] = byte1, byte2, hat
+    return r
+
+
+def test_events_arrive_inline():
+    from button_events import BUTTON_A, BUTTON_START, DPAD_UP
+
+    bridge, pipeline, events = make_bridge()
+    heard = []
+    events.subscribe(heard.append)
+
+    pipeline.push(report(), 1_000)
+    assert heard == []
+    pipeline.push(report(byte1=BUTTON_A), 2_000)
+    assert [(e.name, e.pressed) for e in heard] == [("A", True)]
+    pipeline.push(report(byte1=BUTTON_A), 3_000)           # still held: nothing new
+    assert len(heard) == 1
+    pipeline.push(report(byte2=BUTTON_START >> 8, hat=0), 7_000)
+    assert [(e.name, e.pressed) for e in heard[1:]] == [("A", False), ("Start", True), ("D-Up", True)]
+    assert heard[1].held_ns == 5_000
+    assert events.mask == BUTTON_START | DPAD_UP
+    pipeline.stop()
+
+
+def test_subscribers_hear_only_their_buttons():
+    from button_events import BUTTON_A, BUTTON_B
+
+    bridge, pipeline, events = make_bridge()
+    only_b = []
+    token = events.subscribe(only_b.append, BUTTON_B)
+    pipeline.push(report(byte1=BUTTON_A), 1_000)
+    pipeline.push(report(byte1=BUTTON_A | BUTTON_B), 2_000)
+    assert [(e.name, e.pressed) for e in only_b] == [("B", True)]
+
+    events.unsubscribe(token)
+    pipeline.push(report(), 3_000)
+    assert len(only_b) == 1
+    pipeline.stop()
+
+
+def test_release_on_disconnect():
+    from button_events import BUTTON_LB
+
+    bridge, pipeline, events = make_bridge()
+    heard = []
+    events.subscribe(heard.append)
+    pressed_ns = time.perf_counter_ns()
+    pipeline.push(report(byte1=BUTTON_LB), pressed_ns)
+    bridge.release()                                  # the controller went away
+    assert [(e.name, e.pressed) for e in heard] == [("LB", True), ("LB", False)]
+    assert 0 < heard[1].held_ns < time.perf_counter_ns() - pressed_ns
+    assert events.pressed() == []
+    pipeline.stop()
+
+
+def test_failing_subscriber_is_contained():
+    from button_events import BUTTON_A
+
+    bridge, pipeline, events = make_bridge()
+    heard = []
+
+    def broken(event):
+        raise RuntimeError("macro bug")
+    token = events.subscribe(broken)
+    events.subscribe(heard.append)
+    pipeline.push(report(byte1=BUTTON_A), 1_000)      # must not raise into the read loop
+    pipeline.push(report(), 2_000)
+    assert [(e.name, e.pressed) for e in heard] == [("A", True), ("A", False)]
+    assert events.errors == {token: 2}
+    pipeline.stop()
+
+
+if __name__ == "__main__":
+    test_events_arrive_inline()
+    test_subscribers_hear_only_their_buttons()
+    test_release_on_disconnect()
+    test_failing_subscriber_is_contained()
+    print("PASSED")
@@ -5,8 +5,18 @@ Tests and displays all button inputs from the VITURE x 8BitDo controller
 using the same mapping logic as controller_bridge.py
 """
 
+import os
 import sys
 import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from button_events import ButtonEventStream
+from device_discovery import find_controller, VITURE_VID, NORMAL_PID
+from live_screen import LiveScreen
+
+READ_TIMEOUT_MS = 100  # lets Ctrl+C through while waiting for a report
+SCREEN_FPS = 30
 
 def parse_hat_switch(hat_value):
     """
@@ -40,6 +50,107 @@ def parse_hat_switch(hat_value):
     
     return directions[hat_value] if hat_value < 8 else (False, False, False, False)
 
+BUTTON_MAP_1 = [
+    (0x01, "A", "XUSB_GAMEPAD_A"),
+    (0x02, "B", "XUSB_GAMEPAD_B"),
+    (0x04, "X", "XUSB_GAMEPAD_X"),
+    (0x08, "Y", "XUSB_GAMEPAD_Y"),
+    (0x10, "LB (L1)", "XUSB_GAMEPAD_LEFT_SHOULDER"),
+    (0x20, "RB (R1)", "XUSB_GAMEPAD_RIGHT_SHOULDER"),
+    (0x40, "L2", "Left Trigger"),
+    (0x80, "R2", "Right Trigger"),
+]
+
+BUTTON_MAP_2 = [
+    (0x01, "Select", "XUSB_GAMEPAD_BACK"),
+    (0x02, "Start", "XUSB_GAMEPAD_START"),
+    (0x04, "Home", "XUSB_GAMEPAD_GUIDE"),
+    (0x08, "LS Click", "XUSB_GAMEPAD_LEFT_THUMB"),
+    (0x10, "RS Click", "XUSB_GAMEPAD_RIGHT_THUMB"),
+    (0x20, "Rear 1?", "Not mapped"),
+    (0x40, "Rear 2?", "Not mapped"),
+    (0x80, "Reserved?", "Not mapped"),
+]
+
+def render_mapping(snapshot):
+    """Screen lines for (report bytes, pressed buttons, recent events)"""
+    data, active_buttons, recent_events = snapshot
+    
+    # Parse using same logic as controller_bridge.py
+    b1 = data[1]  # Button Byte 1
+    b2 = data[2]  # Button Byte 2
+    hat = data[3] # D-Pad Hat Switch
+    
+    lines = []
+    lines.append("=" * 70)
+    lines.append("BUTTON MAPPING TEST - Live Input Display")
+    lines.append("=" * 70)
+    lines.append("")
+    
+    # Raw Data
+    lines.append("Raw Data (first 10 bytes):")
+    hex_str = " ".join([f"{b:02x}" for b in data[:10]])
+    lines.append(f"  {hex_str}")
+    lines.append(f"  Byte 1: {b1:02x} ({b1:08b})")
+    lines.append(f"  Byte 2: {b2:02x} ({b2:08b})")
+    lines.append(f"  Hat:    {hat:02x} ({hat:08b})")
+    lines.append("")
+    
+    # Buttons from Byte 1 and Byte 2
+    for title, value, button_map in (("Buttons from Byte 1:", b1, BUTTON_MAP_1),
+                                     ("Buttons from Byte 2:", b2, BUTTON_MAP_2)):
+        lines.append(title)
+        for mask, name, xbox_name in button_map:
+            if value & mask:
+                lines.append(f"  [*] {name:12s} -> {xbox_name}")
+            else:
+                lines.append(f"  [ ] {name:12s}")
+        lines.append("")
+    
+    # D-Pad from Hat Switch
+    lines.append("D-Pad (Hat Switch):")
+    d_up, d_down, d_left, d_right = parse_hat_switch(hat)
+    
+    hat_names = [
+        (d_up, "Up", "XUSB_GAMEPAD_DPAD_UP"),
+        (d_down, "Down", "XUSB_GAMEPAD_DPAD_DOWN"),
+        (d_left, "Left", "XUSB_GAMEPAD_DPAD_LEFT"),
+        (d_right, "Right", "XUSB_GAMEPAD_DPAD_RIGHT"),
+    ]
+    
+    for pressed, name, xbox_name in hat_names:
+        if pressed:
+            lines.append(f"  [*] {name:12s} -> {xbox_name}")
+        else:
+            lines.append(f"  [ ] {name:12s}")
+    lines.append(f"  Hat Value: {hat:02x} ({hat})")
+    
+    # Joystick positions
+    lines.append("")
+    lines.append("Joystick Positions:")
+    lx, ly = data[4], data[5]
+    rx, ry = data[6], data[7]
+    lines.append(f"  Left Stick:  X={lx:3d} ({lx:08b}), Y={ly:3d} ({ly:08b})")
+    lines.append(f"  Right Stick: X={rx:3d} ({rx:08b}), Y={ry:3d} ({ry:08b})")
+    
+    # Recent events (bridge mapping, from the event stream)
+    lines.append("")
+    lines.append("Recent Events:")
+    for event in recent_events:
+        if event.pressed:
+            lines.append(f"  [*] {event.name} pressed")
+        else:
+            lines.append(f"  [ ] {event.name} released after {event.held_ns / 1e6:.0f} ms")
+    
+    lines.append("")
+    lines.append("=" * 70)
+    if active_buttons:
+        lines.append(f"ACTIVE: {', '.join(active_buttons)}")
+    else:
+        lines.append("No buttons pressed")
+    lines.append("=" * 70)
+    return lines
+
 def test_button_mapping():
     try:
         import hid
@@ -48,28 +159,13 @@ def test_button_mapping():
         print("Install it with: pip install hid")
         return
 
-    TARGET_VID = 0x2DC8
-    TARGET_PID = 0x301F
-
     print("=" * 70)
     print("VITURE x 8BitDo Controller - Button Mapping Tester")
     print("=" * 70)
-    print(f"Looking for controller (VID: 0x{TARGET_VID:04x}, PID: 0x{TARGET_PID:04x})...")
+    print(f"Looking for controller (VID: 0x{VITURE_VID:04x}, PID: 0x{NORMAL_PID:04x})...")
     
-    # Find the device
-    target_device = None
-    for device in hid.enumerate():
-        if device['vendor_id'] == TARGET_VID and device['product_id'] == TARGET_PID:
-            if device['usage_page'] == 1 and device['usage'] == 5:
-                target_device = device
-                break
-    
-    if not target_device:
-        # Fallback
-        for device in hid.enumerate():
-            if device['vendor_id'] == TARGET_VID and device['product_id'] == TARGET_PID:
-                target_device = device
-                break
+    # Find the device (gamepad collection first, any interface as fallback)
+    target_device = find_controller()
     
     if not target_device:
         print("[X] Controller not found!")
@@ -86,153 +182,32 @@ def test_button_mapping():
     print("=" * 70)
     print()
 
+    screen = LiveScreen(render_mapping, fps=SCREEN_FPS)
     try:
         h = hid.device()
         h.open_path(target_device['path'])
-        h.set_nonblocking(1)
         
         last_data = None
+        events = ButtonEventStream()
+        recent_events = deque(maxlen=5)
+        events.subscribe(recent_events.append)
+        screen.start()
         
         while True:
-            data = h.read(64)
+            # Blocking read: the screen redraws on its own thread
+            data = h.read(64, READ_TIMEOUT_MS)
             if data and len(data) >= 8:
-                # Only update display if data changed
+                events.feed(time.perf_counter_ns(), data)
+                # Only hand the screen a new state if data changed
                 if data != last_data:
                     last_data = data
-                    
-                    # Parse using same logic as controller_bridge.py
-                    b1 = data[1]  # Button Byte 1
-                    b2 = data[2]  # Button Byte 2
-                    hat = data[3] # D-Pad Hat Switch
-                    
-                    # Clear screen (Windows compatible)
-                    sys.stdout.write("\033[H\033[J")
-                    
-                    print("=" * 70)
-                    print("BUTTON MAPPING TEST - Live Input Display")
-                    print("=" * 70)
-                    print()
-                    
-                    # Raw Data
-                    print("Raw Data (first 10 bytes):")
-                    hex_str = " ".join([f"{b:02x}" for b in data[:10]])
-                    print(f"  {hex_str}")
-                    print(f"  Byte 1: {b1:02x} ({b1:08b})")
-                    print(f"  Byte 2: {b2:02x} ({b2:08b})")
-                    print(f"  Hat:    {hat:02x} ({hat:08b})")
-                    print()
-                    
-                    # Buttons from Byte 1
-                    print("Buttons from Byte 1:")
-                    buttons_1 = []
-                    button_map_1 = [
-                        (0x01, "A", "XUSB_GAMEPAD_A"),
-                        (0x02, "B", "XUSB_GAMEPAD_B"),
-                        (0x04, "X", "XUSB_GAMEPAD_X"),
-                        (0x08, "Y", "XUSB_GAMEPAD_Y"),
-                        (0x10, "LB (L1)", "XUSB_GAMEPAD_LEFT_SHOULDER"),
-                        (0x20, "RB (R1)", "XUSB_GAMEPAD_RIGHT_SHOULDER"),
-                        (0x40, "L2", "Left Trigger"),
-                        (0x80, "R2", "Right Trigger"),
-                    ]
-                    
-                    for mask, name, xbox_name in button_map_1:
-                        if b1 & mask:
-                            buttons_1.append(f"[*] {name:12s} -> {xbox_name}")
-                        else:
-                            buttons_1.append(f"[ ] {name:12s}")
-                    
-                    for btn in buttons_1:
-                        print(f"  {btn}")
-                    print()
-                    
-                    # Buttons from Byte 2
-                    print("Buttons from Byte 2:")
-                    buttons_2 = []
-                    button_map_2 = [
-                        (0x01, "Select", "XUSB_GAMEPAD_BACK"),
-                        (0x02, "Start", "XUSB_GAMEPAD_START"),
-                        (0x04, "Home", "XUSB_GAMEPAD_GUIDE"),
-                        (0x08, "LS Click", "XUSB_GAMEPAD_LEFT_THUMB"),
-                        (0x10, "RS Click", "XUSB_GAMEPAD_RIGHT_THUMB"),
-                        (0x20, "Rear 1?", "Not mapped"),
-                        (0x40, "Rear 2?", "Not mapped"),
-                        (0x80, "Reserved?", "Not mapped"),
-                    ]
-                    
-                    for mask, name, xbox_name in button_map_2:
-                        if b2 & mask:
-                            buttons_2.append(f"[*] {name:12s} -> {xbox_name}")
-                        else:
-                            buttons_2.append(f"[ ] {name:12s}")
-                    
-                    for btn in buttons_2:
-                        print(f"  {btn}")
-                    print()
-                    
-                    # D-Pad from Hat Switch
-                    print("D-Pad (Hat Switch):")
-                    d_up, d_down, d_left, d_right = parse_hat_switch(hat)
-                    
-                    hat_names = [
-                        (d_up, "Up", "XUSB_GAMEPAD_DPAD_UP"),
-                        (d_down, "Down", "XUSB_GAMEPAD_DPAD_DOWN"),
-                        (d_left, "Left", "XUSB_GAMEPAD_DPAD_LEFT"),
-                        (d_right, "Right", "XUSB_GAMEPAD_DPAD_RIGHT"),
-                    ]
-                    
-                    hat_display = []
-                    for pressed, name, xbox_name in hat_names:
-                        if pressed:
-                            hat_display.append(f"[*] {name:12s} -> {xbox_name}")
-                        else:
-                            hat_display.append(f"[ ] {name:12s}")
-                    
-                    for hat_btn in hat_display:
-                        print(f"  {hat_btn}")
-                    print(f"  Hat Value: {hat:02x} ({hat})")
-                    
-                    # Joystick positions
-                    print()
-                    print("Joystick Positions:")
-                    lx, ly = data[4], data[5]
-                    rx, ry = data[6], data[7]
-                    print(f"  Left Stick:  X={lx:3d} ({lx:08b}), Y={ly:3d} ({ly:08b})")
-                    print(f"  Right Stick: X={rx:3d} ({rx:08b}), Y={ry:3d} ({ry:08b})")
-                    
-                    # Summary of pressed buttons
-                    active_buttons = []
-                    if b1 & 0x01: active_buttons.append("A")
-                    if b1 & 0x02: active_buttons.append("B")
-                    if b1 & 0x04: active_buttons.append("X")
-                    if b1 & 0x08: active_buttons.append("Y")
-                    if b1 & 0x10: active_buttons.append("LB")
-                    if b1 & 0x20: active_buttons.append("RB")
-                    if b1 & 0x40: active_buttons.append("L2")
-                    if b1 & 0x80: active_buttons.append("R2")
-                    if b2 & 0x01: active_buttons.append("Select")
-                    if b2 & 0x02: active_buttons.append("Start")
-                    if b2 & 0x04: active_buttons.append("Home")
-                    if b2 & 0x08: active_buttons.append("LS")
-                    if b2 & 0x10: active_buttons.append("RS")
-                    if d_up: active_buttons.append("D-Up")
-                    if d_down: active_buttons.append("D-Down")
-                    if d_left: active_buttons.append("D-Left")
-                    if d_right: active_buttons.append("D-Right")
-                    
-                    print()
-                    print("=" * 70)
-                    if active_buttons:
-                        print(f"ACTIVE: {', '.join(active_buttons)}")
-                    else:
-                        print("No buttons pressed")
-                    print("=" * 70)
-            
-            time.sleep(0.01)  # Small delay to avoid excessive CPU usage
+                    screen.update((bytes(data[:10]), events.pressed(), tuple(recent_events)))
 
     except KeyboardInterrupt:
+        screen.stop()
         print("\n\nStopping test...")
     except Exception as e:
+        screen.stop()
         print(f"\n\nError: {e}")
         import traceback
         traceback.print_exc()
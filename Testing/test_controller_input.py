@@ -4,9 +4,13 @@ Controller Input Tester
 Reads raw HID reports from the VITURE x 8BitDo controller and prints them.
 """
 
+import os
 import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from device_discovery import find_controller, VITURE_VID, NORMAL_PID
+
 def test_input():
     try:
         import hid
@@ -14,22 +18,11 @@ def test_input():
         print("Error: 'hid' package not installed")
         return
 
-    TARGET_VID = 0x2DC8
-    TARGET_PID = 0x301F
-
-    print(f"Looking for controller (VID: 0x{TARGET_VID:04x}, PID: 0x{TARGET_PID:04x})...")
+    print(f"Looking for controller (VID: 0x{VITURE_VID:04x}, PID: 0x{NORMAL_PID:04x})...")
     
-    # Find the device
-    target_device = None
-    for device in hid.enumerate():
-        if device['vendor_id'] == TARGET_VID and device['product_id'] == TARGET_PID:
-            # We want the interface with Usage Page 1, Usage 5 (Game Pad)
-            if device['usage_page'] == 1 and device['usage'] == 5:
-                target_device = device
-                break
-            # Fallback: just take the first one if we can't distinguish
-            if target_device is None:
-                target_device = device
+    # Find the device - we want the interface with Usage Page 1, Usage 5 (Game Pad),
+    # falling back to any interface if we can't distinguish
+    target_device = find_controller()
     
     if not target_device:
         print("Controller not found.")
@@ -38,27 +31,27 @@ def test_input():
     print(f"Found device: {target_device['product_string']}")
     print(f"Path: {target_device['path']}")
     print("\nListening for inputs... (Press Ctrl+C to stop)")
-    print("Each line represents a data packet from the controller.")
+    print("Each line represents a data packet from the controller, with the time since the previous one.")
+    print("For rate and jitter statistics use profile_report_rate.py.")
     print("-" * 60)
 
     try:
         h = hid.device()
         h.open_path(target_device['path'])
-        
-        # Set non-blocking
-        h.set_nonblocking(1)
 
-        last_print = 0
+        last_time = None
         
         while True:
-            # Read up to 64 bytes
-            data = h.read(64)
+            # Block until the next report (timeout lets Ctrl+C through); a
+            # fixed sleep here would hide the controller's real report rate
+            data = h.read(64, 100)
             if data:
+                now = time.perf_counter_ns()
+                gap = f"+{(now - last_time) / 1e6:7.2f} ms" if last_time else " " * 10
+                last_time = now
                 # Convert to hex string
                 hex_data = " ".join([f"{b:02x}" for b in data])
-                print(f"Data: {hex_data}")
-            
-            time.sleep(0.01)
+                print(f"{gap}  Data: {hex_data}")
 
     except KeyboardInterrupt:
         print("\nStopping...")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Golden Replay Test
+Checks the batch decoder against the bridge's decode_into report by
+report (default mapping and a few decoder options), that a recorded
+session replays clean against its own golden, that a mapping change and
+a dropped report are caught at the right record, and that replay runs at
+millions of reports per second. No controller needed.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Bridge"))
+sys.path.insert(0, os.path.join(HERE, "..", "Analysis"))
+
+SESSION_REPORTS = 400000
+MIN_RATE = 1_000_000      # records/s through load + decode + compare
+
+
+def scalar_states(decoder, reports):
+    from controller_state import ControllerState
+
+    state = ControllerState()
+    return [bytes(state) for report in reports if decoder.decode_into(report, state)]
+
+
+def batch_frames(reports, width=8):
+    from batch_decoder import np
+
+    frames = np.zeros((len(reports), width), dtype=np.uint8)
+    lengths = np.array([len(r) for r in reports])
+    for i, report in enumerate(reports):
+        frames[i, :min(len(report), width)] = list(report[:width])
+    return frames, lengths
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"inverted_axes": ("LX",)},
+    {"hat_values": {"up": 1, "right": 2, "down": 4, "left": 8}},
+    {"deadzone": 0.25},
+], ids=["default", "lx-inverted", "bitwise-hat", "deadzone-25"])
+def test_batch_matches_decode_into(options):
+    from batch_decoder import BatchDecoder, np
+    from controller_state import ReportDecoder
+    from synthetic_reports import make_stream
+
+    stream = make_stream("mixed", seed=7)
+    reports = [bytes(next(stream)) for _ in range(20000)]
+    decoder = ReportDecoder(**options)
+    accepted, states = BatchDecoder(decoder).decode(*batch_frames(reports))
+    expected = scalar_states(decoder, reports)
+    assert int(accepted.sum()) == len(expected) < len(reports)
+    assert states.view(np.uint8).tobytes() == b"".join(expected)
+
+
+def write_session(path, count):
+    from capture_format import CaptureWriter
+    from synthetic_reports import make_stream
+
+    walk = make_stream("walk", seed=3)
+    rng = random.Random(3)
+    with CaptureWriter(path) as writer:
+        writer.write_marker(0, "session start")
+        for i in range(count):
+            report = next(walk)
+            if i == count // 2:
+                writer.write_marker(i * 1_000_000, "A pressed")
+            if i >= count // 2 and i < count // 2 + 50:
+                report[1] |= 0x01                  # A held for 50 reports
+            if rng.random() < 0.001:
+                report = report[:5]                # short read, ignored by the bridge
+            writer.write_report((i + 1) * 1_000_000, report)
+
+
+def record_session(directory):
+    """A recorded session and its golden, from the default decoder"""
+    from batch_decoder import BatchDecoder
+    from controller_state import ReportDecoder
+    import golden_replay
+
+    path = os.path.join(directory, "session.vxcap")
+    write_session(path, SESSION_REPORTS)
+    golden_replay.save_golden(golden_replay.golden_path(path),
+                              golden_replay.replay(path, BatchDecoder(ReportDecoder())))
+    return path
+
+
+@pytest.fixture(scope="module")
+def session(tmp_path_factory):
+    return record_session(str(tmp_path_factory.mktemp("golden")))
+
+
+def test_replay_matches_own_golden_at_speed(session):
+    from batch_decoder import BatchDecoder
+    from controller_state import ReportDecoder
+    import golden_replay
+
+    batch = BatchDecoder(ReportDecoder())
+    start = time.perf_counter()
+    result = golden_replay.replay(session, batch)
+    golden_index, golden_states = golden_replay.load_golden(golden_replay.golden_path(session))
+    position = golden_replay.first_divergence(golden_index, golden_states, result)
+    rate = len(result.arrays) / (time.perf_counter() - start)
+    print(f"replay + compare: {rate / 1e6:.1f} M records/s")
+    assert position is None
+    assert len(result) < len(result.arrays)      # markers and short reads yield no state
+    assert rate >= MIN_RATE
+
+
+def test_mapping_change_caught_at_first_affected_state(session):
+    from batch_decoder import BatchDecoder, np
+    from controller_state import BUTTON_MAP, XUSB_GAMEPAD_A, XUSB_GAMEPAD_B, ReportDecoder
+    import golden_replay
+
+    golden_index, golden_states = golden_replay.load_golden(golden_replay.golden_path(session))
+    # Swap A and B: the first state with only one of them held must be flagged
+    swapped = {XUSB_GAMEPAD_A: XUSB_GAMEPAD_B, XUSB_GAMEPAD_B: XUSB_GAMEPAD_A}
+    button_map = [(byte, mask, swapped.get(target, target)) for byte, mask, target in BUTTON_MAP]
+    changed = golden_replay.replay(session, BatchDecoder(ReportDecoder(button_map=button_map)))
+    position = golden_replay.first_divergence(golden_index, golden_states, changed)
+    high = golden_states[:, 1]                 # wButtons high byte
+    a_held = (high & (XUSB_GAMEPAD_A >> 8)) > 0
+    b_held = (high & (XUSB_GAMEPAD_B >> 8)) > 0
+    assert position == int(np.flatnonzero(a_held != b_held)[0])
+    lines = golden_replay.describe_divergence(position, golden_index, golden_states, changed)
+    assert "wButtons" in lines[1]
+
+
+def test_dropped_report_caught_where_it_went_missing(session):
+    from batch_decoder import BatchDecoder
+    from controller_state import ReportDecoder
+    import golden_replay
+
+    golden_index, golden_states = golden_replay.load_golden(golden_replay.golden_path(session))
+    result = golden_replay.replay(session, BatchDecoder(ReportDecoder()))
+    dropped = SESSION_REPORTS // 3
+    keep = golden_index != golden_index[dropped]
+    assert golden_replay.first_divergence(golden_index[keep], golden_states[keep], result) == dropped
+
+
+if __name__ == "__main__":
+    for options in ({}, {"inverted_axes": ("LX",)},
+                    {"hat_values": {"up": 1, "right": 2, "down": 4, "left": 8}}, {"deadzone": 0.25}):
+        test_batch_matches_decode_into(options)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = record_session(tmp)
+        test_replay_matches_own_golden_at_speed(path)
+        test_mapping_change_caught_at_first_affected_state(path)
+        test_dropped_report_caught_where_it_went_missing(path)
+    print("PASSED")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Live Screen Test
+Feeds the button mapping tester's screen 1000 synthetic reports a second
+into a deliberately slow fake terminal and checks that:
+  - the read loop never waits on the terminal (update() stays cheap),
+  - redraws are capped at the frame rate,
+  - the terminal ends up showing exactly the last frame,
+  - far fewer bytes are written than clearing and reprinting per report.
+No controller needed.
+"""
+
+import os
+import re
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+
+REPORTS = 2000
+RATE_HZ = 1000
+FPS = 30
+TERMINAL_DELAY = 0.02   # seconds per write, a slow remote terminal
+
+ESCAPE = re.compile(r"\033\[(\??)([0-9;]*)([A-Za-z])")
+
+
+class FakeTerminal:
+    """Just enough of a VT100 to replay what LiveScreen writes"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.cells = {}
+        self.row = self.col = 0
+        self.writes = 0
+
+    def write(self, text):
+        time.sleep(self.delay)
+        self.writes += 1
+        pos = 0
+        for match in ESCAPE.finditer(text):
+            self._put(text[pos:match.start()])
+            pos = match.end()
+            private, params, command = match.groups()
+            if private:
+                continue
+            if command == "H":
+                parts = [int(p) for p in params.split(";")] if params else [1, 1]
+                self.row, self.col = parts[0] - 1, parts[1] - 1
+            elif command == "J":
+                self.cells.clear()
+        self._put(text[pos:])
+
+    def _put(self, text):
+        for ch in text:
+            self.cells[(self.row, self.col)] = ch
+            self.col += 1
+
+    def flush(self):
+        pass
+
+    def lines(self):
+        rows = {}
+        for (r, c), ch in self.cells.items():
+            rows.setdefault(r, {})[c] = ch
+        out = []
+        for r in range(max(rows) + 1 if rows else 0):
+            row = rows.get(r, {})
+            out.append("".join(row.get(c, " ") for c in range(max(row) + 1 if row else 0)).rstrip())
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+
+def synthetic_report(i):
+    report = [0x01, 0, 0, 0x0F, 128, 128, 128, 128, 0, 0]
+    report[4] = (128 + i) & 0xFF             # left stick sweeping
+    report[5] = (128 - i // 2) & 0xFF
+    if (i // 100) % 2:
+        report[1] = 0x01                      # A held every other 100 ms
+    if (i // 250) % 2:
+        report[3] = (i // 250) % 8            # D-pad stepping round
+    return bytes(report)
+
+
+def run_screen():
+    """Feed the screen REPORTS reports at RATE_HZ into a slow terminal"""
+    os.environ.setdefault("COLUMNS", "100")
+    os.environ.setdefault("LINES", "60")
+    from live_screen import LiveScreen
+    from test_button_mapping import render_mapping
+
+    terminal = FakeTerminal(TERMINAL_DELAY)
+    screen = LiveScreen(render_mapping, fps=FPS, stream=terminal)
+    full_redraw_bytes = 0
+    worst_update = 0.0
+    period = 1.0 / RATE_HZ
+
+    screen.start()
+    start = time.perf_counter()
+    for i in range(REPORTS):
+        snapshot = (synthetic_report(i), ["A"] if (i // 100) % 2 else [], ())
+        t0 = time.perf_counter()
+        screen.update(snapshot)
+        worst_update = max(worst_update, time.perf_counter() - t0)
+        # What the old clear-and-print loop wrote for every report
+        full_redraw_bytes += len("\033[H\033[J" + "\n".join(render_mapping(snapshot)) + "\n")
+        time.sleep(period)
+    elapsed = time.perf_counter() - start
+    screen.stop()
+
+    stats = screen.stats()
+    print(f"Frames drawn: {stats['frames']} ({stats['frames'] / elapsed:.1f}/s, cap {FPS}), "
+          f"{stats['bytes']} bytes vs {full_redraw_bytes} clearing per report, "
+          f"slowest update() {worst_update * 1e6:.0f} us")
+    return {
+        "stats": stats,
+        "frame_rate": stats["frames"] / elapsed,
+        "worst_update": worst_update,
+        "full_redraw_bytes": full_redraw_bytes,
+        "shown": terminal.lines(),
+        "expected": [line.rstrip() for line in render_mapping(snapshot)],
+    }
+
+
+@pytest.fixture(scope="module")
+def run():
+    return run_screen()
+
+
+def test_read_loop_never_waits_on_terminal(run):
+    assert run["worst_update"] < TERMINAL_DELAY / 2
+
+
+def test_redraws_capped_at_frame_rate(run):
+    assert run["frame_rate"] <= FPS * 1.1
+
+
+def test_terminal_shows_last_frame(run):
+    assert run["shown"] == run["expected"]
+
+
+def test_less_output_than_full_redraws(run):
+    assert run["stats"]["bytes"] * 10 < run["full_redraw_bytes"]
+
+
+if __name__ == "__main__":
+    result = run_screen()
+    test_read_loop_never_waits_on_terminal(result)
+    test_redraws_capped_at_frame_rate(result)
+    test_terminal_shows_last_frame(result)
+    test_less_output_than_full_redraws(result)
+    print("PASSED")
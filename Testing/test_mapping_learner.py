@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Mapping Learner Test
+Synthesizes a guided capture session using the bridge's current mapping
+(with reaction delays, stick jitter, analog trigger bytes and the odd
+accidental press), runs the mapping learner on it and checks it recovers
+every button, the hat encoding and the axis bytes/inversion, that the
+profile builds a decoder and that one with buttons outside bytes 1-2 is
+rejected. Also checks the analysis stays well under a second. No
+controller needed.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Analysis"))
+
+FRAMES_PER_STEP = 800     # ~4 s per step at the controller's report rate
+REPORT_INTERVAL_NS = 5_000_000
+
+
+def synthesize(path, rng):
+    from capture_format import CaptureWriter
+    from controller_state import BUTTON_MAP
+    from mapping_profile import BUTTON_TARGETS, MARKER_PREFIX, capture_steps
+
+    where = {target: (byte, mask) for byte, mask, target in BUTTON_MAP}
+    hat_values = {"up": 0, "right": 2, "down": 4, "left": 6}
+    axis_bytes = {"LX": 4, "LY": 5, "RX": 6, "RY": 7}
+    # Y axes report 0 when pushed up, like the real controller
+    axis_extreme = {("LX", "-"): 0, ("LX", "+"): 255, ("LY", "+"): 0, ("LY", "-"): 255,
+                    ("RX", "-"): 0, ("RX", "+"): 255, ("RY", "+"): 0, ("RY", "-"): 255}
+
+    ts = 0
+    with CaptureWriter(path) as writer:
+        for label, _ in capture_steps():
+            writer.write_marker(ts, MARKER_PREFIX + label)
+            delay = rng.randrange(40, 120)          # reaction time in frames
+            for i in range(FRAMES_PER_STEP):
+                report = [0x01, 0, 0, 0x0F, 128, 128, 128, 128, 0, 0]
+                for b in (4, 5, 6, 7):
+                    report[b] = 128 + rng.randint(-3, 3)
+                held = delay <= i < FRAMES_PER_STEP - 30
+                if held and label.startswith("button:"):
+                    name = label.split(":", 1)[1]
+                    byte, mask = where[BUTTON_TARGETS[name]]
+                    report[byte] |= mask
+                    if name in ("LT", "RT"):
+                        report[8 if name == "LT" else 9] = min(255, (i - delay) * 8)
+                elif held and label.startswith("hat:"):
+                    report[3] = hat_values[label.split(":", 1)[1]]
+                elif held and label.startswith("axis:"):
+                    axis, sign = label[5:7], label[7]
+                    extreme = axis_extreme[(axis, sign)]
+                    jitter = rng.randint(0, 4)
+                    report[axis_bytes[axis]] = extreme + jitter if extreme == 0 else extreme - jitter
+                if rng.random() < 0.002:
+                    report[1] |= 1 << rng.randrange(8)  # accidental brush of another button
+                writer.write_report(ts, report)
+                ts += REPORT_INTERVAL_NS
+
+
+def learn_session(path):
+    """Synthesize a session at `path` and learn it: (frames, profile, elapsed s)"""
+    from mapping_learner import load_session, learn, print_profile
+
+    synthesize(path, random.Random(3))
+    frames, labels, names = load_session(path)
+    start = time.perf_counter()
+    profile = learn(frames, labels, names)
+    elapsed = time.perf_counter() - start
+    print_profile(profile)
+    return len(frames), profile, elapsed
+
+
+@pytest.fixture(scope="module")
+def learned(tmp_path_factory):
+    return learn_session(str(tmp_path_factory.mktemp("learner") / "guided.vxcap"))
+
+
+def test_buttons_recovered(learned):
+    from controller_state import BUTTON_MAP
+    from mapping_profile import BUTTON_TARGETS
+
+    frames, profile, elapsed = learned
+    expected = {target: (byte, mask) for byte, mask, target in BUTTON_MAP}
+    got = {name: (entry["byte"], entry["mask"]) for name, entry in profile["buttons"].items()}
+    assert got == {name: expected[target] for name, target in BUTTON_TARGETS.items()}
+
+
+def test_hat_and_axes_recovered(learned):
+    frames, profile, elapsed = learned
+    assert profile["hat"]["byte"] == 3 and profile["hat"]["encoding"] == "hat8"
+    axes = {axis: (entry["byte"], entry["inverted"]) for axis, entry in profile["axes"].items()}
+    assert axes == {"LX": (4, False), "LY": (5, True), "RX": (6, False), "RY": (7, True)}
+
+
+def test_profile_usable_by_decoder(learned):
+    from controller_state import ReportDecoder
+    from mapping_profile import decoder_kwargs
+
+    frames, profile, elapsed = learned
+    ReportDecoder(**decoder_kwargs(profile))
+    print(f"Analysis of {frames} frames: {elapsed * 1000:.1f} ms")
+    assert elapsed < 1.0
+
+
+def test_buttons_outside_decoder_bytes_rejected():
+    from mapping_profile import decoder_kwargs
+
+    profile = {"buttons": {"A": {"byte": 1, "mask": 1}, "B": {"byte": 9, "mask": 2}}}
+    with pytest.raises(ValueError, match="byte 9"):
+        decoder_kwargs(profile)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        result = learn_session(os.path.join(tmp, "guided.vxcap"))
+    test_buttons_recovered(result)
+    test_hat_and_axes_recovered(result)
+    test_profile_usable_by_decoder(result)
+    test_buttons_outside_decoder_bytes_rejected()
+    print("PASSED")
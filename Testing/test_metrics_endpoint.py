@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Metrics Endpoint Test
+Runs the bridge's read loop (controller_bridge.Bridge) against a
+synthetic 2000 Hz controller (with a read error and a reconnect), then
+against one polled every 5 ms that queues up reports between polls,
+scrapes the loopback endpoint over HTTP and checks the Prometheus text:
+reports read, updates emitted, coalesced reports, reconnects, read errors, time
+since the last report and the per-device histograms. Also checks the
+per-report calls allocate nothing and stay cheap. No controller needed.
+"""
+
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Bridge"))
+
+RATE_HZ = 2000
+READ_S = 0.4
+POLLED_HZ = 1000             # the controller without stored descriptors...
+POLLED_REPORTS = 300         # ...read by 5 ms polls, ~5 reports queued per wakeup
+HOT_PATH_CALLS = 100000
+MAX_HOT_PATH_US = 3.0
+DEVICE = "2dc8:301f"
+
+
+def parse(text):
+    """{'name{labels}': value} for every sample line; raises on malformed lines"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        key, value = line.rsplit(" ", 1)
+        samples[key] = float(value)
+    return samples
+
+
+class FakePad:
+    """Stands in for vgamepad: counts the updates sent"""
+
+    def __init__(self):
+        from controller_state import ControllerState
+
+        self.report = ControllerState()
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+
+class PolledController:
+    """A controller with no stored descriptors, so the bridge polls it every 5 ms.
+
+    Reports due since the last read queue up like hidapi's buffer; after
+    `count` of them read() raises OSError, like an unplugged device.
+    """
+
+    name = "polled"
+
+    def __init__(self, rate_hz, count):
+        self.period = 1.0 / rate_hz
+        self.count = count
+        self.served = 0
+
+    def find(self):
+        return {"path": b"polled"}
+
+    def open(self, device=None, nonblocking=True):
+        self.start = time.perf_counter()
+        self.served = 0
+
+    def read(self, size, timeout_ms=None):
+        if self.served >= self.count:
+            raise OSError("polled controller unplugged")
+        if time.perf_counter() < self.start + self.served * self.period:
+            return []
+        self.served += 1
+        return [0x01, 0, 0, 0x0F, 128, 128, 128, 128, 0, 0]
+
+    def close(self):
+        pass
+
+
+def run_session(bridge):
+    """Three connections through the bridge's read loop, each ending in a read error"""
+    backend = bridge.backend
+    for attempt in range(2):
+        backend.served = 0
+        bridge.run_connection(backend.find())
+    # Back again, through the 5 ms polling fallback this time
+    bridge.backend = PolledController(POLLED_HZ, POLLED_REPORTS)
+    bridge.run_connection(bridge.backend.find())
+
+
+def scrape_session():
+    """Run the session with every collector registered and scrape it over HTTP"""
+    from controller_bridge import Bridge
+    from controller_state import ReportDecoder
+    from device_backend import SyntheticBackend
+    from metrics_endpoint import (
+        BridgeMetrics, MetricsServer, decoder_collector, pipeline_collector, power_collector, watchdog_collector,
+    )
+    from power_mode import PowerMode
+    from report_pipeline import ReportPipeline
+    from stall_watchdog import StallWatchdog
+
+    pipeline = ReportPipeline()
+    decoder = ReportDecoder()
+    power = PowerMode()                                  # no --power-save
+    watchdog = StallWatchdog(pipeline.ring)
+    metrics = BridgeMetrics()
+    for collector in (pipeline_collector(pipeline), decoder_collector(decoder),
+                      watchdog_collector(watchdog), power_collector(power)):
+        metrics.add_collector(collector)
+    server = MetricsServer(metrics, port=0)
+    pad = FakePad()
+    backend = SyntheticBackend("walk", rate_hz=RATE_HZ, count=int(RATE_HZ * READ_S / 2), seed=9)
+    bridge = Bridge(pad, backend, decoder, pipeline, power, watchdog, metrics=metrics)
+    try:
+        run_session(bridge)
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            content_type = response.headers["Content-Type"]
+            text = response.read().decode("utf-8")
+        try:
+            urllib.request.urlopen(f"http://{server.host}:{server.port}/", timeout=5)
+            status = 200
+        except urllib.error.HTTPError as e:
+            status = e.code
+    finally:
+        server.close()
+        pipeline.stop()
+    print(text)
+    return {"server": server, "content_type": content_type, "text": text, "other_status": status,
+            "samples": parse(text), "pushed": pipeline.ring.head,
+            "emitted": pad.updates - 3}                  # minus a release per disconnect
+
+
+def sample(scraped, name, labels=""):
+    key = f"vxbridge_{name}{{{labels}}}" if labels else f"vxbridge_{name}"
+    return scraped["samples"].get(key)
+
+
+def histogram(scraped, name, buckets):
+    label = f'device="{DEVICE}"'
+    counts = [sample(scraped, f"{name}_bucket", f'{label},le="{b!r}"') for b in buckets]
+    counts.append(sample(scraped, f"{name}_bucket", f'{label},le="+Inf"'))
+    return counts
+
+
+@pytest.fixture(scope="module")
+def scraped():
+    return scrape_session()
+
+
+def test_served_on_loopback_as_prometheus_text(scraped):
+    assert scraped["server"].host == "127.0.0.1"
+    assert scraped["content_type"].startswith("text/plain; version=0.0.4")
+    assert scraped["other_status"] == 404
+
+
+def test_counters_match_the_session(scraped):
+    label = f'device="{DEVICE}"'
+    assert sample(scraped, "reports_read_total") == scraped["pushed"]
+    assert sample(scraped, "updates_emitted_total", label) == scraped["emitted"]
+    assert sample(scraped, "connects_total", label) == 3
+    assert sample(scraped, "reconnects_total") == 2
+    assert sample(scraped, "read_errors_total") == 3
+    assert sample(scraped, "stalls_total") == 0
+    assert sample(scraped, "stall_threshold_seconds") is not None
+    assert 0 <= sample(scraped, "seconds_since_last_report") < 0.5
+
+
+def test_coalesced_reports_counted_without_power_save(scraped):
+    # Each 5 ms poll took the ~5 reports that queued up since the last one
+    # (the blocking reads before that mostly found one)
+    coalesced = sample(scraped, "coalesced_reports_total")
+    assert POLLED_REPORTS * 0.6 < coalesced < scraped["pushed"]
+    assert sample(scraped, "idle_updates_skipped_total") == 0
+
+
+def test_histograms(scraped):
+    from metrics_endpoint import INTERVAL_BUCKETS, LATENCY_BUCKETS
+
+    latency = histogram(scraped, "update_latency_seconds", LATENCY_BUCKETS)
+    assert None not in latency
+    assert latency == sorted(latency)
+    assert latency[-1] == sample(scraped, "update_latency_seconds_count", f'device="{DEVICE}"') \
+        == scraped["emitted"]
+    intervals = histogram(scraped, "report_interval_seconds", INTERVAL_BUCKETS)
+    assert None not in intervals
+    assert intervals == sorted(intervals)
+    # Most gaps at 2000 Hz are in the 2 ms bucket or below
+    typical_gap = next(b for b, n in zip(INTERVAL_BUCKETS, intervals) if n >= intervals[-1] / 2)
+    assert typical_gap <= 0.002
+
+
+def test_latency_measured_from_the_read_stamp():
+    from metrics_endpoint import LATENCY_BUCKETS, DeviceMetrics
+
+    device = DeviceMetrics(DEVICE)
+    device.updated(time.perf_counter_ns() - 3_000_000)        # read 3 ms ago
+    cumulative, total = device.latency.snapshot()
+    first = next(i for i, count in enumerate(cumulative) if count)
+    assert LATENCY_BUCKETS[first] == 0.005
+    assert 0.003 <= total < 0.005
+
+
+def test_hot_path_allocates_nothing_and_stays_cheap():
+    from metrics_endpoint import DeviceMetrics
+
+    device = DeviceMetrics(DEVICE)
+    stamp = time.perf_counter_ns()
+    for i in range(1000):                                    # warm up
+        device.report(stamp + i)
+        device.updated(stamp + i)
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for i in range(HOT_PATH_CALLS):
+        device.report(stamp + i * 500_000)
+        device.updated(stamp + i * 500_000)
+    per_call_us = (time.perf_counter() - start) / HOT_PATH_CALLS * 1e6
+    assert abs(sys.getallocatedblocks() - blocks) < 10
+    assert per_call_us < MAX_HOT_PATH_US
+
+
+if __name__ == "__main__":
+    result = scrape_session()
+    test_served_on_loopback_as_prometheus_text(result)
+    test_counters_match_the_session(result)
+    test_coalesced_reports_counted_without_power_save(result)
+    test_histograms(result)
+    test_latency_measured_from_the_read_stamp()
+    test_hot_path_allocates_nothing_and_stays_cheap()
+    print("PASSED")
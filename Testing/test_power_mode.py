@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Power Mode Test
+Runs the bridge's read loop (controller_bridge.Bridge) against a scripted
+1000 Hz controller that sends idle duplicates, with the left stick pushed
+for two short stretches, once with power saving off and once on. Checks the idle stretch costs a
+small fraction of the wakeups and less CPU, duplicate pad updates stop,
+the first changed report reaches the pad within one idle poll and every
+report after it gets through at full rate, that a button held through
+the idle stretch stays held on a remote bridge fed by --stream, and that
+the search for a missing controller backs off. No controller needed.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Bridge"))
+
+RATE_HZ = 1000
+READ_TIMEOUT_MS = 8
+IDLE_AFTER_S = 0.5
+PUSHED = [(0.0, 0.3), (2.5, 2.8)]       # seconds with the stick pushed
+RUN_S = 3.5
+WINDOW = (1.0, 2.4)                     # measured stretch, idle with power saving on
+NEUTRAL = [0x01, 0, 0, 0x0F, 128, 128, 128, 128, 0, 0]
+
+
+class ScriptedController:
+    """Backend serving a report every 1/RATE_HZ s; unread reports queue up like hidapi's buffer.
+
+    Notes the wakeups, CPU time and skipped updates as the run passes each
+    WINDOW mark, and unplugs (read() raises OSError) after `run_s`.
+    """
+
+    name = "scripted"
+
+    def __init__(self, power, held=0, run_s=RUN_S, on_unplug=None):
+        self.power = power
+        self.held = held                       # report byte 1, held the whole run
+        self.run_s = run_s
+        self.on_unplug = on_unplug
+        self.marks = {}
+
+    def find(self):
+        return {"path": b"scripted"}
+
+    def open(self, device=None, nonblocking=True):
+        self.start = time.perf_counter()
+        self.index = 0
+
+    def read(self, size, timeout_ms=None):
+        now = time.perf_counter() - self.start
+        for mark in WINDOW:
+            if mark not in self.marks and now >= mark:
+                self.marks[mark] = (self.power.wakeups, time.process_time(), self.power.suppressed)
+        if now >= self.run_s:
+            if self.on_unplug:
+                self.on_unplug()
+            raise OSError("scripted controller unplugged")
+        due = self.start + self.index / RATE_HZ
+        wait = due - time.perf_counter()
+        if wait > 0:
+            if not timeout_ms:
+                return []
+            if wait > timeout_ms / 1000:
+                time.sleep(timeout_ms / 1000)
+                return []
+            time.sleep(wait)
+        at = self.index / RATE_HZ
+        report = list(NEUTRAL)
+        report[1] = self.held
+        if any(start <= at < end for start, end in PUSHED):
+            report[4] = 255
+        report[8] = self.index & 0xFF          # analog byte: not decoded, tags the report
+        self.index += 1
+        return report
+
+    def close(self):
+        pass
+
+
+class ScriptedStore:
+    """Descriptor store with a 1 ms endpoint: the bridge does blocking reads"""
+
+    def read_plan(self, device):
+        from descriptor_store import ReadPlan
+
+        return ReadPlan(64, READ_TIMEOUT_MS, 1.0, None)
+
+
+class FakePad:
+    """Stands in for vgamepad: notes when each update went out, for which report"""
+
+    def __init__(self, backend, ring):
+        from controller_state import ControllerState
+
+        self.report = ControllerState()
+        self.backend = backend
+        self.ring = ring
+        self.updates = []
+
+    def update(self):
+        # The report being fed is the ring's newest slot
+        self.updates.append((time.perf_counter() - self.backend.start, self.ring.newest_slot()[8],
+                             self.report.sThumbLX))
+
+
+def run_bridge_loop(power_save, held=0, streamer=None, run_s=RUN_S, on_unplug=None):
+    """One connection through the bridge's read loop, the controller unplugged after `run_s`"""
+    from controller_bridge import Bridge
+    from controller_state import ReportDecoder
+    from power_mode import PowerMode
+    from report_pipeline import ReportPipeline
+    from stall_watchdog import StallWatchdog
+
+    power = PowerMode(enabled=power_save, idle_after=IDLE_AFTER_S)
+    held_state = []
+
+    def unplug():
+        held_state.append(bytes(bridge.state))     # before the bridge lets go of the pad
+        if on_unplug:
+            on_unplug()
+
+    backend = ScriptedController(power, held, run_s, unplug)
+    pipeline = ReportPipeline()
+    pad = FakePad(backend, pipeline.ring)
+    bridge = Bridge(pad, backend, ReportDecoder(), pipeline, power, StallWatchdog(pipeline.ring),
+                    streamer=streamer, store=ScriptedStore())
+    bridge.run_connection(backend.find())
+    pipeline.stop()
+
+    marks = backend.marks
+    run = {"updates": pad.updates[:-1], "power": power, "state": held_state[0]}   # minus the release
+    if WINDOW[1] in marks:
+        (w0, c0, s0), (w1, c1, s1) = marks[WINDOW[0]], marks[WINDOW[1]]
+        span = WINDOW[1] - WINDOW[0]
+        run.update(wakeups_per_s=(w1 - w0) / span, cpu_s=c1 - c0, suppressed=s1 - s0)
+    return run
+
+
+def measure_runs():
+    full = run_bridge_loop(power_save=False)
+    saving = run_bridge_loop(power_save=True)
+    for label, run in (("power saving off", full), ("power saving on ", saving)):
+        print(f"{label}: {run['wakeups_per_s']:6.0f} wakeups/s, {run['cpu_s'] * 1000:5.0f} ms CPU "
+              f"over the idle stretch, {len(run['updates'])} pad updates")
+    print(f"[power] {saving['power'].summary()}")
+    return full, saving
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return measure_runs()
+
+
+def test_idle_cuts_wakeups_and_cpu(runs):
+    full, saving = runs
+    assert saving["wakeups_per_s"] < full["wakeups_per_s"] / 10
+    assert saving["cpu_s"] < full["cpu_s"]
+
+
+def test_idle_duplicates_skipped(runs):
+    full, saving = runs
+    assert saving["suppressed"] > (WINDOW[1] - WINDOW[0]) * RATE_HZ * 0.9
+    assert saving["power"].idle_periods == 2          # once per quiet stretch
+    assert len(full["updates"]) >= RUN_S * RATE_HZ * 0.95
+
+
+def test_first_change_wakes_within_one_idle_poll(runs):
+    from power_mode import IDLE_POLL_S
+
+    full, saving = runs
+    # The second push starts at report 2500: first pad update after the idle stretch
+    t, tag, lx = next(u for u in saving["updates"] if u[0] >= WINDOW[1])
+    assert tag == 2500 & 0xFF
+    assert lx > 0
+    assert (t - PUSHED[1][0]) * 1000 < IDLE_POLL_S * 1000 + 5
+
+
+def test_full_rate_after_wake(runs):
+    full, saving = runs
+    tags = [tag for t, tag, lx in saving["updates"] if PUSHED[1][0] <= t < PUSHED[1][1] - 0.05]
+    assert len(tags) > 200
+    assert tags == [(tags[0] + i) & 0xFF for i in range(len(tags))]
+
+
+def test_stream_holds_input_while_idle():
+    from udp_stream import StreamReceiver, StreamSender
+
+    # A shorter stale timeout than the default 1 s, so a missing heartbeat shows
+    receiver = StreamReceiver(port=0, bind="127.0.0.1", stale_timeout=0.3)
+    streamer = StreamSender(("127.0.0.1", receiver.port))
+    released = []
+    remote = []
+    running = True
+
+    def receive_loop():
+        while running:
+            if receiver.receive(timeout=0.05) and receiver.last_packet_time is None:
+                released.append(time.perf_counter())      # timed out and cleared the state
+    thread = threading.Thread(target=receive_loop, daemon=True)
+    thread.start()
+    try:
+        run = run_bridge_loop(power_save=True, held=0x01, streamer=streamer, run_s=1.6,   # A held
+                              on_unplug=lambda: remote.append(bytes(receiver.state)))
+    finally:
+        running = False
+        thread.join(1.0)
+        streamer.close()
+        receiver.close()
+    assert run["power"].idle                           # idle since ~0.8 s
+    assert released == []
+    assert remote == [run["state"]]
+    assert any(run["state"])
+
+
+def test_search_backs_off():
+    from power_mode import SEARCH_MAX_S, SEARCH_START_S, PowerMode
+
+    saving, plain = PowerMode(enabled=True), PowerMode()
+    delays = [saving.search_delay() for _ in range(6)]
+    assert delays[0] == SEARCH_START_S
+    assert delays[-1] == SEARCH_MAX_S
+    assert all(b == min(2 * a, SEARCH_MAX_S) for a, b in zip(delays, delays[1:]))
+    saving.connected()
+    assert saving.search_delay() == SEARCH_START_S     # starts over once connected
+    assert [plain.search_delay() for _ in range(3)] == [SEARCH_START_S] * 3
+
+
+if __name__ == "__main__":
+    measured = measure_runs()
+    test_idle_cuts_wakeups_and_cpu(measured)
+    test_idle_duplicates_skipped(measured)
+    test_first_change_wakes_within_one_idle_poll(measured)
+    test_full_rate_after_wake(measured)
+    test_stream_holds_input_while_idle()
+    test_search_backs_off()
+    print("PASSED")
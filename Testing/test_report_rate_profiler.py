@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Report Rate Profiler Test
+Writes a synthetic 1000 Hz capture with known jitter, lost reports, late
+(bursty) deliveries and duplicates, profiles it and checks each figure
+comes back. No controller needed.
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+
+REPORTS = 5000
+PERIOD_NS = 1_000_000
+LOST = (1000, 1001, 3000, 4200)        # never sent
+LATE = (2000, 2500, 3500)              # delivered just before the next one
+DUPLICATES = (10, 20, 30, 40, 50)      # same payload as the report before
+
+
+def synthesize(path, rng):
+    from capture_format import CaptureWriter
+
+    with CaptureWriter(path) as writer:
+        previous = None
+        last_ts = 0
+        for i in range(REPORTS):
+            if i in LOST:
+                continue
+            ts = i * PERIOD_NS + int(rng.gauss(0, 30_000))
+            if i in LATE:
+                ts = (i + 1) * PERIOD_NS - 50_000
+            ts = max(ts, last_ts + 1)       # read order: timestamps never go back
+            last_ts = ts
+            report = bytes([0x01, i & 0xFF, (i >> 8) & 0xFF, 0x0F, 128, 128, 128, 128])
+            if i in DUPLICATES:
+                report = previous
+            writer.write_report(ts, report)
+            previous = report
+
+
+def profile_session(path):
+    """Synthesize the capture at `path` and profile it at 1 ms and 5 ms polls"""
+    from profile_report_rate import profile_capture, print_profile
+
+    synthesize(path, random.Random(5))
+    results = profile_capture(path, polls_ms=(1.0, 5.0))
+    for report_id, result in results.items():
+        print_profile(report_id, result)
+    return results
+
+
+@pytest.fixture(scope="module")
+def results(tmp_path_factory):
+    return profile_session(str(tmp_path_factory.mktemp("rate") / "rate.vxcap"))
+
+
+def test_rate_and_jitter(results):
+    assert list(results) == [1]
+    result = results[1]
+    assert abs(result["rate_hz"] - 1000) < 5
+    assert abs(result["interval_ms"][50] - 1.0) < 0.01
+    assert 0.05 < result["jitter_ms"][99] < 0.15       # ~3 sigma
+
+
+def test_duplicates_bursts_and_losses(results):
+    result = results[1]
+    assert result["duplicates"] == len(DUPLICATES)
+    assert result["bursts"] == len(LATE)
+    assert result["missing_estimate"] == len(LOST)
+
+
+def test_slow_poll_supersedes_reports(results):
+    result = results[1]
+    five = result["polls"][5.0]
+    assert 0.75 < five["superseded"] / result["reports"] < 0.85
+    assert 2.0 < five["delay_ms"][0] < 3.0
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        profiled = profile_session(os.path.join(tmp, "rate.vxcap"))
+    test_rate_and_jitter(profiled)
+    test_duplicates_bursts_and_losses(profiled)
+    test_slow_poll_supersedes_reports(profiled)
+    print("PASSED")
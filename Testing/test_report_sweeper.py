@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Report Sweeper Test
+Sweeps a fake controller that answers one feature report, hangs on
+another, flips an input report byte when a feature report is set,
+rejects an output report and unplugs itself on a last write. Checks the
+hang costs one timeout and the sweep carries on, each side effect is
+pinned on the attempt that caused it (and stick jitter on none), the
+capture holds everything sent and received, and the sweep stops when the
+device goes away. No controller needed.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Bridge"))
+sys.path.insert(0, os.path.join(HERE, "..", "Analysis"))
+
+TIMEOUT_S = 0.1
+SETTLE_S = 0.03
+HANG_S = 2.0
+
+
+class FakeController:
+    """What every handle of the fake controller shares"""
+
+    def __init__(self):
+        self.report = bytearray([0x01, 0, 0, 0x0F, 128, 128, 128, 128, 0, 0] + [0] * 54)
+        self.gone = False
+        self.lock = threading.Lock()
+        self.rng = random.Random(4)
+
+
+class FakeHandle:
+    """hid.device look-alike for the fake controller"""
+
+    def __init__(self, controller):
+        self.c = controller
+
+    def open_path(self, path):
+        if self.c.gone:
+            raise OSError("open failed")
+
+    def read(self, size, timeout_ms=None):
+        time.sleep(0.001)                               # ~1000 reports/s
+        if self.c.gone:
+            raise OSError("read error")
+        with self.c.lock:
+            report = bytearray(self.c.report)
+        for i in range(4, 8):
+            report[i] += self.c.rng.randint(-2, 2)      # stick jitter at rest
+        return list(report[:size])
+
+    def get_feature_report(self, report_id, length):
+        if report_id == 0x85:
+            return [0x85] + [0x10 + i for i in range(length - 1)]
+        if report_id == 0x45:
+            time.sleep(HANG_S)                          # firmware never answers
+            return []
+        raise OSError("get_feature_report failed")
+
+    def send_feature_report(self, data):
+        if data[0] == 0x44:
+            with self.c.lock:
+                self.c.report[9] = data[1]              # e.g. a mode byte in the input report
+        return len(data)
+
+    def write(self, data):
+        if data[0] == 0x46:
+            return -1
+        if data[0] == 0x43 and data[1] == 0xFF:
+            self.c.gone = True                          # "mode switch": the device drops off
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def run_sweep(directory):
+    """Sweep the fake controller once, then unplug it on a last write"""
+    from report_sweeper import (
+        PATTERNS, InputWatch, SweepLog, TimedDevice, build_attempts, parse_ids, print_outcome, sweep,
+    )
+
+    controller = FakeController()
+    factory = lambda: FakeHandle(controller)
+    path = os.path.join(directory, "sweep.vxcap")
+    log = SweepLog(path)
+    watch = InputWatch(factory, b"fake", log)
+    watch.start()
+    time.sleep(1.0)                                 # a baseline to compare against
+    device = TimedDevice(factory, b"fake", TIMEOUT_S)
+
+    patterns = [(name, PATTERNS[name]) for name in ("zeros", "first")]
+    attempts = build_attempts(["get", "set", "write"], parse_ids("0x43-0x46,0x85"), patterns, size=16)
+    start = time.perf_counter()
+    outcomes = sweep(attempts, device, log, watch, settle=SETTLE_S, on_outcome=print_outcome)
+    elapsed = time.perf_counter() - start
+
+    final = build_attempts(["write"], [0x43, 0x44], [("ones", PATTERNS["ones"])], size=16)
+    last = sweep(final, device, log, watch, settle=SETTLE_S, on_outcome=print_outcome)
+    watch.stop()
+    log.close()
+    by_name = {(o.attempt.op, o.attempt.report_id, o.attempt.pattern): o for o in outcomes}
+    return {"path": path, "attempts": attempts, "outcomes": outcomes, "by_name": by_name,
+            "elapsed": elapsed, "last": last, "device": device}
+
+
+@pytest.fixture(scope="module")
+def swept(tmp_path_factory):
+    return run_sweep(str(tmp_path_factory.mktemp("sweep")))
+
+
+def test_every_attempt_runs_and_answers_are_reported(swept):
+    by_name = swept["by_name"]
+    assert len(swept["outcomes"]) == len(swept["attempts"]) == 25
+    answered = by_name[("get", 0x85, None)]
+    assert answered.status == "ok"
+    assert answered.response[:2] == bytes([0x85, 0x10])
+    assert by_name[("write", 0x46, "zeros")].status == "rejected"
+
+
+def test_hang_costs_one_timeout(swept):
+    hung = swept["by_name"][("get", 0x45, None)]
+    assert hung.status == "timeout"
+    assert hung.elapsed_ms < TIMEOUT_S * 1000 * 1.5
+    assert swept["device"].abandoned == 1
+    budget = len(swept["attempts"]) * (SETTLE_S + 0.02) + TIMEOUT_S + 0.5
+    assert swept["elapsed"] < budget
+
+
+def test_side_effect_pinned_on_the_attempt_that_caused_it(swept):
+    by_name = swept["by_name"]
+    # Stick jitter at rest must not count as an effect
+    assert {key for key, o in by_name.items() if o.effects} == {("set", 0x44, "first")}
+    assert "id1[9] 0x00->0x01" in by_name[("set", 0x44, "first")].effects[0]
+
+
+def test_sweep_stops_when_the_device_goes_away(swept):
+    (last,) = swept["last"]
+    assert "device disconnected" in last.effects
+
+
+def test_capture_holds_everything_sent_and_received(swept):
+    from capture_format import CaptureReader, KIND_FEATURE_GET, KIND_FEATURE_SET, KIND_MARKER, KIND_OUTPUT, KIND_INPUT
+
+    kinds = {}
+    gets = []
+    for record in CaptureReader(swept["path"]):
+        kinds[record.kind] = kinds.get(record.kind, 0) + 1
+        if record.kind == KIND_FEATURE_GET:
+            gets.append(record.report_id)
+    attempts = swept["attempts"]
+    assert kinds.get(KIND_INPUT, 0) > 500
+    assert kinds.get(KIND_FEATURE_SET) == 10
+    assert kinds.get(KIND_OUTPUT) == sum(1 for a in attempts if a.op == "write") + 1
+    assert gets == [0x85]
+    assert kinds.get(KIND_MARKER, 0) >= 2 * (len(attempts) + 1)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_sweep(tmp)
+        test_every_attempt_runs_and_answers_are_reported(result)
+        test_hang_costs_one_timeout(result)
+        test_side_effect_pinned_on_the_attempt_that_caused_it(result)
+        test_sweep_stops_when_the_device_goes_away(result)
+        test_capture_holds_everything_sent_and_received(result)
+    print("PASSED")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Shared State Latency Test
+Runs a publisher in a child process (standing in for the bridge) and
+measures how long it takes a reader in this process to see each update:
+no torn reads, nearly every update seen, p50 under 100 us. Also checks a
+reader gives up on a publisher that died mid-write, a report published
+from its ring slot keeps its read stamp, and a second publisher is
+refused. No controller needed. Do not run while the real bridge is
+active - it owns the segment, so the publishers here are refused.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+
+UPDATES = 2000
+RATE_HZ = 1000
+MIN_SEEN = 0.9            # fraction of updates a spinning reader must see
+MAX_P50_US = 100          # "within microseconds": publish -> reader
+MAX_P99_US = 1000
+
+
+def publisher_process(ready, count, rate_hz):
+    from controller_state import ControllerState, ReportDecoder
+    from shared_state import SharedStatePublisher
+
+    publisher = SharedStatePublisher()
+    decoder = ReportDecoder()
+    state = ControllerState()
+    report = [0x01, 0x00, 0x00, 0x0F, 0x80, 0x80, 0x80, 0x80] + [0] * 56
+    publisher.set_connected(True)
+    ready.set()
+    time.sleep(0.2)  # let the reader attach
+
+    period = 1.0 / rate_hz
+    for i in range(count):
+        report[1] = i & 0xFF
+        report[4] = (i * 3) & 0xFF
+        decoder.decode_into(report, state)
+        publisher.publish(report, state)
+        time.sleep(period)
+    publisher.close()
+
+
+def measure_latency():
+    """Follow a child-process publisher; returns (sorted latencies in ns, torn reads)"""
+    from controller_state import ControllerState, ReportDecoder
+    from shared_state import SharedStateReader
+
+    ready = multiprocessing.Event()
+    proc = multiprocessing.Process(target=publisher_process, args=(ready, UPDATES, RATE_HZ))
+    proc.start()
+    ready.wait(5)
+
+    reader = SharedStateReader()
+    decoder = ReportDecoder()
+    check = ControllerState()
+    latencies = []
+    torn = 0
+    last_seq = reader.sequence()
+    try:
+        while len(latencies) < UPDATES:
+            snapshot = reader.wait_for_update(last_seq, timeout=2.0)
+            if snapshot is None:
+                break
+            latencies.append(time.perf_counter_ns() - snapshot.timestamp_ns)
+            # A torn read would pair a report with another report's state
+            decoder.decode_into(snapshot.report, check)
+            if bytes(check) != bytes(snapshot.state):
+                torn += 1
+            last_seq = snapshot.seq
+    finally:
+        reader.close()
+        proc.join()
+    latencies.sort()
+    return latencies, torn
+
+
+def percentile_us(latencies, p):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] / 1000.0
+
+
+def test_shared_state_latency():
+    latencies, torn = measure_latency()
+    print(f"Updates seen: {len(latencies)} / {UPDATES}, torn reads: {torn}")
+    if latencies:
+        print("Latency p50 / p90 / p99 / max: " + " / ".join(
+            f"{percentile_us(latencies, p):.1f}" for p in (50, 90, 99, 100)) + " us")
+
+    assert torn == 0
+    # A busy-spinning reader sees nearly every update at 1 kHz
+    assert len(latencies) >= UPDATES * MIN_SEEN
+    assert percentile_us(latencies, 50) < MAX_P50_US
+    assert percentile_us(latencies, 99) < MAX_P99_US
+
+
+def test_read_gives_up_on_a_publisher_stuck_mid_write():
+    from controller_state import ControllerState
+    from shared_state import READ_RETRY_S, SharedStatePublisher, SharedStateReader
+
+    publisher = SharedStatePublisher()
+    reader = SharedStateReader()
+    try:
+        publisher.publish([0x01] * 8, ControllerState())
+        assert reader.read() is not None
+
+        publisher._seq.value += 1               # odd: as if it died halfway through a publish
+        start = time.perf_counter()
+        assert reader.read() is None
+        assert time.perf_counter() - start < READ_RETRY_S + 0.05
+        assert reader.wait_for_update(reader.sequence() - 1, timeout=0.05) is None
+
+        publisher._seq.value += 1               # even again: readable
+        assert reader.read() is not None
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_publish_from_ring_slot():
+    from controller_state import ControllerState, ReportDecoder
+    from report_pipeline import ReportRing
+    from shared_state import SharedStatePublisher, SharedStateReader
+
+    ring = ReportRing()
+    report = [0x01, 0x01, 0x00, 0x0F, 0xFF, 0x80, 0x80, 0x80, 0, 0]
+    ring.push(report, 123_456_789)
+    state = ControllerState()
+    ReportDecoder().decode_into(report, state)
+    publisher = SharedStatePublisher()
+    reader = SharedStateReader()
+    try:
+        publisher.publish(ring.newest_slot(), state, 123_456_789, len(report))
+        snapshot = reader.read()
+        assert snapshot.report == bytes(report)
+        assert snapshot.timestamp_ns == 123_456_789      # the read stamp, not publish time
+        assert bytes(snapshot.state) == bytes(state)
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_second_publisher_is_refused():
+    from shared_state import SharedStatePublisher
+
+    first = SharedStatePublisher()
+    try:
+        with pytest.raises(FileExistsError):
+            SharedStatePublisher()
+    finally:
+        first.close()
+    SharedStatePublisher().close()              # free again once the first one is gone
+
+
+if __name__ == "__main__":
+    test_shared_state_latency()
+    test_read_gives_up_on_a_publisher_stuck_mid_write()
+    test_publish_from_ring_slot()
+    test_second_publisher_is_refused()
+    print("PASSED")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Stall Watchdog Test
+Runs the bridge's connection loop (controller_bridge.Bridge) against a
+synthetic controller that goes quiet with its handle still open and stays
+quiet for two reopens. Checks the stall is caught once the learned
+threshold has passed, the virtual pad is released to neutral, the device
+is reopened with growing backoff until reports flow again, and the stall
+and recovery times land in the watchdog's metrics (and its JSON file).
+No controller needed.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Bridge"))
+
+RATE_HZ = 2000
+STALL_AFTER = 2000          # reports, ~1 s in
+SILENT_REOPENS = 2
+RUN_AFTER_RECOVERY = 1000   # reports, ~0.5 s, before the stream ends
+
+
+class FakePad:
+    """Stands in for vgamepad: keeps each XUSB report sent, with its time"""
+
+    def __init__(self):
+        from controller_state import ControllerState
+
+        self.report = ControllerState()
+        self.updates = []
+
+    def update(self):
+        self.updates.append((time.perf_counter(), bytes(self.report)))
+
+
+def run_stalling_session():
+    """A synthetic controller that goes quiet ~1 s in, through the bridge's connection loop"""
+    from controller_bridge import Bridge
+    from controller_state import ReportDecoder
+    from device_backend import SyntheticBackend
+    from power_mode import PowerMode
+    from report_pipeline import ReportPipeline
+    from stall_watchdog import StallWatchdog
+
+    events = []
+
+    class RecordingBackend(SyntheticBackend):
+        def open(self, device=None, nonblocking=True):
+            super().open(device, nonblocking)
+            events.append(("open", time.perf_counter()))
+
+        def close(self):
+            super().close()
+            events.append(("close", time.perf_counter()))
+
+    backend = RecordingBackend("walk", rate_hz=RATE_HZ, count=STALL_AFTER + RUN_AFTER_RECOVERY, seed=5,
+                               stall_after=STALL_AFTER, silent_reopens=SILENT_REOPENS)
+    pad = FakePad()
+    pipeline = ReportPipeline()
+    watchdog = StallWatchdog(pipeline.ring)
+    bridge = Bridge(pad, backend, ReportDecoder(), pipeline, PowerMode(), watchdog)
+    # Search and reconnect the way main() does, until the stream runs out
+    while backend.served < backend.count:
+        pause = bridge.run_connection(backend.find())
+        if watchdog.recovering:
+            events.append(("stall", watchdog.silence_ms))
+            time.sleep(pause)
+    pipeline.stop()
+    print(f"[watchdog] {watchdog.summary()}")
+    return {"backend": backend, "watchdog": watchdog, "pad": pad, "metrics": watchdog.metrics(),
+            "events": events}
+
+
+def times(session, kind):
+    return [t for k, t in session["events"] if k == kind]
+
+
+@pytest.fixture(scope="module")
+def session():
+    return run_stalling_session()
+
+
+def test_stall_caught_once_after_threshold(session):
+    from controller_bridge import SYNTHETIC_TIMEOUT_MS
+
+    metrics = session["metrics"]
+    threshold = metrics["threshold_ms"]
+    silences = times(session, "stall")
+    # Every silent reopen times out again, but it is one stall
+    assert len(silences) == SILENT_REOPENS + 1
+    assert metrics["stalls"] == 1
+    # Caught on the first empty read past the threshold
+    first_stall = times(session, "close")[0]
+    first_silence_ms = (first_stall - times(session, "open")[0] - STALL_AFTER / RATE_HZ) * 1000
+    assert threshold <= silences[0] < threshold + SYNTHETIC_TIMEOUT_MS + 20
+    assert threshold <= first_silence_ms < threshold + SYNTHETIC_TIMEOUT_MS + 100
+
+
+def test_pad_released_to_neutral(session):
+    updates = session["pad"].updates
+    assert any(report != bytes(12) for t, report in updates[:STALL_AFTER])
+    # The last thing the pad got before each close was a release
+    for closed in times(session, "close"):
+        t, report = [u for u in updates if u[0] <= closed][-1]
+        assert report == bytes(12)
+
+
+def test_reopened_with_growing_backoff(session):
+    from stall_watchdog import BACKOFF_START_S
+
+    opens, closes = times(session, "open"), times(session, "close")
+    gaps_ms = [(opened - closed) * 1000 for closed, opened in zip(closes, opens[1:])]
+    expected = [BACKOFF_START_S * 1000 * 2 ** i for i in range(SILENT_REOPENS + 1)]
+    assert session["metrics"]["reopens"] == SILENT_REOPENS + 1
+    assert len(gaps_ms) == len(expected)
+    for gap, want in zip(gaps_ms, expected):
+        assert want <= gap < want + 30
+
+
+def test_recovery_time_in_metrics(session, tmp_path):
+    from controller_bridge import SYNTHETIC_TIMEOUT_MS
+    from stall_watchdog import BACKOFF_START_S
+
+    metrics = session["metrics"]
+    backoff_ms = sum(BACKOFF_START_S * 1000 * 2 ** i for i in range(SILENT_REOPENS + 1))
+    assert metrics["recoveries"] == 1
+    assert not metrics["recovering"]
+    assert metrics["last_recovery_ms"] < (SILENT_REOPENS * (metrics["threshold_ms"] + SYNTHETIC_TIMEOUT_MS)
+                                          + backoff_ms) * 1.1 + 100
+    assert abs(metrics["stalled_seconds"] * 1000 - metrics["last_recovery_ms"]) < 1
+    # Reports flowing again afterwards, until the stream ran out
+    assert session["backend"].served == STALL_AFTER + RUN_AFTER_RECOVERY
+
+    path = os.path.join(str(tmp_path), "watchdog.json")
+    session["watchdog"].save(path)
+    with open(path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["stalls"] == 1
+    assert saved["last_recovery_ms"] == metrics["last_recovery_ms"]
+
+
+def test_learned_threshold():
+    from report_pipeline import ReportRing
+    from stall_watchdog import STALL_FLOOR_MS, StallWatchdog
+
+    ring = ReportRing()
+    watchdog = StallWatchdog(ring, interval_ms=8)
+    assert watchdog.threshold_ms() == 800                      # from the 8 ms endpoint interval
+    for i in range(200):
+        ring.push(b"\x01", i * 10_000_000)                     # 100 Hz
+    assert watchdog.threshold_ms() == 1000
+    assert StallWatchdog(ring, timeout_ms=250).threshold_ms() == 250
+    off = StallWatchdog(ring, timeout_ms=0)
+    assert off.threshold_ms() is None
+    assert not off.check()
+
+    ring = ReportRing()
+    for i in range(200):
+        ring.push(b"\x01", i * 1_000_000)                      # 1000 Hz
+    assert StallWatchdog(ring).threshold_ms() == STALL_FLOOR_MS
+
+
+def test_metrics_leave_the_ring_alone():
+    from report_pipeline import ReportRing
+    from stall_watchdog import StallWatchdog
+
+    class WatchedRing(ReportRing):
+        reads = 0
+
+        def recent_stamps(self, count):
+            WatchedRing.reads += 1
+            return super().recent_stamps(count)
+
+    # metrics() runs on the endpoint's thread; the ring is the read thread's
+    ring = WatchedRing()
+    watchdog = StallWatchdog(ring)
+    for i in range(200):
+        ring.push(b"\x01", i * 10_000_000)                     # 100 Hz
+    watchdog.opened()
+    reads = WatchedRing.reads
+    assert watchdog.metrics()["threshold_ms"] == 1000
+    assert watchdog.summary()
+    assert WatchedRing.reads == reads
+
+
+if __name__ == "__main__":
+    recorded = run_stalling_session()
+    test_stall_caught_once_after_threshold(recorded)
+    test_pad_released_to_neutral(recorded)
+    test_reopened_with_growing_backoff(recorded)
+    with tempfile.TemporaryDirectory() as tmp:
+        test_recovery_time_in_metrics(recorded, tmp)
+    test_learned_threshold()
+    test_metrics_leave_the_ring_alone()
+    print("PASSED")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+sysfs Inventory Test
+Builds a fake /sys in a temporary directory - the controller and a USB
+keyboard under devices/, with the bus/usb/devices, bus/hid/devices,
+class/hidraw and class/input symlinks the kernel makes - and checks the
+scanner joins each VID:PID to its interfaces and to the hidraw and event
+nodes underneath them, and nothing else. No controller needed.
+"""
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Analysis"))
+
+USB_PARENT = os.path.join("devices", "pci0000:00", "0000:00:14.0", "usb1")
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+
+def link(root, link_path, target):
+    """Relative symlink at root/link_path pointing to root/target, like sysfs"""
+    link_path = os.path.join(root, link_path)
+    os.makedirs(os.path.dirname(link_path), exist_ok=True)
+    os.symlink(os.path.relpath(os.path.join(root, target), os.path.dirname(link_path)), link_path)
+
+
+def add_hid_device(root, port, vid, pid, product, hid_seq, hidraw, event, js=None):
+    """One USB device with a single HID interface, its hidraw node and input nodes"""
+    device = os.path.join(USB_PARENT, port)
+    intf = os.path.join(device, f"{port}:1.0")
+    hid_id = f"0003:{vid:04X}:{pid:04X}.{hid_seq:04X}"
+    hid = os.path.join(intf, hid_id)
+    input_dev = os.path.join(hid, "input", f"input{hid_seq}")
+
+    for name, value in (("idVendor", f"{vid:04x}"), ("idProduct", f"{pid:04x}"),
+                        ("product", product), ("busnum", "1"), ("devnum", str(hid_seq + 1))):
+        write(os.path.join(root, device, name), value)
+    for name, value in (("bInterfaceNumber", "00"), ("bInterfaceClass", "03"),
+                        ("bNumEndpoints", "02")):
+        write(os.path.join(root, intf, name), value)
+    write(os.path.join(root, hid, "uevent"), f"HID_ID=0003:{vid:08X}:{pid:08X}\nHID_NAME={product}")
+    write(os.path.join(root, input_dev, "name"), product)
+    os.makedirs(os.path.join(root, hid, "hidraw", hidraw))
+    link(root, os.path.join(hid, "hidraw", hidraw, "device"), hid)
+    for node in filter(None, (event, js)):
+        os.makedirs(os.path.join(root, input_dev, node))
+        link(root, os.path.join(input_dev, node, "device"), input_dev)
+        link(root, os.path.join("class", "input", node), os.path.join(input_dev, node))
+
+    link(root, os.path.join("bus", "usb", "devices", port), device)
+    link(root, os.path.join("bus", "usb", "devices", f"{port}:1.0"), intf)
+    link(root, os.path.join("bus", "hid", "devices", hid_id), hid)
+    link(root, os.path.join("class", "hidraw", hidraw), os.path.join(hid, "hidraw", hidraw))
+
+
+def make_fake_sys(root):
+    add_hid_device(root, "1-2", 0x2DC8, 0x301F, "8BitDo VITURE Controller", 1, "hidraw3", "event7", "js0")
+    add_hid_device(root, "1-4", 0x046D, 0xC31C, "USB Keyboard", 2, "hidraw1", "event4")
+    # The root hub is on the USB bus but has no HID interface
+    write(os.path.join(root, USB_PARENT, "idVendor"), "1d6b")
+    write(os.path.join(root, USB_PARENT, "idProduct"), "0002")
+    link(root, os.path.join("bus", "usb", "devices", "usb1"), USB_PARENT)
+    # A hidraw node that does not sit under any USB interface (e.g. Bluetooth)
+    virtual = os.path.join("devices", "virtual", "misc", "uhid", "0005:0000:0000.0009")
+    os.makedirs(os.path.join(root, virtual, "hidraw", "hidraw9"))
+    link(root, os.path.join(virtual, "hidraw", "hidraw9", "device"), virtual)
+    link(root, os.path.join("class", "hidraw", "hidraw9"), os.path.join(virtual, "hidraw", "hidraw9"))
+
+
+def test_vid_pid_joined_to_hidraw_and_event_nodes(tmp_path):
+    from sysfs_inventory import scan_sysfs
+
+    make_fake_sys(str(tmp_path))
+    devices = {(d["vendor_id"], d["product_id"]): d for d in scan_sysfs(str(tmp_path))}
+    assert set(devices) == {(0x1D6B, 0x0002), (0x2DC8, 0x301F), (0x046D, 0xC31C)}
+
+    controller = devices[(0x2DC8, 0x301F)]
+    assert controller["is_target"] and controller["product"] == "8BitDo VITURE Controller"
+    (intf,) = controller["interfaces"]
+    assert intf["number"] == 0 and intf["class"] == 3 and intf["endpoints"] == 2
+    assert intf["hidraw"] == [{"node": "/dev/hidraw3", "hid_id": "0003:2DC8:301F.0001",
+                               "name": "8BitDo VITURE Controller"}]
+    assert [n["node"] for n in intf["input"]] == ["/dev/input/event7", "/dev/input/js0"]
+    assert {n["name"] for n in intf["input"]} == {"8BitDo VITURE Controller"}
+
+    keyboard = devices[(0x046D, 0xC31C)]
+    assert not keyboard["is_target"]
+    (intf,) = keyboard["interfaces"]
+    assert [n["node"] for n in intf["hidraw"]] == ["/dev/hidraw1"]
+    assert [n["node"] for n in intf["input"]] == ["/dev/input/event4"]
+
+    # Nothing joined to the hub, and the non-USB hidraw9 is left out
+    assert devices[(0x1D6B, 0x0002)]["interfaces"] == []
+    nodes = [n["node"] for d in devices.values() for i in d["interfaces"] for n in i["hidraw"]]
+    assert "/dev/hidraw9" not in nodes
+
+
+def test_missing_root_is_empty(tmp_path):
+    from sysfs_inventory import scan_sysfs
+
+    assert scan_sysfs(str(tmp_path / "nothing")) == []
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as root:
+        test_vid_pid_joined_to_hidraw_and_event_nodes(Path(root))
+        test_missing_root_is_empty(Path(root))
+    print("PASSED")
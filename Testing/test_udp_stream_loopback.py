@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+UDP Stream Loopback Test
+Streams random controller states to a receiver on 127.0.0.1, drops a share
+of packets on purpose, and checks the receiver converges on the sender's
+state through keyframes, with small packets and a measured round trip.
+Also checks a restarted sender is followed at its first keyframe, a held
+state is released after the stale timeout even while foreign packets keep
+arriving, and malformed packets are dropped. No controller needed.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+
+STATES = 5000
+LOSS_RATE = 0.05
+
+
+def lossy_sender(address, **kwargs):
+    """A StreamSender that drops state packets at random to exercise keyframe recovery"""
+    from udp_stream import PKT_STATE, StreamSender
+
+    class LossySender(StreamSender):
+        def __init__(self):
+            super().__init__(address, **kwargs)
+            self.rng = random.Random(42)
+            self.dropped = 0
+            self.bytes_sent = 0
+
+        def _send(self, packet):
+            if packet[2] == PKT_STATE and self.rng.random() < LOSS_RATE:
+                self.dropped += 1
+                return
+            self.bytes_sent += len(packet)
+            super()._send(packet)
+    return LossySender()
+
+
+def receive_in_background(receiver):
+    """Start a thread calling receiver.receive(); returns a function that stops it"""
+    running = [True]
+
+    def receive_loop():
+        while running[0]:
+            receiver.receive(timeout=0.05)
+    thread = threading.Thread(target=receive_loop, daemon=True)
+    thread.start()
+
+    def stop():
+        running[0] = False
+        thread.join()
+    return stop
+
+
+def random_states(count, seed=7):
+    """Yield ControllerStates: mostly small stick moves, occasional button changes"""
+    from controller_state import ControllerState, ReportDecoder
+
+    decoder = ReportDecoder()
+    state = ControllerState()
+    rng = random.Random(seed)
+    report = [0x01, 0x00, 0x00, 0x0F, 0x80, 0x80, 0x80, 0x80]
+    for _ in range(count):
+        report[4 + rng.randrange(4)] = rng.randrange(256)
+        if rng.random() < 0.1:
+            report[1] = rng.getrandbits(8)
+        decoder.decode_into(report, state)
+        yield state
+
+
+def settle(sender, receiver, state, timeout=1.0):
+    """Stop changing input and let keyframes heal any loss; True once the receiver matches"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        sender.tick()
+        time.sleep(0.005)
+        if bytes(receiver.state) == bytes(state) and receiver.synced:
+            return True
+    return False
+
+
+def test_udp_stream_loopback():
+    from udp_stream import StreamReceiver
+
+    receiver = StreamReceiver(port=0, bind="127.0.0.1")
+    stop = receive_in_background(receiver)
+    sender = lossy_sender(("127.0.0.1", receiver.port), keyframe_interval=0.05, ping_interval=0.05)
+    try:
+        for state in random_states(STATES):
+            sender.send_state(state)
+            time.sleep(0.0002)
+        converged = settle(sender, receiver, state)
+    finally:
+        stop()
+        sender.close()
+        receiver.close()
+
+    print(f"{sender.sent} packets sent ({sender.dropped} dropped on purpose), "
+          f"avg {sender.bytes_sent / max(1, sender.sent):.1f} bytes; receiver saw {receiver.received}, "
+          f"{receiver.lost} detected lost, {receiver.keyframes} keyframes")
+    assert sender.dropped > 0
+    assert receiver.lost > 0                    # the loss was noticed...
+    assert converged                            # ...and healed by a keyframe
+    assert bytes(receiver.state) == bytes(state)
+    assert sender.bytes_sent / sender.sent < 16 + 1 + 12   # deltas, not full states
+    assert sender.rtt_avg_ms is not None and sender.rtt_avg_ms < 50
+
+
+def test_restarted_sender_is_followed_at_its_first_keyframe():
+    from controller_state import ControllerState
+    from udp_stream import StreamReceiver, StreamSender
+
+    receiver = StreamReceiver(port=0, bind="127.0.0.1")
+    stop = receive_in_background(receiver)
+    try:
+        first = StreamSender(("127.0.0.1", receiver.port))
+        for state in random_states(2000):
+            first.send_state(state)
+        assert settle(first, receiver, state)
+        assert receiver.last_seq > 1000
+        first.close()
+
+        # A new sender starts its sequence at 0 again and sends without a pause
+        second = StreamSender(("127.0.0.1", receiver.port), keyframe_interval=0.05)
+        held = ControllerState()
+        held.sThumbLX = 4321
+        start = time.perf_counter()
+        while time.perf_counter() - start < 0.5 and receiver.state.sThumbLX != 4321:
+            second.send_state(held)
+            second.tick()
+            time.sleep(0.002)
+        followed_ms = (time.perf_counter() - start) * 1000
+        second.close()
+    finally:
+        stop()
+        receiver.close()
+    assert receiver.state.sThumbLX == 4321
+    assert followed_ms < 100                    # one keyframe, not a silence plus the stale timeout
+    assert receiver.resyncs == 1
+
+
+def test_stale_state_cleared_while_foreign_traffic_flows():
+    import socket
+    from controller_state import ControllerState
+    from udp_stream import StreamReceiver, encode_state, state_values
+
+    receiver = StreamReceiver(port=0, bind="127.0.0.1", stale_timeout=0.2)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        held = ControllerState()
+        held.bButtonsHi = 0x10
+        packet, _ = encode_state(5, 0, state_values(held), None, keyframe=True)
+        sock.sendto(packet, ("127.0.0.1", receiver.port))
+        assert receiver.receive(timeout=1.0) is True
+        # Only noise from now on: the socket never goes quiet, yet the
+        # held button must still be released after stale_timeout
+        start = time.perf_counter()
+        while any(bytes(receiver.state)) and time.perf_counter() - start < 1.0:
+            sock.sendto(b"noise", ("127.0.0.1", receiver.port))
+            receiver.receive(timeout=0.05)
+        released_ms = (time.perf_counter() - start) * 1000
+    finally:
+        sock.close()
+        receiver.close()
+    assert bytes(receiver.state) == bytes(12)
+    assert released_ms < 300
+
+
+def test_malformed_packets_are_dropped():
+    import socket
+    from controller_state import ControllerState
+    from udp_stream import HEADER, MAGIC, PKT_PING, PKT_STATE, StreamReceiver, encode_state, state_values
+
+    receiver = StreamReceiver(port=0, bind="127.0.0.1")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        bad = [
+            HEADER.pack(MAGIC, PKT_STATE, 0, 1, 0) + bytes([0xFF, 1]),   # all fields flagged, 1 byte of them
+            HEADER.pack(MAGIC, PKT_STATE, 0, 1, 0),                      # no payload at all
+            b"VX\x01",                                                   # shorter than a header
+            b"not ours, just LAN noise",
+        ]
+        for packet in bad:
+            sock.sendto(packet, ("127.0.0.1", receiver.port))
+            assert receiver.receive(timeout=1.0) is False
+        assert receiver.malformed == len(bad)
+        assert receiver.received == 0 and bytes(receiver.state) == bytes(12)
+
+        # A ping from a sender that is already gone: the pong must not raise
+        sock.sendto(HEADER.pack(MAGIC, PKT_PING, 0, 1, 0), ("127.0.0.1", receiver.port))
+        sock.close()
+        assert receiver.receive(timeout=1.0) is False
+
+        # Still receiving normally afterwards
+        state = ControllerState()
+        state.sThumbLX = 1234
+        packet, _ = encode_state(2, 0, state_values(state), None, keyframe=True)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.sendto(packet, ("127.0.0.1", receiver.port))
+        sender.close()
+        assert receiver.receive(timeout=1.0) is True
+        assert receiver.state.sThumbLX == 1234
+    finally:
+        receiver.close()
+
+
+if __name__ == "__main__":
+    test_udp_stream_loopback()
+    test_restarted_sender_is_followed_at_its_first_keyframe()
+    test_stale_state_cleared_while_foreign_traffic_flows()
+    test_malformed_packets_are_dropped()
+    print("PASSED")
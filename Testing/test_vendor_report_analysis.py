@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Vendor Report Analysis Test
+Records a synthetic session through the bridge's pipeline - gamepad
+reports at 1000 Hz with vendor reports (ID 2) at 500 Hz carrying a
+sequence counter, a 16-bit value that follows the left stick, a flag set
+while A is held, a slowly draining "battery" byte and noise - then checks
+the analysis finds each field, the vendor-only recorder keeps exactly the
+ID 2 frames, and the decoder exposes the suggested fields while decoding
+report ID 1 exactly as before. No controller needed.
+"""
+
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Bridge"))
+sys.path.insert(0, os.path.join(HERE, "..", "Analysis"))
+
+GAMEPAD_REPORTS = 100000
+MAX_ANALYSIS_S = 2.0
+
+
+def vendor_frame(sequence, pad, rng):
+    frame = bytearray(63)
+    frame[0] = 0x02
+    frame[1] = sequence & 0xFF                            # sequence counter
+    frame[2] = 0x5A                                       # constant
+    struct.pack_into("<h", frame, 10, (pad[4] - 128) * 200 + rng.randint(-40, 40))  # follows LX
+    frame[20] = 1 if pad[1] & 0x01 else 0                 # A held
+    frame[40] = 100 - sequence * 50 // GAMEPAD_REPORTS    # battery, draining
+    for offset in range(48, 56):
+        frame[offset] = rng.getrandbits(8)                # noise
+    return bytes(frame)
+
+
+def record_session(full_path, vendor_path):
+    """Push the session through a ReportPipeline with both recorders"""
+    from report_pipeline import RecorderSink, ReportPipeline
+    from synthetic_reports import make_stream
+
+    walk = make_stream("walk", seed=11)
+    rng = random.Random(11)
+    pipeline = ReportPipeline(capacity=1 << 16)
+    pipeline.add_sink(RecorderSink(full_path))
+    vendor_sink = RecorderSink(vendor_path, report_ids=(2,), name="vendor-recorder")
+    pipeline.add_sink(vendor_sink)
+    sent = 0
+    for i in range(GAMEPAD_REPORTS):
+        pad = next(walk)
+        if (i // 2000) % 2:
+            pad[1] |= 0x01                                # A held in alternate 2 s stretches
+        pipeline.push(pad, (2 * i) * 500_000)
+        if i % 2:
+            pipeline.push(vendor_frame(i // 2, pad, rng), (2 * i + 1) * 500_000)
+            sent += 1
+        if i % 4096 == 0:
+            time.sleep(0.001)                             # let the recorders keep up
+    pipeline.stop()
+    return sent, pipeline.sink_stats()
+
+
+@pytest.fixture(scope="module")
+def session(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("vendor")
+    full_path, vendor_path = str(tmp / "session.vxcap"), str(tmp / "vendor.vxcap")
+    sent, sink_stats = record_session(full_path, vendor_path)
+    return full_path, vendor_path, sent, sink_stats
+
+
+@pytest.fixture(scope="module")
+def analysis(session):
+    from vendor_report_analysis import analyse, print_analysis
+
+    start = time.perf_counter()
+    result = analyse(session[0])
+    result["elapsed"] = time.perf_counter() - start
+    print_analysis(result)
+    return result
+
+
+def test_vendor_recorder_keeps_only_id2(session):
+    from capture_format import CaptureReader
+
+    full_path, vendor_path, sent, sink_stats = session
+    assert sum(stats[2] for stats in sink_stats) == 0
+    assert [r.report_id for r in CaptureReader(vendor_path)] == [2] * sent
+
+
+def test_analysis_finds_each_field(analysis):
+    kinds, matches, words = analysis["kinds"], analysis["matches"], analysis["words"]
+    assert kinds[1] == "counter +1"
+    assert kinds[2] == "constant"
+    assert [(w[0], w[1]) for w in words] == [(10, "i16")]
+    assert matches["word10"][0] == "LX" and matches["word10"][1] > 0.95
+    assert kinds[20] == "flags"
+    assert matches["byte20"][0] == "A" and matches["byte20"][1] > 0.95
+    assert kinds[40] == "signal"
+    assert [kinds[o] for o in range(48, 56)] == ["noisy"] * 8
+    assert analysis["elapsed"] < MAX_ANALYSIS_S
+
+
+def test_decoder_exposes_suggested_fields(session, analysis):
+    from capture_format import CaptureReader
+    from controller_state import ControllerState, ReportDecoder
+    from mapping_profile import decoder_kwargs
+    from vendor_report_analysis import suggest_fields
+
+    full_path, vendor_path, sent, sink_stats = session
+    # The suggested fields, loaded the way the bridge loads a profile
+    decoder = ReportDecoder(**decoder_kwargs({"vendor": suggest_fields(analysis)}))
+    plain = ReportDecoder()
+    state, plain_state = ControllerState(), ControllerState()
+    last_vendor = None
+    for record in CaptureReader(full_path):
+        # Report ID 1 decodes exactly as without vendor fields
+        assert decoder.decode_into(record.data, state) == plain.decode_into(record.data, plain_state)
+        assert state.as_tuple() == plain_state.as_tuple()
+        if record.report_id == 2:
+            last_vendor = record.data
+    assert decoder.vendor.decoded == sent
+    assert decoder.rejected == 0
+    assert decoder.vendor.values["word10"] == struct.unpack_from("<h", last_vendor, 10)[0]
+    assert decoder.vendor.values["counter"] == last_vendor[1]
+
+
+if __name__ == "__main__":
+    from vendor_report_analysis import analyse, print_analysis
+
+    with tempfile.TemporaryDirectory() as tmp:
+        full_path, vendor_path = os.path.join(tmp, "session.vxcap"), os.path.join(tmp, "vendor.vxcap")
+        recorded = (full_path, vendor_path) + record_session(full_path, vendor_path)
+        start = time.perf_counter()
+        result = analyse(full_path)
+        result["elapsed"] = time.perf_counter() - start
+        print_analysis(result)
+        test_vendor_recorder_keeps_only_id2(recorded)
+        test_analysis_finds_each_field(result)
+        test_decoder_exposes_suggested_fields(recorded, result)
+    print("PASSED")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Visualizer Sampling Test
+Plays a scripted 1000 Hz session through the visualizer's reader thread
+and frame sampler at 20 fps: a stick flick and a button tap that both
+start and end between two frames. Checks every report is consumed, the
+flick shows up in the min/max envelope and the tap in the frame's
+buttons (the latest state alone misses both), and the report rate reads
+~1000/s. No controller needed.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+
+RATE_HZ = 1000
+FPS = 20
+SECONDS = 1.0
+FLICK = range(120, 128)   # report numbers where LX is pushed to 255
+TAP = range(330, 334)     # report numbers where A is held
+
+
+class ScriptedDevice:
+    """Stands in for hid.device: returns one scripted report per period"""
+
+    def __init__(self, count, rate_hz):
+        self.count = count
+        self.period = 1.0 / rate_hz
+        self.sent = 0
+        self._next = time.perf_counter()
+
+    def read(self, size, timeout_ms=0):
+        if self.sent >= self.count:
+            time.sleep(timeout_ms / 1000)
+            return []
+        self._next += self.period
+        time.sleep(max(0.0, self._next - time.perf_counter()))
+        i = self.sent
+        self.sent += 1
+        report = [0x01, 0, 0, 0x0F, 128, 128, 128, 128, 0, 0] + [0] * 54
+        if i in FLICK:
+            report[4] = 255
+        if i in TAP:
+            report[1] = 0x01
+        return report
+
+
+def run_sampler():
+    """Play the scripted session through the reader and sample it at FPS"""
+    from report_pipeline import ReportRing
+    from visualize_controller import (
+        FrameSampler, ReportReader, RING_CAPACITY, render_visualization,
+    )
+
+    count = int(RATE_HZ * SECONDS)
+    ring = ReportRing(RING_CAPACITY)
+    sampler = FrameSampler(ring)
+    device = ScriptedDevice(count, RATE_HZ)
+    reader = ReportReader(device, ring)
+    reader.start()
+
+    frames = []
+    period = 1.0 / FPS
+    next_frame = time.perf_counter()
+    while device.sent < count or ring.head > sampler.cursor.position:
+        next_frame += period
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+        frame = sampler.sample()
+        if frame:
+            frames.append(frame)
+            render_visualization(frame)
+    reader.stop()
+
+    print(f"Frames sampled: {len(frames)}, reports consumed: {sampler.total} of {count}")
+    for line in render_visualization(frames[-1])[:4]:
+        print(f"  {line}")
+    return count, sampler, frames
+
+
+@pytest.fixture(scope="module")
+def sampled():
+    return run_sampler()
+
+
+def test_every_report_consumed(sampled):
+    count, sampler, frames = sampled
+    assert sampler.total == count
+    assert sampler.cursor.dropped == 0
+
+
+def test_flick_and_tap_visible(sampled):
+    count, sampler, frames = sampled
+    assert any(f["envelope"]["LX"][1] == 255 for f in frames)
+    assert any(f["buttons"][0] & 0x01 for f in frames)
+
+
+def test_report_rate(sampled):
+    count, sampler, frames = sampled
+    steady = [f["rates"][-1] for f in frames[1:-1]]
+    mean_rate = sum(steady) / len(steady)
+    assert abs(mean_rate - RATE_HZ) < RATE_HZ * 0.2
+
+
+if __name__ == "__main__":
+    result = run_sampler()
+    test_every_report_consumed(result)
+    test_flick_and_tap_visible(result)
+    test_report_rate(result)
+    print("PASSED")
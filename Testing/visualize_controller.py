@@ -2,15 +2,34 @@
 """
 Controller Joystick Visualizer
 Visualizes the joystick and trigger values from the controller in real-time.
+
+A reader thread pushes every report into a small ring buffer; once per
+frame the display drains it and shows the latest state plus the min/max
+each axis reached since the previous frame, the buttons seen at any point
+during the frame, and a sparkline of the report rate. A stick flick that
+comes and goes between two redraws still shows up as an envelope.
 """
 
 import sys
 import os
+import threading
 import time
 import math
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bridge"))
+from device_discovery import find_controller, VITURE_VID, NORMAL_PID
+from report_pipeline import ReportRing
+from live_screen import LiveScreen
+
+READ_TIMEOUT_MS = 100
+FPS = 20
+RING_CAPACITY = 256       # reports; several frames' worth at 1000 Hz
+SPARK_WIDTH = 40          # frames of report-rate history
+SPARK_LEVELS = " .:-=+*#%@"
 
-def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+# Report bytes shown with a min/max envelope
+AXES = (("LX", 4), ("LY", 5), ("RX", 6), ("RY", 7), ("L2", 8), ("R2", 9))
 
 def draw_bar(value, width=20):
     """Draw a progress bar for a value between 0 and 255"""
@@ -18,8 +37,30 @@ def draw_bar(value, width=20):
     filled = int(normalized * width)
     return "[" + "#" * filled + " " * (width - filled) + f"] {value:3d}"
 
-def draw_joystick(x, y, size=10):
-    """Draw a 2D representation of joystick position"""
+def draw_envelope(low, high, value, width=32):
+    """Bar showing the range an axis covered this frame and where it is now"""
+    def cell(v):
+        return min(width - 1, v * width // 256)
+    bar = [" "] * width
+    for c in range(cell(low), cell(high) + 1):
+        bar[c] = "-"
+    bar[cell(value)] = "O"
+    return "[" + "".join(bar) + f"] {value:3d}  ({low:3d}-{high:3d})"
+
+def draw_sparkline(rates):
+    """One character per frame, scaled to the highest rate shown"""
+    top = max(rates) if rates else 0
+    if not top:
+        return " " * len(rates)
+    last = len(SPARK_LEVELS) - 1
+    return "".join(SPARK_LEVELS[round(r / top * last)] for r in rates)
+
+def draw_joystick(x, y, size=10, x_range=None, y_range=None):
+    """Draw a 2D representation of joystick position.
+
+    x_range/y_range are (min, max) reached this frame; the box they span is
+    shaded so movements shorter than a frame stay visible.
+    """
     # Normalize 0-255 to -1.0 to 1.0 (approximate, center is 127/128)
     norm_x = (x - 128) / 128.0
     norm_y = (y - 128) / 128.0
@@ -36,6 +77,13 @@ def draw_joystick(x, y, size=10):
     pos_x = max(0, min(grid_x - 1, pos_x))
     pos_y = max(0, min(grid_y - 1, pos_y))
     
+    def to_col(v):
+        return max(0, min(grid_x - 1, int(((v - 128) / 128.0 + 1) * size)))
+    def to_row(v):
+        return max(0, min(grid_y - 1, int(((v - 128) / 128.0 + 1) * (size / 2))))
+    x_lo, x_hi = (to_col(x_range[0]), to_col(x_range[1])) if x_range else (pos_x, pos_x)
+    y_lo, y_hi = (to_row(y_range[0]), to_row(y_range[1])) if y_range else (pos_y, pos_y)
+    
     output = []
     output.append(f"  X: {x:3d}  Y: {y:3d}")
     output.append("  +" + "-" * grid_x + "+")
@@ -47,6 +95,8 @@ def draw_joystick(x, y, size=10):
                 line += "O"
             elif r == size // 2 and c == size:
                 line += "+"
+            elif y_lo <= r <= y_hi and x_lo <= c <= x_hi:
+                line += "."
             else:
                 line += " "
         line += "|"
@@ -55,6 +105,162 @@ def draw_joystick(x, y, size=10):
     output.append("  +" + "-" * grid_x + "+")
     return "\n".join(output)
 
+class ReportReader(threading.Thread):
+    """Reads every report into a ring; never waits on the display"""
+
+    def __init__(self, device, ring):
+        super().__init__(name="report-reader", daemon=True)
+        self.device = device
+        self.ring = ring
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                data = self.device.read(64, READ_TIMEOUT_MS)
+                if data:
+                    self.ring.push(data, time.perf_counter_ns())
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(1.0)
+
+class FrameSampler:
+    """Summarizes the reports that arrived since the previous frame"""
+
+    def __init__(self, ring, history=SPARK_WIDTH):
+        self.cursor = ring.cursor()
+        self.latest = None
+        self.rates = deque([0.0] * history, maxlen=history)
+        self.total = 0
+        self._last_sample = time.perf_counter_ns()
+
+    def sample(self, now_ns=None):
+        """Drain the ring; returns the state to draw, or None before any report"""
+        now_ns = now_ns or time.perf_counter_ns()
+        lows = highs = None
+        buttons1 = buttons2 = 0
+        count = 0
+        while True:
+            item = self.cursor.next()
+            if item is None:
+                break
+            report = item[1]
+            if len(report) < 10 or report[0] != 0x01:
+                continue
+            count += 1
+            self.latest = report
+            values = [report[b] for _, b in AXES]
+            if lows is None:
+                lows, highs = values, list(values)
+            else:
+                lows = [min(a, b) for a, b in zip(lows, values)]
+                highs = [max(a, b) for a, b in zip(highs, values)]
+            buttons1 |= report[1]
+            buttons2 |= report[2]
+
+        elapsed = (now_ns - self._last_sample) / 1e9
+        self._last_sample = now_ns
+        self.rates.append(count / elapsed if elapsed > 0 else 0.0)
+        self.total += count
+        if self.latest is None:
+            return None
+        if lows is None:
+            # Nothing new this frame: the envelope is just the held value
+            lows = highs = [self.latest[b] for _, b in AXES]
+            buttons1, buttons2 = self.latest[1], self.latest[2]
+        return {
+            "report": self.latest[:10],
+            "envelope": {name: (lo, hi) for (name, _), lo, hi in zip(AXES, lows, highs)},
+            "buttons": (buttons1, buttons2),
+            "count": count,
+            "rates": tuple(self.rates),
+            "total": self.total,
+            "dropped": self.cursor.dropped,
+        }
+
+def render_visualization(frame):
+    if frame is None:
+        return ["VITURE x 8BitDo Controller Visualization", "=" * 40, "Waiting for reports..."]
+    data = frame["report"]
+    envelope = frame["envelope"]
+    # Based on previous output: 01 80 00 0f 7f 7f 7f 7f
+    # Likely mapping:
+    # Byte 0: Report ID? (01)
+    # Byte 1: Buttons (A, B, X, Y, LB, RB, etc.)
+    # Byte 2: D-Pad / potentially more buttons
+    # Byte 3: ?
+    # Byte 4: Left Stick X
+    # Byte 5: Left Stick Y
+    # Byte 6: Right Stick X (mapped to RZ)
+    # Byte 7: Right Stick Y (mapped to Z)
+    
+    # Note: This mapping is a guess and needs verification
+    # 8BitDo usually follows standard XInput or Switch Pro mapping patterns
+    
+    # Buttons held at any point during the frame, so short taps show
+    buttons1, buttons2 = frame["buttons"]
+    
+    lx = data[4]
+    ly = data[5]
+    rx = data[6]
+    ry = data[7]
+    
+    lines = []
+    lines.append("VITURE x 8BitDo Controller Visualization")
+    lines.append("=" * 40)
+    lines.append(f"Raw Data: {' '.join([f'{b:02x}' for b in data[:10]])}")
+    rate = frame["rates"][-1]
+    lines.append(f"Reports:  {rate:6.0f}/s |{draw_sparkline(frame['rates'])}| "
+                 f"{frame['count']} this frame, {frame['total']} total"
+                 + (f", {frame['dropped']} dropped" if frame["dropped"] else ""))
+    lines.append("-" * 40)
+    
+    lines.append(f"Left Analog Stick:")
+    lines.extend(draw_joystick(lx, ly, x_range=envelope["LX"], y_range=envelope["LY"]).split("\n"))
+    
+    lines.append("")
+    lines.append("Right Analog Stick:")
+    lines.extend(draw_joystick(rx, ry, x_range=envelope["RX"], y_range=envelope["RY"]).split("\n"))
+    
+    lines.append("")
+    lines.append("Axes (this frame's min-max):")
+    for name, byte in AXES:
+        low, high = envelope[name]
+        lines.append(f"  {name}: {draw_envelope(low, high, data[byte])}")
+    
+    lines.append("-" * 40)
+    lines.append(f"Buttons 1: {buttons1:08b} (Hex: {buttons1:02x})")
+    lines.append(f"Buttons 2: {buttons2:08b} (Hex: {buttons2:02x})")
+    
+    # Try to identify specific buttons
+    btn_str = []
+    
+    # Verified Mapping
+    # Byte 1
+    if buttons1 & 0x01: btn_str.append("A")
+    if buttons1 & 0x02: btn_str.append("B")
+    if buttons1 & 0x08: btn_str.append("X")
+    if buttons1 & 0x10: btn_str.append("Y")
+    if buttons1 & 0x20: btn_str.append("P2 (Back)")
+    if buttons1 & 0x40: btn_str.append("LB")
+    if buttons1 & 0x80: btn_str.append("RB")
+    
+    # Byte 2
+    if buttons2 & 0x01: btn_str.append("LT")
+    if buttons2 & 0x02: btn_str.append("RT")
+    if buttons2 & 0x04: btn_str.append("Select")
+    if buttons2 & 0x08: btn_str.append("Start")
+    if buttons2 & 0x10: btn_str.append("Home")
+    if buttons2 & 0x20: btn_str.append("L3")
+    if buttons2 & 0x40: btn_str.append("R3")
+    
+    lines.append(f"Detected Inputs: {', '.join(btn_str)}")
+    return lines
+
 def visualize_controller():
     try:
         import hid
@@ -62,18 +268,10 @@ def visualize_controller():
         print("Error: 'hid' package not installed")
         return
 
-    TARGET_VID = 0x2DC8
-    TARGET_PID = 0x301F
-
-    print(f"Looking for controller (VID: 0x{TARGET_VID:04x}, PID: 0x{TARGET_PID:04x})...")
+    print(f"Looking for controller (VID: 0x{VITURE_VID:04x}, PID: 0x{NORMAL_PID:04x})...")
     
-    # Find the device
-    target_device = None
-    for device in hid.enumerate():
-        if device['vendor_id'] == TARGET_VID and device['product_id'] == TARGET_PID:
-            if device['usage_page'] == 1 and device['usage'] == 5:
-                target_device = device
-                break
+    # Find the device (Game Pad collection only)
+    target_device = find_controller(any_interface=False)
     
     if not target_device:
         print("Controller not found.")
@@ -82,88 +280,34 @@ def visualize_controller():
     print("Controller found! Reading input data...")
     time.sleep(1)
 
+    screen = LiveScreen(render_visualization, fps=FPS)
+    reader = None
     try:
         h = hid.device()
         h.open_path(target_device['path'])
-        h.set_nonblocking(1)
-        
-        print("\n\n")
+        ring = ReportRing(RING_CAPACITY)
+        sampler = FrameSampler(ring)
+        reader = ReportReader(h, ring)
+        reader.start()
+        screen.start()
 
-        while True:
-            # Read data
-            data = h.read(64)
-            if data and len(data) >= 8:
-                # Based on previous output: 01 80 00 0f 7f 7f 7f 7f
-                # Likely mapping:
-                # Byte 0: Report ID? (01)
-                # Byte 1: Buttons (A, B, X, Y, LB, RB, etc.)
-                # Byte 2: D-Pad / potentially more buttons
-                # Byte 3: ?
-                # Byte 4: Left Stick X
-                # Byte 5: Left Stick Y
-                # Byte 6: Right Stick X (mapped to RZ)
-                # Byte 7: Right Stick Y (mapped to Z)
-                
-                # Note: This mapping is a guess and needs verification
-                # 8BitDo usually follows standard XInput or Switch Pro mapping patterns
-                
-                # Check for buttons
-                buttons1 = data[1]
-                buttons2 = data[2]
-                
-                lx = data[4]
-                ly = data[5]
-                rx = data[6]
-                ry = data[7]
-                
-                # Clear and redraw
-                # Using ANSI escape codes to move cursor up instead of clearing screen to reduce flicker
-                sys.stdout.write("\033[H\033[J") 
-                
-                print("VITURE x 8BitDo Controller Visualization")
-                print("=" * 40)
-                print(f"Raw Data: {' '.join([f'{b:02x}' for b in data[:10]])}")
-                print("-" * 40)
-                
-                print(f"Left Analog Stick:")
-                print(draw_joystick(lx, ly))
-                
-                print("\nRight Analog Stick:")
-                print(draw_joystick(rx, ry))
-                
-                print("-" * 40)
-                print(f"Buttons 1: {buttons1:08b} (Hex: {buttons1:02x})")
-                print(f"Buttons 2: {buttons2:08b} (Hex: {buttons2:02x})")
-                
-                # Try to identify specific buttons
-                btn_str = []
-                
-                # Verified Mapping
-                # Byte 1
-                if buttons1 & 0x01: btn_str.append("A")
-                if buttons1 & 0x02: btn_str.append("B")
-                if buttons1 & 0x08: btn_str.append("X")
-                if buttons1 & 0x10: btn_str.append("Y")
-                if buttons1 & 0x20: btn_str.append("P2 (Back)")
-                if buttons1 & 0x40: btn_str.append("LB")
-                if buttons1 & 0x80: btn_str.append("RB")
-                
-                # Byte 2
-                if buttons2 & 0x01: btn_str.append("LT")
-                if buttons2 & 0x02: btn_str.append("RT")
-                if buttons2 & 0x04: btn_str.append("Select")
-                if buttons2 & 0x08: btn_str.append("Start")
-                if buttons2 & 0x10: btn_str.append("Home")
-                if buttons2 & 0x20: btn_str.append("L3")
-                if buttons2 & 0x40: btn_str.append("R3")
-                
-                print(f"Detected Inputs: {', '.join(btn_str)}")
-                
-            time.sleep(0.05)
+        # The reader consumes every report; this loop only samples per frame
+        period = 1.0 / FPS
+        next_frame = time.perf_counter()
+        while reader.is_alive():
+            next_frame += period
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+            screen.update(sampler.sample())
+        screen.stop()
+        print(f"\nRead error: {reader.error}")
 
     except KeyboardInterrupt:
+        screen.stop()
         print("\nStopping...")
     finally:
+        if reader is not None:
+            reader.stop()
+        screen.stop()
         try:
             h.close()
         except: